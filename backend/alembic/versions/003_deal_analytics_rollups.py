@@ -0,0 +1,43 @@
+"""Per-organization deal analytics rollups
+
+Revision ID: 003
+Revises: 002
+Create Date: 2025-11-03 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers
+revision = '003'
+down_revision = '002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Create deal_analytics_rollups"""
+
+    op.create_table('deal_analytics_rollups',
+        sa.Column('organization_id', postgresql.UUID(as_uuid=False), nullable=False),
+        sa.Column('dimension', sa.String(20), nullable=False),
+        sa.Column('key', sa.String(255), nullable=False, server_default=''),
+        sa.Column('deal_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('active_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('value_sum', sa.Numeric(24, 2), nullable=False, server_default='0'),
+        sa.Column('value_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('active_value_sum', sa.Numeric(24, 2), nullable=False, server_default='0'),
+        sa.Column('closed_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('won_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('close_days_sum', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('close_days_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('refreshed_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['organization_id'], ['organizations.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('organization_id', 'dimension', 'key')
+    )
+
+
+def downgrade() -> None:
+    """Drop deal_analytics_rollups"""
+    op.drop_table('deal_analytics_rollups')
@@ -4,13 +4,16 @@ Central AI orchestration and model management
 """
 
 from enum import Enum
-from typing import Dict, Any, List, Optional, Union
+from typing import AsyncIterator, Dict, Any, List, Optional, Union
 from datetime import datetime
 from dataclasses import dataclass
 import asyncio
 import json
 from abc import ABC, abstractmethod
 
+from app.ai.streaming import StreamEvent
+from app.services.ai_gateway import get_ai_gateway_stats
+
 class AIModel(str, Enum):
     """AI model types available in the platform"""
     DOCUMENT_ANALYZER = "document_analyzer"
@@ -79,6 +82,20 @@ class AIProcessor(ABC):
         """Get model information"""
         pass
 
+    async def stream(self, request: AIRequest) -> AsyncIterator[StreamEvent]:
+        """
+        Process a request as a stream of events ending in "done".
+
+        Processors that can't stream produce the whole result at once and
+        report each of its fields.
+        """
+        response = await self.process(request)
+        if response.error:
+            raise RuntimeError(response.error)
+        for name, value in response.result.items():
+            yield StreamEvent("field", {"name": name, "value": value})
+        yield StreamEvent("done", {"result": response.result, "confidence": response.confidence})
+
 class MockAIProcessor(AIProcessor):
     """Mock AI processor for development and testing"""
     
@@ -307,6 +324,29 @@ class AIService:
                 error=str(e)
             )
     
+    async def stream_request(self, request: AIRequest) -> AsyncIterator[StreamEvent]:
+        """Process an AI request, yielding events as the result is produced"""
+        self.processing_stats["total_requests"] += 1
+        started = datetime.now()
+
+        try:
+            processor = self.processors.get(request.model)
+            if not processor:
+                raise ValueError(f"No processor available for model {request.model}")
+
+            if not processor.supports_task(request.task):
+                raise ValueError(f"Model {request.model} does not support task {request.task}")
+
+            async for event in processor.stream(request):
+                yield event
+
+        except Exception:
+            self.processing_stats["failed_requests"] += 1
+            raise
+
+        self.processing_stats["successful_requests"] += 1
+        self._update_average_processing_time(int((datetime.now() - started).total_seconds() * 1000))
+
     def _update_average_processing_time(self, processing_time_ms: int):
         """Update running average processing time"""
         current_avg = self.processing_stats["average_processing_time_ms"]
@@ -342,12 +382,21 @@ class AIService:
         stats["success_rate"] = (
             stats["successful_requests"] / max(stats["total_requests"], 1)
         ) * 100
+        stats["gateway"] = get_ai_gateway_stats()
         return stats
     
-    async def batch_process(self, requests: List[AIRequest]) -> List[AIResponse]:
-        """Process multiple AI requests in parallel"""
-        tasks = [self.process_request(request) for request in requests]
-        return await asyncio.gather(*tasks, return_exceptions=False)
+    async def batch_process(self, requests: List[AIRequest], max_concurrency: int = 8) -> List[AIResponse]:
+        """
+        Process multiple AI requests in parallel, at most ``max_concurrency``
+        at a time (Claude calls are further limited per model by the AI gateway)
+        """
+        slots = asyncio.Semaphore(max_concurrency)
+
+        async def run(request: AIRequest) -> AIResponse:
+            async with slots:
+                return await self.process_request(request)
+
+        return await asyncio.gather(*(run(request) for request in requests), return_exceptions=False)
     
     def health_check(self) -> Dict[str, Any]:
         """Perform health check on AI service"""
@@ -6,11 +6,12 @@ Real AI integration using Anthropic's Claude API
 import os
 import json
 import asyncio
-from typing import Dict, Any, List
+from typing import AsyncIterator, Dict, Any, List
 from datetime import datetime
-import httpx
 
 from .ai_service import AIProcessor, AIRequest, AIResponse, AITask, AIModel
+from .streaming import StreamEvent, StructuredStream
+from app.services.ai_gateway import get_ai_gateway
 
 
 class ClaudeAIProcessor(AIProcessor):
@@ -35,27 +36,8 @@ class ClaudeAIProcessor(AIProcessor):
             # Prepare Claude API request
             messages = self._build_messages(request)
 
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    "https://api.anthropic.com/v1/messages",
-                    headers={
-                        "Content-Type": "application/json",
-                        "x-api-key": self.api_key,
-                        "anthropic-version": "2023-06-01"
-                    },
-                    json={
-                        "model": self.claude_model,
-                        "max_tokens": self.max_tokens,
-                        "temperature": self.temperature,
-                        "messages": messages
-                    },
-                    timeout=30.0
-                )
-
-            if response.status_code != 200:
-                raise Exception(f"Claude API error: {response.status_code} - {response.text}")
-
-            response_data = response.json()
+            # Pooled, budgeted and cached by the shared gateway; raises on API errors
+            response_data = await get_ai_gateway().create_message(self._payload(messages), cache=True)
             result = self._parse_claude_response(request, response_data)
 
             processing_time = int((datetime.now() - start_time).total_seconds() * 1000)
@@ -88,6 +70,17 @@ class ClaudeAIProcessor(AIProcessor):
                 error=str(e)
             )
 
+    async def stream(self, request: AIRequest) -> AsyncIterator[StreamEvent]:
+        """Stream the completion, reporting JSON fields as soon as each is complete"""
+        stream = StructuredStream(
+            get_ai_gateway().stream_message(self._payload(self._build_messages(request)), cache=True)
+        )
+        async for event in stream:
+            yield event
+
+        result = self._parse_claude_response(request, {"content": [{"type": "text", "text": stream.text}]})
+        yield StreamEvent("done", {"result": result, "confidence": self._calculate_confidence(result)})
+
     def supports_task(self, task: AITask) -> bool:
         return task in self.supported_tasks
 
@@ -101,6 +94,14 @@ class ClaudeAIProcessor(AIProcessor):
             "temperature": self.temperature
         }
 
+    def _payload(self, messages: List[Dict[str, str]]) -> Dict[str, Any]:
+        return {
+            "model": self.claude_model,
+            "max_tokens": self.max_tokens,
+            "temperature": self.temperature,
+            "messages": messages
+        }
+
     def _build_messages(self, request: AIRequest) -> List[Dict[str, str]]:
         """Build messages for Claude API based on task type"""
 
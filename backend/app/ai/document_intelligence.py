@@ -4,12 +4,48 @@ AI-powered document analysis, summarization, and data extraction
 """
 
 from enum import Enum
-from typing import Dict, Any, List, Optional, Union
+from typing import AsyncIterator, Dict, Any, List, Optional, Union
 from datetime import datetime
-from dataclasses import dataclass
-import re
+from dataclasses import asdict, dataclass
 import json
 from .ai_service import AIService, AIRequest, AIResponse, AITask, AIModel, get_ai_service
+from .streaming import StreamEvent
+from app.services.document_scanner import PatternScanner, PatternSpec, ScanResult
+
+# Extraction patterns by category: (label, pattern, ignore_case), in priority order
+EXTRACTION_PATTERNS = {
+    "company": [
+        ("company", r'([A-Z][a-zA-Z\s]+(?:Inc|LLC|Corp|Ltd|Company|Co))', False),
+        ("corporation", r'([A-Z][a-zA-Z\s]+(?:Corporation|Incorporated|Limited))', False)
+    ],
+    "currency": [("currency", r'\$[\d,]+(?:\.\d{2})?[MBK]?', False)],
+    "percentage": [("percentage", r'\d+(?:\.\d+)?%', False)],
+    "revenue": [
+        ("revenue", r'revenue[:\s]+\$([\d,]+(?:\.\d+)?[MBK]?)', True),
+        ("sales", r'sales[:\s]+\$([\d,]+(?:\.\d+)?[MBK]?)', True)
+    ],
+    "ebitda": [("ebitda", r'ebitda[:\s]+\$([\d,]+(?:\.\d+)?[MBK]?)', True)],
+    "valuation": [
+        ("valuation", r'valuation[:\s]+\$([\d,]+(?:\.\d+)?[MBK]?)', True),
+        ("enterprise_value", r'enterprise\s+value[:\s]+\$([\d,]+(?:\.\d+)?[MBK]?)', True)
+    ],
+    "date": [
+        ("numeric", r'(\d{1,2}/\d{1,2}/\d{4})', False),
+        ("iso", r'(\d{4}-\d{2}-\d{2})', False),
+        # Only from a word's first letter: a match starting mid-word would also match from there,
+        # so this finds the same dates without retrying every letter of every word
+        ("written", r'(?<![A-Za-z])([A-Za-z]+\s+\d{1,2},?\s+\d{4})', False)
+    ],
+    "email": [("email", r'([a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,})', False)],
+    "phone": [("phone", r'(\(?\d{3}\)?[\s.-]?\d{3}[\s.-]?\d{4})', False)],
+    "growth_rate": [("growth_rate", r'growth[:\s]+([\d.]+)%', True)],
+    "margin": [("margin", r'margin[:\s]+([\d.]+)%', True)],
+    "action_item": [
+        ("action_item", r'action\s+item[:\s]+([^\n.]+)', True),
+        ("todo", r'todo[:\s]+([^\n.]+)', True),
+        ("next_steps", r'next\s+steps?[:\s]+([^\n.]+)', True)
+    ]
+}
 
 class DocumentType(str, Enum):
     """Types of documents that can be analyzed"""
@@ -77,6 +113,7 @@ class DocumentIntelligenceService:
     def __init__(self, ai_service: Optional[AIService] = None):
         self.ai_service = ai_service or get_ai_service()
         self.document_type_patterns = self._initialize_document_patterns()
+        self.scanner = PatternScanner(self._scan_specs())
         
     def _initialize_document_patterns(self) -> Dict[DocumentType, List[str]]:
         """Initialize patterns for document type detection"""
@@ -115,15 +152,42 @@ class DocumentIntelligenceService:
             ]
         }
     
+    def _scan_specs(self) -> List[PatternSpec]:
+        """Type detection and extraction patterns, compiled into one scanner"""
+        specs = [
+            PatternSpec("document_type", doc_type.value, pattern)
+            for doc_type, patterns in self.document_type_patterns.items()
+            for pattern in patterns
+        ]
+        for category, patterns in EXTRACTION_PATTERNS.items():
+            specs += [PatternSpec(category, label, pattern, ignore_case) for label, pattern, ignore_case in patterns]
+        return specs
+
+    def _scan(self, content: str, scan: Optional[ScanResult]) -> ScanResult:
+        return scan if scan is not None else self.scanner.scan(content)
+
+    def _first_value(self, scan: ScanResult, category: str) -> Optional[str]:
+        """Value of the first hit of the highest-priority pattern in the category"""
+        for label, _, _ in EXTRACTION_PATTERNS[category]:
+            hit = scan.first(category, label)
+            if hit:
+                return hit.value
+        return None
+
+    def _values(self, scan: ScanResult, category: str) -> List[str]:
+        """Values of the category's hits, pattern by pattern"""
+        return [value for label, _, _ in EXTRACTION_PATTERNS[category] for value in scan.values(category, label)]
+
     async def analyze_document(self, content: str, document_id: str,
                               hint_type: Optional[DocumentType] = None,
                               user_id: Optional[str] = None,
                               organization_id: Optional[str] = None) -> DocumentAnalysis:
         """Perform comprehensive document analysis"""
         start_time = datetime.now()
+        scan = self.scanner.scan(content)
         
         # Detect document type
-        detected_type = hint_type or self._detect_document_type(content)
+        detected_type = hint_type or self._detect_document_type(content, scan)
         
         # Perform AI analysis
         ai_request = AIRequest(
@@ -146,7 +210,7 @@ class DocumentIntelligenceService:
         ai_response = await self.ai_service.process_request(ai_request)
         
         # Extract entities using pattern matching
-        entities = self._extract_entities(content)
+        entities = self._extract_entities(content, scan)
         
         # Calculate sentiment
         sentiment_score = self._calculate_sentiment(content)
@@ -177,7 +241,27 @@ class DocumentIntelligenceService:
                                 organization_id: Optional[str] = None) -> ContentSummary:
         """Generate a comprehensive summary of document content"""
         # Use AI to generate summary
-        ai_request = AIRequest(
+        ai_request = self._summary_request(content, max_length, user_id, organization_id)
+        ai_response = await self.ai_service.process_request(ai_request)
+        return self._build_summary(content, ai_response.result)
+
+    async def stream_summary(self, content: str, max_length: int = 500,
+                             user_id: Optional[str] = None,
+                             organization_id: Optional[str] = None) -> AsyncIterator[StreamEvent]:
+        """Streaming variant of summarize_document; ends with a "done" event holding the ContentSummary"""
+        ai_request = self._summary_request(content, max_length, user_id, organization_id)
+        result = {}
+        async for event in self.ai_service.stream_request(ai_request):
+            if event.event == "done":
+                result = event.data.get("result") or {}
+            else:
+                yield event
+
+        yield StreamEvent("done", {"result": asdict(self._build_summary(content, result))})
+
+    def _summary_request(self, content: str, max_length: int,
+                         user_id: Optional[str], organization_id: Optional[str]) -> AIRequest:
+        return AIRequest(
             task=AITask.SUMMARIZE_CONTENT,
             model=AIModel.CONTENT_SUMMARIZER,
             input_data={
@@ -189,19 +273,18 @@ class DocumentIntelligenceService:
             user_id=user_id,
             organization_id=organization_id
         )
-        
-        ai_response = await self.ai_service.process_request(ai_request)
-        result = ai_response.result
-        
+
+    def _build_summary(self, content: str, result: Dict[str, Any]) -> ContentSummary:
         # Extract additional information
         word_count = len(content.split())
         reading_time = max(1, word_count // 200)  # Assume 200 words per minute
+        scan = self.scanner.scan(content)
         
         return ContentSummary(
             executive_summary=result.get("executive_summary", ""),
             key_points=result.get("key_points", []),
-            action_items=self._extract_action_items(content),
-            important_dates=self._extract_dates(content),
+            action_items=self._extract_action_items(content, scan),
+            important_dates=self._extract_dates(content, scan),
             financial_highlights=self._extract_financial_highlights(content),
             risks_identified=self._extract_risks(content),
             word_count=word_count,
@@ -228,11 +311,12 @@ class DocumentIntelligenceService:
         ai_result = ai_response.result.get("extracted_fields", {})
         
         # Enhanced extraction using pattern matching
-        entities = self._extract_entities(content)
-        financial_data = self._extract_financial_data(content)
-        dates = self._extract_dates(content)
-        contacts = self._extract_contacts(content)
-        metrics = self._extract_metrics(content)
+        scan = self.scanner.scan(content)
+        entities = self._extract_entities(content, scan)
+        financial_data = self._extract_financial_data(content, scan)
+        dates = self._extract_dates(content, scan)
+        contacts = self._extract_contacts(content, scan)
+        metrics = self._extract_metrics(content, scan)
         
         # Combine AI and pattern-based results
         combined_entities = {**entities, **ai_result.get("entities", {})}
@@ -247,17 +331,13 @@ class DocumentIntelligenceService:
             confidence_scores=ai_response.result.get("confidence_scores", {})
         )
     
-    def _detect_document_type(self, content: str) -> DocumentType:
+    def _detect_document_type(self, content: str, scan: Optional[ScanResult] = None) -> DocumentType:
         """Detect document type using pattern matching"""
-        content_lower = content.lower()
-        scores = {}
-        
-        for doc_type, patterns in self.document_type_patterns.items():
-            score = 0
-            for pattern in patterns:
-                matches = len(re.findall(pattern, content_lower))
-                score += matches
-            scores[doc_type] = score
+        scan = self._scan(content, scan)
+        scores = {
+            doc_type: scan.count("document_type", doc_type.value)
+            for doc_type in self.document_type_patterns
+        }
         
         if scores:
             best_match = max(scores, key=scores.get)
@@ -266,156 +346,80 @@ class DocumentIntelligenceService:
         
         return DocumentType.UNKNOWN
     
-    def _extract_entities(self, content: str) -> Dict[str, List[str]]:
+    def _extract_entities(self, content: str, scan: Optional[ScanResult] = None) -> Dict[str, List[str]]:
         """Extract entities using pattern matching"""
+        scan = self._scan(content, scan)
         entities = {
-            "companies": [],
+            "companies": [match.strip() for match in self._values(scan, "company")],
             "people": [],
             "locations": [],
-            "currencies": [],
-            "percentages": []
+            "currencies": scan.values("currency"),
+            "percentages": scan.values("percentage")
         }
         
-        # Company patterns (simplified)
-        company_patterns = [
-            r'([A-Z][a-zA-Z\s]+(?:Inc|LLC|Corp|Ltd|Company|Co))',
-            r'([A-Z][a-zA-Z\s]+(?:Corporation|Incorporated|Limited))'
-        ]
-        
-        for pattern in company_patterns:
-            matches = re.findall(pattern, content)
-            entities["companies"].extend([match.strip() for match in matches])
-        
-        # Currency amounts
-        currency_pattern = r'\$[\d,]+(?:\.\d{2})?[MBK]?'
-        entities["currencies"] = re.findall(currency_pattern, content)
-        
-        # Percentages
-        percentage_pattern = r'\d+(?:\.\d+)?%'
-        entities["percentages"] = re.findall(percentage_pattern, content)
-        
         # Remove duplicates
         for key in entities:
             entities[key] = list(set(entities[key]))
         
         return entities
     
-    def _extract_financial_data(self, content: str) -> Dict[str, Any]:
+    def _extract_financial_data(self, content: str, scan: Optional[ScanResult] = None) -> Dict[str, Any]:
         """Extract financial data using pattern matching"""
+        scan = self._scan(content, scan)
         financial_data = {}
         
-        # Revenue patterns
-        revenue_patterns = [
-            r'revenue[:\s]+\$([\d,]+(?:\.\d+)?[MBK]?)',
-            r'sales[:\s]+\$([\d,]+(?:\.\d+)?[MBK]?)'
-        ]
-        
-        for pattern in revenue_patterns:
-            match = re.search(pattern, content, re.IGNORECASE)
-            if match:
-                financial_data["revenue"] = match.group(1)
-                break
-        
-        # EBITDA patterns
-        ebitda_pattern = r'ebitda[:\s]+\$([\d,]+(?:\.\d+)?[MBK]?)'
-        match = re.search(ebitda_pattern, content, re.IGNORECASE)
-        if match:
-            financial_data["ebitda"] = match.group(1)
-        
-        # Valuation patterns
-        valuation_patterns = [
-            r'valuation[:\s]+\$([\d,]+(?:\.\d+)?[MBK]?)',
-            r'enterprise\s+value[:\s]+\$([\d,]+(?:\.\d+)?[MBK]?)'
-        ]
-        
-        for pattern in valuation_patterns:
-            match = re.search(pattern, content, re.IGNORECASE)
-            if match:
-                financial_data["valuation"] = match.group(1)
-                break
+        for field in ("revenue", "ebitda", "valuation"):
+            value = self._first_value(scan, field)
+            if value:
+                financial_data[field] = value
         
         return financial_data
     
-    def _extract_dates(self, content: str) -> List[Dict[str, Any]]:
+    def _extract_dates(self, content: str, scan: Optional[ScanResult] = None) -> List[Dict[str, Any]]:
         """Extract important dates from content"""
-        dates = []
-        
-        # Date patterns
-        date_patterns = [
-            r'(\d{1,2}/\d{1,2}/\d{4})',
-            r'(\d{4}-\d{2}-\d{2})',
-            r'([A-Za-z]+\s+\d{1,2},?\s+\d{4})'
+        scan = self._scan(content, scan)
+        dates = [
+            {
+                "date": match,
+                "context": "extracted",
+                "type": "general"
+            }
+            for match in self._values(scan, "date")
         ]
         
-        for pattern in date_patterns:
-            matches = re.findall(pattern, content)
-            for match in matches:
-                dates.append({
-                    "date": match,
-                    "context": "extracted",
-                    "type": "general"
-                })
-        
         return dates[:10]  # Limit to first 10 dates
     
-    def _extract_contacts(self, content: str) -> List[Dict[str, Any]]:
+    def _extract_contacts(self, content: str, scan: Optional[ScanResult] = None) -> List[Dict[str, Any]]:
         """Extract contact information"""
+        scan = self._scan(content, scan)
         contacts = []
         
-        # Email pattern
-        email_pattern = r'([a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,})'
-        emails = re.findall(email_pattern, content)
-        
-        for email in emails:
-            contacts.append({
-                "type": "email",
-                "value": email,
-                "context": "document"
-            })
-        
-        # Phone pattern (simplified)
-        phone_pattern = r'(\(?\d{3}\)?[\s.-]?\d{3}[\s.-]?\d{4})'
-        phones = re.findall(phone_pattern, content)
-        
-        for phone in phones:
-            contacts.append({
-                "type": "phone",
-                "value": phone,
-                "context": "document"
-            })
+        for contact_type in ("email", "phone"):
+            for value in scan.values(contact_type):
+                contacts.append({
+                    "type": contact_type,
+                    "value": value,
+                    "context": "document"
+                })
         
         return contacts
     
-    def _extract_metrics(self, content: str) -> Dict[str, float]:
+    def _extract_metrics(self, content: str, scan: Optional[ScanResult] = None) -> Dict[str, float]:
         """Extract quantitative metrics"""
+        scan = self._scan(content, scan)
         metrics = {}
         
-        # Growth rate
-        growth_pattern = r'growth[:\s]+([\d.]+)%'
-        match = re.search(growth_pattern, content, re.IGNORECASE)
-        if match:
-            metrics["growth_rate"] = float(match.group(1))
-        
-        # Margin
-        margin_pattern = r'margin[:\s]+([\d.]+)%'
-        match = re.search(margin_pattern, content, re.IGNORECASE)
-        if match:
-            metrics["margin"] = float(match.group(1))
+        for metric in ("growth_rate", "margin"):
+            value = self._first_value(scan, metric)
+            if value is not None:
+                metrics[metric] = float(value)
         
         return metrics
     
-    def _extract_action_items(self, content: str) -> List[str]:
+    def _extract_action_items(self, content: str, scan: Optional[ScanResult] = None) -> List[str]:
         """Extract action items from content"""
-        action_patterns = [
-            r'action\s+item[:\s]+([^\n.]+)',
-            r'todo[:\s]+([^\n.]+)',
-            r'next\s+steps?[:\s]+([^\n.]+)'
-        ]
-        
-        action_items = []
-        for pattern in action_patterns:
-            matches = re.findall(pattern, content, re.IGNORECASE)
-            action_items.extend(matches)
+        scan = self._scan(content, scan)
+        action_items = self._values(scan, "action_item")
         
         return action_items[:5]  # Limit to 5 items
     
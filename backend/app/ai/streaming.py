@@ -0,0 +1,264 @@
+"""
+AI Response Streaming
+Incremental JSON parsing of streamed completions and delivery over
+Server-Sent Events or the realtime WebSocket manager
+"""
+
+import asyncio
+import json
+import uuid
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Dict, List, Optional, Set
+
+import structlog
+from fastapi.responses import StreamingResponse
+
+from app.realtime.websocket_manager import MessageType, RealtimeMessage, websocket_manager
+
+logger = structlog.get_logger(__name__)
+
+WEBSOCKET_MESSAGE_TYPES = {
+    "start": MessageType.AI_STREAM_START,
+    "delta": MessageType.AI_STREAM_DELTA,
+    "field": MessageType.AI_STREAM_FIELD,
+    "item": MessageType.AI_STREAM_FIELD,
+    "done": MessageType.AI_STREAM_END,
+    "error": MessageType.AI_STREAM_ERROR,
+}
+
+# Relay tasks started for WebSocket delivery; held so they aren't garbage collected
+_relays: Set[asyncio.Task] = set()
+
+
+@dataclass
+class StreamEvent:
+    """One event of a streamed AI response"""
+    event: str  # start, delta, field, item, done or error
+    data: Dict[str, Any] = field(default_factory=dict)
+
+
+class IncrementalJSONParser:
+    """
+    Parse a JSON object as it arrives in arbitrary chunks.
+
+    Reports each top-level field once its value is complete, and each element
+    of a top-level array as soon as that element is complete, so a list of
+    risks is delivered one risk at a time. Prose or code fences around the
+    object are ignored.
+    """
+
+    def __init__(self):
+        self._text = ""
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._done = False
+        self._segment_start = None  # start of the current key or value at depth 1
+        self._key: Optional[str] = None
+        self._item_start = None  # start of the current element of a top-level array
+        self._item_index = 0
+        self._object_start = None
+        self.fields: Dict[str, Any] = {}
+
+    @property
+    def complete(self) -> bool:
+        return self._done
+
+    def feed(self, chunk: str) -> List[StreamEvent]:
+        """Consume a chunk and return the field and item events it completed"""
+        events: List[StreamEvent] = []
+        self._text += chunk
+        text = self._text
+
+        while self._pos < len(text) and not self._done:
+            pos = self._pos
+            char = text[pos]
+            self._pos += 1
+
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+                continue
+
+            if self._depth == 0:
+                if char == "{":
+                    self._depth = 1
+                    self._object_start = pos
+                    self._segment_start = pos + 1
+                continue
+
+            if char == '"':
+                self._in_string = True
+            elif char in "{[":
+                self._depth += 1
+                if self._depth == 2 and char == "[":
+                    self._item_start = pos + 1
+                    self._item_index = 0
+            elif char in "}]":
+                if self._depth == 2 and char == "]" and self._item_start is not None:
+                    self._emit_item(text[self._item_start:pos], events)
+                    self._item_start = None
+                self._depth -= 1
+                if self._depth == 0:
+                    self._emit_field(text[self._segment_start:pos], events)
+                    self._done = True
+            elif char == ":" and self._depth == 1:
+                self._key = _loads(text[self._segment_start:pos])
+                self._segment_start = pos + 1
+            elif char == ",":
+                if self._depth == 1:
+                    self._emit_field(text[self._segment_start:pos], events)
+                    self._segment_start = pos + 1
+                elif self._depth == 2 and self._item_start is not None:
+                    self._emit_item(text[self._item_start:pos], events)
+                    self._item_start = pos + 1
+
+        return events
+
+    def result(self) -> Optional[Dict[str, Any]]:
+        """The parsed object, or the fields completed so far when it never closed"""
+        if self._done:
+            parsed = _loads(self._text[self._object_start:self._pos])
+            if isinstance(parsed, dict):
+                return parsed
+        return dict(self.fields) if self.fields else None
+
+    def _emit_field(self, raw: str, events: List[StreamEvent]):
+        key, self._key = self._key, None
+        if not isinstance(key, str) or not raw.strip():
+            return
+        value = _loads(raw)
+        if value is _INVALID:
+            return
+        self.fields[key] = value
+        events.append(StreamEvent("field", {"name": key, "value": value}))
+
+    def _emit_item(self, raw: str, events: List[StreamEvent]):
+        if not isinstance(self._key, str) or not raw.strip():
+            return
+        value = _loads(raw)
+        if value is _INVALID:
+            return
+        events.append(StreamEvent("item", {"field": self._key, "index": self._item_index, "value": value}))
+        self._item_index += 1
+
+
+_INVALID = object()
+
+
+def _loads(raw: str) -> Any:
+    try:
+        return json.loads(raw)
+    except ValueError:
+        return _INVALID
+
+
+class StructuredStream:
+    """
+    Turn a stream of text chunks into delta, field and item events.
+
+    Iterate once; afterwards ``text`` holds the whole completion and
+    ``result`` the parsed JSON object (or None when there was none).
+    """
+
+    def __init__(self, chunks: AsyncIterator[str]):
+        self.chunks = chunks
+        self.parser = IncrementalJSONParser()
+        self.text = ""
+
+    @property
+    def result(self) -> Optional[Dict[str, Any]]:
+        return self.parser.result()
+
+    async def __aiter__(self) -> AsyncIterator[StreamEvent]:
+        parts = []
+        async for chunk in self.chunks:
+            parts.append(chunk)
+            yield StreamEvent("delta", {"text": chunk})
+            for event in self.parser.feed(chunk):
+                yield event
+        self.text = "".join(parts)
+
+
+# Transports
+
+def format_sse(event: StreamEvent) -> str:
+    """Encode an event as a Server-Sent Events message"""
+    return f"event: {event.event}\ndata: {json.dumps(event.data, default=str)}\n\n"
+
+
+async def _with_envelope(events: AsyncIterator[StreamEvent], stream_id: str) -> AsyncIterator[StreamEvent]:
+    """Bracket a stream with a start event and turn failures into an error event"""
+    yield StreamEvent("start", {"stream_id": stream_id})
+    try:
+        async for event in events:
+            yield event
+    except Exception as e:
+        logger.error("AI stream failed", stream_id=stream_id, error=str(e))
+        yield StreamEvent("error", {"stream_id": stream_id, "message": str(e)})
+
+
+def sse_response(events: AsyncIterator[StreamEvent], stream_id: Optional[str] = None) -> StreamingResponse:
+    """Stream events to the caller as text/event-stream"""
+    stream_id = stream_id or str(uuid.uuid4())
+
+    async def body():
+        async for event in _with_envelope(events, stream_id):
+            yield format_sse(event)
+
+    return StreamingResponse(
+        body(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",  # keep nginx from buffering the stream
+            "X-Stream-Id": stream_id,
+        }
+    )
+
+
+async def relay_to_websocket(
+    events: AsyncIterator[StreamEvent],
+    user_id: str,
+    stream_id: Optional[str] = None,
+    organization_id: Optional[str] = None
+):
+    """Forward events to the user's realtime connections as AI_STREAM_* frames"""
+    stream_id = stream_id or str(uuid.uuid4())
+    async for event in _with_envelope(events, stream_id):
+        await websocket_manager.send_to_user(user_id, RealtimeMessage(
+            id=None,
+            type=WEBSOCKET_MESSAGE_TYPES[event.event],
+            sender_id="ai",
+            target_id=user_id,
+            channel=f"ai_stream:{stream_id}",
+            payload={"stream_id": stream_id, "event": event.event, **event.data},
+            organization_id=organization_id
+        ))
+
+
+def stream_to_client(
+    events: AsyncIterator[StreamEvent],
+    transport: str,
+    user_id: str,
+    organization_id: Optional[str] = None
+):
+    """
+    Deliver a stream over the requested transport.
+
+    "sse" returns the streaming response itself; "websocket" relays in the
+    background and returns the stream id the client should listen for.
+    """
+    stream_id = str(uuid.uuid4())
+    if transport == "sse":
+        return sse_response(events, stream_id)
+
+    task = asyncio.create_task(relay_to_websocket(events, user_id, stream_id, organization_id))
+    _relays.add(task)
+    task.add_done_callback(_relays.discard)
+    return {"stream_id": stream_id, "transport": "websocket", "channel": f"ai_stream:{stream_id}"}
@@ -3,43 +3,68 @@ Advanced Real-Time Analytics & Intelligence Dashboard Platform - Sprint 13
 Real-time analytics, intelligent dashboards, and comprehensive reporting for the M&A SaaS platform
 """
 
-from .real_time_analytics import (
-    RealTimeAnalyticsEngine, MetricProcessor, EventStream,
-    get_real_time_analytics_engine
-)
-from .dashboard_system import (
-    DashboardSystem, DashboardManager, VisualizationEngine,
-    get_dashboard_system
-)
-from .reporting_engine import (
-    ReportingEngine, ReportGenerator, TemplateManager,
-    get_reporting_engine
-)
-from .performance_monitor import (
-    PerformanceMonitor, SystemHealthMonitor, AlertManager,
-    get_performance_monitor
-)
-from .portfolio.portfolio_intelligence import (
-    PortfolioIntelligenceService, SynergyEngine, RiskAnalyzer,
-    get_portfolio_intelligence_service
-)
-from .market.intelligence_engine import (
-    MarketIntelligenceEngine, CompetitiveAnalyzer, PredictiveModels,
-    get_market_intelligence_engine
-)
-from .ml.prediction_models import (
-    PredictionEngine, DealSuccessPredictor, TimingOptimizer, ValuationGapBridger,
-    get_prediction_engine
-)
-from .competitive.intelligence_system import (
-    CompetitiveIntelligenceService, ThreatAssessmentEngine, StrategicResponseOptimizer,
-    get_competitive_intelligence_service
-)
-from .reporting.insights_engine import (
-    ReportingEngine as CustomReportingEngine, NaturalLanguageProcessor,
-    ReportType, VisualizationType, DeliveryFrequency, AIInsight, ExecutiveReport,
-    get_reporting_engine as get_custom_reporting_engine
-)
+import importlib
+
+# Public names and the submodule each comes from. They are imported on
+# first access, so importing one submodule (or the config below) does
+# not pull in every engine and its optional dependencies.
+_EXPORTS = {
+    ".real_time_analytics": [
+        "RealTimeAnalyticsEngine", "MetricProcessor", "EventStream",
+        "get_real_time_analytics_engine"
+    ],
+    ".dashboard_system": [
+        "DashboardSystem", "DashboardManager", "VisualizationEngine",
+        "get_dashboard_system"
+    ],
+    ".reporting_engine": [
+        "ReportingEngine", "ReportGenerator", "TemplateManager",
+        "get_reporting_engine"
+    ],
+    ".performance_monitor": [
+        "PerformanceMonitor", "SystemHealthMonitor", "AlertManager",
+        "get_performance_monitor"
+    ],
+    ".portfolio.portfolio_intelligence": [
+        "PortfolioIntelligenceService", "SynergyEngine", "RiskAnalyzer",
+        "get_portfolio_intelligence_service"
+    ],
+    ".market.intelligence_engine": [
+        "MarketIntelligenceEngine", "CompetitiveAnalyzer", "PredictiveModels",
+        "get_market_intelligence_engine"
+    ],
+    ".ml.prediction_models": [
+        "PredictionEngine", "DealSuccessPredictor", "TimingOptimizer", "ValuationGapBridger",
+        "get_prediction_engine"
+    ],
+    ".competitive.intelligence_system": [
+        "CompetitiveIntelligenceService", "ThreatAssessmentEngine", "StrategicResponseOptimizer",
+        "get_competitive_intelligence_service"
+    ],
+    ".reporting.insights_engine": [
+        "NaturalLanguageProcessor", "ReportType", "VisualizationType", "DeliveryFrequency",
+        "AIInsight", "ExecutiveReport"
+    ],
+}
+
+# Exported under a different name than in their module
+_ALIASES = {
+    "CustomReportingEngine": (".reporting.insights_engine", "ReportingEngine"),
+    "get_custom_reporting_engine": (".reporting.insights_engine", "get_reporting_engine"),
+}
+
+_LAZY = {name: (module, name) for module, names in _EXPORTS.items() for name in names}
+_LAZY.update(_ALIASES)
+
+
+def __getattr__(name):
+    if name not in _LAZY:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    module_name, attribute = _LAZY[name]
+    value = getattr(importlib.import_module(module_name, __name__), attribute)
+    globals()[name] = value
+    return value
+
 
 __all__ = [
     "RealTimeAnalyticsEngine",
@@ -11,7 +11,9 @@ from abc import ABC, abstractmethod
 import asyncio
 import json
 from collections import defaultdict, deque
-import statistics
+import time
+
+from .time_series import MetricSeries, WindowSummary
 
 class MetricType(Enum):
     COUNTER = "counter"
@@ -140,17 +142,18 @@ class RealtimeInsight:
     timestamp: datetime = field(default_factory=datetime.now)
 
 class MetricProcessor:
-    """Processes and aggregates metrics in real-time"""
-
-    def __init__(self):
-        self.metrics_buffer = defaultdict(deque)
-        self.aggregation_functions = {
-            AggregationType.SUM: sum,
-            AggregationType.AVERAGE: statistics.mean,
-            AggregationType.COUNT: len,
-            AggregationType.MIN: min,
-            AggregationType.MAX: max,
-        }
+    """
+    Processes and aggregates metrics in real-time
+
+    Each metric is a MetricSeries: NumPy ring buffers of timestamps and values
+    plus minute buckets carrying count/sum/min/max and a DDSketch, so
+    aggregations read O(buckets) pre-rolled state instead of every sample.
+    """
+
+    def __init__(self, ring_capacity: int = 8192, retention_minutes: int = 24 * 60):
+        self.metrics_buffer: Dict[str, MetricSeries] = {}
+        self.ring_capacity = ring_capacity
+        self.retention_minutes = retention_minutes
         self.processing_stats = {
             "metrics_processed": 0,
             "aggregations_computed": 0,
@@ -159,15 +162,18 @@ class MetricProcessor:
 
     def process_metric(self, metric: Metric) -> bool:
         """Process a single metric"""
-        try:
-            # Store metric in time-series buffer
-            self.metrics_buffer[metric.name].append(metric)
+        return self.record(metric.name, metric.value, metric.timestamp)
 
-            # Keep only recent metrics (last hour)
-            cutoff_time = datetime.now() - timedelta(hours=1)
-            while (self.metrics_buffer[metric.name] and
-                   self.metrics_buffer[metric.name][0].timestamp < cutoff_time):
-                self.metrics_buffer[metric.name].popleft()
+    def record(self, name: str, value: Union[int, float],
+               timestamp: Optional[datetime] = None) -> bool:
+        """Record a sample without building a Metric object"""
+        try:
+            series = self.metrics_buffer.get(name)
+            if series is None:
+                series = self.metrics_buffer[name] = MetricSeries(
+                    self.ring_capacity, self.retention_minutes
+                )
+            series.append(timestamp.timestamp() if timestamp else time.time(), float(value))
 
             self.processing_stats["metrics_processed"] += 1
             return True
@@ -178,34 +184,29 @@ class MetricProcessor:
     def aggregate_metrics(self, query: AnalyticsQuery) -> List[AggregatedMetric]:
         """Aggregate metrics based on query parameters"""
         results = []
+        start, end = self._resolve_window(query.time_window, query.start_time, query.end_time)
 
         for metric_name in query.metric_names:
-            if metric_name not in self.metrics_buffer:
+            series = self.metrics_buffer.get(metric_name)
+            if series is None:
                 continue
 
-            # Filter metrics by time window
-            metrics = self._filter_by_time_window(
-                self.metrics_buffer[metric_name],
-                query.time_window,
-                query.start_time,
-                query.end_time
-            )
-
-            if not metrics:
+            summary = series.summarize(start.timestamp(), end.timestamp())
+            if not summary.count:
                 continue
 
             # Apply aggregations
             for aggregation in query.aggregations:
-                aggregated_value = self._apply_aggregation(metrics, aggregation)
+                aggregated_value = self._apply_aggregation(summary, aggregation)
 
                 result = AggregatedMetric(
                     name=metric_name,
                     aggregation=aggregation,
                     value=aggregated_value,
                     time_window=query.time_window,
-                    start_time=query.start_time or metrics[0].timestamp,
-                    end_time=query.end_time or metrics[-1].timestamp,
-                    sample_count=len(metrics),
+                    start_time=query.start_time or datetime.fromtimestamp(summary.first_ts),
+                    end_time=query.end_time or datetime.fromtimestamp(summary.last_ts),
+                    sample_count=summary.count,
                     tags=query.tags
                 )
                 results.append(result)
@@ -213,10 +214,10 @@ class MetricProcessor:
         self.processing_stats["aggregations_computed"] += len(results)
         return results
 
-    def _filter_by_time_window(self, metrics: deque, time_window: TimeWindow,
-                              start_time: Optional[datetime],
-                              end_time: Optional[datetime]) -> List[Metric]:
-        """Filter metrics by time window"""
+    def _resolve_window(self, time_window: TimeWindow,
+                        start_time: Optional[datetime],
+                        end_time: Optional[datetime]) -> Tuple[datetime, datetime]:
+        """Query bounds, defaulting to the window ending now"""
         now = datetime.now()
 
         if not start_time:
@@ -226,8 +227,7 @@ class MetricProcessor:
         if not end_time:
             end_time = now
 
-        return [m for m in metrics
-                if start_time <= m.timestamp <= end_time]
+        return start_time, end_time
 
     def _get_window_duration(self, time_window: TimeWindow) -> timedelta:
         """Get timedelta for time window"""
@@ -242,24 +242,30 @@ class MetricProcessor:
         }
         return window_map.get(time_window, timedelta(hours=1))
 
-    def _apply_aggregation(self, metrics: List[Metric],
+    def _apply_aggregation(self, summary: WindowSummary,
                           aggregation: AggregationType) -> float:
-        """Apply aggregation function to metrics"""
-        values = [m.value for m in metrics]
-
-        if aggregation in self.aggregation_functions:
-            return self.aggregation_functions[aggregation](values)
+        """Apply aggregation function to a window summary"""
+        if aggregation == AggregationType.SUM:
+            return summary.total
+        elif aggregation == AggregationType.AVERAGE:
+            return summary.total / summary.count
+        elif aggregation == AggregationType.COUNT:
+            return summary.count
+        elif aggregation == AggregationType.MIN:
+            return summary.minimum
+        elif aggregation == AggregationType.MAX:
+            return summary.maximum
         elif aggregation == AggregationType.PERCENTILE:
-            return statistics.quantiles(values, n=100)[94]  # 95th percentile
+            return summary.sketch.quantile(0.95)  # 95th percentile, within 1%
         elif aggregation == AggregationType.RATE:
-            if len(values) < 2:
+            if summary.count < 2:
                 return 0.0
-            time_diff = (metrics[-1].timestamp - metrics[0].timestamp).total_seconds()
-            return len(values) / max(time_diff, 1.0)
+            time_diff = summary.last_ts - summary.first_ts
+            return summary.count / max(time_diff, 1.0)
         elif aggregation == AggregationType.DELTA:
-            if len(values) < 2:
+            if summary.count < 2:
                 return 0.0
-            return values[-1] - values[0]
+            return summary.last_value - summary.first_value
 
         return 0.0
 
@@ -335,14 +341,7 @@ class RealTimeAnalyticsEngine:
                           metric_type: MetricType = MetricType.GAUGE,
                           tags: Optional[Dict[str, str]] = None) -> bool:
         """Track a real-time metric"""
-        metric = Metric(
-            name=name,
-            value=value,
-            metric_type=metric_type,
-            tags=tags or {}
-        )
-
-        return self.metric_processor.process_metric(metric)
+        return self.metric_processor.record(name, value)
 
     async def emit_event(self, event_type: EventType, source: str,
                         data: Dict[str, Any], user_id: Optional[str] = None) -> str:
@@ -542,4 +541,4 @@ def get_real_time_analytics_engine() -> RealTimeAnalyticsEngine:
     global _real_time_analytics_engine_instance
     if _real_time_analytics_engine_instance is None:
         _real_time_analytics_engine_instance = RealTimeAnalyticsEngine()
-    return _real_time_analytics_engine_instance
\ No newline at end of file
+    return _real_time_analytics_engine_instance
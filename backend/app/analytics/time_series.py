@@ -0,0 +1,255 @@
+"""
+Columnar Time Series for Real-Time Metrics
+Ring-buffered samples, pre-rolled minute buckets and DDSketch quantiles, so a
+window query costs O(buckets) rather than O(samples).
+"""
+
+import math
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Deque, Dict, Optional
+
+import numpy as np
+
+
+class DDSketch:
+    """
+    Quantile sketch with relative-error guarantees (DDSketch).
+
+    Values land in logarithmic bins, so any quantile is accurate to within
+    ``relative_accuracy`` of the true value, sketches merge exactly by adding
+    bin counts, and memory grows with the log of the value range rather than
+    with the sample count.
+    """
+
+    __slots__ = ("relative_accuracy", "gamma", "log_gamma", "positive", "negative", "zero_count", "count")
+
+    def __init__(self, relative_accuracy: float = 0.01):
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.log_gamma = math.log(self.gamma)
+        self.positive: Dict[int, int] = {}
+        self.negative: Dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+
+    def _index(self, magnitude: float) -> int:
+        return math.ceil(math.log(magnitude) / self.log_gamma)
+
+    def _value(self, index: int) -> float:
+        return 2 * self.gamma ** index / (self.gamma + 1)
+
+    def add(self, value: float, count: int = 1) -> None:
+        if value > 0:
+            index = self._index(value)
+            self.positive[index] = self.positive.get(index, 0) + count
+        elif value < 0:
+            index = self._index(-value)
+            self.negative[index] = self.negative.get(index, 0) + count
+        else:
+            self.zero_count += count
+        self.count += count
+
+    def add_many(self, values: np.ndarray) -> None:
+        """Vectorized add for an array of samples"""
+        if not len(values):
+            return
+        for store, magnitudes in ((self.positive, values[values > 0]), (self.negative, -values[values < 0])):
+            if len(magnitudes):
+                indexes, counts = np.unique(
+                    np.ceil(np.log(magnitudes) / self.log_gamma).astype(np.int64), return_counts=True
+                )
+                for index, count in zip(indexes.tolist(), counts.tolist()):
+                    store[index] = store.get(index, 0) + count
+        self.zero_count += int(np.count_nonzero(values == 0))
+        self.count += len(values)
+
+    def merge(self, other: "DDSketch") -> None:
+        """Add another sketch's samples (both must share relative_accuracy)"""
+        for store, other_store in ((self.positive, other.positive), (self.negative, other.negative)):
+            for index, count in other_store.items():
+                store[index] = store.get(index, 0) + count
+        self.zero_count += other.zero_count
+        self.count += other.count
+
+    def copy(self) -> "DDSketch":
+        sketch = DDSketch(self.relative_accuracy)
+        sketch.merge(self)
+        return sketch
+
+    def quantile(self, q: float) -> Optional[float]:
+        if not self.count:
+            return None
+        rank = q * (self.count - 1)
+
+        seen = 0
+        for index in sorted(self.negative, reverse=True):
+            seen += self.negative[index]
+            if seen > rank:
+                return -self._value(index)
+        seen += self.zero_count
+        if seen > rank:
+            return 0.0
+        for index in sorted(self.positive):
+            seen += self.positive[index]
+            if seen > rank:
+                return self._value(index)
+        return self._value(max(self.positive)) if self.positive else 0.0
+
+
+@dataclass
+class MinuteBucket:
+    """Streaming aggregates for the samples in one minute"""
+    start: float
+    count: int = 0
+    total: float = 0.0
+    minimum: float = math.inf
+    maximum: float = -math.inf
+    first_ts: float = math.inf
+    first_value: float = 0.0
+    last_ts: float = -math.inf
+    last_value: float = 0.0
+    sketch: DDSketch = field(default_factory=DDSketch)
+
+    def add(self, timestamp: float, value: float) -> None:
+        self.count += 1
+        self.total += value
+        if value < self.minimum:
+            self.minimum = value
+        if value > self.maximum:
+            self.maximum = value
+        if timestamp < self.first_ts:
+            self.first_ts, self.first_value = timestamp, value
+        if timestamp >= self.last_ts:
+            self.last_ts, self.last_value = timestamp, value
+        self.sketch.add(value)
+
+
+@dataclass
+class WindowSummary:
+    """Everything the supported aggregations need for one window"""
+    count: int = 0
+    total: float = 0.0
+    minimum: float = math.inf
+    maximum: float = -math.inf
+    first_ts: float = math.inf
+    first_value: float = 0.0
+    last_ts: float = -math.inf
+    last_value: float = 0.0
+    sketch: DDSketch = field(default_factory=DDSketch)
+
+    def add_bucket(self, bucket: MinuteBucket) -> None:
+        self.count += bucket.count
+        self.total += bucket.total
+        self.minimum = min(self.minimum, bucket.minimum)
+        self.maximum = max(self.maximum, bucket.maximum)
+        if bucket.first_ts < self.first_ts:
+            self.first_ts, self.first_value = bucket.first_ts, bucket.first_value
+        if bucket.last_ts >= self.last_ts:
+            self.last_ts, self.last_value = bucket.last_ts, bucket.last_value
+        self.sketch.merge(bucket.sketch)
+
+    def add_samples(self, timestamps: np.ndarray, values: np.ndarray) -> None:
+        if not len(values):
+            return
+        self.count += len(values)
+        self.total += float(values.sum())
+        self.minimum = min(self.minimum, float(values.min()))
+        self.maximum = max(self.maximum, float(values.max()))
+        first, last = int(timestamps.argmin()), int(timestamps.argmax())
+        if timestamps[first] < self.first_ts:
+            self.first_ts, self.first_value = float(timestamps[first]), float(values[first])
+        if timestamps[last] >= self.last_ts:
+            self.last_ts, self.last_value = float(timestamps[last]), float(values[last])
+        self.sketch.add_many(values)
+
+
+class MetricSeries:
+    """
+    One metric's samples in columnar form.
+
+    Raw samples go into fixed-size NumPy ring buffers (timestamp and value
+    columns, 16 bytes per sample) and are rolled into per-minute buckets as
+    they arrive. Window queries combine whole buckets and only touch raw
+    samples for the partial minutes at the window edges; once those samples
+    have left the ring, the edge bucket is counted whole.
+    """
+
+    def __init__(self, capacity: int = 8192, retention_minutes: int = 24 * 60):
+        """
+        Args:
+            capacity: Raw samples kept in the ring buffers
+            retention_minutes: Minute buckets kept (the longest answerable window)
+        """
+        self.capacity = capacity
+        self.retention_minutes = retention_minutes
+        self.timestamps = np.zeros(capacity, dtype=np.float64)
+        self.values = np.zeros(capacity, dtype=np.float64)
+        self.size = 0
+        self.head = 0  # next write position
+        self.buckets: Dict[int, MinuteBucket] = {}
+        self.bucket_order: Deque[int] = deque()
+        self.total_samples = 0
+
+    def __len__(self) -> int:
+        return self.total_samples
+
+    def append(self, timestamp: float, value: float) -> None:
+        self.timestamps[self.head] = timestamp
+        self.values[self.head] = value
+        self.head = (self.head + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+        self.total_samples += 1
+
+        minute = int(timestamp // 60)
+        bucket = self.buckets.get(minute)
+        if bucket is None:
+            bucket = self.buckets[minute] = MinuteBucket(start=minute * 60.0)
+            self.bucket_order.append(minute)
+            self._expire_buckets(minute)
+        bucket.add(timestamp, value)
+
+    def _expire_buckets(self, newest_minute: int) -> None:
+        cutoff = newest_minute - self.retention_minutes
+        while self.bucket_order and self.bucket_order[0] <= cutoff:
+            self.buckets.pop(self.bucket_order.popleft(), None)
+
+    @property
+    def oldest_raw_timestamp(self) -> float:
+        if self.size == 0:
+            return math.inf
+        if self.size < self.capacity:
+            return float(self.timestamps[:self.size].min())
+        return float(self.timestamps.min())
+
+    def _raw_in_bucket(self, bucket: MinuteBucket, start: float, end: float):
+        """Ring samples inside both the bucket's minute and [start, end]"""
+        timestamps = self.timestamps[:self.size]
+        values = self.values[:self.size]
+        mask = ((timestamps >= max(start, bucket.start)) & (timestamps <= end)
+                & (timestamps < bucket.start + 60))
+        return timestamps[mask], values[mask]
+
+    def summarize(self, start: float, end: float) -> WindowSummary:
+        """Aggregates for samples with start <= timestamp <= end (epoch seconds)"""
+        summary = WindowSummary()
+        first_minute, last_minute = int(start // 60), int(end // 60)
+        raw_from = self.oldest_raw_timestamp
+
+        if last_minute - first_minute < len(self.buckets):
+            minutes = range(first_minute, last_minute + 1)
+        else:
+            minutes = [m for m in self.buckets if first_minute <= m <= last_minute]
+
+        for minute in minutes:
+            bucket = self.buckets.get(minute)
+            if bucket is None:
+                continue
+            whole = bucket.start >= start and bucket.start + 60 <= end
+            if whole or bucket.start < raw_from:
+                summary.add_bucket(bucket)
+            else:
+                # Edge minute still in the ring: count only the samples in range
+                summary.add_samples(*self._raw_in_bucket(bucket, start, end))
+
+        return summary
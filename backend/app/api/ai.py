@@ -1,7 +1,8 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
-from typing import Dict, Any
+from typing import Dict, Any, Literal
 
+from app.ai.streaming import stream_to_client
 from app.core.database import get_db
 from app.models.models import Deal, User
 from app.services.tenant_service import get_current_user, require_analyst
@@ -108,6 +109,29 @@ async def research_market(
             detail=f"Market research failed: {str(e)}"
         )
 
+@router.post("/market-research/stream")
+async def stream_market_research(
+    request: MarketResearchRequest,
+    transport: Literal["sse", "websocket"] = "sse",
+    current_user: User = Depends(require_analyst),
+    db: Session = Depends(get_db)
+):
+    """Stream market research over SSE or the realtime WebSocket as it is generated"""
+    
+    # Check subscription access
+    if current_user.tenant.subscription_plan.value == "solo":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Market research requires Growth plan or higher"
+        )
+    
+    return stream_to_client(
+        claude_service.stream_market_research(request),
+        transport,
+        str(current_user.id),
+        str(current_user.tenant_id)
+    )
+
 @router.post("/analyze-document")
 async def analyze_document(
     document_content: str,
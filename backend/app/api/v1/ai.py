@@ -4,7 +4,7 @@ API endpoints for AI-powered features and intelligent automation
 """
 
 from fastapi import APIRouter, HTTPException, Depends, UploadFile, File
-from typing import List, Optional, Dict, Any
+from typing import List, Literal, Optional, Dict, Any
 from datetime import datetime
 import json
 
@@ -20,6 +20,7 @@ from app.ai import (
     get_ai_analytics_service
 )
 from app.ai.ai_service import analyze_document, score_deal, summarize_content, generate_insights
+from app.ai.streaming import stream_to_client
 from app.ai.document_intelligence import DocumentType
 from app.ai.deal_insights import DealCategory, IndustryVertical
 from app.ai.automation_engine import TriggerType, ActionType, NotificationPriority
@@ -187,6 +188,29 @@ async def summarize_document_content(
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Document summarization failed: {str(e)}")
 
+@router.post("/documents/summarize/stream")
+async def stream_document_summary(
+    content: str,
+    max_length: int = 500,
+    transport: Literal["sse", "websocket"] = "sse",
+    current_user = Depends(get_current_user),
+    organization = Depends(get_current_organization)
+):
+    """Stream a document summary over SSE or the realtime WebSocket as it is generated"""
+    doc_service = get_document_intelligence_service()
+    
+    return stream_to_client(
+        doc_service.stream_summary(
+            content=content,
+            max_length=max_length,
+            user_id=current_user.id,
+            organization_id=organization.id
+        ),
+        transport,
+        str(current_user.id),
+        str(organization.id)
+    )
+
 @router.post("/documents/extract-data")
 async def extract_structured_data(
     content: str,
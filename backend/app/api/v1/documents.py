@@ -4,7 +4,7 @@ Story 3.1: Document Upload API - Secure file upload and management
 """
 
 import os
-import io
+import asyncio
 from typing import List, Optional, Dict, Any
 from uuid import UUID, uuid4
 from datetime import datetime, timedelta
@@ -17,7 +17,7 @@ from sqlalchemy.orm import selectinload
 
 from app.core.deps import get_db, get_current_user, get_current_tenant
 from app.models.documents import Document, DocumentCategory, DocumentStatus
-from app.services.storage_factory import storage_service
+from app.services.storage_factory import storage_service, get_storage_service
 from app.middleware.permission_middleware import require_permission, require_senior_role, load_document_context
 from app.core.permissions import ResourceType, Action
 from app.schemas.document import (
@@ -93,24 +93,20 @@ async def upload_document(
     file_extension = os.path.splitext(file.filename)[1].lower()
     content_type = file.content_type or 'application/octet-stream'
 
-    # Read file content
-    file_content = await file.read()
-    file_size = len(file_content)
-
-    # Create file-like object for S3
-    file_obj = io.BytesIO(file_content)
-
-    # Upload to configured storage provider (R2, S3, etc.)
-    storage_result = storage_service.upload_document(
-        file=file_obj,
-        filename=file.filename,
-        organization_id=str(tenant_id),
+    # Stream the spooled upload to the configured storage provider (R2, S3, etc.)
+    # on a worker thread; parts are hashed and sent without buffering the file
+    storage_result = await get_storage_service().upload_document_async(
+        file.file,
+        file.filename,
+        str(tenant_id),
         deal_id=str(deal_id) if deal_id else None,
         content_type=content_type,
         metadata={
             'uploaded_by': current_user.get('id', ''),
             'user_email': current_user.get('email', '')
-        }
+        },
+        # The spooled file is gone after this request, so nothing to resume
+        resumable=False
     )
 
     if not storage_result['success']:
@@ -127,7 +123,7 @@ async def upload_document(
         original_filename=file.filename,
         file_extension=file_extension,
         mime_type=content_type,
-        file_size=file_size,
+        file_size=storage_result['file_size'],
         s3_bucket=storage_result.get('r2_bucket') or storage_result.get('s3_bucket') or storage_result.get('bucket', ''),
         s3_key=storage_result.get('r2_key') or storage_result.get('s3_key') or storage_result.get('path', ''),
         s3_url=storage_result.get('r2_url') or storage_result.get('s3_url') or storage_result.get('signed_url', ''),
@@ -211,6 +207,34 @@ async def get_upload_presigned_url(
     }
 
 
+@router.get("/storage/usage", response_model=Dict[str, Any])
+@require_permission(ResourceType.DOCUMENTS, Action.READ)
+async def get_storage_usage(
+    current_user: Dict[str, Any] = Depends(get_current_user),
+    tenant_id: UUID = Depends(get_current_tenant),
+) -> Dict[str, Any]:
+    """
+    Storage used by the current organization, broken down by deal.
+    Read from incremental usage counters, so it does not list the bucket.
+    """
+
+    storage = get_storage_service()
+    if not hasattr(storage, 'get_usage_stats'):
+        raise HTTPException(
+            status_code=status.HTTP_501_NOT_IMPLEMENTED,
+            detail="Usage statistics are not available for this storage provider"
+        )
+
+    usage = await asyncio.to_thread(storage.get_usage_stats, organization_id=str(tenant_id))
+    if 'error' in usage:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=usage['error']
+        )
+
+    return usage
+
+
 @router.get("/", response_model=DocumentListResponse)
 @require_permission(ResourceType.DOCUMENTS, Action.READ)
 async def list_documents(
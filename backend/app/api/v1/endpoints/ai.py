@@ -1,10 +1,11 @@
 """AI and Claude MCP API endpoints"""
 
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Literal, Optional, Any
 from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
 from pydantic import BaseModel, Field
 import structlog
 
+from app.ai.streaming import stream_to_client
 from app.services.claude_mcp import ClaudeMCPService, DealAnalysis, PartnershipRecommendation
 from app.api.deps import get_current_user, rate_limit_ai
 from app.core.security import verify_api_key
@@ -128,6 +129,40 @@ async def analyze_deal(
         )
 
 
+@router.post("/analyze-deal/stream")
+async def stream_deal_analysis(
+    request: DealAnalysisRequest,
+    transport: Literal["sse", "websocket"] = "sse",
+    current_user=Depends(get_current_user),
+    _=Depends(rate_limit_ai)
+):
+    """
+    Stream a deal analysis as it is generated.
+
+    With transport=sse the response is an event stream of delta, field, item
+    and done events. With transport=websocket the same events are pushed to
+    the user's realtime connections as ai_stream_* messages and the response
+    only carries the stream id.
+    """
+    claude_service = ClaudeMCPService()
+
+    async def events():
+        async for event in claude_service.stream_deal_analysis(
+            deal_data=request.deal_data,
+            context=request.context
+        ):
+            if event.event == "done":
+                await log_ai_analysis(
+                    user_id=current_user.id,
+                    analysis_type="deal_analysis",
+                    confidence=event.data["result"]["confidence_score"],
+                    streamed=True
+                )
+            yield event
+
+    return stream_to_client(events(), transport, str(current_user.id))
+
+
 @router.post("/identify-partnerships", response_model=PartnershipSearchResponse)
 async def identify_partnerships(
     request: PartnershipSearchRequest,
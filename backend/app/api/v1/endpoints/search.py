@@ -24,6 +24,15 @@ class SemanticSearchRequest(BaseModel):
     threshold: float = Field(0.7, ge=0.0, le=1.0, description="Similarity threshold")
 
 
+class ChunkSearchRequest(BaseModel):
+    """Request model for chunk-level (optionally hybrid) search"""
+    query: str = Field(..., min_length=1, max_length=1000, description="Search query")
+    document_type: Optional[str] = Field(None, description="Filter by document type")
+    limit: int = Field(10, ge=1, le=50, description="Maximum number of chunks")
+    threshold: float = Field(0.0, ge=0.0, le=1.0, description="Similarity threshold for vector hits")
+    hybrid: bool = Field(True, description="Fuse vector and full-text rankings")
+
+
 class SearchResult(BaseModel):
     """Search result model"""
     document_id: str
@@ -103,6 +112,37 @@ async def semantic_search(
         )
 
 
+@router.post("/semantic/chunks", response_model=List[Dict[str, Any]])
+async def semantic_chunk_search(
+    request: ChunkSearchRequest,
+    current_user=Depends(get_current_user)
+):
+    """
+    Search document chunks with the HNSW index, optionally fused with
+    full-text ranking via reciprocal-rank fusion.
+    """
+    try:
+        embedding_service = EmbeddingService()
+
+        hits = await embedding_service.search_chunks(
+            query=request.query,
+            organization_id=str(current_user.organization_id),
+            limit=request.limit,
+            threshold=request.threshold,
+            hybrid=request.hybrid,
+            document_type=request.document_type
+        )
+
+        return [hit.to_dict() for hit in hits]
+
+    except Exception as e:
+        logger.error("Chunk search failed", error=str(e), user_id=current_user.id)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Search failed. Please try again."
+        )
+
+
 @router.get("/fulltext")
 async def fulltext_search(
     q: str = Query(..., min_length=1, max_length=500, description="Search query"),
@@ -225,6 +265,17 @@ async def upload_document_with_embedding(
         await db.commit()
         await db.refresh(document)
 
+        # Index chunks for chunk-level retrieval; the document is usable without them
+        try:
+            await embedding_service.index_document_chunks(
+                document_id=str(document.id),
+                organization_id=str(current_user.organization_id),
+                content=request.content,
+                title=request.title
+            )
+        except Exception as e:
+            logger.warning("Chunk indexing failed", document_id=str(document.id), error=str(e))
+
         logger.info(
             "Document uploaded with embedding",
             document_id=str(document.id),
@@ -98,16 +98,24 @@ async def get_online_users(
 async def get_user_notifications(
     include_read: bool = Query(False),
     limit: int = Query(50, le=100),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
     current_user: ClerkUser = Depends(get_current_user)
 ):
-    """Get user notifications"""
+    """Get user notifications, newest first"""
 
     try:
-        notifications = await notification_service.get_user_notifications(
-            user_id=current_user.user_id,
-            include_read=include_read,
-            limit=limit
-        )
+        try:
+            notifications, next_cursor = await notification_service.get_notification_page(
+                user_id=current_user.user_id,
+                include_read=include_read,
+                limit=limit,
+                cursor=cursor
+            )
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid notification cursor"
+            )
 
         # Convert notifications to dict format
         notification_data = []
@@ -135,6 +143,7 @@ async def get_user_notifications(
             "notifications": notification_data,
             "total_count": len(notification_data),
             "unread_count": await notification_service.get_unread_count(current_user.user_id),
+            "next_cursor": next_cursor,
             "metadata": {
                 "user_id": current_user.user_id,
                 "include_read": include_read,
@@ -143,6 +152,8 @@ async def get_user_notifications(
             }
         }
 
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Failed to get user notifications: {str(e)}")
         raise HTTPException(
@@ -268,7 +279,7 @@ async def join_document_collaboration(
             "document_id": document_id,
             "document_state": {
                 "version": doc_state.version,
-                "content_length": len(doc_state.content),
+                "content_length": doc_state.content_length,
                 "last_modified": doc_state.last_modified.isoformat(),
                 "locked_by": doc_state.locked_by,
                 "locked_at": doc_state.locked_at.isoformat() if doc_state.locked_at else None
@@ -808,6 +819,7 @@ async def collaboration_health():
                 "running_tasks": running_tasks_count,
                 "workflow_templates": len(task_engine.workflow_templates)
             },
+            "broadcast": websocket_manager.get_broadcast_metrics(),
             "timestamp": datetime.utcnow().isoformat()
         }
 
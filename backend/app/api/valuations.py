@@ -229,6 +229,25 @@ class TwoWaySensitivityRequest(BaseModel):
     param2_steps: int = Field(default=5, ge=3, le=20)
 
 
+class SensitivityAxisRequest(BaseModel):
+    parameter: str
+    min_value: float
+    max_value: float
+    steps: int = Field(default=10, ge=2, le=100)
+
+    def values(self) -> List[float]:
+        return [
+            self.min_value + (self.max_value - self.min_value) * i / (self.steps - 1)
+            for i in range(self.steps)
+        ]
+
+
+class GridSensitivityRequest(BaseModel):
+    axes: List[SensitivityAxisRequest] = Field(..., min_length=1, max_length=4)
+    tornado: Optional[Dict[str, List[float]]] = None
+    terminal_value_method: Optional[TerminalValueMethod] = None
+
+
 # ============================================================================
 # DCF Endpoints
 # ============================================================================
@@ -335,6 +354,46 @@ async def run_dcf_sensitivity(
     return results
 
 
+@router.post("/dcf/{dcf_id}/sensitivity/grid", response_model=Dict[str, Any])
+async def run_dcf_grid_sensitivity(
+    dcf_id: str,
+    grid_request: GridSensitivityRequest,
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(get_current_user),
+    tenant_id: str = Depends(get_current_tenant)
+):
+    """
+    Run N-dimensional sensitivity analysis on DCF model
+
+    Evaluates the full grid (e.g. WACC x terminal growth x exit multiple x margin)
+    in one pass and optionally returns tornado-chart deltas.
+    """
+    dcf_model = db.query(DCFModel).filter(
+        DCFModel.id == dcf_id,
+        DCFModel.organization_id == tenant_id
+    ).first()
+
+    if not dcf_model:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"DCF model {dcf_id} not found"
+        )
+
+    service = DCFValuationService(db)
+
+    try:
+        results = service.run_grid_sensitivity(
+            dcf_model,
+            {axis.parameter: axis.values() for axis in grid_request.axes},
+            tornado_ranges=_tornado_ranges(grid_request),
+            terminal_value_method=grid_request.terminal_value_method
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    return results
+
+
 # ============================================================================
 # Comparable Company Endpoints
 # ============================================================================
@@ -538,6 +597,60 @@ async def run_lbo_sensitivity(
     return results
 
 
+@router.post("/lbo/{lbo_id}/sensitivity/grid", response_model=Dict[str, Any])
+async def run_lbo_grid_sensitivity(
+    lbo_id: str,
+    grid_request: GridSensitivityRequest,
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(get_current_user),
+    tenant_id: str = Depends(get_current_tenant)
+):
+    """
+    Run N-dimensional sensitivity analysis on LBO IRR
+
+    Axes may be any of exit_multiple, revenue_growth and ebitda_margin.
+    """
+    lbo_model = db.query(LBOModel).filter(
+        LBOModel.id == lbo_id,
+        LBOModel.organization_id == tenant_id
+    ).first()
+
+    if not lbo_model:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"LBO model {lbo_id} not found"
+        )
+
+    service = LBOModelingService(db)
+
+    try:
+        results = service.run_grid_sensitivity(
+            lbo_model,
+            {axis.parameter: axis.values() for axis in grid_request.axes},
+            tornado_ranges=_tornado_ranges(grid_request)
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    return results
+
+
+def _tornado_ranges(grid_request: GridSensitivityRequest) -> Optional[Dict[str, tuple]]:
+    """Validate and convert tornado [low, high] pairs"""
+    if not grid_request.tornado:
+        return None
+
+    ranges = {}
+    for parameter, bounds in grid_request.tornado.items():
+        if len(bounds) != 2:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Tornado range for {parameter} must be [low, high]"
+            )
+        ranges[parameter] = (bounds[0], bounds[1])
+    return ranges
+
+
 # ============================================================================
 # Comprehensive Valuation Endpoints
 # ============================================================================
@@ -5,10 +5,14 @@ Handles JWT validation, user extraction, and organization management
 
 import os
 import json
+import time
+import asyncio
+import hashlib
 import httpx
-from typing import Optional, Dict, Any, List
+from collections import OrderedDict
+from typing import Optional, Dict, Any, List, Tuple
 from datetime import datetime, timedelta
-from jose import jwt, JWTError
+from jose import jwk, jwt, JWTError
 from fastapi import HTTPException, Security, Depends, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from pydantic import BaseModel, Field
@@ -22,6 +26,10 @@ CLERK_PUBLISHABLE_KEY = os.getenv("CLERK_PUBLISHABLE_KEY")
 CLERK_API_URL = "https://api.clerk.com/v1"
 CLERK_ISSUER = os.getenv("CLERK_ISSUER", "https://clerk.com")
 
+# Auth context caching
+CLERK_ORG_CACHE_TTL = int(os.getenv("CLERK_ORG_CACHE_TTL", "300"))  # seconds
+CLERK_TOKEN_CACHE_SIZE = int(os.getenv("CLERK_TOKEN_CACHE_SIZE", "10000"))
+
 if not CLERK_SECRET_KEY:
     logger.warning("CLERK_SECRET_KEY not set. Authentication will fail.")
 
@@ -76,78 +84,169 @@ class TokenData(BaseModel):
 
 
 class ClerkAuthMiddleware:
-    """Middleware for validating Clerk JWT tokens"""
+    """
+    Middleware for validating Clerk JWT tokens
+
+    Keeps the per-request cost off the network: one pooled HTTP client, JWKS
+    keys indexed by ``kid``, verified tokens cached by hash until ``exp`` and
+    organization details cached for ``org_cache_ttl`` seconds. Webhooks call
+    ``invalidate_organization``/``invalidate_user`` when Clerk data changes.
+    """
 
-    def __init__(self):
+    def __init__(
+        self,
+        org_cache_ttl: int = CLERK_ORG_CACHE_TTL,
+        token_cache_size: int = CLERK_TOKEN_CACHE_SIZE
+    ):
         self.secret_key = CLERK_SECRET_KEY
-        self.jwks_client = None
+        self._client: Optional[httpx.AsyncClient] = None
+
+        # JWKS: kid -> constructed key, refreshed by a single shared fetch
         self._jwks_cache = None
+        self._jwks_keys: Dict[str, Any] = {}
         self._jwks_cache_time = None
+        self._jwks_forced_time = None
+        self._jwks_fetches: Dict[str, asyncio.Future] = {}
         self.cache_duration = timedelta(hours=1)
-
-    async def get_jwks(self) -> Dict[str, Any]:
-        """Fetch JWKS from Clerk with caching"""
+        # Unknown kids force a refetch at most this often
+        self.jwks_min_refresh_interval = timedelta(seconds=30)
+
+        # sha256(token) -> TokenData, evicted at exp or least recently used
+        self._token_cache: "OrderedDict[str, TokenData]" = OrderedDict()
+        self.token_cache_size = token_cache_size
+
+        # org_id -> (expires_at, details); expired entries are served while refreshing
+        self._org_cache: Dict[str, Tuple[float, Optional[Dict[str, Any]]]] = {}
+        self._org_fetches: Dict[str, asyncio.Future] = {}
+        self.org_cache_ttl = org_cache_ttl
+        self.org_error_ttl = min(30, org_cache_ttl)
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Shared Clerk API client, so requests reuse pooled connections"""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                headers={"Authorization": f"Bearer {self.secret_key}"},
+                timeout=httpx.Timeout(5.0, connect=2.0),
+                limits=httpx.Limits(max_connections=50, max_keepalive_connections=20)
+            )
+        return self._client
+
+    async def aclose(self):
+        """Close the pooled client (application shutdown)"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    @staticmethod
+    async def _single_flight(flights: Dict[Any, asyncio.Future], key, factory):
+        """Await the in-flight call for ``key``, starting it if there is none"""
+        future = flights.get(key)
+        if future is None or future.done():
+            future = flights[key] = asyncio.ensure_future(factory())
+        # Shielded so one cancelled waiter doesn't cancel the fetch for the rest
+        return await asyncio.shield(future)
+
+    async def get_jwks(self, force: bool = False) -> Dict[str, Any]:
+        """Fetch JWKS from Clerk with caching; concurrent refreshes share one request"""
         now = datetime.utcnow()
 
-        if self._jwks_cache and self._jwks_cache_time:
+        if self._jwks_cache and self._jwks_cache_time and not force:
             if now - self._jwks_cache_time < self.cache_duration:
                 return self._jwks_cache
 
+        return await self._single_flight(self._jwks_fetches, "jwks", self._fetch_jwks)
+
+    async def _fetch_jwks(self) -> Optional[Dict[str, Any]]:
         try:
-            async with httpx.AsyncClient() as client:
-                # Clerk's JWKS endpoint
-                jwks_url = f"https://api.clerk.com/v1/jwks"
-                headers = {"Authorization": f"Bearer {self.secret_key}"}
-                response = await client.get(jwks_url, headers=headers)
-
-                if response.status_code == 200:
-                    self._jwks_cache = response.json()
-                    self._jwks_cache_time = now
-                    return self._jwks_cache
-                else:
-                    # Fallback to using the secret key directly
-                    logger.warning(f"Failed to fetch JWKS: {response.status_code}")
-                    return None
+            # Clerk's JWKS endpoint
+            response = await self.client.get(f"{CLERK_API_URL}/jwks")
+
+            if response.status_code == 200:
+                jwks = response.json()
+                keys = {}
+                for key in jwks.get("keys", []):
+                    try:
+                        keys[key.get("kid")] = jwk.construct(key, key.get("alg", "RS256"))
+                    except Exception as e:
+                        logger.warning(f"Skipping unusable JWKS key {key.get('kid')}: {e}")
+                self._jwks_cache = jwks
+                self._jwks_keys = keys
+                self._jwks_cache_time = datetime.utcnow()
+                return jwks
+            else:
+                # Keep serving the keys we already have
+                logger.warning(f"Failed to fetch JWKS: {response.status_code}")
+                return self._jwks_cache
         except Exception as e:
             logger.error(f"Error fetching JWKS: {e}")
+            return self._jwks_cache
+
+    async def get_signing_key(self, kid: Optional[str]):
+        """Public key for ``kid``, refetching the JWKS once when it is unknown"""
+        await self.get_jwks()
+        if kid not in self._jwks_keys:
+            # Key rotation; throttled so random kids can't hammer Clerk
+            now = datetime.utcnow()
+            last = self._jwks_forced_time
+            in_flight = self._jwks_fetches.get("jwks")
+            if last is None or now - last >= self.jwks_min_refresh_interval:
+                self._jwks_forced_time = now
+                await self.get_jwks(force=True)
+            elif in_flight is not None and not in_flight.done():
+                await asyncio.shield(in_flight)
+        return self._jwks_keys.get(kid)
+
+    @staticmethod
+    def _token_key(token: str) -> str:
+        return hashlib.sha256(token.encode()).hexdigest()
+
+    def _cached_token(self, token_key: str) -> Optional[TokenData]:
+        token_data = self._token_cache.get(token_key)
+        if token_data is None:
+            return None
+        if token_data.exp <= time.time():
+            del self._token_cache[token_key]
             return None
+        self._token_cache.move_to_end(token_key)
+        return token_data
+
+    def _cache_token(self, token_key: str, token_data: TokenData):
+        self._token_cache[token_key] = token_data
+        self._token_cache.move_to_end(token_key)
+        while len(self._token_cache) > self.token_cache_size:
+            self._token_cache.popitem(last=False)
+
+    async def _verification_key(self, header: Dict[str, Any]):
+        """Key for the algorithm named in the token header"""
+        algorithm = header.get("alg")
+        if algorithm == "RS256":
+            return await self.get_signing_key(header.get("kid"))
+        if algorithm == "HS256":
+            # Development instances sign with the secret key
+            return self.secret_key
+        return None
 
     async def verify_token(self, token: str) -> TokenData:
         """Verify and decode a Clerk JWT token"""
-        try:
-            # Try to decode with the secret key
-            if self.secret_key:
-                # Clerk uses RS256 for production, HS256 for development
-                # Try both algorithms
-                algorithms = ["RS256", "HS256"]
+        token_key = self._token_key(token)
+        cached = self._cached_token(token_key)
+        if cached is not None:
+            return cached
 
-                for algo in algorithms:
-                    try:
-                        payload = jwt.decode(
-                            token,
-                            self.secret_key,
-                            algorithms=[algo],
-                            options={"verify_aud": False}  # Clerk doesn't always include aud
-                        )
-                        return TokenData(**payload)
-                    except JWTError:
-                        continue
-
-                # If both algorithms fail, try without verification for debugging
-                # (Remove this in production!)
-                try:
-                    unverified = jwt.decode(token, options={"verify_signature": False})
-                    logger.warning(f"Token decoded without verification: {unverified.get('sub')}")
-                    return TokenData(**unverified)
-                except Exception as e:
-                    logger.error(f"Failed to decode token even without verification: {e}")
-
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Could not validate credentials",
-                headers={"WWW-Authenticate": "Bearer"},
+        try:
+            # The header names the algorithm and key; no trying each in turn
+            header = jwt.get_unverified_header(token)
+            key = await self._verification_key(header)
+            if key is None:
+                raise JWTError(f"No verification key for alg={header.get('alg')} kid={header.get('kid')}")
+
+            payload = jwt.decode(
+                token,
+                key,
+                algorithms=[header["alg"]],
+                options={"verify_aud": False}  # Clerk doesn't always include aud
             )
-
         except JWTError as e:
             logger.error(f"JWT validation error: {e}")
             raise HTTPException(
@@ -156,6 +255,10 @@ class ClerkAuthMiddleware:
                 headers={"WWW-Authenticate": "Bearer"},
             )
 
+        token_data = TokenData(**payload)
+        self._cache_token(token_key, token_data)
+        return token_data
+
     async def get_current_user(
         self,
         credentials: HTTPAuthorizationCredentials = Security(security)
@@ -179,26 +282,72 @@ class ClerkAuthMiddleware:
 
         # Fetch additional organization details if user is in an org
         if user.organization_id:
-            org_details = await self.get_organization_details(user.organization_id)
+            org_details = await self.get_cached_organization_details(user.organization_id)
             if org_details:
                 user.organization_name = org_details.get("name")
                 user.metadata["organization"] = org_details
 
         return user
 
+    async def get_cached_organization_details(self, org_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Organization details from the cache.
+
+        Only a cold miss waits on Clerk; an expired entry is returned as is
+        while a background refresh replaces it.
+        """
+        entry = self._org_cache.get(org_id)
+        if entry is None:
+            return await self._single_flight(self._org_fetches, org_id, lambda: self._refresh_organization(org_id))
+
+        expires_at, details = entry
+        if expires_at <= time.monotonic():
+            in_flight = self._org_fetches.get(org_id)
+            if in_flight is None or in_flight.done():
+                self._org_fetches[org_id] = asyncio.ensure_future(self._refresh_organization(org_id))
+        return details
+
+    async def _refresh_organization(self, org_id: str) -> Optional[Dict[str, Any]]:
+        flight = self._org_fetches.get(org_id)
+        details = await self.get_organization_details(org_id)
+        # An invalidation while this was in flight wins over the stale response
+        if self._org_fetches.get(org_id) is flight:
+            if details is not None:
+                self._org_cache[org_id] = (time.monotonic() + self.org_cache_ttl, details)
+            else:
+                # Keep serving stale details through a failed refresh; only a
+                # cold miss is negative-cached. Either way retry after org_error_ttl
+                stale = self._org_cache.get(org_id, (0.0, None))[1]
+                self._org_cache[org_id] = (time.monotonic() + self.org_error_ttl, stale)
+                details = stale
+            self._org_fetches.pop(org_id, None)
+        return details
+
+    def invalidate_organization(self, org_id: Optional[str]):
+        """Drop cached details for an organization (webhook-driven)"""
+        if not org_id:
+            return
+        self._org_cache.pop(org_id, None)
+        self._org_fetches.pop(org_id, None)
+
+    def invalidate_user(self, user_id: Optional[str]):
+        """Drop verified tokens cached for a user (deleted user, revoked session)"""
+        if not user_id:
+            return
+        for token_key in [k for k, data in self._token_cache.items() if data.sub == user_id]:
+            del self._token_cache[token_key]
+
     async def get_organization_details(self, org_id: str) -> Optional[Dict[str, Any]]:
         """Fetch organization details from Clerk API"""
         try:
-            async with httpx.AsyncClient() as client:
-                url = f"{CLERK_API_URL}/organizations/{org_id}"
-                headers = {"Authorization": f"Bearer {self.secret_key}"}
-                response = await client.get(url, headers=headers)
-
-                if response.status_code == 200:
-                    return response.json()
-                else:
-                    logger.error(f"Failed to fetch org details: {response.status_code}")
-                    return None
+            url = f"{CLERK_API_URL}/organizations/{org_id}"
+            response = await self.client.get(url)
+
+            if response.status_code == 200:
+                return response.json()
+            else:
+                logger.error(f"Failed to fetch org details: {response.status_code}")
+                return None
         except Exception as e:
             logger.error(f"Error fetching organization: {e}")
             return None
@@ -296,16 +445,14 @@ def require_role(allowed_roles: List[str]):
 async def verify_user_in_organization(user_id: str, org_id: str) -> bool:
     """Verify if a user belongs to a specific organization"""
     try:
-        async with httpx.AsyncClient() as client:
-            url = f"{CLERK_API_URL}/organizations/{org_id}/memberships"
-            headers = {"Authorization": f"Bearer {CLERK_SECRET_KEY}"}
-            response = await client.get(url, headers=headers)
-
-            if response.status_code == 200:
-                memberships = response.json()
-                for membership in memberships:
-                    if membership.get("user_id") == user_id:
-                        return True
+        url = f"{CLERK_API_URL}/organizations/{org_id}/memberships"
+        response = await clerk_auth.client.get(url)
+
+        if response.status_code == 200:
+            memberships = response.json()
+            for membership in memberships:
+                if membership.get("user_id") == user_id:
+                    return True
         return False
     except Exception as e:
         logger.error(f"Error verifying organization membership: {e}")
@@ -315,13 +462,11 @@ async def verify_user_in_organization(user_id: str, org_id: str) -> bool:
 async def get_user_organizations(user_id: str) -> List[Dict[str, Any]]:
     """Get all organizations a user belongs to"""
     try:
-        async with httpx.AsyncClient() as client:
-            url = f"{CLERK_API_URL}/users/{user_id}/organization_memberships"
-            headers = {"Authorization": f"Bearer {CLERK_SECRET_KEY}"}
-            response = await client.get(url, headers=headers)
+        url = f"{CLERK_API_URL}/users/{user_id}/organization_memberships"
+        response = await clerk_auth.client.get(url)
 
-            if response.status_code == 200:
-                return response.json()
+        if response.status_code == 200:
+            return response.json()
         return []
     except Exception as e:
         logger.error(f"Error fetching user organizations: {e}")
@@ -331,30 +476,24 @@ async def get_user_organizations(user_id: str) -> List[Dict[str, Any]]:
 async def create_organization(name: str, created_by: str, **kwargs) -> Optional[Dict[str, Any]]:
     """Create a new organization in Clerk"""
     try:
-        async with httpx.AsyncClient() as client:
-            url = f"{CLERK_API_URL}/organizations"
-            headers = {
-                "Authorization": f"Bearer {CLERK_SECRET_KEY}",
-                "Content-Type": "application/json"
-            }
-
-            data = {
-                "name": name,
-                "created_by": created_by,
-                "public_metadata": kwargs.get("public_metadata", {}),
-                "private_metadata": kwargs.get("private_metadata", {})
-            }
-
-            if "slug" in kwargs:
-                data["slug"] = kwargs["slug"]
-
-            response = await client.post(url, headers=headers, json=data)
-
-            if response.status_code == 200:
-                return response.json()
-            else:
-                logger.error(f"Failed to create organization: {response.text}")
-                return None
+        url = f"{CLERK_API_URL}/organizations"
+        data = {
+            "name": name,
+            "created_by": created_by,
+            "public_metadata": kwargs.get("public_metadata", {}),
+            "private_metadata": kwargs.get("private_metadata", {})
+        }
+
+        if "slug" in kwargs:
+            data["slug"] = kwargs["slug"]
+
+        response = await clerk_auth.client.post(url, json=data)
+
+        if response.status_code == 200:
+            return response.json()
+        else:
+            logger.error(f"Failed to create organization: {response.text}")
+            return None
     except Exception as e:
         logger.error(f"Error creating organization: {e}")
         return None
\ No newline at end of file
@@ -11,6 +11,7 @@ from datetime import datetime, timezone
 from fastapi import APIRouter, Request, HTTPException, Depends, Header, status
 from sqlalchemy.orm import Session
 from svix.webhooks import Webhook, WebhookVerificationError
+from app.auth.clerk_auth import clerk_auth
 from app.core.database import get_db
 from app.models.user import User, OrganizationMembership
 from app.models.organization import Organization
@@ -468,6 +469,20 @@ class WebhookHandler:
 webhook_handler = WebhookHandler()
 
 
+def invalidate_auth_cache(event_type: Optional[str], data: Dict[str, Any]):
+    """Drop cached Clerk auth context touched by a webhook event"""
+    if event_type in ("organization.updated", "organization.deleted"):
+        clerk_auth.invalidate_organization(data.get("id"))
+    elif event_type in ("organizationMembership.created", "organizationMembership.updated",
+                        "organizationMembership.deleted"):
+        org_id = data.get("organization_id") or (data.get("organization") or {}).get("id")
+        clerk_auth.invalidate_organization(org_id)
+    elif event_type == "user.deleted":
+        clerk_auth.invalidate_user(data.get("id"))
+    elif event_type in ("session.ended", "session.removed", "session.revoked"):
+        clerk_auth.invalidate_user(data.get("user_id"))
+
+
 @router.post("/clerk")
 async def clerk_webhook(
     request: Request,
@@ -507,6 +522,9 @@ async def clerk_webhook(
 
     logger.info(f"Processing webhook event: {event_type}")
 
+    # Before the handlers run, so a failed DB write can't leave stale auth context
+    invalidate_auth_cache(event_type, event_data or {})
+
     try:
         # Route to appropriate handler based on event type
         if event_type == "user.created":
@@ -1,37 +1,74 @@
 """High-performance caching layer for AI and database operations"""
 
+import asyncio
 import json
 import hashlib
-from typing import Optional, Any, Union
+import math
+import random
+import re
+import time
+import uuid
+from typing import Optional, Any, Union, Dict, Iterable, List
 from datetime import timedelta
+import numpy as np
 import redis.asyncio as redis
 from functools import wraps
 import structlog
 
+from app.core.codec import CacheCodec, CodecError, get_codec
 from app.core.config import settings
 
 logger = structlog.get_logger(__name__)
 
 
+# Marker for values written by get_or_set: {"_xf": [compute_seconds, expires_at], "v": value}
+ENTRY_MARKER = "_xf"
+
+# Deletes a lock only if it still holds our token
+RELEASE_LOCK_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
 class CacheService:
     """
     Redis-based caching service for performance optimization.
     Reduces AI API costs and improves response times.
+
+    get_or_set is stampede-safe: concurrent misses for a key in one process
+    share a single computation, a short Redis lock keeps other workers from
+    recomputing at the same time, and entries are refreshed in the background
+    slightly before they expire (probabilistic early refresh), with the
+    probability rising as expiry nears and for values that are slow to compute.
     """
 
-    def __init__(self):
+    def __init__(
+        self,
+        early_refresh_beta: float = 1.0,
+        lock_timeout: float = 30.0,
+        codec: Optional[CacheCodec] = None
+    ):
         self.redis_client = None
+        self.codec = codec or get_codec()
         self.default_ttl = 3600  # 1 hour
         self.ai_cache_ttl = 7200  # 2 hours for expensive AI calls
+        self.tag_ttl = 86400  # tag sets outlive the entries they list
+        self.early_refresh_beta = early_refresh_beta
+        self.lock_timeout = lock_timeout
         self._initialized = False
+        self._inflight: Dict[str, asyncio.Task] = {}
 
     async def initialize(self):
         """Initialize Redis connection"""
         if not self._initialized and settings.REDIS_URL:
             try:
+                # Values are codec bytes, so responses stay undecoded
                 self.redis_client = redis.from_url(
                     settings.REDIS_URL,
-                    decode_responses=True,
+                    decode_responses=False,
                     max_connections=50,
                     socket_keepalive=True,
                     socket_keepalive_options={
@@ -52,34 +89,69 @@ class CacheService:
         if not self.redis_client:
             return None
 
+        entry = await self._get_entry(key)
+        if entry is None:
+            return None
+        return entry["v"] if self._is_entry(entry) else entry
+
+    async def _get_entry(self, key: str) -> Optional[Any]:
+        """Raw decoded value, including the get_or_set envelope"""
         try:
             value = await self.redis_client.get(key)
             if value:
-                return json.loads(value)
+                return self.codec.decode(value)
+            return None
+        except CodecError as e:
+            # Written by a newer codec during a rollout; treat as a miss
+            logger.debug("Cache value not decodable", key=key, error=str(e))
             return None
         except Exception as e:
             logger.error("Cache get failed", key=key, error=str(e))
             return None
 
+    @staticmethod
+    def _is_entry(value: Any) -> bool:
+        return isinstance(value, dict) and ENTRY_MARKER in value and "v" in value
+
     async def set(
         self,
         key: str,
         value: Any,
-        ttl: Optional[int] = None
+        ttl: Optional[int] = None,
+        tags: Optional[Iterable[str]] = None
     ) -> bool:
-        """Set value in cache"""
+        """
+        Set value in cache
+
+        Args:
+            tags: Tag names; invalidate_tags removes every key carrying a tag
+        """
         if not self.redis_client:
             return False
 
         try:
             ttl = ttl or self.default_ttl
-            serialized = json.dumps(value)
-            await self.redis_client.set(key, serialized, ex=ttl)
+            serialized = self.codec.encode(value)
+            if not tags:
+                await self.redis_client.set(key, serialized, ex=ttl)
+                return True
+
+            pipe = self.redis_client.pipeline(transaction=False)
+            pipe.set(key, serialized, ex=ttl)
+            for tag in tags:
+                tag_key = self._tag_key(tag)
+                pipe.sadd(tag_key, key)
+                pipe.expire(tag_key, max(ttl, self.tag_ttl))
+            await pipe.execute()
             return True
         except Exception as e:
             logger.error("Cache set failed", key=key, error=str(e))
             return False
 
+    @staticmethod
+    def _tag_key(tag: str) -> str:
+        return f"tag:{tag}"
+
     async def delete(self, key: str) -> bool:
         """Delete key from cache"""
         if not self.redis_client:
@@ -141,40 +213,160 @@ class CacheService:
         func,
         ttl: Optional[int] = None,
         *args,
+        cache_tags: Optional[Iterable[str]] = None,
         **kwargs
     ) -> Any:
-        """Get from cache or compute and cache"""
-        # Try to get from cache
-        cached = await self.get(key)
-        if cached is not None:
-            logger.debug("Cache hit", key=key)
-            return cached
-
-        # Compute value
-        logger.debug("Cache miss, computing", key=key)
-        if asyncio.iscoroutinefunction(func):
-            value = await func(*args, **kwargs)
+        """
+        Get from cache or compute and cache
+
+        Concurrent misses share one computation; near expiry, a hit may start
+        a background refresh while still returning the cached value.
+
+        Args:
+            cache_tags: Tags stored with the value (see invalidate_tags)
+        """
+        ttl = ttl or self.default_ttl
+        cache_tags = list(cache_tags or [])
+
+        if self.redis_client:
+            entry = await self._get_entry(key)
+            if entry is not None:
+                logger.debug("Cache hit", key=key)
+                cache_metrics.record_hit()
+                if self._is_entry(entry):
+                    if key not in self._inflight and self._should_refresh_early(entry):
+                        cache_metrics.early_refreshes += 1
+                        self._start_computation(key, func, ttl, cache_tags, args, kwargs)
+                    return entry["v"]
+                return entry
+
+        cache_metrics.record_miss()
+        task = self._inflight.get(key)
+        if task is not None:
+            cache_metrics.coalesced += 1
         else:
-            value = func(*args, **kwargs)
+            logger.debug("Cache miss, computing", key=key)
+            task = self._start_computation(key, func, ttl, cache_tags, args, kwargs)
 
-        # Store in cache
-        await self.set(key, value, ttl)
-        return value
+        # Shielded so one caller's cancellation doesn't cancel the shared work
+        return await asyncio.shield(task)
+
+    def _should_refresh_early(self, entry: Dict[str, Any]) -> bool:
+        """XFetch: refresh when now - delta * beta * ln(rand) passes expiry"""
+        compute_seconds, expires_at = entry[ENTRY_MARKER]
+        if self.early_refresh_beta <= 0:
+            return False
+        jitter = -compute_seconds * self.early_refresh_beta * math.log(1.0 - random.random())
+        return time.time() + jitter >= expires_at
+
+    def _start_computation(self, key, func, ttl, tags, args, kwargs) -> asyncio.Task:
+        task = asyncio.ensure_future(self._compute(key, func, ttl, tags, args, kwargs))
+        self._inflight[key] = task
+        task.add_done_callback(lambda done: self._finish_computation(key, done))
+        return task
+
+    def _finish_computation(self, key: str, task: asyncio.Task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning("Cache computation failed", key=key, error=str(task.exception()))
+
+    async def _compute(self, key, func, ttl, tags, args, kwargs) -> Any:
+        """Compute a value once across workers and store it with its envelope"""
+        lock_key = f"lock:{key}"
+        token = uuid.uuid4().hex
+        locked = await self._acquire_lock(lock_key, token)
 
-    async def clear_pattern(self, pattern: str) -> int:
-        """Clear all keys matching pattern"""
+        try:
+            if not locked:
+                # Another worker is computing (or refreshing); use its result
+                # if it lands in time
+                value = await self._wait_for_value(key)
+                if value is not None:
+                    return value
+
+            started = time.monotonic()
+            if asyncio.iscoroutinefunction(func):
+                value = await func(*args, **kwargs)
+            else:
+                value = func(*args, **kwargs)
+            compute_seconds = time.monotonic() - started
+
+            if value is not None and self.redis_client:
+                entry = {ENTRY_MARKER: [round(compute_seconds, 4), time.time() + ttl], "v": value}
+                await self.set(key, entry, ttl, tags=tags)
+            return value
+        finally:
+            if locked:
+                await self._release_lock(lock_key, token)
+
+    async def _acquire_lock(self, lock_key: str, token: str) -> bool:
         if not self.redis_client:
-            return 0
+            return True
+        try:
+            return bool(await self.redis_client.set(lock_key, token, nx=True, px=int(self.lock_timeout * 1000)))
+        except Exception as e:
+            logger.error("Cache lock failed", key=lock_key, error=str(e))
+            return True
 
+    async def _release_lock(self, lock_key: str, token: str):
         try:
-            keys = await self.redis_client.keys(pattern)
-            if keys:
-                return await self.redis_client.delete(*keys)
+            await self.redis_client.eval(RELEASE_LOCK_SCRIPT, 1, lock_key, token)
+        except Exception as e:
+            logger.error("Cache unlock failed", key=lock_key, error=str(e))
+
+    async def _wait_for_value(self, key: str, poll_interval: float = 0.05) -> Optional[Any]:
+        deadline = time.monotonic() + self.lock_timeout
+        while time.monotonic() < deadline:
+            await asyncio.sleep(poll_interval)
+            value = await self.get(key)
+            if value is not None:
+                return value
+            poll_interval = min(poll_interval * 2, 1.0)
+        return None
+
+    async def clear_pattern(self, pattern: str, batch_size: int = 500) -> int:
+        """Clear all keys matching pattern (incremental SCAN, never KEYS)"""
+        if not self.redis_client:
             return 0
+
+        try:
+            deleted = 0
+            batch = []
+            async for key in self.redis_client.scan_iter(match=pattern, count=1000):
+                batch.append(key)
+                if len(batch) >= batch_size:
+                    deleted += await self.redis_client.unlink(*batch)
+                    batch = []
+            if batch:
+                deleted += await self.redis_client.unlink(*batch)
+            return deleted
         except Exception as e:
             logger.error("Cache clear pattern failed", pattern=pattern, error=str(e))
             return 0
 
+    async def invalidate_tags(self, *tags: str, batch_size: int = 500) -> int:
+        """Delete every key stored with any of ``tags``"""
+        if not self.redis_client:
+            return 0
+
+        deleted = 0
+        for tag in tags:
+            tag_key = self._tag_key(tag)
+            try:
+                batch = []
+                async for key in self.redis_client.sscan_iter(tag_key, count=1000):
+                    batch.append(key)
+                    if len(batch) >= batch_size:
+                        deleted += await self.redis_client.unlink(*batch)
+                        batch = []
+                if batch:
+                    deleted += await self.redis_client.unlink(*batch)
+                await self.redis_client.unlink(tag_key)
+            except Exception as e:
+                logger.error("Cache tag invalidation failed", tag=tag, error=str(e))
+        return deleted
+
 
 class AIResponseCache:
     """
@@ -224,7 +416,8 @@ class AIResponseCache:
     ):
         """Cache embedding"""
         key = f"{self.prefix}embedding:{model}:{hashlib.md5(text.encode()).hexdigest()}"
-        await self.cache.set(key, embedding, ttl)
+        # Stored as raw float32 rather than a JSON list
+        await self.cache.set(key, np.asarray(embedding, dtype=np.float32), ttl)
 
     def _generate_claude_key(self, prompt: str, context: Optional[dict]) -> str:
         """Generate cache key for Claude responses"""
@@ -240,8 +433,13 @@ class AIResponseCache:
 class QueryCache:
     """
     Database query result caching for performance.
+
+    Results are tagged with the models (tables) they read, so writes to a
+    model can invalidate exactly the cached queries that depend on it.
     """
 
+    TABLE_PATTERN = re.compile(r"\b(?:from|join|update|into)\s+[\"`]?(\w+)", re.IGNORECASE)
+
     def __init__(self, cache_service: CacheService):
         self.cache = cache_service
         self.prefix = "db:"
@@ -260,16 +458,30 @@ class QueryCache:
         query: str,
         params: dict,
         result: Any,
-        ttl: int = 300  # 5 minutes default
+        ttl: int = 300,  # 5 minutes default
+        models: Optional[List[str]] = None
     ):
-        """Cache query result"""
+        """
+        Cache query result
+
+        Args:
+            models: Models the query reads; parsed from the SQL when omitted
+        """
         key = self._generate_query_key(query, params)
-        await self.cache.set(key, result, ttl)
+        models = models if models is not None else self.models_in_query(query)
+        await self.cache.set(key, result, ttl, tags=[self._model_tag(m) for m in models])
 
     async def invalidate_for_model(self, model_name: str):
         """Invalidate all cached queries for a model"""
-        pattern = f"{self.prefix}{model_name}:*"
-        return await self.cache.clear_pattern(pattern)
+        return await self.cache.invalidate_tags(self._model_tag(model_name))
+
+    @classmethod
+    def models_in_query(cls, query: str) -> List[str]:
+        """Table names a SQL statement reads or writes, lower-cased"""
+        return sorted({name.lower() for name in cls.TABLE_PATTERN.findall(query)})
+
+    def _model_tag(self, model_name: str) -> str:
+        return f"{self.prefix}model:{model_name.lower()}"
 
     def _generate_query_key(self, query: str, params: dict) -> str:
         """Generate cache key for query"""
@@ -302,18 +514,8 @@ def cache_result(ttl: int = 3600, prefix: str = "func:"):
                 json.dumps(key_data, sort_keys=True).encode()
             ).hexdigest()
 
-            # Check cache
-            cached = await cache.get(key)
-            if cached is not None:
-                logger.debug(f"Cache hit for {func.__name__}")
-                return cached
-
-            # Execute function
-            result = await func(*args, **kwargs)
-
-            # Cache result
-            await cache.set(key, result, ttl)
-            return result
+            # Cached, or computed once for all concurrent callers
+            return await cache.get_or_set(key, func, ttl, *args, **kwargs)
 
         return wrapper
     return decorator
@@ -335,6 +537,8 @@ class CacheMetrics:
         self.hits = 0
         self.misses = 0
         self.errors = 0
+        self.coalesced = 0  # misses served by another caller's computation
+        self.early_refreshes = 0
 
     @property
     def hit_rate(self) -> float:
@@ -363,12 +567,11 @@ class CacheMetrics:
             "misses": self.misses,
             "errors": self.errors,
             "hit_rate": self.hit_rate,
-            "total_requests": self.hits + self.misses
+            "total_requests": self.hits + self.misses,
+            "coalesced": self.coalesced,
+            "early_refreshes": self.early_refreshes
         }
 
 
 # Initialize cache metrics
 cache_metrics = CacheMetrics()
-
-
-import asyncio  # Add this import at the top of the file
\ No newline at end of file
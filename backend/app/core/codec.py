@@ -0,0 +1,268 @@
+"""
+Binary codecs for cached payloads
+
+Every encoded value starts with a two-byte header:
+
+    byte 0   CODEC_VERSION
+    byte 1   low nibble: serializer, high nibble: compression
+
+followed by the (optionally compressed) body. JSON text never starts with
+byte 0x01, so values written before this format are still read as JSON;
+values with an unknown version raise CodecError, which caches treat as a
+miss. That lets old and new workers share Redis during a rollout.
+
+Serializers: msgpack, orjson or stdlib JSON for general values, and raw
+little-endian float32 for vectors. Bodies (other than vectors) of at least
+``compress_threshold`` bytes are compressed with zstd, lz4 or zlib (whichever is configured and
+installed). msgpack, orjson, zstandard and lz4 are optional; without them
+the codec falls back to JSON and zlib.
+"""
+
+import json
+import zlib
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Optional, Sequence, Union
+
+import numpy as np
+
+try:
+    import msgpack
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    MSGPACK_AVAILABLE = False
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+try:
+    import lz4.frame
+    LZ4_AVAILABLE = True
+except ImportError:
+    LZ4_AVAILABLE = False
+
+
+CODEC_VERSION = 1
+
+# Serializers (low nibble)
+FORMAT_JSON = 0
+FORMAT_MSGPACK = 1
+FORMAT_ORJSON = 2
+FORMAT_FLOAT32 = 3
+
+# Compression (high nibble)
+COMPRESSION_NONE = 0
+COMPRESSION_ZLIB = 1
+COMPRESSION_ZSTD = 2
+COMPRESSION_LZ4 = 3
+
+SERIALIZERS = {"json": FORMAT_JSON, "msgpack": FORMAT_MSGPACK, "orjson": FORMAT_ORJSON}
+COMPRESSIONS = {"none": COMPRESSION_NONE, "zlib": COMPRESSION_ZLIB, "zstd": COMPRESSION_ZSTD, "lz4": COMPRESSION_LZ4}
+
+# Little-endian float32, the same layout as the embedding cache
+VECTOR_DTYPE = np.dtype("<f4")
+
+
+class CodecError(ValueError):
+    """Payload that this codec version cannot decode"""
+
+
+def _default(value: Any) -> Any:
+    """Fallback for types the serializers don't know; matches json.dumps(default=str)"""
+    if isinstance(value, int):
+        # Only reached for integers the binary serializers can't hold
+        raise OverflowError("Integer exceeds 64 bits")
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return str(value)
+
+
+class CacheCodec:
+    """
+    Encodes cache values to compact bytes and back.
+
+    ``serializer`` and ``compression`` name the preferred formats; "auto"
+    picks the best one installed. Decoding reads the header, so any codec
+    instance can read what any other wrote.
+    """
+
+    def __init__(
+        self,
+        serializer: str = "auto",
+        compression: str = "auto",
+        compress_threshold: int = 1024,
+        compression_level: int = 3
+    ):
+        """
+        Args:
+            serializer: "auto", "msgpack", "orjson" or "json"
+            compression: "auto", "zstd", "lz4", "zlib" or "none"
+            compress_threshold: Bodies at least this many bytes are compressed
+            compression_level: Level passed to the compressor
+        """
+        self.format = self._pick_serializer(serializer)
+        self.compression = self._pick_compression(compression)
+        self.compress_threshold = compress_threshold
+        self.compression_level = compression_level
+        self._zstd_compressor = zstandard.ZstdCompressor(level=compression_level) if ZSTD_AVAILABLE else None
+        self._zstd_decompressor = zstandard.ZstdDecompressor() if ZSTD_AVAILABLE else None
+
+    @staticmethod
+    def _pick_serializer(name: str) -> int:
+        if name == "auto":
+            return FORMAT_MSGPACK if MSGPACK_AVAILABLE else FORMAT_ORJSON if ORJSON_AVAILABLE else FORMAT_JSON
+        if name not in SERIALIZERS:
+            raise ValueError(f"Unknown serializer: {name}")
+        fmt = SERIALIZERS[name]
+        if (fmt == FORMAT_MSGPACK and not MSGPACK_AVAILABLE) or (fmt == FORMAT_ORJSON and not ORJSON_AVAILABLE):
+            return FORMAT_JSON
+        return fmt
+
+    @staticmethod
+    def _pick_compression(name: str) -> int:
+        if name == "auto":
+            return COMPRESSION_ZSTD if ZSTD_AVAILABLE else COMPRESSION_LZ4 if LZ4_AVAILABLE else COMPRESSION_ZLIB
+        if name not in COMPRESSIONS:
+            raise ValueError(f"Unknown compression: {name}")
+        method = COMPRESSIONS[name]
+        if (method == COMPRESSION_ZSTD and not ZSTD_AVAILABLE) or (method == COMPRESSION_LZ4 and not LZ4_AVAILABLE):
+            return COMPRESSION_ZLIB
+        return method
+
+    # Encoding
+
+    def encode(self, value: Any) -> bytes:
+        """Encode a general value (dicts, lists, scalars, records)"""
+        if isinstance(value, np.ndarray) and value.dtype.kind == "f" and value.ndim == 1:
+            return self.encode_vector(value)
+        try:
+            return self._frame(self.format, self._serialize(self.format, value))
+        except (OverflowError, TypeError):
+            # msgpack (OverflowError) and orjson (TypeError) stop at 64-bit
+            # integers; stdlib JSON has no limit
+            if self.format == FORMAT_JSON:
+                raise
+            return self._frame(FORMAT_JSON, self._serialize(FORMAT_JSON, value))
+
+    def encode_vector(self, vector: Union[Sequence[float], np.ndarray]) -> bytes:
+        """Encode a float vector as raw float32 (4 bytes per dimension)"""
+        return self._frame(FORMAT_FLOAT32, np.asarray(vector, dtype=VECTOR_DTYPE).tobytes())
+
+    def _serialize(self, fmt: int, value: Any) -> bytes:
+        if fmt == FORMAT_MSGPACK:
+            return msgpack.packb(value, default=_default, use_bin_type=True)
+        if fmt == FORMAT_ORJSON:
+            return orjson.dumps(value, default=_default, option=orjson.OPT_SERIALIZE_NUMPY)
+        return json.dumps(value, default=_default, separators=(",", ":")).encode()
+
+    def _frame(self, fmt: int, body: bytes) -> bytes:
+        compression = COMPRESSION_NONE
+        # Float32 vectors are near-random bytes; compressing them costs more
+        # CPU than the few percent it saves
+        if (fmt != FORMAT_FLOAT32 and self.compression != COMPRESSION_NONE
+                and len(body) >= self.compress_threshold):
+            compressed = self._compress(self.compression, body)
+            if len(compressed) < len(body):
+                compression, body = self.compression, compressed
+        return bytes((CODEC_VERSION, fmt | (compression << 4))) + body
+
+    def _compress(self, method: int, body: bytes) -> bytes:
+        if method == COMPRESSION_ZSTD:
+            return self._zstd_compressor.compress(body)
+        if method == COMPRESSION_LZ4:
+            return lz4.frame.compress(body)
+        return zlib.compress(body, self.compression_level)
+
+    # Decoding
+
+    def decode(self, data: Optional[Union[bytes, str]]) -> Any:
+        """
+        Decode a value written by any codec version this one understands
+
+        Raises:
+            CodecError: Unknown version, serializer or compression
+        """
+        if data is None:
+            return None
+        if isinstance(data, str):
+            return json.loads(data)
+        if not data or data[0] != CODEC_VERSION:
+            if data and data[0] < 0x09:
+                raise CodecError(f"Unsupported cache codec version {data[0]}")
+            # Written before the binary format: plain JSON text
+            return json.loads(data)
+        if len(data) < 2:
+            raise CodecError("Truncated cache payload")
+
+        fmt, compression = data[1] & 0x0F, data[1] >> 4
+        body = self._decompress(compression, memoryview(data)[2:])
+
+        if fmt == FORMAT_FLOAT32:
+            return np.frombuffer(body, dtype=VECTOR_DTYPE).tolist()
+        if fmt == FORMAT_MSGPACK:
+            if not MSGPACK_AVAILABLE:
+                raise CodecError("msgpack payload but msgpack is not installed")
+            # Non-string keys (e.g. {2024: 5.0}) are valid msgpack; don't refuse them
+            return msgpack.unpackb(body, raw=False, strict_map_key=False)
+        if fmt == FORMAT_ORJSON:
+            return orjson.loads(bytes(body)) if ORJSON_AVAILABLE else json.loads(bytes(body))
+        if fmt == FORMAT_JSON:
+            return json.loads(bytes(body))
+        raise CodecError(f"Unknown cache serializer {fmt}")
+
+    def _decompress(self, compression: int, body: memoryview) -> bytes:
+        if compression == COMPRESSION_NONE:
+            return body
+        if compression == COMPRESSION_ZLIB:
+            return zlib.decompress(body)
+        if compression == COMPRESSION_ZSTD:
+            if not ZSTD_AVAILABLE:
+                raise CodecError("zstd payload but zstandard is not installed")
+            return self._zstd_decompressor.decompress(body)
+        if compression == COMPRESSION_LZ4:
+            if not LZ4_AVAILABLE:
+                raise CodecError("lz4 payload but lz4 is not installed")
+            return lz4.frame.decompress(body)
+        raise CodecError(f"Unknown cache compression {compression}")
+
+
+class LegacyJSONCodec(CacheCodec):
+    """Writes plain JSON text (the pre-codec format); reads everything"""
+
+    def encode(self, value: Any) -> bytes:
+        return json.dumps(value, default=_default).encode()
+
+    def encode_vector(self, vector: Union[Sequence[float], np.ndarray]) -> bytes:
+        return self.encode(np.asarray(vector, dtype=VECTOR_DTYPE).tolist())
+
+
+def get_codec(name: Optional[str] = None) -> CacheCodec:
+    """
+    Codec from settings: CACHE_CODEC ("binary" or "json" to keep writing the
+    legacy format during a rollout), CACHE_SERIALIZER, CACHE_COMPRESSION and
+    CACHE_COMPRESS_THRESHOLD.
+    """
+    from app.core.config import settings
+
+    if (name or settings.CACHE_CODEC) == "json":
+        return LegacyJSONCodec(serializer="json", compression="none")
+    return CacheCodec(
+        serializer=settings.CACHE_SERIALIZER,
+        compression=settings.CACHE_COMPRESSION,
+        compress_threshold=settings.CACHE_COMPRESS_THRESHOLD
+    )
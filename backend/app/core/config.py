@@ -16,9 +16,31 @@ class Settings:
         
         # Redis Cache
         self.REDIS_URL = os.getenv("REDIS_URL")
+        self.EMBEDDING_CACHE_MAX_BYTES = int(os.getenv("EMBEDDING_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+        self.EMBEDDING_CACHE_TTL = int(os.getenv("EMBEDDING_CACHE_TTL", str(30 * 24 * 3600)))
+        # Cached payload format: "binary" (versioned msgpack/float32 + compression)
+        # or "json" to keep writing plain JSON while old workers are still running
+        self.CACHE_CODEC = os.getenv("CACHE_CODEC", "binary").lower()
+        self.CACHE_SERIALIZER = os.getenv("CACHE_SERIALIZER", "auto").lower()
+        self.CACHE_COMPRESSION = os.getenv("CACHE_COMPRESSION", "auto").lower()
+        self.CACHE_COMPRESS_THRESHOLD = int(os.getenv("CACHE_COMPRESS_THRESHOLD", "1024"))
+        # Realtime backplane across workers: "redis" (needs REDIS_URL), "memory" or "none"
+        self.REALTIME_BACKPLANE = os.getenv("REALTIME_BACKPLANE", "redis").lower()
+        # Per-organization deal analytics rollups, kept current on deal writes and
+        # rebuilt from the deals table when older than the max age (seconds)
+        self.DEAL_ANALYTICS_ROLLUPS = os.getenv("DEAL_ANALYTICS_ROLLUPS", "false").lower() == "true"
+        self.DEAL_ANALYTICS_ROLLUP_MAX_AGE = int(os.getenv("DEAL_ANALYTICS_ROLLUP_MAX_AGE", "3600"))
 
         # Claude MCP
         self.anthropic_api_key = os.getenv("ANTHROPIC_API_KEY")
+        # AI gateway shared by every Claude caller. Budgets apply per model;
+        # AI_GATEWAY_MODEL_BUDGETS overrides them as "model=concurrency:tokens_per_minute,..."
+        self.ANTHROPIC_BASE_URL = os.getenv("ANTHROPIC_BASE_URL", "https://api.anthropic.com")
+        self.AI_GATEWAY_MAX_CONCURRENCY = int(os.getenv("AI_GATEWAY_MAX_CONCURRENCY", "8"))
+        self.AI_GATEWAY_TOKENS_PER_MINUTE = int(os.getenv("AI_GATEWAY_TOKENS_PER_MINUTE", "80000"))
+        self.AI_GATEWAY_MODEL_BUDGETS = os.getenv("AI_GATEWAY_MODEL_BUDGETS", "")
+        self.AI_GATEWAY_MAX_RETRIES = int(os.getenv("AI_GATEWAY_MAX_RETRIES", "4"))
+        self.AI_GATEWAY_CACHE_TTL = int(os.getenv("AI_GATEWAY_CACHE_TTL", "7200"))
 
         # Stripe Payment Processing
         self.STRIPE_SECRET_KEY = os.getenv("STRIPE_SECRET_KEY")
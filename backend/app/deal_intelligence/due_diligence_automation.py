@@ -10,9 +10,10 @@ from enum import Enum
 from collections import defaultdict, deque
 import json
 import uuid
-import re
 from abc import ABC, abstractmethod
 
+from app.services.document_scanner import PatternScanner, PatternSpec, ScanResult, literal_specs
+
 # Data Models and Enums
 class DocumentType(Enum):
     FINANCIAL_STATEMENT = "financial_statement"
@@ -122,6 +123,60 @@ class QAItem:
     created_date: datetime = field(default_factory=datetime.now)
     due_date: Optional[datetime] = None
 
+# Known risk patterns, by category and the phrase reported for a hit
+RISK_PATTERNS = {
+    "financial_distress": {
+        "going concern": r"going\s+concern",
+        "liquidity crisis": r"liquidity\s+crisis",
+        "covenant violation": r"covenant\s+violation",
+        "cash shortage": r"cash\s+shortage"
+    },
+    "legal_issues": {
+        "pending litigation": r"pending\s+litigation",
+        "regulatory investigation": r"regulatory\s+investigation",
+        "breach of contract": r"breach\s+of\s+contract",
+        "intellectual property dispute": r"intellectual\s+property\s+dispute"
+    },
+    "operational_risks": {
+        "key person dependency": r"key\s+person\s+dependency",
+        "system failure": r"system\s+failure",
+        "supply chain disruption": r"supply\s+chain\s+disruption",
+        "customer concentration": r"customer\s+concentration"
+    }
+}
+
+# Terms the analyses look for, matched case-insensitively anywhere in the text
+FINANCIAL_TERMS = ["revenue", "decline", "decrease", "profit", "ebitda", "loss", "net",
+                   "cash flow", "negative", "cash", "expense", "cost", "asset", "liability",
+                   "balance sheet", "table"]
+LEGAL_TERMS = ["termination", "liability", "unlimited", "indemnification", "indemnif",
+               "terms", "conditions", "signature", "signed"]
+LEGAL_RISK_TERMS = ["penalty", "default", "breach", "damages", "lawsuit", "litigation"]
+REGULATORY_TERMS = ["regulation", "compliance", "sec", "gdpr", "sox", "hipaa"]
+IP_TERMS = ["patent", "trademark", "copyright", "trade secret"]
+HIGH_RISK_TERMS = ["bankruptcy", "insolvent", "default", "breach", "violation",
+                   "penalty", "fine", "investigation", "audit", "fraud"]
+ENVIRONMENTAL_TERMS = ["contamination", "hazardous", "pollution", "remediation"]
+COMPLIANCE_TERMS = ["management certification", "internal control", "signature",
+                    "preparer", "consent", "retention"]
+
+DATE_PATTERN = r'\d{1,2}[/\-]\d{1,2}[/\-]\d{2,4}'
+NUMBER_PATTERN = r'\$?([\d,]+\.?\d*)'
+
+
+def _document_scan_specs() -> List[PatternSpec]:
+    """Every pattern the analyses use, for a single scan per document"""
+    terms = list(dict.fromkeys(
+        FINANCIAL_TERMS + LEGAL_TERMS + LEGAL_RISK_TERMS + REGULATORY_TERMS + IP_TERMS +
+        HIGH_RISK_TERMS + ENVIRONMENTAL_TERMS + COMPLIANCE_TERMS
+    ))
+    specs = literal_specs("term", terms) + literal_specs("term", ["|"], ignore_case=False)
+    specs += [PatternSpec("date", "date", DATE_PATTERN), PatternSpec("number", "number", NUMBER_PATTERN)]
+    for category, patterns in RISK_PATTERNS.items():
+        specs += [PatternSpec(category, phrase, pattern) for phrase, pattern in patterns.items()]
+    return specs
+
+
 class DocumentAnalysisEngine:
     """Advanced AI-powered document analysis engine"""
 
@@ -130,6 +185,7 @@ class DocumentAnalysisEngine:
         self.document_index = {}
         self.risk_patterns = defaultdict(list)
         self.analysis_history = defaultdict(list)
+        self.scanner = PatternScanner(_document_scan_specs())
 
     def initialize_analysis_models(self) -> bool:
         """Initialize AI models for document analysis"""
@@ -172,8 +228,11 @@ class DocumentAnalysisEngine:
 
         analysis_id = f"analysis_{document_id}_{int(datetime.now().timestamp())}"
 
+        # One pass over the document finds every pattern the analyses need
+        scan = self.scanner.scan(document_content)
+
         # Extract basic document information
-        basic_info = self._extract_basic_information(document_content, document_type)
+        basic_info = self._extract_basic_information(document_content, document_type, scan)
 
         # Perform specific analyses
         key_findings = []
@@ -185,25 +244,25 @@ class DocumentAnalysisEngine:
 
         for analysis_type in analysis_types:
             if analysis_type == "financial_analysis":
-                financial_results = self._perform_financial_analysis(document_content, document_type)
+                financial_results = self._perform_financial_analysis(document_content, document_type, scan)
                 key_findings.extend(financial_results["findings"])
                 extracted_data.update(financial_results["data"])
                 anomalies.extend(financial_results["anomalies"])
 
             elif analysis_type == "legal_analysis":
-                legal_results = self._perform_legal_analysis(document_content, document_type)
+                legal_results = self._perform_legal_analysis(document_content, document_type, scan)
                 key_findings.extend(legal_results["findings"])
                 risk_flags.extend(legal_results["risks"])
                 compliance_issues.extend(legal_results["compliance"])
 
             elif analysis_type == "risk_assessment":
-                risk_results = self._perform_risk_assessment(document_content, document_type)
+                risk_results = self._perform_risk_assessment(document_content, document_type, scan)
                 risk_flags.extend(risk_results["risks"])
                 anomalies.extend(risk_results["anomalies"])
                 recommendations.extend(risk_results["recommendations"])
 
             elif analysis_type == "compliance_check":
-                compliance_results = self._perform_compliance_check(document_content, document_type)
+                compliance_results = self._perform_compliance_check(document_content, document_type, scan)
                 compliance_issues.extend(compliance_results["issues"])
                 recommendations.extend(compliance_results["recommendations"])
 
@@ -337,31 +396,42 @@ class DocumentAnalysisEngine:
 
         return dict(risk_summary)
 
-    def _extract_basic_information(self, content: str, doc_type: DocumentType) -> Dict[str, Any]:
+    def _scan(self, content: str, scan: Optional[ScanResult]) -> ScanResult:
+        return scan if scan is not None else self.scanner.scan(content)
+
+    def _extract_basic_information(self, content: str, doc_type: DocumentType,
+                                   scan: Optional[ScanResult] = None) -> Dict[str, Any]:
         """Extract basic information from document"""
+        scan = self._scan(content, scan)
+        has = lambda term: scan.has("term", term)
+
         basic_info = {
             "word_count": len(content.split()),
-            "has_tables": "table" in content.lower() or "|" in content,
-            "has_dates": bool(re.search(r'\d{1,2}[/\-]\d{1,2}[/\-]\d{2,4}', content)),
-            "has_numbers": bool(re.search(r'\$?[\d,]+\.?\d*', content)),
+            "has_tables": has("table") or has("|"),
+            "has_dates": scan.has("date"),
+            "has_numbers": scan.has("number"),
             "document_length": len(content)
         }
 
         # Document type specific extractions
         if doc_type == DocumentType.FINANCIAL_STATEMENT:
-            basic_info["has_revenue"] = "revenue" in content.lower()
-            basic_info["has_expenses"] = "expense" in content.lower() or "cost" in content.lower()
-            basic_info["has_balance_sheet"] = "balance sheet" in content.lower()
+            basic_info["has_revenue"] = has("revenue")
+            basic_info["has_expenses"] = has("expense") or has("cost")
+            basic_info["has_balance_sheet"] = has("balance sheet")
 
         elif doc_type == DocumentType.LEGAL_AGREEMENT:
-            basic_info["has_terms"] = "terms" in content.lower() and "conditions" in content.lower()
-            basic_info["has_signatures"] = "signature" in content.lower() or "signed" in content.lower()
-            basic_info["has_liability"] = "liability" in content.lower() or "indemnif" in content.lower()
+            basic_info["has_terms"] = has("terms") and has("conditions")
+            basic_info["has_signatures"] = has("signature") or has("signed")
+            basic_info["has_liability"] = has("liability") or has("indemnif")
 
         return basic_info
 
-    def _perform_financial_analysis(self, content: str, doc_type: DocumentType) -> Dict[str, Any]:
+    def _perform_financial_analysis(self, content: str, doc_type: DocumentType,
+                                    scan: Optional[ScanResult] = None) -> Dict[str, Any]:
         """Perform AI-powered financial analysis"""
+        scan = self._scan(content, scan)
+        has = lambda term: scan.has("term", term)
+
         results = {
             "findings": [],
             "data": {},
@@ -369,8 +439,7 @@ class DocumentAnalysisEngine:
         }
 
         # Extract financial numbers
-        number_pattern = r'\$?([\d,]+\.?\d*)'
-        numbers = re.findall(number_pattern, content)
+        numbers = scan.values("number")
         financial_values = [float(n.replace(',', '')) for n in numbers if n.replace(',', '').replace('.', '').isdigit()]
 
         if financial_values:
@@ -386,27 +455,31 @@ class DocumentAnalysisEngine:
                     results["anomalies"].append(f"Detected {len(outliers)} potential outlier values")
 
         # Revenue analysis
-        if "revenue" in content.lower():
+        if has("revenue"):
             results["findings"].append("Revenue information present")
-            if "decline" in content.lower() or "decrease" in content.lower():
+            if has("decline") or has("decrease"):
                 results["findings"].append("Potential revenue decline mentioned")
 
         # Profitability analysis
-        if "profit" in content.lower() or "ebitda" in content.lower():
+        if has("profit") or has("ebitda"):
             results["findings"].append("Profitability metrics present")
-            if "loss" in content.lower() and "net" in content.lower():
+            if has("loss") and has("net"):
                 results["findings"].append("Net loss indicators present")
 
         # Cash flow analysis
-        if "cash flow" in content.lower():
+        if has("cash flow"):
             results["findings"].append("Cash flow information available")
-            if "negative" in content.lower() and "cash" in content.lower():
+            if has("negative") and has("cash"):
                 results["anomalies"].append("Potential negative cash flow mentioned")
 
         return results
 
-    def _perform_legal_analysis(self, content: str, doc_type: DocumentType) -> Dict[str, Any]:
+    def _perform_legal_analysis(self, content: str, doc_type: DocumentType,
+                                scan: Optional[ScanResult] = None) -> Dict[str, Any]:
         """Perform AI-powered legal analysis"""
+        scan = self._scan(content, scan)
+        has = lambda term: scan.has("term", term)
+
         results = {
             "findings": [],
             "risks": [],
@@ -415,40 +488,41 @@ class DocumentAnalysisEngine:
 
         # Contract term analysis
         if doc_type in [DocumentType.LEGAL_AGREEMENT, DocumentType.CUSTOMER_CONTRACT]:
-            if "termination" in content.lower():
+            if has("termination"):
                 results["findings"].append("Termination clauses present")
 
-            if "liability" in content.lower():
+            if has("liability"):
                 results["findings"].append("Liability provisions identified")
-                if "unlimited" in content.lower() and "liability" in content.lower():
+                if has("unlimited"):
                     results["risks"].append("Unlimited liability exposure detected")
 
-            if "indemnification" in content.lower():
+            if has("indemnification"):
                 results["findings"].append("Indemnification clauses present")
 
             # Risk indicators
-            risk_terms = ["penalty", "default", "breach", "damages", "lawsuit", "litigation"]
-            for term in risk_terms:
-                if term in content.lower():
+            for term in LEGAL_RISK_TERMS:
+                if has(term):
                     results["risks"].append(f"Legal risk indicator: {term}")
 
         # Regulatory compliance
-        regulatory_terms = ["regulation", "compliance", "sec", "gdpr", "sox", "hipaa"]
-        for term in regulatory_terms:
-            if term.upper() in content.upper():
+        for term in REGULATORY_TERMS:
+            if has(term):
                 results["compliance"].append(f"Regulatory reference: {term.upper()}")
 
         # Intellectual property
         if doc_type == DocumentType.INTELLECTUAL_PROPERTY:
-            ip_terms = ["patent", "trademark", "copyright", "trade secret"]
-            for term in ip_terms:
-                if term in content.lower():
+            for term in IP_TERMS:
+                if has(term):
                     results["findings"].append(f"IP asset identified: {term}")
 
         return results
 
-    def _perform_risk_assessment(self, content: str, doc_type: DocumentType) -> Dict[str, Any]:
+    def _perform_risk_assessment(self, content: str, doc_type: DocumentType,
+                                 scan: Optional[ScanResult] = None) -> Dict[str, Any]:
         """Perform comprehensive risk assessment"""
+        scan = self._scan(content, scan)
+        has = lambda term: scan.has("term", term)
+
         results = {
             "risks": [],
             "anomalies": [],
@@ -456,45 +530,50 @@ class DocumentAnalysisEngine:
         }
 
         # Generic risk indicators
-        high_risk_terms = [
-            "bankruptcy", "insolvent", "default", "breach", "violation",
-            "penalty", "fine", "investigation", "audit", "fraud"
-        ]
-
-        for term in high_risk_terms:
-            if term in content.lower():
+        for term in HIGH_RISK_TERMS:
+            if has(term):
                 results["risks"].append(f"High risk indicator: {term}")
 
         # Financial distress indicators
-        distress_terms = ["going concern", "liquidity crisis", "cash shortage", "covenant violation"]
-        for term in distress_terms:
-            if term in content.lower():
-                results["risks"].append(f"Financial distress indicator: {term}")
+        for phrase in RISK_PATTERNS["financial_distress"]:
+            if scan.has("financial_distress", phrase):
+                results["risks"].append(f"Financial distress indicator: {phrase}")
                 results["recommendations"].append("Conduct additional financial due diligence")
 
+        # Known legal and operational risk patterns
+        for phrase in RISK_PATTERNS["legal_issues"]:
+            if scan.has("legal_issues", phrase):
+                results["risks"].append(f"Legal risk pattern: {phrase}")
+        for phrase in RISK_PATTERNS["operational_risks"]:
+            if scan.has("operational_risks", phrase):
+                results["risks"].append(f"Operational risk pattern: {phrase}")
+
         # Environmental risks
         if doc_type == DocumentType.ENVIRONMENTAL_REPORT:
-            env_risks = ["contamination", "hazardous", "pollution", "remediation"]
-            for term in env_risks:
-                if term in content.lower():
+            for term in ENVIRONMENTAL_TERMS:
+                if has(term):
                     results["risks"].append(f"Environmental risk: {term}")
 
         # Document inconsistencies
-        dates = re.findall(r'\d{1,2}[/\-]\d{1,2}[/\-]\d{2,4}', content)
+        dates = scan.values("date")
         if len(set(dates)) > 10:  # Too many different dates
             results["anomalies"].append("High number of different dates - potential inconsistency")
 
         # Missing information
         if doc_type == DocumentType.FINANCIAL_STATEMENT:
             required_elements = ["revenue", "expense", "asset", "liability"]
-            missing = [elem for elem in required_elements if elem not in content.lower()]
+            missing = [elem for elem in required_elements if not has(elem)]
             if missing:
                 results["anomalies"].append(f"Missing financial elements: {', '.join(missing)}")
 
         return results
 
-    def _perform_compliance_check(self, content: str, doc_type: DocumentType) -> Dict[str, Any]:
+    def _perform_compliance_check(self, content: str, doc_type: DocumentType,
+                                  scan: Optional[ScanResult] = None) -> Dict[str, Any]:
         """Perform regulatory compliance analysis"""
+        scan = self._scan(content, scan)
+        has = lambda term: scan.has("term", term)
+
         results = {
             "issues": [],
             "recommendations": []
@@ -502,27 +581,27 @@ class DocumentAnalysisEngine:
 
         # SOX compliance for financial documents
         if doc_type in [DocumentType.FINANCIAL_STATEMENT, DocumentType.AUDIT_REPORT]:
-            if "management certification" not in content.lower():
+            if not has("management certification"):
                 results["issues"].append("SOX: Missing management certification")
                 results["recommendations"].append("Obtain management certification for SOX compliance")
 
-            if "internal control" not in content.lower():
+            if not has("internal control"):
                 results["issues"].append("SOX: No internal control assessment mentioned")
 
         # Tax compliance
         if doc_type == DocumentType.TAX_RETURN:
-            if "signature" not in content.lower():
+            if not has("signature"):
                 results["issues"].append("Tax: Missing required signatures")
 
-            if "preparer" not in content.lower():
+            if not has("preparer"):
                 results["issues"].append("Tax: Missing preparer information")
 
         # GDPR compliance for employee records
         if doc_type == DocumentType.EMPLOYEE_RECORDS:
-            if "consent" not in content.lower():
+            if not has("consent"):
                 results["issues"].append("GDPR: Missing data processing consent")
 
-            if "retention" not in content.lower():
+            if not has("retention"):
                 results["issues"].append("GDPR: No data retention policy mentioned")
 
         return results
@@ -580,24 +659,7 @@ class DocumentAnalysisEngine:
     def _initialize_risk_patterns(self) -> None:
         """Initialize known risk patterns for detection"""
         self.risk_patterns = {
-            "financial_distress": [
-                r"going\s+concern",
-                r"liquidity\s+crisis",
-                r"covenant\s+violation",
-                r"cash\s+shortage"
-            ],
-            "legal_issues": [
-                r"pending\s+litigation",
-                r"regulatory\s+investigation",
-                r"breach\s+of\s+contract",
-                r"intellectual\s+property\s+dispute"
-            ],
-            "operational_risks": [
-                r"key\s+person\s+dependency",
-                r"system\s+failure",
-                r"supply\s+chain\s+disruption",
-                r"customer\s+concentration"
-            ]
+            category: list(patterns.values()) for category, patterns in RISK_PATTERNS.items()
         }
 
 class DataRoomManager:
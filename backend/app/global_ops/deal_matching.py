@@ -11,6 +11,8 @@ import json
 import math
 from abc import ABC, abstractmethod
 
+import numpy as np
+
 
 class DealType(str, Enum):
     ACQUISITION = "acquisition"
@@ -138,10 +140,37 @@ class ScoringAlgorithm(ABC):
     def calculate_score(self, buyer: CompanyProfile, seller: CompanyProfile, criteria: MatchingCriteria) -> float:
         pass
 
+    def score_batch(
+        self,
+        buyer: CompanyProfile,
+        index: "ProfileFeatureIndex",
+        rows: np.ndarray,
+        criteria: MatchingCriteria
+    ) -> np.ndarray:
+        """
+        Score the buyer against many indexed profiles at once.
+
+        The default calls calculate_score per row; built-in scorers override
+        it with NumPy kernels over the index columns that return the same
+        values.
+        """
+        return np.fromiter(
+            (self.calculate_score(buyer, index.profiles[row], criteria) for row in rows.tolist()),
+            dtype=np.float64, count=len(rows)
+        )
+
 
 class IndustryAlignmentScorer(ScoringAlgorithm):
     """Scores industry alignment between companies"""
 
+    # Simplified industry relationship mapping
+    RELATED_INDUSTRIES = {
+        "technology": ["telecommunications", "media", "financial_services"],
+        "healthcare": ["pharmaceuticals", "medical_devices", "biotechnology"],
+        "financial_services": ["technology", "insurance", "real_estate"],
+        "manufacturing": ["automotive", "aerospace", "industrial"]
+    }
+
     def calculate_score(self, buyer: CompanyProfile, seller: CompanyProfile, criteria: MatchingCriteria) -> float:
         if buyer.industry_sector == seller.industry_sector:
             return 1.0
@@ -150,18 +179,20 @@ class IndustryAlignmentScorer(ScoringAlgorithm):
         else:
             return 0.3
 
-    def _are_related_industries(self, industry1: str, industry2: str) -> bool:
-        # Simplified industry relationship mapping
-        related_industries = {
-            "technology": ["telecommunications", "media", "financial_services"],
-            "healthcare": ["pharmaceuticals", "medical_devices", "biotechnology"],
-            "financial_services": ["technology", "insurance", "real_estate"],
-            "manufacturing": ["automotive", "aerospace", "industrial"]
-        }
+    def score_batch(self, buyer, index, rows, criteria):
+        # Score per industry code, then gather
+        table = np.full(len(index.vocab["industry"]), 0.3)
+        for industry, code in index.vocab["industry"].items():
+            if industry == buyer.industry_sector:
+                table[code] = 1.0
+            elif self._are_related_industries(buyer.industry_sector, industry):
+                table[code] = 0.7
+        return table[index.column("industry", rows)]
 
+    def _are_related_industries(self, industry1: str, industry2: str) -> bool:
         return (
-            industry2 in related_industries.get(industry1, []) or
-            industry1 in related_industries.get(industry2, [])
+            industry2 in self.RELATED_INDUSTRIES.get(industry1, []) or
+            industry1 in self.RELATED_INDUSTRIES.get(industry2, [])
         )
 
 
@@ -186,6 +217,20 @@ class GeographicSynergyScorer(ScoringAlgorithm):
         score = (overlap_ratio * 0.4) + (min(expansion_potential, 1.0) * 0.6)
         return min(score, 1.0)
 
+    def score_batch(self, buyer, index, rows, criteria):
+        buyer_regions = set(buyer.geographic_regions)
+        overlap = index.term_counts("region", buyer_regions, rows)
+        seller_count = index.column("region_count", rows)
+
+        if not buyer_regions:
+            # No overlap ratio or expansion without buyer regions
+            return np.where(seller_count == 0, 0.5, 0.0)
+
+        overlap_ratio = overlap / len(buyer_regions)
+        expansion_potential = (seller_count - overlap) / len(buyer_regions)
+        score = (overlap_ratio * 0.4) + (np.minimum(expansion_potential, 1.0) * 0.6)
+        return np.minimum(score, 1.0)
+
 
 class FinancialCompatibilityScorer(ScoringAlgorithm):
     """Scores financial compatibility"""
@@ -220,10 +265,49 @@ class FinancialCompatibilityScorer(ScoringAlgorithm):
         final_score = (size_score * 0.4) + (health_score * 0.4) + (growth_compatibility * 0.2)
         return min(final_score, 1.0)
 
+    def score_batch(self, buyer, index, rows, criteria):
+        # Missing financials are stored as 0.0, which is falsy like None
+        revenue = index.column("revenue", rows)
+        valuation = index.column("valuation", rows)
+        has_data = (revenue != 0) & (valuation != 0) & bool(buyer.revenue and buyer.valuation)
+
+        if buyer.revenue and buyer.revenue > 0:
+            size_ratio = revenue / buyer.revenue
+        else:
+            size_ratio = np.zeros(len(rows))
+        size_score = np.select(
+            [
+                (size_ratio >= 0.1) & (size_ratio <= 0.5),
+                (size_ratio >= 0.05) & (size_ratio <= 0.75),
+                size_ratio <= 1.0
+            ],
+            [1.0, 0.8, 0.6],
+            default=0.3
+        )
+
+        health_score = np.minimum(buyer.financial_health_score, index.column("financial_health", rows))
+
+        growth_compatibility = np.ones(len(rows))
+        if buyer.growth_rate:
+            growth = index.column("growth_rate", rows)
+            penalised = np.maximum(0.5, 1.0 - (np.abs(buyer.growth_rate - growth) / 50))
+            growth_compatibility = np.where(growth != 0, penalised, 1.0)
+
+        final_score = np.minimum((size_score * 0.4) + (health_score * 0.4) + (growth_compatibility * 0.2), 1.0)
+        return np.where(has_data, final_score, 0.5)
+
 
 class StrategicFitScorer(ScoringAlgorithm):
     """Scores strategic fit and synergy potential"""
 
+    # Market position complementarity
+    POSITION_SCORES = {
+        ("market_leader", "niche_player"): 0.9,
+        ("market_leader", "emerging_player"): 0.8,
+        ("growth_company", "established_player"): 0.85,
+        ("niche_player", "market_leader"): 0.7
+    }
+
     def calculate_score(self, buyer: CompanyProfile, seller: CompanyProfile, criteria: MatchingCriteria) -> float:
         # Check strategic priorities alignment
         buyer_priorities = set(buyer.strategic_priorities)
@@ -232,14 +316,7 @@ class StrategicFitScorer(ScoringAlgorithm):
         alignment_score = len(buyer_priorities.intersection(seller_capabilities)) / len(buyer_priorities) if buyer_priorities else 0.5
 
         # Market position complementarity
-        position_scores = {
-            ("market_leader", "niche_player"): 0.9,
-            ("market_leader", "emerging_player"): 0.8,
-            ("growth_company", "established_player"): 0.85,
-            ("niche_player", "market_leader"): 0.7
-        }
-
-        position_score = position_scores.get((buyer.market_position, seller.market_position), 0.6)
+        position_score = self.POSITION_SCORES.get((buyer.market_position, seller.market_position), 0.6)
 
         # Technology synergy
         tech_overlap = len(set(buyer.technology_stack).intersection(set(seller.technology_stack)))
@@ -250,6 +327,189 @@ class StrategicFitScorer(ScoringAlgorithm):
         final_score = (alignment_score * 0.4) + (position_score * 0.3) + (tech_score * 0.3)
         return min(final_score, 1.0)
 
+    def score_batch(self, buyer, index, rows, criteria):
+        buyer_priorities = set(buyer.strategic_priorities)
+        positions = index.column("position", rows)
+
+        if buyer_priorities:
+            # A priority counts once whether it names a technology or the market position
+            aligned = np.zeros(len(rows))
+            for priority in buyer_priorities:
+                has_priority = index.rows_with_any("tech", [priority])[rows]
+                code = index.vocab["position"].get(priority)
+                if code is not None:
+                    has_priority |= positions == code
+                aligned += has_priority
+            alignment_score = aligned / len(buyer_priorities)
+        else:
+            alignment_score = np.full(len(rows), 0.5)
+
+        table = np.full(len(index.vocab["position"]), 0.6)
+        for (buyer_position, seller_position), score in self.POSITION_SCORES.items():
+            code = index.vocab["position"].get(seller_position)
+            if buyer_position == buyer.market_position and code is not None:
+                table[code] = score
+        position_score = table[positions]
+
+        buyer_tech = set(buyer.technology_stack)
+        tech_overlap = index.term_counts("tech", buyer_tech, rows)
+        tech_expansion = index.column("tech_count", rows) - tech_overlap
+        tech_score = np.minimum(1.0, (tech_overlap * 0.3 + tech_expansion * 0.7) / 5)
+
+        final_score = (alignment_score * 0.4) + (position_score * 0.3) + (tech_score * 0.3)
+        return np.minimum(final_score, 1.0)
+
+
+class ProfileFeatureIndex:
+    """
+    Columnar copy of the company profiles for batch scoring.
+
+    Scalar attributes live in NumPy columns (one row per profile, missing
+    numbers stored as 0.0); industries and market positions are integer
+    codes; regions, technologies and deal types are posting lists of rows.
+    Re-adding a profile retires its old row and appends a new one, and the
+    index is rebuilt once retired rows outnumber live ones.
+    """
+
+    COLUMNS = {
+        "alive": np.bool_,
+        "industry": np.int32,
+        "position": np.int32,
+        "revenue": np.float64,
+        "valuation": np.float64,
+        "growth_rate": np.float64,
+        "financial_health": np.float64,
+        "region_count": np.int32,
+        "tech_count": np.int32,
+    }
+    POSTING_KINDS = ("region", "tech", "deal_type")
+
+    def __init__(self, initial_capacity: int = 1024):
+        self.capacity = initial_capacity
+        self.columns = {name: np.zeros(initial_capacity, dtype=dtype) for name, dtype in self.COLUMNS.items()}
+        self.profiles: List[Optional[CompanyProfile]] = []
+        self.row_of: Dict[str, int] = {}
+        self.vocab: Dict[str, Dict[str, int]] = {"industry": {}, "position": {}}
+        self.postings: Dict[str, Dict[str, List[int]]] = {kind: {} for kind in self.POSTING_KINDS}
+        self._posting_arrays: Dict[Tuple[str, str], np.ndarray] = {}
+        self.retired = 0
+
+    def __len__(self) -> int:
+        return len(self.row_of)
+
+    @property
+    def size(self) -> int:
+        """Rows allocated, including retired ones"""
+        return len(self.profiles)
+
+    def add(self, profile: CompanyProfile) -> int:
+        """Index a profile (replacing any earlier version) and return its row"""
+        previous = self.row_of.get(profile.company_id)
+        if previous is not None:
+            self._retire(previous)
+
+        row = self.size
+        if row == self.capacity:
+            self._grow()
+        self.profiles.append(profile)
+        self.row_of[profile.company_id] = row
+
+        regions = set(profile.geographic_regions)
+        technologies = set(profile.technology_stack)
+        values = {
+            "alive": True,
+            "industry": self._code("industry", profile.industry_sector),
+            "position": self._code("position", profile.market_position),
+            "revenue": profile.revenue or 0.0,
+            "valuation": profile.valuation or 0.0,
+            "growth_rate": profile.growth_rate or 0.0,
+            "financial_health": profile.financial_health_score,
+            "region_count": len(regions),
+            "tech_count": len(technologies),
+        }
+        for name, value in values.items():
+            self.columns[name][row] = value
+
+        deal_types = {getattr(deal_type, "value", deal_type) for deal_type in profile.available_for}
+        for kind, terms in (("region", regions), ("tech", technologies), ("deal_type", deal_types)):
+            for term in terms:
+                self.postings[kind].setdefault(term, []).append(row)
+                self._posting_arrays.pop((kind, term), None)
+
+        if self.retired > max(1024, len(self)):
+            self.rebuild()
+        return self.row_of[profile.company_id]
+
+    def _retire(self, row: int) -> None:
+        self.columns["alive"][row] = False
+        self.profiles[row] = None
+        self.retired += 1
+
+    def _grow(self) -> None:
+        self.capacity *= 2
+        for name, column in self.columns.items():
+            grown = np.zeros(self.capacity, dtype=column.dtype)
+            grown[:len(column)] = column
+            self.columns[name] = grown
+
+    def _code(self, kind: str, value: str) -> int:
+        codes = self.vocab[kind]
+        if value not in codes:
+            codes[value] = len(codes)
+        return codes[value]
+
+    def rebuild(self) -> None:
+        """Re-index the live profiles into fresh, densely packed rows"""
+        live = [profile for profile in self.profiles if profile is not None]
+        self.__init__(initial_capacity=max(1024, len(live)))
+        for profile in live:
+            self.add(profile)
+
+    # Lookups used by the batch scorers
+
+    def column(self, name: str, rows: np.ndarray) -> np.ndarray:
+        return self.columns[name][rows]
+
+    def posting(self, kind: str, term: str) -> np.ndarray:
+        key = (kind, term)
+        rows = self._posting_arrays.get(key)
+        if rows is None:
+            rows = self._posting_arrays[key] = np.asarray(self.postings[kind].get(term, ()), dtype=np.int64)
+        return rows
+
+    def rows_with_any(self, kind: str, terms) -> np.ndarray:
+        """Boolean mask over all rows: has at least one of ``terms``"""
+        mask = np.zeros(self.size, dtype=bool)
+        for term in terms:
+            mask[self.posting(kind, term)] = True
+        return mask
+
+    def term_counts(self, kind: str, terms, rows: np.ndarray) -> np.ndarray:
+        """How many of the distinct ``terms`` each of ``rows`` has"""
+        postings = [self.posting(kind, term) for term in set(terms)]
+        if not postings:
+            return np.zeros(len(rows), dtype=np.int64)
+        return np.bincount(np.concatenate(postings), minlength=self.size)[rows]
+
+    def candidates(
+        self,
+        deal_type: DealType,
+        exclude_id: Optional[str] = None,
+        industries: Optional[List[str]] = None,
+        regions: Optional[List[str]] = None
+    ) -> np.ndarray:
+        """Live rows available for ``deal_type``, optionally narrowed by industry and region"""
+        mask = self.rows_with_any("deal_type", [getattr(deal_type, "value", deal_type)])
+        mask &= self.columns["alive"][:self.size]
+        if industries:
+            codes = [self.vocab["industry"][i] for i in industries if i in self.vocab["industry"]]
+            mask &= np.isin(self.columns["industry"][:self.size], codes)
+        if regions:
+            mask &= self.rows_with_any("region", regions)
+        if exclude_id in self.row_of:
+            mask[self.row_of[exclude_id]] = False
+        return np.flatnonzero(mask)
+
 
 class DealMatchingEngine:
     """AI-powered deal matching and strategic fit analysis engine"""
@@ -262,12 +522,14 @@ class DealMatchingEngine:
             MatchingCriteria.FINANCIAL_COMPATIBILITY: FinancialCompatibilityScorer(),
             MatchingCriteria.STRATEGIC_FIT: StrategicFitScorer()
         }
+        self.feature_index = ProfileFeatureIndex()
         self.deal_matches: List[DealMatch] = []
         self.matching_history: List[Dict[str, Any]] = []
 
     def add_company_profile(self, profile: CompanyProfile) -> bool:
         """Add or update a company profile"""
         self.company_profiles[profile.company_id] = profile
+        self.feature_index.add(profile)
         return True
 
     def find_matches(
@@ -276,9 +538,18 @@ class DealMatchingEngine:
         deal_type: DealType,
         criteria_weights: Optional[Dict[MatchingCriteria, float]] = None,
         min_score_threshold: float = 0.6,
-        max_results: int = 10
+        max_results: int = 10,
+        industries: Optional[List[str]] = None,
+        regions: Optional[List[str]] = None
     ) -> List[DealMatch]:
-        """Find potential deal matches for a buyer"""
+        """
+        Find potential deal matches for a buyer
+
+        Screening scores every candidate at once over the feature index;
+        only the top ``max_results`` above the threshold are built into full
+        DealMatch objects. ``industries`` and ``regions`` narrow the
+        candidates before scoring.
+        """
 
         if buyer_id not in self.company_profiles:
             raise ValueError(f"Buyer profile not found: {buyer_id}")
@@ -295,57 +566,98 @@ class DealMatchingEngine:
                 MatchingCriteria.TECHNOLOGY_SYNERGY: 0.1
             }
 
-        matches = []
-
-        # Evaluate all potential targets
-        for seller_id, seller_profile in self.company_profiles.items():
-            if seller_id == buyer_id:
-                continue
-
-            # Check if seller is available for this deal type
-            if deal_type not in seller_profile.available_for:
-                continue
-
-            # Calculate match score
-            match_score = self._calculate_match_score(
-                buyer_profile, seller_profile, criteria_weights
-            )
+        # Stage one: screen all targets available for this deal type
+        rows = self.feature_index.candidates(
+            deal_type, exclude_id=buyer_id, industries=industries, regions=regions
+        )
+        scores = self._screen_candidates(buyer_profile, rows, criteria_weights)
+        rows = self._top_candidates(rows, scores, min_score_threshold, max_results)
 
-            # Only include matches above threshold
-            if match_score.overall_score >= min_score_threshold:
-                # Estimate deal value
-                estimated_value = self._estimate_deal_value(buyer_profile, seller_profile, deal_type)
-
-                # Generate strategic rationale
-                rationale = self._generate_strategic_rationale(buyer_profile, seller_profile, match_score)
-
-                # Create match object
-                deal_match = DealMatch(
-                    match_id=f"match_{buyer_id}_{seller_id}_{datetime.now().timestamp()}",
-                    buyer_profile=buyer_profile,
-                    seller_profile=seller_profile,
-                    deal_type=deal_type,
-                    match_score=match_score,
-                    estimated_deal_value=estimated_value,
-                    strategic_rationale=rationale,
-                    synergy_potential=match_score.overall_score * 0.8,  # Synergy is typically less than match score
-                    risk_assessment=self._assess_deal_risk(buyer_profile, seller_profile),
-                    timeline_estimate=self._estimate_timeline(buyer_profile, seller_profile, deal_type),
-                    match_date=datetime.now(),
-                    status="identified"
-                )
-
-                matches.append(deal_match)
-
-        # Sort by overall score and return top matches
-        matches.sort(key=lambda x: x.match_score.overall_score, reverse=True)
-        final_matches = matches[:max_results]
+        # Stage two: full scoring, rationale, risk and timeline for the shortlist
+        final_matches = [
+            self._build_match(buyer_profile, self.feature_index.profiles[row], deal_type, criteria_weights)
+            for row in rows.tolist()
+        ]
 
         # Store matches
         self.deal_matches.extend(final_matches)
 
         return final_matches
 
+    def _screen_candidates(
+        self,
+        buyer: CompanyProfile,
+        rows: np.ndarray,
+        criteria_weights: Dict[MatchingCriteria, float]
+    ) -> np.ndarray:
+        """Overall scores for ``rows``, matching _calculate_match_score"""
+        weighted_sum = np.zeros(len(rows))
+        total_weight = 0
+
+        for criteria, weight in criteria_weights.items():
+            if criteria in self.scoring_algorithms:
+                scores = self.scoring_algorithms[criteria].score_batch(buyer, self.feature_index, rows, criteria)
+                weighted_sum += scores * weight
+                total_weight += weight
+
+        return weighted_sum / total_weight if total_weight > 0 else weighted_sum
+
+    @staticmethod
+    def _top_candidates(
+        rows: np.ndarray,
+        scores: np.ndarray,
+        min_score_threshold: float,
+        max_results: int
+    ) -> np.ndarray:
+        """Rows of the best ``max_results`` scores at or above the threshold, best first"""
+        keep = scores >= min_score_threshold
+        rows, scores = rows[keep], scores[keep]
+        if max_results <= 0 or not len(rows):
+            return rows[:0]
+
+        if len(rows) > max_results:
+            # Everything tied with the k-th best stays in, so ties resolve by row
+            # (profile insertion order) just as the stable sort used to
+            kth = np.partition(scores, len(scores) - max_results)[len(scores) - max_results]
+            keep = scores >= kth
+            rows, scores = rows[keep], scores[keep]
+
+        order = np.lexsort((rows, -scores))[:max_results]
+        return rows[order]
+
+    def _build_match(
+        self,
+        buyer_profile: CompanyProfile,
+        seller_profile: CompanyProfile,
+        deal_type: DealType,
+        criteria_weights: Dict[MatchingCriteria, float]
+    ) -> DealMatch:
+        """Create the full DealMatch for a shortlisted target"""
+        match_score = self._calculate_match_score(
+            buyer_profile, seller_profile, criteria_weights
+        )
+
+        # Estimate deal value
+        estimated_value = self._estimate_deal_value(buyer_profile, seller_profile, deal_type)
+
+        # Generate strategic rationale
+        rationale = self._generate_strategic_rationale(buyer_profile, seller_profile, match_score)
+
+        return DealMatch(
+            match_id=f"match_{buyer_profile.company_id}_{seller_profile.company_id}_{datetime.now().timestamp()}",
+            buyer_profile=buyer_profile,
+            seller_profile=seller_profile,
+            deal_type=deal_type,
+            match_score=match_score,
+            estimated_deal_value=estimated_value,
+            strategic_rationale=rationale,
+            synergy_potential=match_score.overall_score * 0.8,  # Synergy is typically less than match score
+            risk_assessment=self._assess_deal_risk(buyer_profile, seller_profile),
+            timeline_estimate=self._estimate_timeline(buyer_profile, seller_profile, deal_type),
+            match_date=datetime.now(),
+            status="identified"
+        )
+
     def analyze_strategic_fit(
         self,
         buyer_id: str,
@@ -489,26 +801,18 @@ class DealMatchingEngine:
 
         # Find matches for each preferred deal type
         for deal_type in preferred_deal_types:
+            # Industry and region preferences narrow the candidates up front
             matches = self.find_matches(
                 buyer_id=buyer_id,
                 deal_type=deal_type,
-                min_score_threshold=min_synergy_score
+                min_score_threshold=min_synergy_score,
+                industries=preferred_industries,
+                regions=preferred_regions
             )
 
             # Filter by preferences
             filtered_matches = []
             for match in matches:
-                # Industry filter
-                if preferred_industries and match.seller_profile.industry_sector not in preferred_industries:
-                    continue
-
-                # Region filter
-                if preferred_regions:
-                    seller_regions = set(match.seller_profile.geographic_regions)
-                    preferred_regions_set = set(preferred_regions)
-                    if not seller_regions.intersection(preferred_regions_set):
-                        continue
-
                 # Deal size filter
                 if max_deal_size and match.estimated_deal_value and match.estimated_deal_value > max_deal_size:
                     continue
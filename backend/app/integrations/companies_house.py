@@ -11,6 +11,8 @@ import logging
 from requests_ratelimiter import LimiterSession
 import asyncio
 
+from .rate_limit import AsyncTokenBucket
+
 logger = logging.getLogger(__name__)
 
 
@@ -23,17 +25,55 @@ class CompaniesHouseAPI:
     BASE_URL = "https://api.company-information.service.gov.uk"
     RATE_LIMIT = 600  # 600 requests per 5 minutes
 
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        session: Optional[httpx.AsyncClient] = None,
+        rate_limiter: Optional[AsyncTokenBucket] = None,
+        base_url: Optional[str] = None
+    ):
+        """
+        Args:
+            api_key: Companies House API key (defaults to COMPANIES_HOUSE_API_KEY)
+            session: Shared pooled client; requests then carry their own auth
+            rate_limiter: Token bucket shared by all callers of this registry
+            base_url: Override the API host (e.g. a local stub server)
+        """
         self.api_key = api_key or os.getenv("COMPANIES_HOUSE_API_KEY")
         if not self.api_key:
             raise ValueError("COMPANIES_HOUSE_API_KEY environment variable not set")
 
-        # Rate-limited session
-        self.session = httpx.AsyncClient(
-            auth=(self.api_key, ""),
-            timeout=30.0,
-            headers={"User-Agent": "100DaysAndBeyond/1.0"}
-        )
+        if base_url:
+            self.BASE_URL = base_url.rstrip("/")
+
+        self.rate_limiter = rate_limiter
+        self._owns_session = session is None
+
+        if session is None:
+            # Rate-limited session
+            self.session = httpx.AsyncClient(
+                auth=(self.api_key, ""),
+                timeout=30.0,
+                headers={"User-Agent": "100DaysAndBeyond/1.0"}
+            )
+            self._request_kwargs = {}
+        else:
+            self.session = session
+            self._request_kwargs = {
+                "auth": (self.api_key, ""),
+                "headers": {"User-Agent": "100DaysAndBeyond/1.0"}
+            }
+
+    @classmethod
+    def default_rate_limiter(cls) -> AsyncTokenBucket:
+        """Token bucket matching the documented quota (600 requests per 5 minutes)"""
+        return AsyncTokenBucket.per_window(cls.RATE_LIMIT, 300, burst=10)
+
+    async def _get(self, url: str, params: Optional[Dict[str, Any]] = None) -> httpx.Response:
+        """Issue a GET through the rate limiter"""
+        if self.rate_limiter:
+            await self.rate_limiter.acquire()
+        return await self.session.get(url, params=params, **self._request_kwargs)
 
     async def search_companies(
         self,
@@ -59,7 +99,7 @@ class CompaniesHouseAPI:
         }
 
         try:
-            response = await self.session.get(url, params=params)
+            response = await self._get(url, params=params)
             response.raise_for_status()
             data = response.json()
 
@@ -89,7 +129,7 @@ class CompaniesHouseAPI:
         url = f"{self.BASE_URL}/company/{company_number}"
 
         try:
-            response = await self.session.get(url)
+            response = await self._get(url)
             response.raise_for_status()
             return response.json()
 
@@ -118,7 +158,7 @@ class CompaniesHouseAPI:
         params = {"register_view": str(register_view).lower()}
 
         try:
-            response = await self.session.get(url, params=params)
+            response = await self._get(url, params=params)
             response.raise_for_status()
             return response.json()
 
@@ -150,7 +190,7 @@ class CompaniesHouseAPI:
             params["category"] = category
 
         try:
-            response = await self.session.get(url, params=params)
+            response = await self._get(url, params=params)
             response.raise_for_status()
             return response.json()
 
@@ -206,7 +246,7 @@ class CompaniesHouseAPI:
         url = f"{self.BASE_URL}/company/{company_number}/persons-with-significant-control"
 
         try:
-            response = await self.session.get(url)
+            response = await self._get(url)
             response.raise_for_status()
             return response.json()
 
@@ -227,7 +267,7 @@ class CompaniesHouseAPI:
         url = f"{self.BASE_URL}/company/{company_number}/charges"
 
         try:
-            response = await self.session.get(url)
+            response = await self._get(url)
             response.raise_for_status()
             return response.json()
 
@@ -299,7 +339,7 @@ class CompaniesHouseAPI:
         }
 
         try:
-            response = await self.session.get(url, params=params)
+            response = await self._get(url, params=params)
             response.raise_for_status()
             return response.json()
 
@@ -327,6 +367,7 @@ class CompaniesHouseAPI:
         distressed = []
 
         current_year = datetime.now().year
+        candidates = []
 
         for company in companies.get("items", []):
             company_number = company.get("company_number")
@@ -340,9 +381,15 @@ class CompaniesHouseAPI:
                 if (current_year - creation_year) < min_age_years:
                     continue
 
-            # Get filing history
-            filings = await self.get_filing_history(company_number, category="accounts")
+            candidates.append(company)
+
+        # Get filing histories concurrently (the rate limiter paces the requests)
+        histories = await asyncio.gather(*(
+            self.get_filing_history(company["company_number"], category="accounts")
+            for company in candidates
+        ))
 
+        for company, filings in zip(candidates, histories):
             # Indicators of distress:
             # - Overdue accounts
             # - Irregular filing patterns
@@ -350,7 +397,7 @@ class CompaniesHouseAPI:
 
             if filings.get("overdue_count", 0) > 0:
                 distressed.append({
-                    "company_number": company_number,
+                    "company_number": company["company_number"],
                     "company_name": company.get("title"),
                     "status": company.get("company_status"),
                     "overdue_filings": filings.get("overdue_count"),
@@ -360,8 +407,9 @@ class CompaniesHouseAPI:
         return distressed
 
     async def close(self):
-        """Close the HTTP session"""
-        await self.session.aclose()
+        """Close the HTTP session (shared sessions are closed by their owner)"""
+        if self._owns_session:
+            await self.session.aclose()
 
     async def __aenter__(self):
         return self
@@ -0,0 +1,63 @@
+"""
+Async Rate Limiting for Registry Integrations
+Token bucket shared by concurrent requests against one upstream API
+"""
+import asyncio
+import time
+from typing import Optional
+
+
+class AsyncTokenBucket:
+    """
+    Token bucket for asyncio callers
+
+    Tokens refill continuously at ``rate`` per second up to ``capacity``.
+    Concurrent callers queue on a lock so the bucket is never overdrawn,
+    however many coroutines share it.
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        """
+        Args:
+            rate: Tokens added per second
+            capacity: Maximum burst size (defaults to one second of tokens)
+        """
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+
+        self.rate = float(rate)
+        self.capacity = float(capacity) if capacity is not None else max(1.0, self.rate)
+        self._tokens = self.capacity
+        self._updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+        self.total_wait_seconds = 0.0
+
+    @classmethod
+    def per_window(cls, requests: int, window_seconds: float, burst: Optional[float] = None) -> "AsyncTokenBucket":
+        """Build a bucket from a documented quota such as 600 requests per 300s"""
+        return cls(rate=requests / window_seconds, capacity=burst)
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+
+    async def acquire(self, tokens: float = 1.0) -> None:
+        """Wait until ``tokens`` are available and consume them"""
+        if tokens > self.capacity:
+            raise ValueError("Cannot acquire more tokens than the bucket capacity")
+
+        async with self._lock:
+            self._refill()
+            if self._tokens < tokens:
+                wait = (tokens - self._tokens) / self.rate
+                self.total_wait_seconds += wait
+                await asyncio.sleep(wait)
+                self._refill()
+            self._tokens -= tokens
+
+    @property
+    def available(self) -> float:
+        """Tokens currently available (without consuming)"""
+        self._refill()
+        return self._tokens
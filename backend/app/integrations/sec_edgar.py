@@ -12,6 +12,8 @@ import asyncio
 from xml.etree import ElementTree as ET
 import re
 
+from .rate_limit import AsyncTokenBucket
+
 logger = logging.getLogger(__name__)
 
 
@@ -25,13 +27,22 @@ class SECEdgarAPI:
     API_BASE = "https://data.sec.gov"
     RATE_LIMIT_DELAY = 0.1  # 10 requests per second max
 
-    def __init__(self, user_agent: Optional[str] = None):
+    def __init__(
+        self,
+        user_agent: Optional[str] = None,
+        session: Optional[httpx.AsyncClient] = None,
+        rate_limiter: Optional[AsyncTokenBucket] = None,
+        api_base: Optional[str] = None
+    ):
         """
         Initialize SEC EDGAR API client
 
         Args:
             user_agent: User agent string (required by SEC)
                        Format: "Company Name Admin@email.com"
+            session: Shared pooled client; requests then carry their own headers
+            rate_limiter: Token bucket shared by all callers of this registry
+            api_base: Override the data API host (e.g. a local stub server)
         """
         self.user_agent = user_agent or os.getenv(
             "SEC_EDGAR_USER_AGENT",
@@ -43,19 +54,37 @@ class SECEdgarAPI:
                 "SEC_EDGAR_USER_AGENT must be set with format: 'Company Admin@email.com'"
             )
 
-        self.session = httpx.AsyncClient(
-            timeout=30.0,
-            headers={
-                "User-Agent": self.user_agent,
-                "Accept-Encoding": "gzip, deflate",
-                "Host": "www.sec.gov"
-            }
-        )
+        if api_base:
+            self.API_BASE = api_base.rstrip("/")
+
+        self.rate_limiter = rate_limiter
+        self._owns_session = session is None
+
+        headers = {
+            "User-Agent": self.user_agent,
+            "Accept-Encoding": "gzip, deflate"
+        }
+
+        if session is None:
+            self.session = httpx.AsyncClient(timeout=30.0, headers=headers)
+            self._request_kwargs = {}
+        else:
+            self.session = session
+            self._request_kwargs = {"headers": headers}
 
         self.last_request_time = 0
 
+    @classmethod
+    def default_rate_limiter(cls) -> AsyncTokenBucket:
+        """Token bucket matching the SEC fair-access limit (10 requests per second)"""
+        return AsyncTokenBucket(rate=1 / cls.RATE_LIMIT_DELAY)
+
     async def _rate_limit(self):
         """Enforce SEC rate limit (10 requests per second)"""
+        if self.rate_limiter:
+            await self.rate_limiter.acquire()
+            return
+
         current_time = asyncio.get_event_loop().time()
         time_since_last = current_time - self.last_request_time
 
@@ -79,7 +108,7 @@ class SECEdgarAPI:
         url = f"{self.API_BASE}/cik-lookup-data.txt"
 
         try:
-            response = await self.session.get(url)
+            response = await self.session.get(url, **self._request_kwargs)
             response.raise_for_status()
 
             # Parse the company list
@@ -118,7 +147,7 @@ class SECEdgarAPI:
         url = f"{self.API_BASE}/api/xbrl/companyfacts/CIK{cik}.json"
 
         try:
-            response = await self.session.get(url)
+            response = await self.session.get(url, **self._request_kwargs)
             response.raise_for_status()
             return response.json()
 
@@ -144,7 +173,7 @@ class SECEdgarAPI:
         url = f"{self.API_BASE}/submissions/CIK{cik}.json"
 
         try:
-            response = await self.session.get(url)
+            response = await self.session.get(url, **self._request_kwargs)
             response.raise_for_status()
             return response.json()
 
@@ -227,7 +256,7 @@ class SECEdgarAPI:
         url = f"{self.API_BASE}/api/xbrl/companyconcept/CIK{cik}/{taxonomy}/{tag}.json"
 
         try:
-            response = await self.session.get(url)
+            response = await self.session.get(url, **self._request_kwargs)
             response.raise_for_status()
             return response.json()
 
@@ -271,8 +300,9 @@ class SECEdgarAPI:
         }
 
     async def close(self):
-        """Close the HTTP session"""
-        await self.session.aclose()
+        """Close the HTTP session (shared sessions are closed by their owner)"""
+        if self._owns_session:
+            await self.session.aclose()
 
     async def __aenter__(self):
         return self
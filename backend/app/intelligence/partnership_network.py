@@ -3,11 +3,13 @@ Partnership Network Analysis System
 Relationship mapping and influence assessment for strategic partnerships
 """
 
-from typing import Dict, List, Any, Optional, Tuple, Set
+from typing import Dict, List, Any, Optional, Tuple, Set, Hashable
 from datetime import datetime, timedelta
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from collections import OrderedDict
 from enum import Enum
 import asyncio
+import time
 import numpy as np
 import networkx as nx
 from sklearn.ensemble import GradientBoostingRegressor
@@ -74,6 +76,248 @@ class NetworkOpportunity:
     action_plan: List[str]
 
 
+@dataclass
+class CentralitySnapshot:
+    """All centrality measures for one version of the network"""
+    version: int
+    node_count: int
+    edge_count: int
+    degree: Dict[Hashable, float]
+    betweenness: Dict[Hashable, float]
+    closeness: Dict[Hashable, float]
+    eigenvector: Dict[Hashable, float]
+    betweenness_sample_size: Optional[int]
+    computed_at: datetime
+    compute_seconds: float
+    incremental: bool = False
+    stats: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def approximate(self) -> bool:
+        return self.betweenness_sample_size is not None
+
+    def position(self, node: Hashable) -> Dict[str, float]:
+        """Network position metrics for a single node"""
+        return {
+            "degree_centrality": self.degree.get(node, 0.0),
+            "betweenness_centrality": self.betweenness.get(node, 0.0),
+            "closeness_centrality": self.closeness.get(node, 0.0),
+            "eigenvector_centrality": self.eigenvector.get(node, 0.0)
+        }
+
+
+class NetworkMetricsCache:
+    """
+    Computes every centrality once per graph version
+
+    Snapshots are keyed by a hash of the node and edge sets. When the graph
+    differs from the last snapshot only by a few added edges, betweenness and
+    closeness are patched for the affected sources/targets instead of being
+    recomputed from scratch. Graphs above `approximate_above` nodes use
+    sampled-k betweenness.
+    """
+
+    def __init__(
+        self,
+        max_snapshots: int = 8,
+        incremental_edge_limit: int = 25,
+        incremental_affected_fraction: float = 0.25,
+        approximate_above: int = 2000,
+        betweenness_samples: int = 256,
+        seed: int = 42
+    ):
+        self.max_snapshots = max_snapshots
+        self.incremental_edge_limit = incremental_edge_limit
+        self.incremental_affected_fraction = incremental_affected_fraction
+        self.approximate_above = approximate_above
+        self.betweenness_samples = betweenness_samples
+        self.seed = seed
+
+        self._snapshots: "OrderedDict[int, CentralitySnapshot]" = OrderedDict()
+        self._last_graph: Optional[nx.DiGraph] = None
+        self._last_snapshot: Optional[CentralitySnapshot] = None
+        # Unnormalized betweenness of the last graph, needed for incremental patches
+        self._last_raw_betweenness: Optional[Dict[Hashable, float]] = None
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def graph_version(graph: nx.DiGraph) -> int:
+        """Order-independent hash of the node and edge sets"""
+        return hash((frozenset(graph.nodes()), frozenset(graph.edges())))
+
+    def snapshot(self, graph: nx.DiGraph) -> CentralitySnapshot:
+        """Return centralities for the graph, computing them at most once per version"""
+        version = self.graph_version(graph)
+
+        cached = self._snapshots.get(version)
+        if cached is not None:
+            self._snapshots.move_to_end(version)
+            self.hits += 1
+            return cached
+
+        self.misses += 1
+        started = time.perf_counter()
+
+        snapshot = None
+        if self._can_patch(graph):
+            snapshot = self._incremental_snapshot(graph, version)
+        if snapshot is None:
+            snapshot = self._full_snapshot(graph, version)
+
+        snapshot.compute_seconds = time.perf_counter() - started
+        self._remember(graph, snapshot)
+
+        logger.info(
+            "network_metrics_computed",
+            nodes=snapshot.node_count,
+            edges=snapshot.edge_count,
+            incremental=snapshot.incremental,
+            approximate=snapshot.approximate,
+            seconds=round(snapshot.compute_seconds, 4)
+        )
+        return snapshot
+
+    def invalidate(self) -> None:
+        """Drop all snapshots"""
+        self._snapshots.clear()
+        self._last_graph = None
+        self._last_snapshot = None
+        self._last_raw_betweenness = None
+
+    def _full_snapshot(self, graph: nx.DiGraph, version: int) -> CentralitySnapshot:
+        """Compute every centrality from scratch"""
+        n = graph.number_of_nodes()
+        sample_size = None
+
+        if n > self.approximate_above:
+            sample_size = min(self.betweenness_samples, n)
+            raw_betweenness = nx.betweenness_centrality(
+                graph, k=sample_size, normalized=False, seed=self.seed
+            )
+        else:
+            raw_betweenness = nx.betweenness_centrality(graph, normalized=False)
+
+        return CentralitySnapshot(
+            version=version,
+            node_count=n,
+            edge_count=graph.number_of_edges(),
+            degree=nx.degree_centrality(graph) if n else {},
+            betweenness=self._normalize_betweenness(raw_betweenness, n),
+            closeness=nx.closeness_centrality(graph),
+            eigenvector=self._eigenvector(graph),
+            betweenness_sample_size=sample_size,
+            computed_at=datetime.utcnow(),
+            compute_seconds=0.0,
+            stats={"raw_betweenness": raw_betweenness}
+        )
+
+    def _can_patch(self, graph: nx.DiGraph) -> bool:
+        """Incremental updates require the same nodes and a handful of added edges"""
+        previous = self._last_graph
+        if previous is None or self._last_snapshot is None or self._last_snapshot.approximate:
+            return False
+        if previous.number_of_nodes() != graph.number_of_nodes():
+            return False
+        if set(previous.nodes()) != set(graph.nodes()):
+            return False
+        added = graph.number_of_edges() - previous.number_of_edges()
+        return 0 < added <= self.incremental_edge_limit
+
+    def _incremental_snapshot(self, graph: nx.DiGraph, version: int) -> Optional[CentralitySnapshot]:
+        """
+        Patch the previous snapshot for a small set of added edges
+
+        Adding u->v can only change shortest paths from sources that reach u,
+        and only distances to targets reachable from v. Betweenness is patched
+        by swapping those sources' dependency contributions (old graph out, new
+        graph in); closeness is recomputed for the affected targets only.
+        """
+        previous_graph = self._last_graph
+        previous = self._last_snapshot
+
+        previous_edges = set(previous_graph.edges())
+        current_edges = set(graph.edges())
+        if not previous_edges <= current_edges:
+            return None  # Removals fall back to a full recompute
+        added = current_edges - previous_edges
+
+        sources: Set[Hashable] = set()
+        targets: Set[Hashable] = set()
+        for u, v in added:
+            sources |= nx.ancestors(graph, u) | {u}
+            targets |= nx.descendants(graph, v) | {v}
+
+        n = graph.number_of_nodes()
+        limit = self.incremental_affected_fraction * n
+        if len(sources) > limit or len(targets) > limit:
+            return None
+
+        all_nodes = list(graph.nodes())
+        raw_betweenness = dict(self._last_raw_betweenness)
+        removed = nx.betweenness_centrality_subset(previous_graph, list(sources), all_nodes)
+        inserted = nx.betweenness_centrality_subset(graph, list(sources), all_nodes)
+        for node in all_nodes:
+            raw_betweenness[node] += inserted[node] - removed[node]
+
+        closeness = dict(previous.closeness)
+        for node in targets:
+            closeness[node] = nx.closeness_centrality(graph, u=node)
+
+        return CentralitySnapshot(
+            version=version,
+            node_count=n,
+            edge_count=graph.number_of_edges(),
+            degree=nx.degree_centrality(graph),
+            betweenness=self._normalize_betweenness(raw_betweenness, n),
+            closeness=closeness,
+            eigenvector=self._eigenvector(graph),
+            betweenness_sample_size=None,
+            computed_at=datetime.utcnow(),
+            compute_seconds=0.0,
+            incremental=True,
+            stats={
+                "raw_betweenness": raw_betweenness,
+                "added_edges": len(added),
+                "affected_sources": len(sources),
+                "affected_targets": len(targets)
+            }
+        )
+
+    def _eigenvector(self, graph: nx.DiGraph) -> Dict[Hashable, float]:
+        """
+        Eigenvector centrality from the default uniform start
+
+        Not warm-started: when two components share the dominant eigenvalue
+        the limit depends on the start vector, so a warm start would not
+        match a full recompute.
+        """
+        if graph.number_of_nodes() == 0:
+            return {}
+        try:
+            return nx.eigenvector_centrality(graph, max_iter=1000)
+        except nx.PowerIterationFailedConvergence:
+            logger.warning("eigenvector_centrality_not_converged", nodes=graph.number_of_nodes())
+            return dict.fromkeys(graph.nodes(), 0.0)
+
+    @staticmethod
+    def _normalize_betweenness(raw: Dict[Hashable, float], n: int) -> Dict[Hashable, float]:
+        """Match nx.betweenness_centrality(normalized=True) for directed graphs"""
+        if n <= 2:
+            return dict(raw)
+        scale = 1 / ((n - 1) * (n - 2))
+        return {node: value * scale for node, value in raw.items()}
+
+    def _remember(self, graph: nx.DiGraph, snapshot: CentralitySnapshot) -> None:
+        """Store snapshot and the graph it was computed from"""
+        self._last_raw_betweenness = snapshot.stats.pop("raw_betweenness")
+        self._last_graph = graph.copy(as_view=False)
+        self._last_snapshot = snapshot
+        self._snapshots[snapshot.version] = snapshot
+        while len(self._snapshots) > self.max_snapshots:
+            self._snapshots.popitem(last=False)
+
+
 class PartnershipNetworkAnalyzer:
     """Advanced partnership network analysis"""
 
@@ -84,6 +328,7 @@ class PartnershipNetworkAnalyzer:
         self.relationship_predictor = RelationshipPredictor()
         self.value_calculator = PartnershipValueCalculator()
         self.network_optimizer = NetworkOptimizer()
+        self.metrics_cache = NetworkMetricsCache()
 
     async def analyze_partnership_network(self) -> Dict[str, Any]:
         """Comprehensive partnership network analysis"""
@@ -143,7 +388,10 @@ class PartnershipNetworkAnalyzer:
         """)
 
         # Add edges
+        new_edges = 0
         for conn in connections:
+            if not self.network.has_edge(conn.source_id, conn.target_id):
+                new_edges += 1
             self.network.add_edge(
                 conn.source_id,
                 conn.target_id,
@@ -152,6 +400,16 @@ class PartnershipNetworkAnalyzer:
                 frequency=conn.interaction_frequency
             )
 
+        # Compute centralities once for this graph version; a few new edges are patched in
+        snapshot = self.metrics_cache.snapshot(self.network)
+        logger.info(
+            "partnership_network_built",
+            nodes=snapshot.node_count,
+            edges=snapshot.edge_count,
+            new_edges=new_edges,
+            incremental=snapshot.incremental
+        )
+
     async def _analyze_network_structure(self) -> Dict[str, Any]:
         """Analyze partnership network structure"""
 
@@ -167,10 +425,12 @@ class PartnershipNetworkAnalyzer:
         }
 
         # Centrality analysis
+        centrality = self.metrics_cache.snapshot(self.network)
         structure["centrality"] = {
-            "most_connected": self._get_top_central_nodes(nx.degree_centrality(self.network)),
-            "most_influential": self._get_top_central_nodes(nx.eigenvector_centrality(self.network, max_iter=1000)),
-            "best_connectors": self._get_top_central_nodes(nx.betweenness_centrality(self.network))
+            "most_connected": self._get_top_central_nodes(centrality.degree),
+            "most_influential": self._get_top_central_nodes(centrality.eigenvector),
+            "best_connectors": self._get_top_central_nodes(centrality.betweenness),
+            "betweenness_approximate": centrality.approximate
         }
 
         # Community detection
@@ -197,6 +457,7 @@ class PartnershipNetworkAnalyzer:
         """Assess influence of each partner"""
 
         partner_profiles = []
+        centrality = self.metrics_cache.snapshot(self.network)
 
         for node in self.network.nodes():
             # Calculate influence metrics
@@ -213,12 +474,7 @@ class PartnershipNetworkAnalyzer:
             influence_score = self._calculate_overall_influence(influence_metrics)
 
             # Network position metrics
-            network_position = {
-                "degree_centrality": nx.degree_centrality(self.network)[node],
-                "betweenness_centrality": nx.betweenness_centrality(self.network)[node],
-                "closeness_centrality": nx.closeness_centrality(self.network)[node],
-                "eigenvector_centrality": nx.eigenvector_centrality(self.network, max_iter=1000)[node]
-            }
+            network_position = centrality.position(node)
 
             # Create partner profile
             profile = PartnerProfile(
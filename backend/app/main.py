@@ -288,6 +288,18 @@ async def startup_event():
     except Exception as e:
         logger.warning(f"Cache initialization failed: {e}. Continuing without cache.")
 
+    # Route realtime broadcasts across workers
+    try:
+        from app.core.config import settings
+        from app.realtime.backplane import create_backplane
+        from app.realtime.websocket_manager import websocket_manager as realtime_manager
+
+        backplane = create_backplane(settings.REDIS_URL, settings.REALTIME_BACKPLANE)
+        if backplane:
+            await realtime_manager.attach_backplane(backplane)
+    except Exception as e:
+        logger.warning(f"Realtime backplane unavailable: {e}. Broadcasts stay on this worker.")
+
     # Check required environment variables
     required_vars = [
         "CLERK_SECRET_KEY",
@@ -338,6 +350,16 @@ async def shutdown_event():
     """Clean up on application shutdown"""
     logger.info("M&A SaaS Platform API shutting down...")
 
+    from app.auth.clerk_auth import clerk_auth
+    await clerk_auth.aclose()
+
+    from app.services.ai_gateway import close_ai_gateway
+    await close_ai_gateway()
+
+    from app.realtime.websocket_manager import websocket_manager as realtime_manager
+    if realtime_manager.backplane is not None:
+        await realtime_manager.backplane.close()
+
 @app.get("/", include_in_schema=False)
 async def root():
     if WEBSITE_INDEX.exists():
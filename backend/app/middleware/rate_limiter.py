@@ -6,18 +6,23 @@ Per-tenant and per-endpoint rate limiting with subscription tier support
 import os
 import logging
 import time
-from typing import Optional, Dict, Any
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional, Dict, Any, List
 from datetime import datetime
 from fastapi import Request, HTTPException, status
 from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.responses import JSONResponse
 import redis
-from collections import defaultdict
+import redis.asyncio as aioredis
 
 logger = logging.getLogger(__name__)
 
 # Configuration
 REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+# Connect and read timeout, so a hung Redis falls back to memory instead of stalling requests
+REDIS_TIMEOUT_SECONDS = float(os.getenv("RATE_LIMIT_REDIS_TIMEOUT", "0.5"))
 ENABLE_RATE_LIMITING = os.getenv("ENABLE_RATE_LIMITING", "true").lower() == "true"
 
 
@@ -58,20 +63,159 @@ class RateLimitConfig:
         return tier_config.get(limit_type, 60)
 
 
+# Atomic sliding-window check-and-increment.
+#
+# KEYS[1]  window sorted set (score = request time)
+# ARGV     now, window_start, limit, member prefix, ttl_ms, lease_fraction,
+#          max_lease, then members of an expired lease to refund
+#
+# Admits the request only if the window has room, so denied requests are never
+# recorded. When the window is far from full, up to ``max_lease`` extra slots
+# (``lease_fraction`` of the headroom) are reserved for the caller to hand out
+# locally without another round-trip.
+#
+# Returns {granted, count after the call, oldest score in the window}.
+SLIDING_WINDOW_SCRIPT = """
+local key = KEYS[1]
+local now = tonumber(ARGV[1])
+local limit = tonumber(ARGV[3])
+
+for i = 8, #ARGV do
+    redis.call('ZREM', key, ARGV[i])
+end
+redis.call('ZREMRANGEBYSCORE', key, '-inf', ARGV[2])
+
+local current = redis.call('ZCARD', key)
+local oldest = redis.call('ZRANGE', key, 0, 0, 'WITHSCORES')[2] or ARGV[1]
+if current >= limit then
+    return {0, current, oldest}
+end
+
+local lease = math.floor((limit - current - 1) * tonumber(ARGV[6]))
+lease = math.max(0, math.min(lease, tonumber(ARGV[7])))
+local grant = 1 + lease
+for i = 1, grant do
+    redis.call('ZADD', key, now, ARGV[4] .. ':' .. i)
+end
+redis.call('PEXPIRE', key, ARGV[5])
+return {grant, current + grant, oldest}
+"""
+
+
+@dataclass
+class LocalLease:
+    """Window slots reserved in Redis and handed out by this process"""
+    member: str
+    granted: int
+    limit: int
+    count: int  # window count reported when the lease was reserved
+    oldest: float
+    expires_at: float
+    used: int = 1  # the request that reserved the lease
+
+    @property
+    def available(self) -> int:
+        return self.granted - self.used
+
+    def unused_members(self) -> List[str]:
+        return [f"{self.member}:{i}" for i in range(self.used + 1, self.granted + 1)]
+
+
+class SlidingWindowCounter:
+    """
+    Approximate sliding window in constant memory.
+
+    Keeps the count for the current and previous fixed windows and weights the
+    previous one by how much of it still overlaps the sliding window.
+    """
+
+    __slots__ = ("window_seconds", "window_index", "current", "previous")
+
+    def __init__(self, window_seconds: int):
+        self.window_seconds = window_seconds
+        self.window_index = 0
+        self.current = 0
+        self.previous = 0
+
+    def _roll(self, now: float) -> float:
+        index = int(now // self.window_seconds)
+        if index != self.window_index:
+            self.previous = self.current if index == self.window_index + 1 else 0
+            self.current = 0
+            self.window_index = index
+        return (now % self.window_seconds) / self.window_seconds
+
+    def count(self, now: float) -> int:
+        elapsed = self._roll(now)
+        return int(self.previous * (1 - elapsed)) + self.current
+
+    def add(self, now: float, amount: int = 1) -> int:
+        self._roll(now)
+        self.current += amount
+        return self.current
+
+
 class AdvancedRateLimiter:
-    """Advanced rate limiter with Redis backend and multiple window support"""
+    """
+    Sliding-window rate limiter backed by async Redis.
+
+    Each check is one EVALSHA of SLIDING_WINDOW_SCRIPT, which prunes the window,
+    counts it and records the request atomically. Clients well under their
+    limit get a small lease of pre-reserved slots so their next requests are
+    admitted from process memory; unused slots are released on the next
+    round-trip after the lease expires. When Redis is unreachable the limiter
+    falls back to bounded in-process counters and retries Redis after
+    ``redis_retry_seconds``.
+    """
 
-    def __init__(self):
-        self.redis_client = self._init_redis()
-        self.memory_cache: Dict[str, list] = defaultdict(list)
+    def __init__(
+        self,
+        redis_client: Optional[aioredis.Redis] = None,
+        lease_fraction: float = 0.1,
+        max_lease: int = 20,
+        lease_seconds: float = 1.0,
+        max_local_keys: int = 10000,
+        redis_retry_seconds: float = 5.0
+    ):
+        """
+        Args:
+            redis_client: redis.asyncio client (built from REDIS_URL if omitted)
+            lease_fraction: Share of a window's headroom one lease may reserve
+            max_lease: Most slots reserved by one lease
+            lease_seconds: How long a lease's slots may be handed out locally
+            max_local_keys: Bound on keys held in leases and fallback counters
+            redis_retry_seconds: Pause before retrying Redis after a failure
+        """
+        self.redis_client = redis_client if redis_client is not None else self._init_redis()
         self.use_redis = self.redis_client is not None
-
-    def _init_redis(self) -> Optional[redis.Redis]:
-        """Initialize Redis connection"""
+        self.lease_fraction = lease_fraction
+        self.max_lease = max_lease
+        self.lease_seconds = lease_seconds
+        self.max_local_keys = max_local_keys
+        self.redis_retry_seconds = redis_retry_seconds
+
+        self._script = self.redis_client.register_script(SLIDING_WINDOW_SCRIPT) if self.use_redis else None
+        self._leases: "OrderedDict[str, LocalLease]" = OrderedDict()
+        self.memory_cache: "OrderedDict[str, SlidingWindowCounter]" = OrderedDict()
+        self._redis_down_until = 0.0
+
+        self.local_hits = 0
+        self.redis_checks = 0
+        self.redis_errors = 0
+
+    def _init_redis(self) -> Optional[aioredis.Redis]:
+        """Create the async Redis client once a startup ping succeeds"""
+        options = {
+            "decode_responses": True,
+            "socket_connect_timeout": REDIS_TIMEOUT_SECONDS,
+            "socket_timeout": REDIS_TIMEOUT_SECONDS,
+        }
         try:
-            client = redis.from_url(REDIS_URL, decode_responses=False)
-            client.ping()
-            logger.info("Redis connected for advanced rate limiting")
+            # The constructor is synchronous, so ping through a blocking client
+            with redis.from_url(REDIS_URL, **options) as probe:
+                probe.ping()
+            client = aioredis.from_url(REDIS_URL, **options)
+            logger.info("Async Redis connected for advanced rate limiting")
             return client
         except Exception as e:
             logger.warning(f"Redis unavailable, using memory-based rate limiting: {e}")
@@ -104,14 +248,31 @@ class AdvancedRateLimiter:
         now = time.time()
         window_start = now - window_seconds
 
-        if self.use_redis and self.redis_client:
+        if self.use_redis and now >= self._redis_down_until:
+            lease = self._leases.get(key)
+            if lease is not None and lease.available > 0 and now < lease.expires_at and lease.limit == limit:
+                lease.used += 1
+                self.local_hits += 1
+                current_count = lease.count - lease.available
+                return self._result(True, current_count, limit, lease.oldest, window_seconds)
+
             return await self._check_limit_redis(
                 key, limit, window_seconds, now, window_start
             )
-        else:
-            return await self._check_limit_memory(
-                key, limit, window_seconds, now, window_start
-            )
+
+        return await self._check_limit_memory(
+            key, limit, window_seconds, now, window_start
+        )
+
+    @staticmethod
+    def _result(allowed: bool, current_count: int, limit: int, oldest: float, window_seconds: int) -> Dict[str, Any]:
+        return {
+            "allowed": allowed,
+            "remaining": max(0, limit - current_count),
+            "reset_at": datetime.fromtimestamp(oldest + window_seconds),
+            "current_count": current_count,
+            "limit": limit
+        }
 
     async def _check_limit_redis(
         self,
@@ -121,47 +282,52 @@ class AdvancedRateLimiter:
         now: float,
         window_start: float
     ) -> Dict[str, Any]:
-        """Redis-based rate limiting"""
-        try:
-            pipe = self.redis_client.pipeline()
-
-            # Remove old entries outside the window
-            pipe.zremrangebyscore(key, 0, window_start)
-
-            # Count requests in current window
-            pipe.zcard(key)
-
-            # Add current request timestamp
-            pipe.zadd(key, {str(now): now})
-
-            # Set expiration
-            pipe.expire(key, window_seconds)
-
-            results = pipe.execute()
-            current_count = results[1]
-
-            allowed = current_count < limit
-            remaining = max(0, limit - current_count - 1)
-            reset_at = datetime.fromtimestamp(now + window_seconds)
-
-            return {
-                "allowed": allowed,
-                "remaining": remaining,
-                "reset_at": reset_at,
-                "current_count": current_count,
-                "limit": limit
-            }
+        """Redis-based rate limiting: one atomic script call"""
+        expired = self._leases.pop(key, None)
+        refund = expired.unused_members() if expired else []
+        member = f"{now}:{uuid.uuid4().hex[:12]}"
 
+        try:
+            self.redis_checks += 1
+            granted, count, oldest = await self._script(
+                keys=[key],
+                args=[now, window_start, limit, member, window_seconds * 1000,
+                      self.lease_fraction, self.max_lease, *refund]
+            )
         except Exception as e:
-            logger.error(f"Redis rate limit check failed: {e}")
-            # Fall back to allowing the request
-            return {
-                "allowed": True,
-                "remaining": limit,
-                "reset_at": datetime.fromtimestamp(now + window_seconds),
-                "current_count": 0,
-                "limit": limit
-            }
+            self.redis_errors += 1
+            self._redis_down_until = now + self.redis_retry_seconds
+            logger.error(f"Redis rate limit check failed, using memory limits: {e}")
+            return await self._check_limit_memory(key, limit, window_seconds, now, window_start)
+
+        granted, count, oldest = int(granted), int(count), float(oldest)
+        if granted > 1:
+            self._leases[key] = LocalLease(
+                member=member,
+                granted=granted,
+                limit=limit,
+                count=count,
+                oldest=oldest,
+                expires_at=now + self.lease_seconds
+            )
+            if len(self._leases) > self.max_local_keys:
+                # Unused slots of the dropped lease age out of the window
+                self._leases.popitem(last=False)
+
+        if not granted:
+            return self._result(False, count, limit, oldest, window_seconds)
+        # Slots reserved for the lease are not spent yet
+        return self._result(True, count - (granted - 1), limit, oldest, window_seconds)
+
+    def _memory_counter(self, key: str, window_seconds: int) -> SlidingWindowCounter:
+        counter = self.memory_cache.get(key)
+        if counter is None or counter.window_seconds != window_seconds:
+            counter = self.memory_cache[key] = SlidingWindowCounter(window_seconds)
+            if len(self.memory_cache) > self.max_local_keys:
+                self.memory_cache.popitem(last=False)
+        else:
+            self.memory_cache.move_to_end(key)
+        return counter
 
     async def _check_limit_memory(
         self,
@@ -171,29 +337,19 @@ class AdvancedRateLimiter:
         now: float,
         window_start: float
     ) -> Dict[str, Any]:
-        """Memory-based rate limiting (fallback)"""
-        if key not in self.memory_cache:
-            self.memory_cache[key] = []
-
-        # Remove old timestamps
-        self.memory_cache[key] = [
-            ts for ts in self.memory_cache[key]
-            if ts > window_start
-        ]
-
-        current_count = len(self.memory_cache[key])
+        """Memory-based rate limiting (fallback): bounded keys, O(1) per key"""
+        counter = self._memory_counter(key, window_seconds)
+        current_count = counter.count(now)
         allowed = current_count < limit
 
         if allowed:
-            self.memory_cache[key].append(now)
-
-        remaining = max(0, limit - current_count - 1)
-        reset_at = datetime.fromtimestamp(now + window_seconds)
+            counter.add(now)
+            current_count += 1
 
         return {
             "allowed": allowed,
-            "remaining": remaining,
-            "reset_at": reset_at,
+            "remaining": max(0, limit - current_count),
+            "reset_at": datetime.fromtimestamp(now + window_seconds),
             "current_count": current_count,
             "limit": limit
         }
@@ -206,24 +362,22 @@ class AdvancedRateLimiter:
     ) -> int:
         """Increment a counter (for tracking daily limits, etc.)"""
         key = f"counter:{identifier}:{counter_name}"
+        now = time.time()
 
-        if self.use_redis and self.redis_client:
+        if self.use_redis and now >= self._redis_down_until:
             try:
-                pipe = self.redis_client.pipeline()
+                pipe = self.redis_client.pipeline(transaction=False)
                 pipe.incr(key)
                 pipe.expire(key, window_seconds)
-                results = pipe.execute()
+                results = await pipe.execute()
                 return results[0]
             except Exception as e:
+                self.redis_errors += 1
+                self._redis_down_until = now + self.redis_retry_seconds
                 logger.error(f"Redis counter increment failed: {e}")
-                return 0
 
         # Memory-based counter
-        if key not in self.memory_cache:
-            self.memory_cache[key] = []
-
-        self.memory_cache[key].append(time.time())
-        return len(self.memory_cache[key])
+        return self._memory_counter(key, window_seconds).add(now)
 
 
 class RateLimitMiddleware(BaseHTTPMiddleware):
@@ -375,4 +375,20 @@ class BusinessGoal(TenantModel):
     meta_data = Column(JSONB, default={})
 
     # Relationships
-    owner = relationship("User")
\ No newline at end of file
+    owner = relationship("User")
+
+
+# Add relationships to Organization model
+from app.models.organization import Organization
+
+Organization.metric_snapshots = relationship(
+    "MetricSnapshot",
+    back_populates="organization",
+    lazy="dynamic"
+)
+
+Organization.aggregated_metrics = relationship(
+    "AggregatedMetric",
+    back_populates="organization",
+    lazy="dynamic"
+)
\ No newline at end of file
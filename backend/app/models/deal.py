@@ -14,7 +14,7 @@ from sqlalchemy import (
 from sqlalchemy.dialects.postgresql import UUID, ARRAY
 from sqlalchemy.orm import relationship, validates
 
-from .base import TenantModel, AuditableMixin
+from .base import Base, TenantModel, AuditableMixin
 from sqlalchemy.orm import backref
 
 
@@ -221,6 +221,32 @@ class Deal(TenantModel, AuditableMixin):
         return result
 
 
+class DealAnalyticsRollup(Base):
+    """
+    Pre-aggregated deal counters per organization for the pipeline dashboard
+    One row per (dimension, key): the organization total, each stage,
+    priority, industry, deal lead and creation month
+    """
+    __tablename__ = "deal_analytics_rollups"
+
+    organization_id = Column(UUID(as_uuid=False), ForeignKey("organizations.id", ondelete="CASCADE"),
+                             primary_key=True)
+    dimension = Column(String(20), primary_key=True, comment="total, stage, priority, industry, lead, month")
+    key = Column(String(255), primary_key=True, default="")
+
+    deal_count = Column(Integer, nullable=False, default=0)
+    active_count = Column(Integer, nullable=False, default=0)
+    value_sum = Column(Numeric(24, 2), nullable=False, default=0)
+    value_count = Column(Integer, nullable=False, default=0)
+    active_value_sum = Column(Numeric(24, 2), nullable=False, default=0)
+    closed_count = Column(Integer, nullable=False, default=0)
+    won_count = Column(Integer, nullable=False, default=0)
+    close_days_sum = Column(Integer, nullable=False, default=0)
+    close_days_count = Column(Integer, nullable=False, default=0)
+
+    refreshed_at = Column(DateTime, comment="Last full rebuild from the deals table")
+
+
 class DealTeamMember(TenantModel, AuditableMixin):
     """Team members assigned to deals with roles and responsibilities"""
     __tablename__ = "deal_team_members"
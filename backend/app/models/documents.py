@@ -377,6 +377,9 @@ class DocumentTemplate(TenantModel, AuditableMixin):
     industry = Column(String(100))
     jurisdiction = Column(String(100), comment="Legal jurisdiction for template")
 
+    # Relationships
+    generated_documents = relationship("GeneratedDocument", back_populates="template")
+
     __table_args__ = (
         Index('ix_document_templates_category_active', 'category', 'is_active'),
         Index('ix_document_templates_industry', 'industry'),
@@ -645,6 +645,7 @@ class Integration(BaseModel, SoftDeleteMixin):
     """Basic integration model for external system connections"""
     __tablename__ = 'system_integrations'
 
+    organization_id = Column(UUID(as_uuid=False), ForeignKey("organizations.id"), nullable=False, index=True)
     name = Column(String(100), nullable=False)
     integration_type = Column(String(50), nullable=False)  # 'accounting', 'crm', 'file_storage'
     status = Column(String(20), default='active')
@@ -0,0 +1,215 @@
+"""
+Realtime Backplane
+Routes broadcasts between API workers so a socket receives a deal update no
+matter which worker produced it, and keeps channel history in a ring buffer
+every worker shares.
+
+Envelopes are compact JSON objects carrying the already-encoded frame, so a
+message is serialized once by the producing worker and never re-encoded:
+
+    {"o": origin worker, "k": "o" | "c" | "u", "t": target id, "f": frame,
+     "x": [excluded connection ids]}   # "x" only when non-empty
+
+Publishes are batched: envelopes produced within ``batch_interval`` go out
+as one JSON array in a single PUBLISH.
+"""
+
+import asyncio
+import json
+import logging
+from collections import deque
+from typing import Awaitable, Callable, Deque, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Envelope kinds
+ORGANIZATION = "o"
+CHANNEL = "c"
+USER = "u"
+
+EnvelopeHandler = Callable[[List[Dict]], Awaitable[None]]
+
+
+def make_envelope(origin: str, kind: str, target: str, frame: str,
+                  exclude: Optional[set] = None) -> Dict:
+    envelope = {"o": origin, "k": kind, "t": target, "f": frame}
+    if exclude:
+        envelope["x"] = list(exclude)
+    return envelope
+
+
+class Backplane:
+    """Interface shared by the Redis backplane and the in-memory stand-in"""
+
+    history_size: int = 100
+
+    async def start(self, handler: EnvelopeHandler):
+        """Begin delivering envelopes from other workers to ``handler``"""
+        raise NotImplementedError
+
+    async def publish(self, envelope: Dict):
+        raise NotImplementedError
+
+    async def append_history(self, channel: str, frame: str):
+        raise NotImplementedError
+
+    async def get_history(self, channel: str, limit: int) -> List[str]:
+        raise NotImplementedError
+
+    async def close(self):
+        pass
+
+
+class InMemoryHub:
+    """What Redis provides across processes, for workers sharing one process"""
+
+    def __init__(self):
+        self.handlers: List[EnvelopeHandler] = []
+        self.history: Dict[str, Deque[str]] = {}
+        self.published_batches = 0
+
+
+class InMemoryBackplane(Backplane):
+    """
+    Backplane for tests and single-process development.
+
+    Managers built on backplanes sharing one InMemoryHub behave like workers
+    sharing one Redis.
+    """
+
+    def __init__(self, hub: Optional[InMemoryHub] = None, history_size: int = 100):
+        self.hub = hub or InMemoryHub()
+        self.history_size = history_size
+        self._handler: Optional[EnvelopeHandler] = None
+
+    async def start(self, handler: EnvelopeHandler):
+        self._handler = handler
+        self.hub.handlers.append(handler)
+
+    async def publish(self, envelope: Dict):
+        self.hub.published_batches += 1
+        for handler in list(self.hub.handlers):
+            await handler([envelope])
+
+    async def append_history(self, channel: str, frame: str):
+        self.hub.history.setdefault(channel, deque(maxlen=self.history_size)).append(frame)
+
+    async def get_history(self, channel: str, limit: int) -> List[str]:
+        return list(self.hub.history.get(channel, ()))[-limit:]
+
+    async def close(self):
+        if self._handler in self.hub.handlers:
+            self.hub.handlers.remove(self._handler)
+
+
+class RedisBackplane(Backplane):
+    """
+    Redis pub/sub backplane with batched publishes.
+
+    Every worker subscribes to one bus channel and filters envelopes locally
+    (each worker may hold sockets for any organization or channel). Channel
+    history is a capped Redis list per channel (RPUSH + LTRIM).
+    """
+
+    def __init__(
+        self,
+        redis_client,
+        prefix: str = "realtime",
+        history_size: int = 100,
+        batch_interval: float = 0.002,
+        max_batch: int = 256
+    ):
+        """
+        Args:
+            redis_client: redis.asyncio client with decode_responses=True
+            prefix: Key/channel prefix
+            history_size: Frames kept per channel
+            batch_interval: Seconds to gather envelopes before publishing
+            max_batch: Publish immediately once this many envelopes are queued
+        """
+        self.redis = redis_client
+        self.prefix = prefix
+        self.bus = f"{prefix}:bus"
+        self.history_size = history_size
+        self.batch_interval = batch_interval
+        self.max_batch = max_batch
+        self._pending: List[Dict] = []
+        self._flush_task: Optional[asyncio.Task] = None
+        self._listener: Optional[asyncio.Task] = None
+        self._pubsub = None
+        self.published_batches = 0
+        self.published_envelopes = 0
+
+    async def start(self, handler: EnvelopeHandler):
+        self._pubsub = self.redis.pubsub(ignore_subscribe_messages=True)
+        await self._pubsub.subscribe(self.bus)
+        self._listener = asyncio.create_task(self._listen(handler))
+
+    async def _listen(self, handler: EnvelopeHandler):
+        async for message in self._pubsub.listen():
+            if message.get("type") != "message":
+                continue
+            try:
+                await handler(json.loads(message["data"]))
+            except Exception as e:
+                logger.error(f"Backplane delivery failed: {e}")
+
+    async def publish(self, envelope: Dict):
+        self._pending.append(envelope)
+        if len(self._pending) >= self.max_batch:
+            await self.flush()
+        elif self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_later())
+
+    async def _flush_later(self):
+        await asyncio.sleep(self.batch_interval)
+        await self.flush()
+
+    async def flush(self):
+        if not self._pending:
+            return
+        batch, self._pending = self._pending, []
+        try:
+            await self.redis.publish(self.bus, json.dumps(batch, separators=(",", ":")))
+            self.published_batches += 1
+            self.published_envelopes += len(batch)
+        except Exception as e:
+            logger.error(f"Backplane publish of {len(batch)} envelopes failed: {e}")
+
+    def _history_key(self, channel: str) -> str:
+        return f"{self.prefix}:history:{channel}"
+
+    async def append_history(self, channel: str, frame: str):
+        key = self._history_key(channel)
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.rpush(key, frame)
+        pipe.ltrim(key, -self.history_size, -1)
+        try:
+            await pipe.execute()
+        except Exception as e:
+            logger.error(f"Backplane history write for {channel} failed: {e}")
+
+    async def get_history(self, channel: str, limit: int) -> List[str]:
+        try:
+            return await self.redis.lrange(self._history_key(channel), -limit, -1)
+        except Exception as e:
+            logger.error(f"Backplane history read for {channel} failed: {e}")
+            return []
+
+    async def close(self):
+        await self.flush()
+        if self._listener:
+            self._listener.cancel()
+        if self._pubsub is not None:
+            await self._pubsub.unsubscribe(self.bus)
+            await self._pubsub.close()
+
+
+def create_backplane(redis_url: Optional[str], mode: str = "redis") -> Optional[Backplane]:
+    """Backplane for the configured mode ("redis", "memory" or "none")"""
+    if mode == "memory":
+        return InMemoryBackplane()
+    if mode == "redis" and redis_url:
+        import redis.asyncio as redis
+        return RedisBackplane(redis.from_url(redis_url, decode_responses=True))
+    return None
@@ -8,10 +8,11 @@ import json
 import logging
 from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, asdict, field
 from enum import Enum
 import uuid
 
+from .rope import Rope
 from .websocket_manager import websocket_manager, RealtimeMessage, MessageType
 
 logger = logging.getLogger(__name__)
@@ -68,11 +69,18 @@ class CursorPosition:
             self.end_position = self.start_position
 
 
+@dataclass
+class DocumentSnapshot:
+    """Compacted point-in-time copy of a document"""
+    version: int
+    content: str
+    taken_at: datetime
+
+
 @dataclass
 class DocumentState:
     """Current state of a collaborative document"""
     document_id: str
-    content: str
     version: int
     operations: List[DocumentOperation]
     active_users: Dict[str, Dict[str, Any]]
@@ -80,6 +88,11 @@ class DocumentState:
     last_modified: datetime
     locked_by: Optional[str] = None
     locked_at: Optional[datetime] = None
+    buffer: Rope = field(default_factory=Rope)
+    # Document version each stored cursor was last transformed to
+    cursor_versions: Dict[str, int] = field(default_factory=dict)
+    snapshot: Optional[DocumentSnapshot] = None
+    operations_since_snapshot: int = 0
 
     def __post_init__(self):
         if self.operations is None:
@@ -89,6 +102,19 @@ class DocumentState:
         if self.cursors is None:
             self.cursors = {}
 
+    @property
+    def content(self) -> str:
+        """Full document text (built from the rope and cached until the next edit)"""
+        return self.buffer.to_string()
+
+    @content.setter
+    def content(self, value: str):
+        self.buffer = Rope(value)
+
+    @property
+    def content_length(self) -> int:
+        return len(self.buffer)
+
 
 class OperationalTransform:
     """Operational Transformation engine for conflict resolution"""
@@ -201,6 +227,18 @@ class OperationalTransform:
 
         return content
 
+    @staticmethod
+    def apply_to_rope(buffer: Rope, operation: DocumentOperation) -> None:
+        """Apply an operation to a rope in place"""
+
+        if operation.type == OperationType.INSERT:
+            if operation.content:
+                buffer.insert(operation.position, operation.content)
+
+        elif operation.type == OperationType.DELETE:
+            if operation.length:
+                buffer.delete(operation.position, operation.length)
+
     @staticmethod
     def transform_cursor_position(cursor: CursorPosition, operation: DocumentOperation) -> CursorPosition:
         """Transform cursor position based on document operation"""
@@ -243,18 +281,39 @@ class OperationalTransform:
 
 
 class CollaborativeDocumentManager:
-    """Manages real-time collaborative document editing"""
-
-    def __init__(self):
+    """
+    Manages real-time collaborative document editing.
+
+    Content lives in a rope, so an edit costs one chunk copy rather than a
+    copy of the whole document. Each document has its own lock; the manager
+    lock only guards the document registry. Remote cursors are transformed
+    lazily when read, by replaying the operations applied since each cursor
+    was last updated. Every ``snapshot_interval`` operations the rope is
+    compacted, a snapshot is stored and the operation log is trimmed.
+    """
+
+    def __init__(self, snapshot_interval: int = 200, history_size: int = 100):
         # Document states: document_id -> DocumentState
         self.documents: Dict[str, DocumentState] = {}
 
         # Operation queues for each document: document_id -> List[DocumentOperation]
         self.operation_queues: Dict[str, List[DocumentOperation]] = {}
 
-        # Lock for thread-safe operations
+        # Per-document locks: document_id -> asyncio.Lock
+        self.document_locks: Dict[str, asyncio.Lock] = {}
+
+        # Lock for the document registry
         self.lock = asyncio.Lock()
 
+        self.snapshot_interval = snapshot_interval
+        self.history_size = history_size
+
+    def _document_lock(self, document_id: str) -> asyncio.Lock:
+        lock = self.document_locks.get(document_id)
+        if lock is None:
+            lock = self.document_locks[document_id] = asyncio.Lock()
+        return lock
+
     async def join_document(
         self,
         document_id: str,
@@ -269,7 +328,7 @@ class CollaborativeDocumentManager:
             if document_id not in self.documents:
                 self.documents[document_id] = DocumentState(
                     document_id=document_id,
-                    content="",  # Would load from database
+                    buffer=Rope(""),  # Would load from database
                     version=0,
                     operations=[],
                     active_users={},
@@ -299,18 +358,21 @@ class CollaborativeDocumentManager:
 
         async with self.lock:
             if document_id in self.documents:
+                doc_state = self.documents[document_id]
+
                 # Remove user from active users
-                self.documents[document_id].active_users.pop(user_id, None)
+                doc_state.active_users.pop(user_id, None)
 
                 # Remove user's cursor
-                self.documents[document_id].cursors.pop(user_id, None)
+                doc_state.cursors.pop(user_id, None)
+                doc_state.cursor_versions.pop(user_id, None)
 
                 # Clean up empty document sessions
-                if not self.documents[document_id].active_users:
+                if not doc_state.active_users:
                     # Save document state to database here
                     del self.documents[document_id]
-                    if document_id in self.operation_queues:
-                        del self.operation_queues[document_id]
+                    self.operation_queues.pop(document_id, None)
+                    self.document_locks.pop(document_id, None)
 
                 logger.info(f"User {user_id} left document {document_id}")
 
@@ -322,65 +384,125 @@ class CollaborativeDocumentManager:
     ) -> Optional[DocumentOperation]:
         """Apply operation to document with operational transformation"""
 
-        async with self.lock:
-            if document_id not in self.documents:
-                logger.warning(f"Document {document_id} not found")
-                return None
+        applied = await self.apply_operations(document_id, [operation], user_id)
+        return applied[0] if applied else None
 
-            doc_state = self.documents[document_id]
+    async def apply_operations(
+        self,
+        document_id: str,
+        operations: List[DocumentOperation],
+        user_id: str
+    ) -> List[DocumentOperation]:
+        """
+        Apply a batch of operations from one user under a single document
+        lock, with one broadcast for the whole batch.
+
+        Returns:
+            The transformed operations that were applied, in order
+        """
+
+        doc_state = self.documents.get(document_id)
+        if doc_state is None:
+            logger.warning(f"Document {document_id} not found")
+            return []
 
-            # Initialize operation queue if needed
-            if document_id not in self.operation_queues:
-                self.operation_queues[document_id] = []
+        async with self._document_lock(document_id):
+            queue = self.operation_queues.setdefault(document_id, [])
+            applied: List[DocumentOperation] = []
 
-            # Transform operation against pending operations
-            transformed_operation = operation
-            for pending_op in self.operation_queues[document_id]:
-                if pending_op.user_id != user_id:
-                    transformed_operation, _ = OperationalTransform.transform_operation(
-                        transformed_operation, pending_op
-                    )
+            # Catch the sender's cursor up on remote edits before marking it current below
+            self._resolve_cursor(doc_state, user_id)
 
-            # Apply operation to document content
             try:
-                new_content = OperationalTransform.apply_operation(
-                    doc_state.content, transformed_operation
-                )
+                for operation in operations:
+                    operation.user_id = user_id
+
+                    # Transform operation against pending operations
+                    transformed_operation = operation
+                    for pending_op in queue:
+                        if pending_op.user_id != user_id:
+                            transformed_operation, _ = OperationalTransform.transform_operation(
+                                transformed_operation, pending_op
+                            )
+
+                    # Apply operation to document content
+                    OperationalTransform.apply_to_rope(doc_state.buffer, transformed_operation)
+
+                    doc_state.version += 1
+                    doc_state.operations.append(transformed_operation)
+                    doc_state.operations_since_snapshot += 1
+                    queue.append(transformed_operation)
+                    applied.append(transformed_operation)
 
-                # Update document state
-                doc_state.content = new_content
-                doc_state.version += 1
-                doc_state.last_modified = datetime.utcnow()
-                doc_state.operations.append(transformed_operation)
+            except Exception as e:
+                logger.error(f"Failed to apply operation to document {document_id}: {str(e)}")
 
-                # Keep only last 100 operations
-                if len(doc_state.operations) > 100:
-                    doc_state.operations = doc_state.operations[-100:]
+            if not applied:
+                return []
 
-                # Transform all user cursors
-                for cursor_user_id, cursor in doc_state.cursors.items():
-                    if cursor_user_id != user_id:
-                        doc_state.cursors[cursor_user_id] = OperationalTransform.transform_cursor_position(
-                            cursor, transformed_operation
-                        )
+            doc_state.last_modified = datetime.utcnow()
 
-                # Add to operation queue
-                self.operation_queues[document_id].append(transformed_operation)
+            # The sender's own cursor already reflects its edits
+            if user_id in doc_state.cursors:
+                doc_state.cursor_versions[user_id] = doc_state.version
 
-                # Keep only last 50 operations in queue
-                if len(self.operation_queues[document_id]) > 50:
-                    self.operation_queues[document_id] = self.operation_queues[document_id][-50:]
+            # Keep only last 50 operations in queue
+            if len(queue) > 50:
+                del queue[:-50]
 
-                logger.info(f"Applied operation {transformed_operation.id} to document {document_id}")
+            if doc_state.operations_since_snapshot >= self.snapshot_interval:
+                self._take_snapshot(doc_state)
 
-                # Broadcast operation to other users
-                await self._broadcast_operation(document_id, transformed_operation, user_id)
+            logger.debug(f"Applied {len(applied)} operations to document {document_id}")
 
-                return transformed_operation
+            # Broadcast operations to other users
+            await self._broadcast_operations(document_id, applied, user_id)
 
-            except Exception as e:
-                logger.error(f"Failed to apply operation to document {document_id}: {str(e)}")
-                return None
+            return applied
+
+    def _take_snapshot(self, doc_state: DocumentState) -> DocumentSnapshot:
+        """Compact the rope, store a snapshot and trim the operation log"""
+
+        # Bring every cursor up to date before the operations it needs are trimmed
+        for cursor_user_id in list(doc_state.cursors):
+            self._resolve_cursor(doc_state, cursor_user_id)
+
+        doc_state.buffer.compact()
+        doc_state.snapshot = DocumentSnapshot(
+            version=doc_state.version,
+            content=doc_state.content,
+            taken_at=datetime.utcnow()
+        )
+        doc_state.operations_since_snapshot = 0
+        if len(doc_state.operations) > self.history_size:
+            del doc_state.operations[:-self.history_size]
+
+        return doc_state.snapshot
+
+    def _resolve_cursor(self, doc_state: DocumentState, user_id: str) -> Optional[CursorPosition]:
+        """Transform a stored cursor through the operations applied since it was set"""
+
+        cursor = doc_state.cursors.get(user_id)
+        if cursor is None:
+            return None
+
+        behind = doc_state.version - doc_state.cursor_versions.get(user_id, doc_state.version)
+        if behind <= 0:
+            return cursor
+
+        if behind > len(doc_state.operations):
+            # Operations were trimmed; clamp rather than guess
+            length = doc_state.content_length
+            cursor.start_position = min(cursor.start_position, length)
+            cursor.end_position = min(cursor.end_position, length)
+        else:
+            for operation in doc_state.operations[-behind:]:
+                if operation.user_id != user_id:
+                    cursor = OperationalTransform.transform_cursor_position(cursor, operation)
+
+        doc_state.cursors[user_id] = cursor
+        doc_state.cursor_versions[user_id] = doc_state.version
+        return cursor
 
     async def update_cursor(
         self,
@@ -389,42 +511,55 @@ class CollaborativeDocumentManager:
     ):
         """Update user cursor position"""
 
-        async with self.lock:
-            if document_id in self.documents:
-                self.documents[document_id].cursors[cursor.user_id] = cursor
+        if document_id not in self.documents:
+            return
 
-                # Broadcast cursor update to other users
-                await self._broadcast_cursor_update(document_id, cursor)
+        async with self._document_lock(document_id):
+            doc_state = self.documents[document_id]
+            doc_state.cursors[cursor.user_id] = cursor
+            doc_state.cursor_versions[cursor.user_id] = doc_state.version
+
+            # Broadcast cursor update to other users
+            await self._broadcast_cursor_update(document_id, cursor)
 
-    async def _broadcast_operation(
+    async def _broadcast_operations(
         self,
         document_id: str,
-        operation: DocumentOperation,
+        operations: List[DocumentOperation],
         sender_user_id: str
     ):
-        """Broadcast operation to other document collaborators"""
+        """Broadcast operations to other document collaborators"""
 
         channel = f"doc_{document_id}"
+        doc_state = self.documents[document_id]
+
+        encoded = [
+            {
+                "id": operation.id,
+                "type": operation.type.value,
+                "position": operation.position,
+                "content": operation.content,
+                "length": operation.length,
+                "attributes": operation.attributes,
+                "timestamp": operation.timestamp.isoformat()
+            }
+            for operation in operations
+        ]
+
+        payload = {"document_id": document_id}
+        if len(encoded) == 1:
+            payload["operation"] = encoded[0]
+        else:
+            payload["operations"] = encoded
+        payload["document_version"] = doc_state.version
+        payload["content_length"] = doc_state.content_length
 
         message = RealtimeMessage(
-            id=operation.id,
+            id=operations[-1].id,
             type=MessageType.DOCUMENT_EDIT,
             sender_id=sender_user_id,
             channel=channel,
-            payload={
-                "document_id": document_id,
-                "operation": {
-                    "id": operation.id,
-                    "type": operation.type.value,
-                    "position": operation.position,
-                    "content": operation.content,
-                    "length": operation.length,
-                    "attributes": operation.attributes,
-                    "timestamp": operation.timestamp.isoformat()
-                },
-                "document_version": self.documents[document_id].version,
-                "content_length": len(self.documents[document_id].content)
-            }
+            payload=payload
         )
 
         await websocket_manager.broadcast_to_channel(
@@ -476,10 +611,10 @@ class CollaborativeDocumentManager:
     async def lock_document(self, document_id: str, user_id: str) -> bool:
         """Lock document for exclusive editing"""
 
-        async with self.lock:
-            if document_id not in self.documents:
-                return False
+        if document_id not in self.documents:
+            return False
 
+        async with self._document_lock(document_id):
             doc_state = self.documents[document_id]
 
             if doc_state.locked_by and doc_state.locked_by != user_id:
@@ -511,10 +646,10 @@ class CollaborativeDocumentManager:
     async def unlock_document(self, document_id: str, user_id: str) -> bool:
         """Unlock document"""
 
-        async with self.lock:
-            if document_id not in self.documents:
-                return False
+        if document_id not in self.documents:
+            return False
 
+        async with self._document_lock(document_id):
             doc_state = self.documents[document_id]
 
             if doc_state.locked_by != user_id:
@@ -553,7 +688,7 @@ class CollaborativeDocumentManager:
         doc_state = self.documents[document_id]
 
         for user_id, user_data in doc_state.active_users.items():
-            cursor = doc_state.cursors.get(user_id)
+            cursor = self._resolve_cursor(doc_state, user_id)
             collaborators.append({
                 "user_id": user_id,
                 "user_info": user_data.get("user_info", {}),
@@ -576,10 +711,15 @@ class CollaborativeDocumentManager:
         doc_state = self.documents[document_id]
 
         try:
+            async with self._document_lock(document_id):
+                snapshot = doc_state.snapshot
+                if snapshot is None or snapshot.version != doc_state.version:
+                    snapshot = self._take_snapshot(doc_state)
+
             # Here you would save to database
-            # await save_to_database(document_id, doc_state.content, doc_state.version)
+            # await save_to_database(document_id, snapshot.content, snapshot.version)
 
-            logger.info(f"Saved document {document_id} version {doc_state.version}")
+            logger.info(f"Saved document {document_id} version {snapshot.version}")
             return True
 
         except Exception as e:
@@ -4,8 +4,12 @@ Advanced notification management with real-time delivery
 """
 
 import asyncio
+import heapq
+import itertools
 import logging
-from typing import Dict, List, Any, Optional, Set
+import uuid
+from bisect import bisect_left, insort
+from typing import Dict, List, Any, Optional, Set, Tuple
 from datetime import datetime, timedelta
 from dataclasses import dataclass
 from enum import Enum
@@ -101,12 +105,194 @@ class Notification:
             self.data = {}
 
 
+# Sort key in a user's time index: (created_at timestamp, sequence, notification id)
+OrderKey = Tuple[float, int, str]
+
+
+class UserNotificationStore:
+    """
+    One user's notifications, indexed for the operations the API performs.
+
+    - ``by_id``: notification id -> (order key, notification) for O(1) lookup
+    - ``order``: order keys sorted oldest first; cursor pagination bisects it
+    - ``unread_order``: order keys of notifications not yet read, sorted the
+      same way, so unread-only pages are a bisect and a slice
+    - ``unread``: unread, undismissed, unexpired count kept current on write
+
+    Removals leave the key in ``order`` and are skipped on read; the index is
+    compacted once stale keys outnumber live ones, so removal stays amortized
+    O(1) instead of shifting the list.
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self.by_id: Dict[str, Tuple[OrderKey, Notification]] = {}
+        self.order: List[OrderKey] = []
+        self.head = 0  # keys before head were evicted
+        self.unread_order: List[OrderKey] = []
+        self.unread = 0
+
+    def __len__(self) -> int:
+        return len(self.by_id)
+
+    @staticmethod
+    def counts_as_unread(notification: Notification) -> bool:
+        return not notification.is_read and not notification.is_dismissed
+
+    def add(self, notification: Notification, sequence: int) -> List[Notification]:
+        """Index a notification; returns the oldest ones evicted to stay within max_size"""
+        key = (notification.created_at.timestamp(), sequence, notification.id)
+        if self.order and key < self.order[-1]:
+            # Out-of-order timestamps are rare; keep the index sorted anyway
+            self.order.insert(bisect_left(self.order, key, self.head), key)
+        else:
+            self.order.append(key)
+        self.by_id[notification.id] = (key, notification)
+        if not notification.is_read:
+            insort(self.unread_order, key)
+        if self.counts_as_unread(notification):
+            self.unread += 1
+
+        evicted = []
+        while len(self.by_id) > self.max_size:
+            oldest = self.order[self.head]
+            self.head += 1
+            entry = self.by_id.get(oldest[2])
+            if entry is not None and entry[0] == oldest:
+                evicted.append(self.remove(oldest[2]))
+        self._maybe_compact()
+        return evicted
+
+    def get(self, notification_id: str) -> Optional[Notification]:
+        entry = self.by_id.get(notification_id)
+        return entry[1] if entry else None
+
+    def remove(self, notification_id: str) -> Optional[Notification]:
+        entry = self.by_id.pop(notification_id, None)
+        if entry is None:
+            return None
+        notification = entry[1]
+        if not notification.is_read:
+            self._drop_unread(entry[0])
+        if self.counts_as_unread(notification):
+            self.unread -= 1
+        self._maybe_compact()
+        return notification
+
+    def mark_read(self, notification_id: str) -> bool:
+        notification = self.get(notification_id)
+        if notification is None:
+            return False
+        if not notification.is_read:
+            self._drop_unread(self.by_id[notification_id][0])
+        if self.counts_as_unread(notification):
+            self.unread -= 1
+        notification.is_read = True
+        notification.read_at = datetime.utcnow()
+        return True
+
+    def dismiss(self, notification_id: str) -> bool:
+        notification = self.get(notification_id)
+        if notification is None:
+            return False
+        if self.counts_as_unread(notification):
+            self.unread -= 1
+        notification.is_dismissed = True
+        return True
+
+    def page(
+        self,
+        limit: int,
+        before: Optional[OrderKey] = None,
+        include_read: bool = True
+    ) -> Tuple[List[Notification], Optional[OrderKey]]:
+        """
+        Newest-first page of notifications older than ``before``. Unread-only
+        pages slice ``unread_order`` and never touch read notifications.
+
+        Returns:
+            The page and the order key to pass as ``before`` for the next page
+            (None when there are no older notifications)
+        """
+        if not include_read:
+            end = bisect_left(self.unread_order, before) if before else len(self.unread_order)
+            start = max(0, end - limit)
+            keys = self.unread_order[start:end][::-1]
+            next_key = keys[-1] if keys and start > 0 else None
+            return [self.by_id[key[2]][1] for key in keys], next_key
+
+        end = bisect_left(self.order, before, self.head) if before else len(self.order)
+        results: List[Notification] = []
+        index = end - 1
+        while index >= self.head and len(results) < limit:
+            key = self.order[index]
+            entry = self.by_id.get(key[2])
+            if entry is not None and entry[0] == key:
+                results.append(entry[1])
+            index -= 1
+
+        next_key = None
+        if len(results) == limit and index >= self.head:
+            next_key = self.by_id[results[-1].id][0]
+        return results, next_key
+
+    def _drop_unread(self, key: OrderKey):
+        index = bisect_left(self.unread_order, key)
+        if index < len(self.unread_order) and self.unread_order[index] == key:
+            del self.unread_order[index]
+
+    def _maybe_compact(self):
+        if len(self.order) - self.head > 2 * len(self.by_id) + 64:
+            self.order = [
+                key for key in self.order[self.head:]
+                if key[2] in self.by_id and self.by_id[key[2]][0] == key
+            ]
+            self.head = 0
+
+
+def encode_cursor(key: OrderKey) -> str:
+    return f"{key[0]!r}:{key[1]}"
+
+
+def decode_cursor(cursor: str) -> OrderKey:
+    """Order key bound for a cursor; raises ValueError on malformed input"""
+    timestamp, sequence = cursor.split(":", 1)
+    # "" sorts before any id, so the cursor's own notification is excluded
+    return (float(timestamp), int(sequence), "")
+
+
 class NotificationService:
-    """Service for managing notifications"""
+    """
+    Service for managing notifications.
+
+    Each user's notifications live in a UserNotificationStore. Expiry is a
+    min-heap of (expires_at, sequence, user_id, notification_id) shared by all
+    users and drained up to the current time before each read or write, so
+    nothing ever scans a user's full list.
+    """
 
-    def __init__(self):
-        self.notification_cache: Dict[str, List[Notification]] = {}  # user_id -> notifications
+    def __init__(self, max_notifications_per_user: int = 10000):
+        self.notification_cache: Dict[str, UserNotificationStore] = {}  # user_id -> store
         self.notification_templates = self._initialize_templates()
+        self.max_notifications_per_user = max_notifications_per_user
+        self._expiry_heap: List[Tuple[datetime, int, str, str]] = []
+        self._sequence = itertools.count()
+
+    def _expire(self, now: Optional[datetime] = None) -> int:
+        """Remove every notification whose expiry has passed"""
+        now = now or datetime.utcnow()
+        removed = 0
+        heap = self._expiry_heap
+        while heap and heap[0][0] <= now:
+            _, _, user_id, notification_id = heapq.heappop(heap)
+            store = self.notification_cache.get(user_id)
+            if store is None:
+                continue
+            if store.remove(notification_id) is not None:
+                removed += 1
+            if not store:
+                del self.notification_cache[user_id]
+        return removed
 
     def _initialize_templates(self) -> Dict[NotificationType, Dict[str, Any]]:
         """Initialize notification templates"""
@@ -260,7 +446,7 @@ class NotificationService:
 
         # Create notification
         notification = Notification(
-            id=f"notif_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}_{recipient_id}",
+            id=f"notif_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}_{recipient_id}_{uuid.uuid4().hex[:8]}",
             type=notification_type,
             priority=custom_priority or template.get("priority", NotificationPriority.MEDIUM),
             title=title,
@@ -277,14 +463,20 @@ class NotificationService:
         )
 
         # Cache notification
-        if recipient_id not in self.notification_cache:
-            self.notification_cache[recipient_id] = []
-
-        self.notification_cache[recipient_id].append(notification)
-
-        # Keep only last 100 notifications per user
-        if len(self.notification_cache[recipient_id]) > 100:
-            self.notification_cache[recipient_id] = self.notification_cache[recipient_id][-100:]
+        self._expire()
+        store = self.notification_cache.get(recipient_id)
+        if store is None:
+            store = self.notification_cache[recipient_id] = UserNotificationStore(
+                self.max_notifications_per_user
+            )
+
+        sequence = next(self._sequence)
+        store.add(notification, sequence)
+        if notification.expires_at:
+            heapq.heappush(
+                self._expiry_heap,
+                (notification.expires_at, sequence, recipient_id, notification.id)
+            )
 
         # Send real-time notification
         await self._send_realtime_notification(notification)
@@ -348,93 +540,70 @@ class NotificationService:
     ) -> List[Notification]:
         """Get notifications for a user"""
 
-        if user_id not in self.notification_cache:
-            return []
+        notifications, _ = await self.get_notification_page(user_id, include_read, limit)
+        return notifications
 
-        notifications = self.notification_cache[user_id]
+    async def get_notification_page(
+        self,
+        user_id: str,
+        include_read: bool = True,
+        limit: int = 50,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[Notification], Optional[str]]:
+        """
+        Newest-first page of a user's notifications.
 
-        # Filter based on read status
-        if not include_read:
-            notifications = [n for n in notifications if not n.is_read]
+        Args:
+            cursor: ``next_cursor`` from the previous page
 
-        # Filter expired notifications
-        current_time = datetime.utcnow()
-        notifications = [
-            n for n in notifications
-            if not n.expires_at or n.expires_at > current_time
-        ]
+        Returns:
+            (notifications, next_cursor); next_cursor is None on the last page
 
-        # Sort by creation time (newest first) and limit
-        notifications.sort(key=lambda x: x.created_at, reverse=True)
+        Raises:
+            ValueError: If the cursor is malformed
+        """
 
-        return notifications[:limit]
+        before = decode_cursor(cursor) if cursor else None
+
+        self._expire()
+        store = self.notification_cache.get(user_id)
+        if store is None:
+            return [], None
+
+        notifications, next_key = store.page(limit, before=before, include_read=include_read)
+        return notifications, encode_cursor(next_key) if next_key else None
 
     async def mark_notification_read(self, notification_id: str, user_id: str) -> bool:
         """Mark a notification as read"""
 
-        if user_id not in self.notification_cache:
+        store = self.notification_cache.get(user_id)
+        if store is None or not store.mark_read(notification_id):
             return False
 
-        for notification in self.notification_cache[user_id]:
-            if notification.id == notification_id:
-                notification.is_read = True
-                notification.read_at = datetime.utcnow()
-                logger.info(f"Marked notification {notification_id} as read for user {user_id}")
-                return True
-
-        return False
+        logger.info(f"Marked notification {notification_id} as read for user {user_id}")
+        return True
 
     async def dismiss_notification(self, notification_id: str, user_id: str) -> bool:
         """Dismiss a notification"""
 
-        if user_id not in self.notification_cache:
+        store = self.notification_cache.get(user_id)
+        if store is None or not store.dismiss(notification_id):
             return False
 
-        for i, notification in enumerate(self.notification_cache[user_id]):
-            if notification.id == notification_id:
-                notification.is_dismissed = True
-                logger.info(f"Dismissed notification {notification_id} for user {user_id}")
-                return True
-
-        return False
+        logger.info(f"Dismissed notification {notification_id} for user {user_id}")
+        return True
 
     async def get_unread_count(self, user_id: str) -> int:
         """Get count of unread notifications for a user"""
 
-        if user_id not in self.notification_cache:
-            return 0
-
-        current_time = datetime.utcnow()
-        unread_count = 0
-
-        for notification in self.notification_cache[user_id]:
-            if (not notification.is_read and
-                not notification.is_dismissed and
-                (not notification.expires_at or notification.expires_at > current_time)):
-                unread_count += 1
-
-        return unread_count
+        self._expire()
+        store = self.notification_cache.get(user_id)
+        return store.unread if store else 0
 
     async def cleanup_expired_notifications(self):
         """Remove expired notifications from cache"""
 
-        current_time = datetime.utcnow()
-        cleaned_count = 0
-
-        for user_id in list(self.notification_cache.keys()):
-            original_count = len(self.notification_cache[user_id])
-
-            # Remove expired notifications
-            self.notification_cache[user_id] = [
-                n for n in self.notification_cache[user_id]
-                if not n.expires_at or n.expires_at > current_time
-            ]
-
-            cleaned_count += original_count - len(self.notification_cache[user_id])
-
-            # Remove empty user caches
-            if not self.notification_cache[user_id]:
-                del self.notification_cache[user_id]
+        cleaned_count = self._expire()
 
         if cleaned_count > 0:
             logger.info(f"Cleaned up {cleaned_count} expired notifications")
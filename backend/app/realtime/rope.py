@@ -0,0 +1,127 @@
+"""
+Rope for collaborative document content
+A chunked rope: the text is a list of short string chunks plus a lazily
+rebuilt prefix-length index, so an edit touches one chunk instead of copying
+the whole document.
+"""
+
+from bisect import bisect_right
+from itertools import accumulate
+from typing import List, Optional, Tuple
+
+
+class Rope:
+    """
+    Mutable text made of bounded-size chunks.
+
+    Edits copy at most one chunk (``max_chunk`` characters) plus the chunk
+    index; locating a position is a binary search over cumulative lengths.
+    The full string is only built on demand and cached until the next edit.
+    """
+
+    def __init__(self, text: str = "", chunk_size: int = 2048):
+        """
+        Args:
+            text: Initial content
+            chunk_size: Target chunk length; chunks split at twice this size
+        """
+        self.chunk_size = max(16, chunk_size)
+        self.max_chunk = self.chunk_size * 2
+        self._chunks: List[str] = self._split(text)
+        self._length = len(text)
+        self._offsets: Optional[List[int]] = None
+        self._text: Optional[str] = text
+
+    def _split(self, text: str) -> List[str]:
+        return [text[i:i + self.chunk_size] for i in range(0, len(text), self.chunk_size)] or [""]
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __str__(self) -> str:
+        return self.to_string()
+
+    @property
+    def chunk_count(self) -> int:
+        return len(self._chunks)
+
+    def _locate(self, position: int) -> Tuple[int, int]:
+        """(chunk index, offset within chunk) for a position in [0, len]"""
+        if self._offsets is None:
+            self._offsets = list(accumulate(len(chunk) for chunk in self._chunks))
+        index = bisect_right(self._offsets, position)
+        if index >= len(self._chunks):
+            # Position == len: the end of the last chunk
+            index = len(self._chunks) - 1
+        start = self._offsets[index] - len(self._chunks[index])
+        return index, position - start
+
+    def _touch(self):
+        self._offsets = None
+        self._text = None
+
+    def insert(self, position: int, text: str) -> None:
+        """Insert ``text`` at ``position`` (clamped to the document)"""
+        if not text:
+            return
+        position = min(max(position, 0), self._length)
+        index, offset = self._locate(position)
+        chunk = self._chunks[index]
+        updated = chunk[:offset] + text + chunk[offset:]
+
+        if len(updated) > self.max_chunk:
+            self._chunks[index:index + 1] = self._split(updated)
+        else:
+            self._chunks[index] = updated
+
+        self._length += len(text)
+        self._touch()
+
+    def delete(self, position: int, length: int) -> str:
+        """Delete ``length`` characters at ``position``; returns the removed text"""
+        position = min(max(position, 0), self._length)
+        length = min(max(length, 0), self._length - position)
+        if not length:
+            return ""
+
+        first, first_offset = self._locate(position)
+        last, last_offset = self._locate(position + length)
+        removed = self.slice(position, position + length)
+
+        merged = self._chunks[first][:first_offset] + self._chunks[last][last_offset:]
+        self._chunks[first:last + 1] = [merged] if merged or len(self._chunks) == last - first + 1 else []
+        if not self._chunks:
+            self._chunks = [""]
+
+        self._length -= length
+        self._touch()
+        return removed
+
+    def slice(self, start: int, end: int) -> str:
+        """Text in [start, end) without materializing the whole document"""
+        start = min(max(start, 0), self._length)
+        end = min(max(end, start), self._length)
+        if start == end:
+            return ""
+        if self._text is not None:
+            return self._text[start:end]
+
+        first, first_offset = self._locate(start)
+        last, last_offset = self._locate(end)
+        if first == last:
+            return self._chunks[first][first_offset:last_offset]
+        return "".join(
+            [self._chunks[first][first_offset:]]
+            + self._chunks[first + 1:last]
+            + [self._chunks[last][:last_offset]]
+        )
+
+    def to_string(self) -> str:
+        if self._text is None:
+            self._text = "".join(self._chunks)
+        return self._text
+
+    def compact(self) -> None:
+        """Re-chunk to the target size, dropping empty and undersized chunks"""
+        self._chunks = self._split(self.to_string())
+        self._offsets = None
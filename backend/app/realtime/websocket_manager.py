@@ -6,13 +6,17 @@ Manages real-time WebSocket connections for collaborative features
 import asyncio
 import json
 import logging
-from typing import Dict, List, Set, Any, Optional
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, List, Set, Any, Optional
 from datetime import datetime
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass
 from enum import Enum
 from fastapi import WebSocket, WebSocketDisconnect
 import uuid
 
+from app.realtime.backplane import Backplane, make_envelope, ORGANIZATION, CHANNEL, USER
+
 logger = logging.getLogger(__name__)
 
 
@@ -69,6 +73,13 @@ class MessageType(str, Enum):
     WORKFLOW_COMPLETED = "workflow_completed"
     TASK_COMPLETED = "task_completed"
 
+    # Streamed AI responses
+    AI_STREAM_START = "ai_stream_start"
+    AI_STREAM_DELTA = "ai_stream_delta"
+    AI_STREAM_FIELD = "ai_stream_field"
+    AI_STREAM_END = "ai_stream_end"
+    AI_STREAM_ERROR = "ai_stream_error"
+
 
 class UserStatus(str, Enum):
     """User presence status"""
@@ -99,6 +110,155 @@ class RealtimeMessage:
             self.payload = {}
 
 
+def encode_message(message: RealtimeMessage) -> str:
+    """Serialize a message to its wire format (JSON text frame)"""
+    return json.dumps({
+        'id': message.id,
+        'type': message.type,
+        'sender_id': message.sender_id,
+        'target_id': message.target_id,
+        'channel': message.channel,
+        'payload': message.payload,
+        'timestamp': message.timestamp.isoformat(),
+        'organization_id': message.organization_id
+    }, default=str)
+
+
+def _percentile(sorted_samples: List[float], fraction: float) -> float:
+    if not sorted_samples:
+        return 0.0
+    index = min(len(sorted_samples) - 1, int(round(fraction * (len(sorted_samples) - 1))))
+    return sorted_samples[index]
+
+
+class BroadcastMetrics:
+    """Counters and recent latency samples for outbound delivery"""
+
+    def __init__(self, sample_size: int = 1024):
+        self.broadcasts = 0
+        self.frames_enqueued = 0
+        self.frames_sent = 0
+        self.frames_dropped = 0
+        self.send_failures = 0
+        self.evictions = 0
+        self.fanout_ms: Deque[float] = deque(maxlen=sample_size)
+        self.delivery_ms: Deque[float] = deque(maxlen=sample_size)
+
+    def record_broadcast(self, seconds: float, enqueued: int, dropped: int):
+        self.broadcasts += 1
+        self.frames_enqueued += enqueued
+        self.frames_dropped += dropped
+        self.fanout_ms.append(seconds * 1000)
+
+    def record_delivery(self, seconds: float):
+        self.frames_sent += 1
+        self.delivery_ms.append(seconds * 1000)
+
+    def summary(self) -> Dict[str, Any]:
+        fanout = sorted(self.fanout_ms)
+        delivery = sorted(self.delivery_ms)
+        return {
+            "broadcasts": self.broadcasts,
+            "frames_enqueued": self.frames_enqueued,
+            "frames_sent": self.frames_sent,
+            "frames_dropped": self.frames_dropped,
+            "send_failures": self.send_failures,
+            "slow_consumer_evictions": self.evictions,
+            "fanout_ms_p50": round(_percentile(fanout, 0.5), 3),
+            "fanout_ms_p99": round(_percentile(fanout, 0.99), 3),
+            "delivery_ms_p50": round(_percentile(delivery, 0.5), 3),
+            "delivery_ms_p99": round(_percentile(delivery, 0.99), 3)
+        }
+
+
+class ConnectionSender:
+    """
+    Bounded outbound queue and writer task for one WebSocket.
+
+    Broadcasts only enqueue, so a slow client delays nobody but itself. When a
+    client falls behind far enough to fill its queue, frames for it are
+    dropped; after ``drop_limit`` drops it is handed to ``on_evict``.
+    """
+
+    def __init__(
+        self,
+        connection_id: str,
+        websocket: WebSocket,
+        metrics: BroadcastMetrics,
+        on_evict: Callable[[str, str], None],
+        on_sent: Optional[Callable[[], None]] = None,
+        max_queue: int = 256,
+        send_timeout: float = 10.0,
+        drop_limit: int = 32
+    ):
+        self.connection_id = connection_id
+        self.websocket = websocket
+        self.metrics = metrics
+        self.on_evict = on_evict
+        self.on_sent = on_sent
+        self.send_timeout = send_timeout
+        self.drop_limit = drop_limit
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+        self.dropped = 0
+        self.closed = False
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    def stop(self):
+        self.closed = True
+        if self._task and self._task is not asyncio.current_task():
+            self._task.cancel()
+
+    def offer(self, frame: str) -> bool:
+        """Enqueue without waiting; False (and a drop) when the queue is full"""
+        if self.closed:
+            return False
+        try:
+            self.queue.put_nowait((frame, time.perf_counter()))
+            return True
+        except asyncio.QueueFull:
+            self._record_drop()
+            return False
+
+    async def send(self, frame: str, timeout: float) -> bool:
+        """Enqueue, waiting up to ``timeout`` for room (back-pressure on the caller)"""
+        if self.closed:
+            return False
+        try:
+            await asyncio.wait_for(self.queue.put((frame, time.perf_counter())), timeout)
+        except asyncio.TimeoutError:
+            self.metrics.frames_dropped += 1
+            self._record_drop()
+            return False
+        self.metrics.frames_enqueued += 1
+        return True
+
+    def _record_drop(self):
+        self.dropped += 1
+        if self.dropped >= self.drop_limit and not self.closed:
+            self.closed = True
+            self.metrics.evictions += 1
+            self.on_evict(self.connection_id, "slow consumer")
+
+    async def _run(self):
+        while True:
+            frame, enqueued_at = await self.queue.get()
+            try:
+                await asyncio.wait_for(self.websocket.send_text(frame), self.send_timeout)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.closed = True
+                self.metrics.send_failures += 1
+                self.on_evict(self.connection_id, f"send failed: {e}")
+                return
+            self.metrics.record_delivery(time.perf_counter() - enqueued_at)
+            if self.on_sent:
+                self.on_sent()
+
+
 @dataclass
 class ConnectedUser:
     """Connected user information"""
@@ -110,6 +270,7 @@ class ConnectedUser:
     channels: Set[str] = None
     last_activity: datetime = None
     user_info: Dict[str, Any] = None
+    sender: Optional[ConnectionSender] = None
 
     def __post_init__(self):
         if self.channels is None:
@@ -123,7 +284,14 @@ class ConnectedUser:
 class WebSocketManager:
     """Manages WebSocket connections and real-time messaging"""
 
-    def __init__(self):
+    def __init__(
+        self,
+        outbound_queue_size: int = 256,
+        send_timeout: float = 10.0,
+        enqueue_timeout: float = 1.0,
+        slow_consumer_drop_limit: int = 32,
+        backplane: Optional[Backplane] = None
+    ):
         # Active connections: connection_id -> ConnectedUser
         self.connections: Dict[str, ConnectedUser] = {}
 
@@ -136,12 +304,57 @@ class WebSocketManager:
         # Channel subscriptions: channel -> Set[connection_id]
         self.channel_subscriptions: Dict[str, Set[str]] = {}
 
-        # Message history for channels (in-memory cache)
+        # Message history for channels (in-memory cache, used without a backplane)
         self.channel_history: Dict[str, List[RealtimeMessage]] = {}
 
+        # Cross-worker routing and shared channel history (see attach_backplane)
+        self.backplane = backplane
+        self.worker_id = uuid.uuid4().hex
+
         # Lock for thread-safe operations
         self.lock = asyncio.Lock()
 
+        # Outbound delivery: each connection gets a bounded queue drained by its
+        # own writer task, so broadcasts never wait on a single client
+        self.outbound_queue_size = outbound_queue_size
+        self.send_timeout = send_timeout
+        self.enqueue_timeout = enqueue_timeout
+        self.slow_consumer_drop_limit = slow_consumer_drop_limit
+        self.metrics = BroadcastMetrics()
+        self._evicting: Set[str] = set()
+
+    async def attach_backplane(self, backplane: Backplane):
+        """Route broadcasts through ``backplane`` so every worker's sockets receive them"""
+
+        await backplane.start(self._on_backplane_envelopes)
+        self.backplane = backplane
+        logger.info(f"Realtime backplane attached ({type(backplane).__name__}, worker {self.worker_id})")
+
+    async def _on_backplane_envelopes(self, envelopes: List[Dict[str, Any]]):
+        """Deliver envelopes published by other workers to local sockets"""
+
+        for envelope in envelopes:
+            if envelope.get("o") == self.worker_id:
+                continue
+            kind, target = envelope["k"], envelope["t"]
+            if kind == ORGANIZATION:
+                connection_ids = self.organization_connections.get(target, ())
+            elif kind == CHANNEL:
+                connection_ids = self.channel_subscriptions.get(target, ())
+            elif kind == USER:
+                connection_ids = self.user_connections.get(target, ())
+            else:
+                continue
+            if connection_ids:
+                self._fan_out(connection_ids, envelope["f"], set(envelope.get("x", ())))
+
+    async def _publish(self, kind: str, target: str, frame: str,
+                       exclude_connections: Optional[Set[str]] = None):
+        if self.backplane is not None:
+            await self.backplane.publish(
+                make_envelope(self.worker_id, kind, target, frame, exclude_connections)
+            )
+
     async def connect(
         self,
         websocket: WebSocket,
@@ -163,6 +376,17 @@ class WebSocketManager:
                 connection_id=connection_id,
                 user_info=user_info or {}
             )
+            connected_user.sender = ConnectionSender(
+                connection_id,
+                websocket,
+                self.metrics,
+                on_evict=self._evict,
+                on_sent=lambda: setattr(connected_user, 'last_activity', datetime.utcnow()),
+                max_queue=self.outbound_queue_size,
+                send_timeout=self.send_timeout,
+                drop_limit=self.slow_consumer_drop_limit
+            )
+            connected_user.sender.start()
 
             # Store connection
             self.connections[connection_id] = connected_user
@@ -224,8 +448,10 @@ class WebSocketManager:
             for channel in connected_user.channels.copy():
                 await self._leave_channel_internal(connection_id, channel)
 
-            # Remove connection
+            # Remove connection and stop its writer
             del self.connections[connection_id]
+            if connected_user.sender:
+                connected_user.sender.stop()
 
             # Update user mappings
             if user_id in self.user_connections:
@@ -259,48 +485,50 @@ class WebSocketManager:
                     )
                 )
 
-    async def send_to_connection(self, connection_id: str, message: RealtimeMessage):
-        """Send message to specific connection"""
+    async def send_to_connection(
+        self,
+        connection_id: str,
+        message: Optional[RealtimeMessage],
+        frame: Optional[str] = None
+    ):
+        """
+        Queue a message for a specific connection.
+
+        Waits up to ``enqueue_timeout`` when the connection's queue is full;
+        the frame is dropped after that. Pass a pre-encoded ``frame`` to skip
+        serialization.
+        """
 
         if connection_id not in self.connections:
             logger.warning(f"Connection {connection_id} not found")
             return False
 
         connected_user = self.connections[connection_id]
-
-        try:
-            # Convert message to dict and send
-            message_dict = asdict(message)
-            message_dict['timestamp'] = message.timestamp.isoformat()
-
-            await connected_user.websocket.send_text(json.dumps(message_dict))
-
-            # Update last activity
-            connected_user.last_activity = datetime.utcnow()
-
-            return True
-
-        except Exception as e:
-            logger.error(f"Failed to send message to {connection_id}: {str(e)}")
-            # Connection is likely broken, remove it
-            await self.disconnect(connection_id)
+        if connected_user.sender is None:
             return False
 
+        return await connected_user.sender.send(
+            frame or encode_message(message), self.enqueue_timeout
+        )
+
     async def send_to_user(self, user_id: str, message: RealtimeMessage):
         """Send message to all connections of a specific user"""
 
+        frame = encode_message(message)
+        await self._publish(USER, user_id, frame)
+
         if user_id not in self.user_connections:
-            logger.warning(f"User {user_id} not connected")
+            if self.backplane is None:
+                logger.warning(f"User {user_id} not connected")
             return False
 
-        success_count = 0
         connection_ids = list(self.user_connections[user_id])
+        results = await asyncio.gather(*(
+            self.send_to_connection(connection_id, message, frame)
+            for connection_id in connection_ids
+        ))
 
-        for connection_id in connection_ids:
-            if await self.send_to_connection(connection_id, message):
-                success_count += 1
-
-        return success_count > 0
+        return any(results)
 
     async def broadcast_to_organization(
         self,
@@ -308,22 +536,26 @@ class WebSocketManager:
         message: RealtimeMessage,
         exclude_connections: Optional[Set[str]] = None
     ):
-        """Broadcast message to all users in an organization"""
+        """
+        Broadcast message to all users in an organization.
 
-        if organization_id not in self.organization_connections:
-            logger.warning(f"No connections found for organization {organization_id}")
-            return 0
+        Returns the number of local connections reached; with a backplane the
+        message also goes to every other worker.
+        """
 
-        exclude_connections = exclude_connections or set()
-        success_count = 0
-        connection_ids = list(self.organization_connections[organization_id])
+        frame = encode_message(message)
+        await self._publish(ORGANIZATION, organization_id, frame, exclude_connections)
 
-        for connection_id in connection_ids:
-            if connection_id not in exclude_connections:
-                if await self.send_to_connection(connection_id, message):
-                    success_count += 1
+        if organization_id not in self.organization_connections:
+            if self.backplane is None:
+                logger.warning(f"No connections found for organization {organization_id}")
+            return 0
 
-        return success_count
+        return self._fan_out(
+            self.organization_connections[organization_id],
+            frame,
+            exclude_connections
+        )
 
     async def broadcast_to_channel(
         self,
@@ -334,12 +566,19 @@ class WebSocketManager:
     ):
         """Broadcast message to all subscribers of a channel"""
 
+        frame = encode_message(message)
+        if self.backplane is not None:
+            if save_to_history:
+                await self.backplane.append_history(channel, frame)
+            await self._publish(CHANNEL, channel, frame, exclude_connections)
+
         if channel not in self.channel_subscriptions:
-            logger.warning(f"No subscribers found for channel {channel}")
+            if self.backplane is None:
+                logger.warning(f"No subscribers found for channel {channel}")
             return 0
 
         # Save to channel history
-        if save_to_history:
+        if save_to_history and self.backplane is None:
             if channel not in self.channel_history:
                 self.channel_history[channel] = []
 
@@ -349,16 +588,80 @@ class WebSocketManager:
             if len(self.channel_history[channel]) > 100:
                 self.channel_history[channel] = self.channel_history[channel][-100:]
 
+        return self._fan_out(
+            self.channel_subscriptions[channel],
+            frame,
+            exclude_connections
+        )
+
+    def _fan_out(
+        self,
+        connection_ids: Set[str],
+        frame: str,
+        exclude_connections: Optional[Set[str]] = None
+    ) -> int:
+        """
+        Enqueue one pre-encoded frame on every connection's outbound queue.
+
+        Never awaits a socket: writers drain the queues concurrently, and a
+        full queue counts as a drop against that connection only.
+
+        Returns:
+            Number of connections the frame was queued for
+        """
+
+        started = time.perf_counter()
         exclude_connections = exclude_connections or set()
-        success_count = 0
-        connection_ids = list(self.channel_subscriptions[channel])
+        queued = dropped = 0
+
+        for connection_id in list(connection_ids):
+            if connection_id in exclude_connections:
+                continue
+            connected_user = self.connections.get(connection_id)
+            if connected_user is None or connected_user.sender is None:
+                continue
+            if connected_user.sender.offer(frame):
+                queued += 1
+            else:
+                dropped += 1
 
-        for connection_id in connection_ids:
-            if connection_id not in exclude_connections:
-                if await self.send_to_connection(connection_id, message):
-                    success_count += 1
+        self.metrics.record_broadcast(time.perf_counter() - started, queued, dropped)
+        return queued
 
-        return success_count
+    def _evict(self, connection_id: str, reason: str):
+        """Close and remove a connection whose writer failed or fell behind"""
+
+        if connection_id in self._evicting:
+            return
+        self._evicting.add(connection_id)
+        logger.warning(f"Evicting connection {connection_id}: {reason}")
+        asyncio.get_running_loop().create_task(self._close_evicted(connection_id))
+
+    async def _close_evicted(self, connection_id: str):
+        try:
+            connected_user = self.connections.get(connection_id)
+            if connected_user is not None:
+                try:
+                    # 1013: try again later
+                    await connected_user.websocket.close(code=1013)
+                except Exception:
+                    pass
+            await self.disconnect(connection_id)
+        finally:
+            self._evicting.discard(connection_id)
+
+    def get_broadcast_metrics(self) -> Dict[str, Any]:
+        """Fan-out latency, delivery latency and drop/eviction counters"""
+
+        queued = [
+            user.sender.queue.qsize() for user in self.connections.values() if user.sender
+        ]
+        return {
+            **self.metrics.summary(),
+            "connections": len(self.connections),
+            "max_queue_depth": max(queued, default=0),
+            "queue_capacity": self.outbound_queue_size
+        }
 
     async def join_channel(self, connection_id: str, channel: str):
         """Subscribe connection to a channel"""
@@ -384,7 +687,10 @@ class WebSocketManager:
         logger.info(f"Connection {connection_id} joined channel {channel}")
 
         # Send channel history to new subscriber
-        if channel in self.channel_history:
+        if self.backplane is not None:
+            for frame in await self.backplane.get_history(channel, 20):
+                await self.send_to_connection(connection_id, None, frame=frame)
+        elif channel in self.channel_history:
             for historical_message in self.channel_history[channel][-20:]:  # Last 20 messages
                 await self.send_to_connection(connection_id, historical_message)
 
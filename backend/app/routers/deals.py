@@ -8,7 +8,7 @@ from datetime import datetime, date
 from decimal import Decimal
 from fastapi import APIRouter, Depends, HTTPException, status, Query, UploadFile, File
 from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import and_, or_, func
+from sqlalchemy import and_, or_
 from pydantic import BaseModel, Field, validator
 
 from ..core.database import get_db
@@ -19,6 +19,7 @@ from ..models.deal import (
 )
 from ..auth.clerk_auth import ClerkUser, get_current_organization_user
 from ..auth.tenant_isolation import get_tenant_query, TenantAwareQuery
+from ..services.deal_analytics import DealAnalyticsService
 
 router = APIRouter(prefix="/api/deals", tags=["deals"])
 
@@ -651,118 +652,10 @@ async def get_deal_analytics(
     db: Session = Depends(get_db)
 ):
     """Get deal analytics and insights"""
-    # Base query
-    query = tenant_query.query(Deal)
-
-    # Calculate metrics
-    total_deals = query.count()
-    active_deals = query.filter(Deal.is_active == True).count()
-
-    # Pipeline value
-    pipeline_value = query.filter(
-        Deal.is_active == True
-    ).with_entities(func.sum(Deal.deal_value)).scalar() or Decimal('0')
-
-    # Average deal size
-    avg_deal_size = query.filter(
-        Deal.deal_value.isnot(None)
-    ).with_entities(func.avg(Deal.deal_value)).scalar() or Decimal('0')
-
-    # Win rate
-    closed_deals = query.filter(
-        Deal.stage.in_([DealStage.CLOSED_WON.value, DealStage.CLOSED_LOST.value])
-    ).count()
-
-    won_deals = query.filter(
-        Deal.stage == DealStage.CLOSED_WON.value
-    ).count()
-
-    win_rate = (won_deals / closed_deals * 100) if closed_deals > 0 else 0
-
-    # Deals by stage
-    deals_by_stage = {}
-    for stage in DealStage:
-        count = query.filter(Deal.stage == stage.value).count()
-        deals_by_stage[stage.value] = count
-
-    # Deals by priority
-    deals_by_priority = {}
-    for priority in DealPriority:
-        count = query.filter(Deal.priority == priority.value).count()
-        deals_by_priority[priority.value] = count
-
-    # Deals by industry
-    industry_stats = query.filter(
-        Deal.target_industry.isnot(None)
-    ).with_entities(
-        Deal.target_industry,
-        func.count(Deal.id)
-    ).group_by(Deal.target_industry).all()
-
-    deals_by_industry = {industry: count for industry, count in industry_stats}
-
-    # Monthly deal flow (last 12 months)
-    monthly_deal_flow = []
-    for i in range(11, -1, -1):
-        month_start = datetime.now().replace(day=1) - timedelta(days=i * 30)
-        month_end = (month_start + timedelta(days=32)).replace(day=1)
-
-        count = query.filter(
-            and_(
-                Deal.created_at >= month_start,
-                Deal.created_at < month_end
-            )
-        ).count()
-
-        monthly_deal_flow.append({
-            "month": month_start.strftime("%Y-%m"),
-            "count": count
-        })
-
-    # Top deal leads
-    lead_stats = query.filter(
-        Deal.deal_lead_id.isnot(None)
-    ).with_entities(
-        Deal.deal_lead_id,
-        func.count(Deal.id),
-        func.sum(Deal.deal_value)
-    ).group_by(Deal.deal_lead_id).order_by(
-        func.count(Deal.id).desc()
-    ).limit(5).all()
-
-    top_deal_leads = [
-        {"user_id": lead_id, "deal_count": count, "total_value": value or 0}
-        for lead_id, count, value in lead_stats
-    ]
-
-    # Average days to close
-    closed_deals_with_dates = query.filter(
-        and_(
-            Deal.stage == DealStage.CLOSED_WON.value,
-            Deal.initial_contact_date.isnot(None),
-            Deal.actual_close_date.isnot(None)
-        )
-    ).all()
-
-    if closed_deals_with_dates:
-        total_days = sum(d.days_in_pipeline for d in closed_deals_with_dates)
-        avg_days_to_close = total_days // len(closed_deals_with_dates)
-    else:
-        avg_days_to_close = 0
-
-    return DealAnalytics(
-        total_deals=total_deals,
-        active_deals=active_deals,
-        total_pipeline_value=pipeline_value,
-        average_deal_size=avg_deal_size,
-        average_days_to_close=avg_days_to_close,
-        win_rate=win_rate,
-        deals_by_stage=deals_by_stage,
-        deals_by_priority=deals_by_priority,
-        deals_by_industry=deals_by_industry,
-        monthly_deal_flow=monthly_deal_flow,
-        top_deal_leads=top_deal_leads
-    )
+    # One grouped scan of the deals table, or the organization's rollup rows
+    # when DEAL_ANALYTICS_ROLLUPS is enabled
+    summary = DealAnalyticsService(db).get_summary(tenant_query.organization_id)
+    return DealAnalytics(**summary)
 
 
 # Milestone Management Endpoints
@@ -0,0 +1,533 @@
+"""
+AI Gateway
+Single path for Claude Messages API calls: one pooled keep-alive client
+(HTTP/2 when h2 is installed), per-model concurrency and token-rate budgets,
+de-duplication of identical in-flight requests, response caching (local LRU
+in front of AIResponseCache) and jittered retries on 429/529. Streaming
+calls get the same budgets, cache and retries (until the first token).
+"""
+
+import asyncio
+import hashlib
+import importlib.util
+import json
+import random
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional
+
+import httpx
+import structlog
+
+from app.core.cache import AIResponseCache, ai_cache
+from app.core.config import settings
+from app.core.performance import PerformanceMetrics, performance_monitor
+
+
+logger = structlog.get_logger(__name__)
+
+ANTHROPIC_VERSION = "2023-06-01"
+RETRYABLE_STATUS = (429, 529)  # rate limited, overloaded
+
+Sender = Callable[[Dict[str, Any]], Awaitable[Dict[str, Any]]]
+# Yields Messages API stream events (message_start, content_block_delta, ...) as dicts
+StreamSender = Callable[[Dict[str, Any]], AsyncIterator[Dict[str, Any]]]
+
+
+class AIGatewayError(Exception):
+    """Non-200 response from the Messages API"""
+
+    def __init__(self, status_code: int, message: str, retry_after: Optional[float] = None):
+        super().__init__(f"Claude API error: {status_code} - {message}")
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+@dataclass
+class ModelBudget:
+    """Limits applied to one model across all callers in this process"""
+    max_concurrency: int = 8
+    tokens_per_minute: int = 80000
+
+
+def parse_model_budgets(spec: str, default: ModelBudget) -> Dict[str, ModelBudget]:
+    """Parse "model=concurrency:tokens_per_minute,..." (either side may be empty)"""
+    budgets = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        model, _, limits = item.partition("=")
+        concurrency, _, tokens = limits.partition(":")
+        budgets[model.strip()] = ModelBudget(
+            max_concurrency=int(concurrency or default.max_concurrency),
+            tokens_per_minute=int(tokens or default.tokens_per_minute)
+        )
+    return budgets
+
+
+class TokenBucket:
+    """Token-rate limiter refilled continuously at tokens_per_minute / 60 per second"""
+
+    def __init__(self, tokens_per_minute: int):
+        self.capacity = float(tokens_per_minute)
+        self.rate = tokens_per_minute / 60.0
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self, amount: float) -> float:
+        """Take ``amount`` tokens, waiting for the refill; returns what was taken"""
+        amount = min(float(amount), self.capacity)
+        # Waiters queue on the lock, so a large request isn't starved by small ones
+        async with self._lock:
+            self._refill()
+            while self.tokens < amount:
+                await asyncio.sleep((amount - self.tokens) / self.rate)
+                self._refill()
+            self.tokens -= amount
+        return amount
+
+    def refund(self, amount: float):
+        """Return over-reserved tokens once the real usage is known"""
+        self._refill()
+        self.tokens = min(self.capacity, self.tokens + amount)
+
+
+@dataclass
+class ModelStats:
+    """Counters for one model"""
+    latency: PerformanceMetrics = field(default_factory=PerformanceMetrics)
+    first_token: PerformanceMetrics = field(default_factory=PerformanceMetrics)
+    input_tokens: int = 0
+    output_tokens: int = 0
+    retries: int = 0
+    started: float = field(default_factory=time.monotonic)
+
+    def get_stats(self) -> Dict[str, Any]:
+        elapsed = max(time.monotonic() - self.started, 1e-9)
+        stats = self.latency.get_stats()
+        stats.update(
+            input_tokens=self.input_tokens,
+            output_tokens=self.output_tokens,
+            tokens_per_second=(self.input_tokens + self.output_tokens) / elapsed,
+            retries=self.retries,
+            streams=self.first_token.request_count,
+            first_token_avg_ms=self.first_token.avg_time * 1000,
+            first_token_p95_ms=self.first_token.p95_time * 1000
+        )
+        return stats
+
+
+class _ModelLane:
+    """Concurrency slots and token bucket for one model"""
+
+    def __init__(self, budget: ModelBudget):
+        self.budget = budget
+        self.slots = asyncio.Semaphore(budget.max_concurrency)
+        self.bucket = TokenBucket(budget.tokens_per_minute)
+        self.stats = ModelStats()
+
+
+class AIGateway:
+    """
+    Governs every Claude call made by this process.
+
+    Callers hand over a Messages API payload. ``create_message`` returns the
+    response body as a dict (``content``, ``usage``, ...); callers that use
+    the Anthropic SDK pass ``send`` to keep their client while still going
+    through the budgets, de-duplication, cache and retries here.
+    """
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        base_url: Optional[str] = None,
+        cache: Optional[AIResponseCache] = None,
+        default_budget: Optional[ModelBudget] = None,
+        budgets: Optional[Dict[str, ModelBudget]] = None,
+        max_retries: Optional[int] = None,
+        backoff_base: float = 0.5,
+        backoff_cap: float = 30.0,
+        cache_ttl: Optional[int] = None,
+        local_cache_size: int = 512,
+        timeout: float = 60.0,
+        transport: Optional[httpx.AsyncBaseTransport] = None
+    ):
+        self.api_key = api_key if api_key is not None else settings.anthropic_api_key
+        self.base_url = base_url or settings.ANTHROPIC_BASE_URL
+        self.cache = cache
+        self.default_budget = default_budget or ModelBudget(
+            max_concurrency=settings.AI_GATEWAY_MAX_CONCURRENCY,
+            tokens_per_minute=settings.AI_GATEWAY_TOKENS_PER_MINUTE
+        )
+        self.budgets = budgets if budgets is not None else parse_model_budgets(
+            settings.AI_GATEWAY_MODEL_BUDGETS, self.default_budget
+        )
+        self.max_retries = settings.AI_GATEWAY_MAX_RETRIES if max_retries is None else max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.cache_ttl = settings.AI_GATEWAY_CACHE_TTL if cache_ttl is None else cache_ttl
+        self.local_cache_size = local_cache_size
+        self.timeout = timeout
+        self.transport = transport
+
+        self._client: Optional[httpx.AsyncClient] = None
+        self._lanes: Dict[str, _ModelLane] = {}
+        self._inflight: Dict[str, asyncio.Future] = {}
+        # key -> (expires_at, response)
+        self._local: "OrderedDict[str, tuple]" = OrderedDict()
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.deduplicated = 0
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Shared keep-alive client; HTTP/2 multiplexes calls over one connection"""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                http2=importlib.util.find_spec("h2") is not None,
+                headers={
+                    "x-api-key": self.api_key or "",
+                    "anthropic-version": ANTHROPIC_VERSION,
+                },
+                timeout=httpx.Timeout(self.timeout, connect=5.0),
+                limits=httpx.Limits(max_connections=100, max_keepalive_connections=20, keepalive_expiry=60),
+                transport=self.transport
+            )
+        return self._client
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def _lane(self, model: str) -> _ModelLane:
+        lane = self._lanes.get(model)
+        if lane is None:
+            lane = self._lanes[model] = _ModelLane(self.budgets.get(model, self.default_budget))
+        return lane
+
+    # Public API
+
+    async def create_message(
+        self,
+        payload: Dict[str, Any],
+        send: Optional[Sender] = None,
+        cache: bool = False,
+        cache_ttl: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Run one Messages API request.
+
+        Identical payloads already in flight share one upstream call. With
+        ``cache``, responses are also served from and stored in the local LRU
+        and AIResponseCache for ``cache_ttl`` seconds (gateway default if None).
+        """
+        canonical, key = self._cache_key(payload)
+
+        if cache:
+            cached = await self._cached(key, canonical)
+            if cached is not None:
+                self.cache_hits += 1
+                return cached
+            self.cache_misses += 1
+
+        future = self._inflight.get(key)
+        if future is not None and not future.done():
+            self.deduplicated += 1
+            return await asyncio.shield(future)
+
+        future = self._inflight[key] = asyncio.ensure_future(self._call(payload, send or self._send_http))
+        future.add_done_callback(lambda done: self._forget(key, done))
+        # Shielded so a cancelled caller doesn't cancel the call for the others
+        response = await asyncio.shield(future)
+
+        if cache:
+            await self._store(key, canonical, response, self.cache_ttl if cache_ttl is None else cache_ttl)
+        return response
+
+    async def stream_message(
+        self,
+        payload: Dict[str, Any],
+        send_stream: Optional[StreamSender] = None,
+        cache: bool = False,
+        cache_ttl: Optional[int] = None
+    ) -> AsyncIterator[str]:
+        """
+        Yield the completion's text as it is generated.
+
+        Shares the cache with ``create_message``: a cached completion is
+        replayed as a single chunk and a finished stream is stored. Throttled
+        requests are retried only until the first token has been yielded.
+        """
+        canonical, key = self._cache_key(payload)
+        if cache:
+            cached = await self._cached(key, canonical)
+            if cached is not None:
+                self.cache_hits += 1
+                yield "".join(block.get("text", "") for block in cached.get("content", []))
+                return
+            self.cache_misses += 1
+
+        send_stream = send_stream or self._stream_http
+        lane = self._lane(payload.get("model", "default"))
+        parts = []
+        usage: Dict[str, int] = {}
+
+        async with lane.slots:
+            reserved = await lane.bucket.acquire(self.estimate_tokens(payload))
+            started = time.monotonic()
+            attempt = 0
+            try:
+                while True:
+                    try:
+                        async for event in send_stream(payload):
+                            _merge_usage(usage, event)
+                            text = _event_text(event)
+                            if text:
+                                if not parts:
+                                    lane.stats.first_token.record_request(time.monotonic() - started)
+                                parts.append(text)
+                                yield text
+                        break
+                    except Exception as e:
+                        delay = None if parts else self._retry_delay(e, attempt)
+                        if delay is None:
+                            raise
+                        attempt += 1
+                        self._log_retry(payload, e, attempt, delay, lane)
+                        await asyncio.sleep(delay)
+            except Exception:
+                lane.stats.latency.record_error()
+                await performance_monitor.record_performance("ai_gateway", time.monotonic() - started, success=False)
+                raise
+
+        self._settle(lane, reserved, usage, time.monotonic() - started)
+        await performance_monitor.record_performance("ai_gateway", time.monotonic() - started)
+        if cache:
+            response = {"content": [{"type": "text", "text": "".join(parts)}], "usage": usage}
+            await self._store(key, canonical, response, self.cache_ttl if cache_ttl is None else cache_ttl)
+
+    def _forget(self, key: str, future: asyncio.Future):
+        if self._inflight.get(key) is future:
+            del self._inflight[key]
+
+    async def complete(self, payload: Dict[str, Any], **kwargs) -> str:
+        """Text of the first content block"""
+        response = await self.create_message(payload, **kwargs)
+        return response["content"][0]["text"]
+
+    def clear_cache(self):
+        """Drop the local response cache (AIResponseCache entries expire on their own)"""
+        self._local.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Latency, token throughput and cache statistics for export"""
+        lookups = self.cache_hits + self.cache_misses
+        return {
+            "models": {model: lane.stats.get_stats() for model, lane in self._lanes.items()},
+            "cache_hits": self.cache_hits,
+            "cache_misses": self.cache_misses,
+            "cache_hit_rate": self.cache_hits / lookups if lookups else 0.0,
+            "deduplicated": self.deduplicated,
+            "in_flight": len(self._inflight),
+        }
+
+    # Caching
+
+    @staticmethod
+    def _cache_key(payload: Dict[str, Any]):
+        canonical = json.dumps(payload, sort_keys=True, default=str)
+        return canonical, hashlib.sha256(canonical.encode()).hexdigest()
+
+    async def _cached(self, key: str, canonical: str) -> Optional[Dict[str, Any]]:
+        entry = self._local.get(key)
+        if entry is not None:
+            expires_at, response = entry
+            if expires_at > time.monotonic():
+                self._local.move_to_end(key)
+                return response
+            del self._local[key]
+
+        if self.cache is None:
+            return None
+        try:
+            response = await self.cache.get_claude_response(canonical)
+        except Exception as e:
+            logger.warning("AI response cache read failed", error=str(e))
+            return None
+        if response is not None:
+            self._remember(key, response, self.cache_ttl)
+        return response
+
+    async def _store(self, key: str, canonical: str, response: Dict[str, Any], ttl: int):
+        self._remember(key, response, ttl)
+        if self.cache is not None:
+            try:
+                await self.cache.set_claude_response(canonical, response, ttl=ttl)
+            except Exception as e:
+                logger.warning("AI response cache write failed", error=str(e))
+
+    def _remember(self, key: str, response: Dict[str, Any], ttl: int):
+        self._local[key] = (time.monotonic() + ttl, response)
+        self._local.move_to_end(key)
+        while len(self._local) > self.local_cache_size:
+            self._local.popitem(last=False)
+
+    # Upstream calls
+
+    @staticmethod
+    def estimate_tokens(payload: Dict[str, Any]) -> int:
+        """Input estimate (~4 characters per token) plus the output ceiling"""
+        text = json.dumps(payload.get("messages", []), default=str) + str(payload.get("system") or "")
+        return len(text) // 4 + int(payload.get("max_tokens", 1024))
+
+    async def _send_http(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        response = await self.client.post("/v1/messages", json=payload)
+        if response.status_code != 200:
+            raise AIGatewayError(response.status_code, response.text, _retry_after(response.headers))
+        return response.json()
+
+    async def _stream_http(self, payload: Dict[str, Any]) -> AsyncIterator[Dict[str, Any]]:
+        async with self.client.stream("POST", "/v1/messages", json={**payload, "stream": True}) as response:
+            if response.status_code != 200:
+                body = await response.aread()
+                raise AIGatewayError(
+                    response.status_code, body.decode(errors="replace"), _retry_after(response.headers)
+                )
+            async for event in parse_sse_events(response.aiter_lines()):
+                if event.get("type") == "error":
+                    error = event.get("error") or {}
+                    status_code = 529 if error.get("type") == "overloaded_error" else 500
+                    raise AIGatewayError(status_code, error.get("message", "stream error"))
+                yield event
+
+    async def _call(self, payload: Dict[str, Any], send: Sender) -> Dict[str, Any]:
+        model = payload.get("model", "default")
+        lane = self._lane(model)
+
+        async with lane.slots:
+            reserved = await lane.bucket.acquire(self.estimate_tokens(payload))
+            started = time.monotonic()
+            try:
+                response = await self._with_retries(payload, send, lane)
+            except Exception:
+                lane.stats.latency.record_error()
+                await performance_monitor.record_performance("ai_gateway", time.monotonic() - started, success=False)
+                raise
+
+        duration = time.monotonic() - started
+        self._settle(lane, reserved, response.get("usage") or {}, duration)
+        await performance_monitor.record_performance("ai_gateway", duration)
+        return response
+
+    @staticmethod
+    def _settle(lane: _ModelLane, reserved: float, usage: Dict[str, Any], duration: float):
+        """Refund the unused reservation and record usage and latency"""
+        input_tokens = int(usage.get("input_tokens") or 0)
+        output_tokens = int(usage.get("output_tokens") or 0)
+        if input_tokens + output_tokens:
+            lane.bucket.refund(max(reserved - input_tokens - output_tokens, 0))
+        lane.stats.input_tokens += input_tokens
+        lane.stats.output_tokens += output_tokens
+        lane.stats.latency.record_request(duration)
+
+    async def _with_retries(self, payload: Dict[str, Any], send: Sender, lane: _ModelLane) -> Dict[str, Any]:
+        attempt = 0
+        while True:
+            try:
+                return await send(payload)
+            except Exception as e:
+                delay = self._retry_delay(e, attempt)
+                if delay is None:
+                    raise
+                attempt += 1
+                self._log_retry(payload, e, attempt, delay, lane)
+                await asyncio.sleep(delay)
+
+    def _retry_delay(self, error: Exception, attempt: int) -> Optional[float]:
+        """Backoff before the next attempt, or None when ``error`` isn't retried"""
+        if getattr(error, "status_code", None) not in RETRYABLE_STATUS or attempt >= self.max_retries:
+            return None
+        # Full jitter, but never sooner than the server asked for
+        delay = random.uniform(0, min(self.backoff_cap, self.backoff_base * 2 ** attempt))
+        retry_after = getattr(error, "retry_after", None)
+        if retry_after is None:
+            retry_after = _retry_after(getattr(getattr(error, "response", None), "headers", None))
+        return max(delay, min(retry_after or 0, self.backoff_cap))
+
+    @staticmethod
+    def _log_retry(payload: Dict[str, Any], error: Exception, attempt: int, delay: float, lane: _ModelLane):
+        lane.stats.retries += 1
+        logger.warning(
+            "Claude call throttled, retrying",
+            model=payload.get("model"), status=getattr(error, "status_code", None),
+            attempt=attempt, delay=round(delay, 2)
+        )
+
+
+async def parse_sse_events(lines: AsyncIterator[str]) -> AsyncIterator[Dict[str, Any]]:
+    """Decode a Server-Sent Events body into the JSON objects in its data fields"""
+    data = []
+    async for line in lines:
+        if line.startswith("data:"):
+            data.append(line[5:].lstrip())
+        elif not line and data:
+            yield json.loads("\n".join(data))
+            data = []
+    if data:
+        yield json.loads("\n".join(data))
+
+
+def _event_text(event: Dict[str, Any]) -> Optional[str]:
+    if event.get("type") == "content_block_delta":
+        delta = event.get("delta") or {}
+        if delta.get("type") == "text_delta":
+            return delta.get("text")
+    return None
+
+
+def _merge_usage(usage: Dict[str, int], event: Dict[str, Any]):
+    """Token usage arrives in message_start and is updated by message_delta"""
+    if event.get("type") == "message_start":
+        reported = (event.get("message") or {}).get("usage") or {}
+    elif event.get("type") == "message_delta":
+        reported = event.get("usage") or {}
+    else:
+        return
+    usage.update({name: value for name, value in reported.items() if isinstance(value, int)})
+
+
+def _retry_after(headers) -> Optional[float]:
+    try:
+        return float(headers.get("retry-after")) if headers else None
+    except (TypeError, ValueError):
+        return None
+
+
+# Global gateway instance
+_ai_gateway: Optional[AIGateway] = None
+
+
+def get_ai_gateway() -> AIGateway:
+    """Get the process-wide AI gateway"""
+    global _ai_gateway
+    if _ai_gateway is None:
+        _ai_gateway = AIGateway(cache=ai_cache)
+    return _ai_gateway
+
+
+async def close_ai_gateway():
+    """Close the gateway's pooled client (application shutdown)"""
+    if _ai_gateway is not None:
+        await _ai_gateway.aclose()
+
+
+def get_ai_gateway_stats() -> Dict[str, Any]:
+    """Gateway statistics, empty until the gateway has been used"""
+    return _ai_gateway.get_stats() if _ai_gateway is not None else {}
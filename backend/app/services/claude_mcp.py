@@ -1,7 +1,7 @@
 """Claude MCP (Model Context Protocol) Integration Service for M&A Intelligence"""
 
 import json
-from typing import Dict, List, Optional, Any
+from typing import AsyncIterator, Dict, List, Optional, Any
 from dataclasses import dataclass, asdict
 import asyncio
 from datetime import datetime
@@ -10,7 +10,9 @@ import anthropic
 from anthropic import AsyncAnthropic
 import structlog
 
+from app.ai.streaming import StreamEvent, StructuredStream
 from app.core.config import settings
+from app.services.ai_gateway import get_ai_gateway
 from app.services.prompts import MA_DOMAIN_PROMPTS
 
 
@@ -53,13 +55,63 @@ class ClaudeMCPService:
     """
 
     def __init__(self):
-        self.client = AsyncAnthropic(api_key=settings.ANTHROPIC_API_KEY)
+        # Calls go through the shared AI gateway, which owns budgets, retries
+        # and the response cache; the SDK client only sends
+        self.gateway = get_ai_gateway()
+        self.client = AsyncAnthropic(api_key=settings.ANTHROPIC_API_KEY, max_retries=0)
         self.model = settings.CLAUDE_MODEL
         self.max_tokens = settings.CLAUDE_MAX_TOKENS
         self.temperature = settings.CLAUDE_TEMPERATURE
-        self._cache = {}  # Simple in-memory cache
         self._cache_ttl = 3600  # 1 hour
 
+    def _payload(self, prompt: str, temperature: float) -> Dict[str, Any]:
+        return {
+            "model": self.model,
+            "max_tokens": self.max_tokens,
+            "temperature": temperature,
+            "system": settings.CLAUDE_SYSTEM_PROMPT,
+            "messages": [
+                {
+                    "role": "user",
+                    "content": prompt
+                }
+            ]
+        }
+
+    async def _complete(self, prompt: str, temperature: float, cache: bool = False) -> str:
+        """Run a single-turn prompt through the AI gateway and return the text"""
+        response = await self.gateway.create_message(
+            self._payload(prompt, temperature),
+            send=self._send,
+            cache=cache,
+            cache_ttl=self._cache_ttl
+        )
+        return response["content"][0]["text"]
+
+    async def _send(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Gateway sender using the SDK client, reduced to a cacheable dict"""
+        message = await self.client.messages.create(**payload)
+        usage = getattr(message, "usage", None)
+        return {
+            "content": [{"type": "text", "text": message.content[0].text}],
+            "usage": {
+                name: getattr(usage, name) for name in ("input_tokens", "output_tokens")
+                if isinstance(getattr(usage, name, None), int)
+            }
+        }
+
+    async def _send_stream(self, payload: Dict[str, Any]) -> AsyncIterator[Dict[str, Any]]:
+        """Gateway stream sender using the SDK client's raw event stream"""
+        stream = await self.client.messages.create(**payload, stream=True)
+        async for event in stream:
+            yield event.model_dump()
+
+    def _deal_analysis_prompt(self, deal_data: Dict[str, Any], context: Optional[Dict[str, Any]]) -> str:
+        return MA_DOMAIN_PROMPTS["deal_analysis"].format(
+            deal_data=json.dumps(deal_data, indent=2),
+            context=json.dumps(context or {}, indent=2)
+        )
+
     async def analyze_deal(
         self,
         deal_data: Dict[str, Any],
@@ -77,38 +129,13 @@ class ClaudeMCPService:
         """
         try:
             # Build the analysis prompt
-            prompt = MA_DOMAIN_PROMPTS["deal_analysis"].format(
-                deal_data=json.dumps(deal_data, indent=2),
-                context=json.dumps(context or {}, indent=2)
-            )
+            prompt = self._deal_analysis_prompt(deal_data, context)
 
-            # Check cache
-            cache_key = f"deal_analysis_{hash(prompt)}"
-            if cache_key in self._cache:
-                cached_result, timestamp = self._cache[cache_key]
-                if (datetime.now() - timestamp).seconds < self._cache_ttl:
-                    logger.info("Returning cached deal analysis", deal_id=deal_data.get("id"))
-                    return cached_result
-
-            # Make API call to Claude
-            response = await self.client.messages.create(
-                model=self.model,
-                max_tokens=self.max_tokens,
-                temperature=self.temperature,
-                system=settings.CLAUDE_SYSTEM_PROMPT,
-                messages=[
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ]
-            )
+            # Repeat analyses of the same deal are served from the gateway cache
+            response_text = await self._complete(prompt, self.temperature, cache=True)
 
             # Parse the response
-            analysis = self._parse_deal_analysis(response.content[0].text, deal_data.get("id", "unknown"))
-
-            # Cache the result
-            self._cache[cache_key] = (analysis, datetime.now())
+            analysis = self._parse_deal_analysis(response_text, deal_data.get("id", "unknown"))
 
             logger.info(
                 "Deal analysis completed",
@@ -122,6 +149,38 @@ class ClaudeMCPService:
             logger.error("Deal analysis failed", error=str(e), deal_data=deal_data)
             raise
 
+    async def stream_deal_analysis(
+        self,
+        deal_data: Dict[str, Any],
+        context: Optional[Dict[str, Any]] = None
+    ) -> AsyncIterator[StreamEvent]:
+        """
+        Streaming variant of analyze_deal.
+
+        Yields text deltas as Claude writes them, each recommendation or red
+        flag as soon as it is complete, and finally a "done" event carrying
+        the full DealAnalysis.
+        """
+        prompt = self._deal_analysis_prompt(deal_data, context)
+        stream = StructuredStream(self.gateway.stream_message(
+            self._payload(prompt, self.temperature),
+            send_stream=self._send_stream,
+            cache=True,
+            cache_ttl=self._cache_ttl
+        ))
+        async for event in stream:
+            yield event
+
+        # The incremental parser also copes with prose around the JSON
+        response_text = json.dumps(stream.result) if stream.parser.complete else stream.text
+        analysis = self._parse_deal_analysis(response_text, deal_data.get("id", "unknown"))
+        logger.info(
+            "Deal analysis streamed",
+            deal_id=analysis.deal_id,
+            confidence=analysis.confidence_score
+        )
+        yield StreamEvent("done", {"result": asdict(analysis)})
+
     async def identify_partnerships(
         self,
         organization_profile: Dict[str, Any],
@@ -143,20 +202,10 @@ class ClaudeMCPService:
                 criteria=json.dumps(search_criteria or {}, indent=2)
             )
 
-            response = await self.client.messages.create(
-                model=self.model,
-                max_tokens=self.max_tokens,
-                temperature=0.5,  # Lower temperature for more consistent scoring
-                system=settings.CLAUDE_SYSTEM_PROMPT,
-                messages=[
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ]
-            )
+            # Lower temperature for more consistent scoring
+            response_text = await self._complete(prompt, 0.5)
 
-            partnerships = self._parse_partnership_recommendations(response.content[0].text)
+            partnerships = self._parse_partnership_recommendations(response_text)
 
             # Sort by compatibility score
             partnerships.sort(key=lambda x: x.compatibility_score, reverse=True)
@@ -194,20 +243,9 @@ class ClaudeMCPService:
                 focus_areas=", ".join(focus_areas) if focus_areas else "general market analysis"
             )
 
-            response = await self.client.messages.create(
-                model=self.model,
-                max_tokens=self.max_tokens,
-                temperature=self.temperature,
-                system=settings.CLAUDE_SYSTEM_PROMPT,
-                messages=[
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ]
-            )
+            response_text = await self._complete(prompt, self.temperature)
 
-            insights = self._parse_strategic_insights(response.content[0].text)
+            insights = self._parse_strategic_insights(response_text)
 
             logger.info("Strategic insights generated", focus_areas=focus_areas)
 
@@ -238,20 +276,9 @@ class ClaudeMCPService:
                 goals=", ".join(optimization_goals)
             )
 
-            response = await self.client.messages.create(
-                model=self.model,
-                max_tokens=self.max_tokens,
-                temperature=0.6,
-                system=settings.CLAUDE_SYSTEM_PROMPT,
-                messages=[
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ]
-            )
+            response_text = await self._complete(prompt, 0.6)
 
-            optimization = self._parse_deal_optimization(response.content[0].text)
+            optimization = self._parse_deal_optimization(response_text)
 
             logger.info(
                 "Deal structure optimized",
@@ -286,20 +313,9 @@ class ClaudeMCPService:
                 target=json.dumps(target_profile, indent=2)
             )
 
-            response = await self.client.messages.create(
-                model=self.model,
-                max_tokens=self.max_tokens,
-                temperature=0.5,
-                system=settings.CLAUDE_SYSTEM_PROMPT,
-                messages=[
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ]
-            )
+            response_text = await self._complete(prompt, 0.5)
 
-            assessment = self._parse_integration_assessment(response.content[0].text)
+            assessment = self._parse_integration_assessment(response_text)
 
             logger.info(
                 "Integration readiness assessed",
@@ -442,5 +458,5 @@ class ClaudeMCPService:
 
     def clear_cache(self):
         """Clear the analysis cache"""
-        self._cache.clear()
+        self.gateway.clear_cache()
         logger.info("Claude MCP cache cleared")
\ No newline at end of file
@@ -1,9 +1,10 @@
 import os
 import json
-import httpx
-from typing import Dict, List, Optional, Any
+from typing import AsyncIterator, Dict, List, Optional, Any
 from pydantic import BaseModel
+from app.ai.streaming import StreamEvent, StructuredStream
 from app.core.config import settings
+from app.services.ai_gateway import get_ai_gateway
 
 class DealAnalysisRequest(BaseModel):
     deal_name: str
@@ -35,8 +36,24 @@ class MarketResearchResponse(BaseModel):
 class ClaudeService:
     def __init__(self):
         self.api_key = settings.anthropic_api_key
-        self.base_url = "https://api.anthropic.com/v1"
-        
+        self.model = "claude-3-sonnet-20240229"
+
+    def _payload(self, prompt: str, max_tokens: int) -> Dict[str, Any]:
+        return {
+            "model": self.model,
+            "max_tokens": max_tokens,
+            "messages": [
+                {
+                    "role": "user",
+                    "content": prompt
+                }
+            ]
+        }
+
+    async def _complete(self, prompt: str, max_tokens: int) -> str:
+        """Send a single-turn prompt through the shared AI gateway and return the text"""
+        return await get_ai_gateway().complete(self._payload(prompt, max_tokens), cache=True)
+
     async def analyze_deal(self, request: DealAnalysisRequest) -> DealAnalysisResponse:
         """Analyze an M&A deal using Claude AI"""
         
@@ -67,46 +84,22 @@ class ClaudeService:
         """
         
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    f"{self.base_url}/messages",
-                    headers={
-                        "Content-Type": "application/json",
-                        "x-api-key": self.api_key,
-                        "anthropic-version": "2023-06-01"
-                    },
-                    json={
-                        "model": "claude-3-sonnet-20240229",
-                        "max_tokens": 2000,
-                        "messages": [
-                            {
-                                "role": "user",
-                                "content": prompt
-                            }
-                        ]
-                    }
+            content = await self._complete(prompt, max_tokens=2000)
+
+            # Parse JSON response
+            try:
+                analysis_data = json.loads(content)
+                return DealAnalysisResponse(**analysis_data)
+            except json.JSONDecodeError:
+                # Fallback if JSON parsing fails
+                return DealAnalysisResponse(
+                    analysis=content,
+                    risk_factors=["Unable to parse specific risks"],
+                    opportunities=["Unable to parse specific opportunities"],
+                    recommendations=["Review analysis manually"],
+                    confidence_score=50.0
                 )
-                
-                if response.status_code == 200:
-                    result = response.json()
-                    content = result["content"][0]["text"]
-                    
-                    # Parse JSON response
-                    try:
-                        analysis_data = json.loads(content)
-                        return DealAnalysisResponse(**analysis_data)
-                    except json.JSONDecodeError:
-                        # Fallback if JSON parsing fails
-                        return DealAnalysisResponse(
-                            analysis=content,
-                            risk_factors=["Unable to parse specific risks"],
-                            opportunities=["Unable to parse specific opportunities"],
-                            recommendations=["Review analysis manually"],
-                            confidence_score=50.0
-                        )
-                else:
-                    raise Exception(f"Claude API error: {response.status_code}")
-                    
+
         except Exception as e:
             # Return fallback response if Claude API fails
             return DealAnalysisResponse(
@@ -117,10 +110,8 @@ class ClaudeService:
                 confidence_score=0.0
             )
     
-    async def research_market(self, request: MarketResearchRequest) -> MarketResearchResponse:
-        """Research market conditions for M&A opportunities"""
-        
-        prompt = f"""
+    def _market_research_prompt(self, request: MarketResearchRequest) -> str:
+        return f"""
         As a market research analyst, provide comprehensive market intelligence for M&A opportunities in:
         
         Industry: {request.industry}
@@ -145,46 +136,29 @@ class ClaudeService:
             "competitive_landscape": "competitive analysis"
         }}
         """
+
+    def _market_research_response(self, content: str) -> MarketResearchResponse:
+        try:
+            research_data = json.loads(content)
+            return MarketResearchResponse(**research_data)
+        except json.JSONDecodeError:
+            return MarketResearchResponse(
+                market_overview=content,
+                key_players=["Unable to parse specific players"],
+                market_trends=["Unable to parse specific trends"],
+                growth_projections="Unable to parse projections",
+                competitive_landscape="Unable to parse landscape"
+            )
+
+    async def research_market(self, request: MarketResearchRequest) -> MarketResearchResponse:
+        """Research market conditions for M&A opportunities"""
+        
+        prompt = self._market_research_prompt(request)
         
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    f"{self.base_url}/messages",
-                    headers={
-                        "Content-Type": "application/json",
-                        "x-api-key": self.api_key,
-                        "anthropic-version": "2023-06-01"
-                    },
-                    json={
-                        "model": "claude-3-sonnet-20240229",
-                        "max_tokens": 2000,
-                        "messages": [
-                            {
-                                "role": "user",
-                                "content": prompt
-                            }
-                        ]
-                    }
-                )
-                
-                if response.status_code == 200:
-                    result = response.json()
-                    content = result["content"][0]["text"]
-                    
-                    try:
-                        research_data = json.loads(content)
-                        return MarketResearchResponse(**research_data)
-                    except json.JSONDecodeError:
-                        return MarketResearchResponse(
-                            market_overview=content,
-                            key_players=["Unable to parse specific players"],
-                            market_trends=["Unable to parse specific trends"],
-                            growth_projections="Unable to parse projections",
-                            competitive_landscape="Unable to parse landscape"
-                        )
-                else:
-                    raise Exception(f"Claude API error: {response.status_code}")
-                    
+            content = await self._complete(prompt, max_tokens=2000)
+            return self._market_research_response(content)
+
         except Exception as e:
             return MarketResearchResponse(
                 market_overview=f"Market research temporarily unavailable. Error: {str(e)}",
@@ -193,6 +167,22 @@ class ClaudeService:
                 growth_projections="Retry research later",
                 competitive_landscape="Manual analysis required"
             )
+
+    async def stream_market_research(self, request: MarketResearchRequest) -> AsyncIterator[StreamEvent]:
+        """Streaming variant of research_market; ends with a "done" event holding the full response"""
+        stream = StructuredStream(get_ai_gateway().stream_message(
+            self._payload(self._market_research_prompt(request), max_tokens=2000),
+            cache=True
+        ))
+        async for event in stream:
+            yield event
+
+        # The incremental parser also copes with prose around the JSON
+        try:
+            response = MarketResearchResponse(**stream.result)
+        except (TypeError, ValueError):
+            response = self._market_research_response(stream.text)
+        yield StreamEvent("done", {"result": response.model_dump()})
     
     async def analyze_document(self, document_content: str, document_type: str = "general") -> Dict[str, Any]:
         """Analyze uploaded documents for key insights"""
@@ -214,37 +204,14 @@ class ClaudeService:
         """
         
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    f"{self.base_url}/messages",
-                    headers={
-                        "Content-Type": "application/json",
-                        "x-api-key": self.api_key,
-                        "anthropic-version": "2023-06-01"
-                    },
-                    json={
-                        "model": "claude-3-sonnet-20240229",
-                        "max_tokens": 1500,
-                        "messages": [
-                            {
-                                "role": "user",
-                                "content": prompt
-                            }
-                        ]
-                    }
-                )
-                
-                if response.status_code == 200:
-                    result = response.json()
-                    return {
-                        "summary": result["content"][0]["text"],
-                        "document_type": document_type,
-                        "analysis_date": "2024-01-01",  # Would use actual date
-                        "confidence": "high"
-                    }
-                else:
-                    raise Exception(f"Claude API error: {response.status_code}")
-                    
+            summary = await self._complete(prompt, max_tokens=1500)
+            return {
+                "summary": summary,
+                "document_type": document_type,
+                "analysis_date": "2024-01-01",  # Would use actual date
+                "confidence": "high"
+            }
+
         except Exception as e:
             return {
                 "summary": f"Document analysis temporarily unavailable. Error: {str(e)}",
@@ -24,6 +24,8 @@ from app.models.analytics import (
 from app.models.deal import Deal, DealStage
 from app.models.prospects import Prospect, ProspectStatus, OutreachCampaign
 from app.models.organization import Organization
+from app.core.codec import CacheCodec, CodecError, get_codec
+from app.services.metric_aggregation import MetricAggregationEngine, RollupResult
 from app.core.database import get_db
 import logging
 
@@ -35,11 +37,19 @@ class DataWarehouse:
     Handles ETL, aggregation, and caching
     """
 
-    def __init__(self, db: Session, redis_client: Optional[redis.Redis] = None):
+    def __init__(
+        self,
+        db: Session,
+        redis_client: Optional[redis.Redis] = None,
+        codec: Optional[CacheCodec] = None
+    ):
         self.db = db
+        # Cached values are codec bytes, so responses stay undecoded
         self.redis = redis_client or redis.Redis(
-            host='localhost', port=6379, decode_responses=True
+            host='localhost', port=6379, decode_responses=False
         )
+        self.codec = codec or get_codec()
+        self.aggregation = MetricAggregationEngine(db)
         self.cache_ttl = 3600  # 1 hour default cache
 
     # ETL Pipeline Methods
@@ -249,100 +259,25 @@ class DataWarehouse:
         """
         Aggregate metrics for a specific time period
         """
-        # Query raw metrics
-        snapshots = self.db.query(MetricSnapshot).filter(
-            MetricSnapshot.organization_id == organization_id,
-            MetricSnapshot.metric_type == metric_type,
-            MetricSnapshot.timestamp.between(start_date, end_date)
-        ).all()
-
-        if not snapshots:
-            return None
-
-        values = [float(s.metric_value) for s in snapshots]
-
-        # Calculate aggregations
-        aggregated = AggregatedMetric(
-            organization_id=organization_id,
-            metric_type=metric_type,
-            period=period,
-            period_start=start_date,
-            period_end=end_date,
-            sum_value=Decimal(str(sum(values))),
-            avg_value=Decimal(str(np.mean(values))),
-            min_value=Decimal(str(min(values))),
-            max_value=Decimal(str(max(values))),
-            count=len(values),
-            std_deviation=Decimal(str(np.std(values))),
-            percentile_25=Decimal(str(np.percentile(values, 25))),
-            percentile_50=Decimal(str(np.percentile(values, 50))),
-            percentile_75=Decimal(str(np.percentile(values, 75))),
-            percentile_95=Decimal(str(np.percentile(values, 95)))
+        record = self.aggregation.aggregate_window(
+            organization_id, metric_type, period, start_date, end_date
         )
-
-        # Calculate period-over-period changes
-        prev_start = start_date - (end_date - start_date)
-        prev_end = start_date
-        prev_snapshots = self.db.query(MetricSnapshot).filter(
-            MetricSnapshot.organization_id == organization_id,
-            MetricSnapshot.metric_type == metric_type,
-            MetricSnapshot.timestamp.between(prev_start, prev_end)
-        ).all()
-
-        if prev_snapshots:
-            prev_values = [float(s.metric_value) for s in prev_snapshots]
-            prev_avg = np.mean(prev_values)
-            aggregated.previous_period_value = Decimal(str(prev_avg))
-            aggregated.period_change = aggregated.avg_value - Decimal(str(prev_avg))
-            if prev_avg > 0:
-                aggregated.period_change_percent = Decimal(str(
-                    (float(aggregated.avg_value) - prev_avg) / prev_avg * 100
-                ))
-
-        # Save to database
-        self.db.merge(aggregated)
-        self.db.commit()
-
-        return aggregated
+        return AggregatedMetric(**record) if record else None
 
     async def run_aggregation_job(
         self,
         organization_id: str,
-        period: AggregationPeriod = AggregationPeriod.DAILY
-    ):
+        period: Optional[AggregationPeriod] = AggregationPeriod.DAILY,
+        full: bool = False
+    ) -> RollupResult:
         """
-        Run aggregation job for all metric types
+        Roll up all metric types for ``period`` (every standard period if None)
+
+        Incremental from the last watermark unless ``full`` is set.
         """
-        # Determine time range based on period
-        now = datetime.utcnow()
-        if period == AggregationPeriod.HOURLY:
-            start = now.replace(minute=0, second=0, microsecond=0)
-            end = start + timedelta(hours=1)
-        elif period == AggregationPeriod.DAILY:
-            start = now.replace(hour=0, minute=0, second=0, microsecond=0)
-            end = start + timedelta(days=1)
-        elif period == AggregationPeriod.WEEKLY:
-            days_since_monday = now.weekday()
-            start = (now - timedelta(days=days_since_monday)).replace(
-                hour=0, minute=0, second=0, microsecond=0
-            )
-            end = start + timedelta(weeks=1)
-        elif period == AggregationPeriod.MONTHLY:
-            start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-            # Calculate last day of month
-            if now.month == 12:
-                end = start.replace(year=start.year + 1, month=1)
-            else:
-                end = start.replace(month=start.month + 1)
-
-        # Aggregate each metric type
-        for metric_type in MetricType:
-            try:
-                await self.aggregate_metrics(
-                    organization_id, metric_type, period, start, end
-                )
-            except Exception as e:
-                logger.error(f"Failed to aggregate {metric_type}: {str(e)}")
+        return self.aggregation.rollup(
+            organization_id, [period] if period else None, full=full
+        )
 
     # Caching Methods
     def get_cache_key(self, organization_id: str, query_params: Dict) -> str:
@@ -355,7 +290,9 @@ class DataWarehouse:
         try:
             cached = self.redis.get(cache_key)
             if cached:
-                return json.loads(cached)
+                return self.codec.decode(cached)
+        except CodecError as e:
+            logger.debug(f"Cached metrics not decodable, recomputing: {str(e)}")
         except Exception as e:
             logger.warning(f"Cache retrieval failed: {str(e)}")
         return None
@@ -366,7 +303,7 @@ class DataWarehouse:
             self.redis.setex(
                 cache_key,
                 ttl or self.cache_ttl,
-                json.dumps(data, default=str)
+                self.codec.encode(data)
             )
         except Exception as e:
             logger.warning(f"Cache storage failed: {str(e)}")
@@ -0,0 +1,316 @@
+"""
+Deal Analytics Service
+Pipeline dashboard figures from one grouped aggregation over deals, with an
+optional per-organization rollup table kept current on deal writes
+"""
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import Date, String, case, cast, delete, event, func, inspect, literal, literal_column, select, tuple_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.deal import Deal, DealAnalyticsRollup, DealPriority, DealStage
+import logging
+
+logger = logging.getLogger(__name__)
+
+ROLLUP_METRICS = (
+    "deal_count", "active_count", "value_sum", "value_count", "active_value_sum",
+    "closed_count", "won_count", "close_days_sum", "close_days_count",
+)
+
+# Deal attributes that feed the rollup counters
+TRACKED_ATTRIBUTES = (
+    "organization_id", "stage", "priority", "target_industry", "deal_lead_id", "created_at",
+    "is_active", "is_deleted", "deal_value", "initial_contact_date", "actual_close_date",
+)
+
+deals = Deal.__table__
+rollups = DealAnalyticsRollup.__table__
+
+RollupKey = Tuple[str, str, str]  # (organization_id, dimension, key)
+
+
+def _grouped_deal_query(organization_id: str):
+    """
+    One scan of the organization's deals, grouped by GROUPING SETS into
+    (dimension, key) rows carrying every ROLLUP_METRICS counter
+    """
+    # Inline constants so GROUPING() and GROUP BY see textually identical expressions
+    month = func.to_char(func.date_trunc(literal_column("'month'"), deals.c.created_at), literal_column("'YYYY-MM'"))
+    won = deals.c.stage == DealStage.CLOSED_WON
+    closed_won_with_dates = won & deals.c.initial_contact_date.isnot(None) & deals.c.actual_close_date.isnot(None)
+    close_days = deals.c.actual_close_date - cast(deals.c.created_at, Date)
+
+    dimensions = (
+        ("stage", cast(deals.c.stage, String)),
+        ("priority", cast(deals.c.priority, String)),
+        ("industry", deals.c.target_industry),
+        ("lead", cast(deals.c.deal_lead_id, String)),
+        ("month", month),
+    )
+    dimension = case(
+        *[(func.grouping(expr) == 0, literal(name)) for name, expr in dimensions],
+        else_=literal("total")
+    )
+    key = case(
+        *[(func.grouping(expr) == 0, expr) for name, expr in dimensions],
+        else_=literal("")
+    )
+
+    return (
+        select(
+            dimension.label("dimension"),
+            key.label("key"),
+            func.count().label("deal_count"),
+            func.count().filter(deals.c.is_active).label("active_count"),
+            func.coalesce(func.sum(deals.c.deal_value), 0).label("value_sum"),
+            func.count(deals.c.deal_value).label("value_count"),
+            func.coalesce(func.sum(deals.c.deal_value).filter(deals.c.is_active), 0).label("active_value_sum"),
+            func.count().filter(deals.c.stage.in_([DealStage.CLOSED_WON, DealStage.CLOSED_LOST])).label("closed_count"),
+            func.count().filter(won).label("won_count"),
+            func.coalesce(func.sum(close_days).filter(closed_won_with_dates), 0).label("close_days_sum"),
+            func.count().filter(closed_won_with_dates).label("close_days_count"),
+        )
+        .where(deals.c.organization_id == organization_id, deals.c.is_deleted.is_(False))
+        .group_by(func.grouping_sets(*[tuple_(expr) for name, expr in dimensions], tuple_()))
+    )
+
+
+def summarize(rows, now: Optional[datetime] = None) -> Dict[str, Any]:
+    """Build the DealAnalytics payload from (dimension, key, counters) rows"""
+    now = now or datetime.utcnow()
+    by_dimension: Dict[str, Dict[str, Any]] = defaultdict(dict)
+    for row in rows:
+        by_dimension[row["dimension"]][row["key"]] = row
+
+    total = by_dimension["total"].get("") or dict.fromkeys(ROLLUP_METRICS, 0)
+    closed, won = total["closed_count"], total["won_count"]
+
+    def counts(dimension: str, enum_cls) -> Dict[str, int]:
+        # Keys are enum names (the database labels); the API reports values
+        found = by_dimension[dimension]
+        return {member.value: found[member.name]["deal_count"] if member.name in found else 0
+                for member in enum_cls}
+
+    months = []
+    month_start = date(now.year, now.month, 1)
+    for _ in range(12):
+        months.append(month_start.strftime("%Y-%m"))
+        month_start = (month_start - timedelta(days=1)).replace(day=1)
+    monthly = by_dimension["month"]
+
+    leads = sorted(
+        (row for key, row in by_dimension["lead"].items() if key and row["deal_count"]),
+        key=lambda row: row["deal_count"], reverse=True
+    )[:5]
+
+    return {
+        "total_deals": total["deal_count"],
+        "active_deals": total["active_count"],
+        "total_pipeline_value": total["active_value_sum"] or Decimal("0"),
+        "average_deal_size": (Decimal(total["value_sum"]) / total["value_count"]
+                              if total["value_count"] else Decimal("0")),
+        "average_days_to_close": (total["close_days_sum"] // total["close_days_count"]
+                                  if total["close_days_count"] else 0),
+        "win_rate": (won / closed * 100) if closed > 0 else 0,
+        "deals_by_stage": counts("stage", DealStage),
+        "deals_by_priority": counts("priority", DealPriority),
+        "deals_by_industry": {key: row["deal_count"] for key, row in by_dimension["industry"].items()
+                              if key and row["deal_count"]},
+        "monthly_deal_flow": [
+            {"month": month, "count": monthly[month]["deal_count"] if month in monthly else 0}
+            for month in reversed(months)
+        ],
+        "top_deal_leads": [
+            {"user_id": row["key"], "deal_count": row["deal_count"], "total_value": row["value_sum"] or 0}
+            for row in leads
+        ],
+    }
+
+
+class DealAnalyticsService:
+    """Pipeline analytics for one organization in a single round trip"""
+
+    def __init__(self, db: Session, use_rollups: Optional[bool] = None, max_age: Optional[int] = None):
+        self.db = db
+        self.use_rollups = settings.DEAL_ANALYTICS_ROLLUPS if use_rollups is None else use_rollups
+        self.max_age = timedelta(seconds=settings.DEAL_ANALYTICS_ROLLUP_MAX_AGE if max_age is None else max_age)
+
+    def get_summary(self, organization_id: str) -> Dict[str, Any]:
+        if not self.use_rollups:
+            rows = self.db.execute(_grouped_deal_query(organization_id)).mappings().all()
+            return summarize(rows)
+
+        rows = self.db.execute(
+            select(rollups).where(rollups.c.organization_id == organization_id)
+        ).mappings().all()
+        total = next((row for row in rows if row["dimension"] == "total"), None)
+        if total is None or total["refreshed_at"] is None or \
+                datetime.utcnow() - total["refreshed_at"] > self.max_age:
+            rows = self.rebuild(organization_id)
+        return summarize(rows)
+
+    def rebuild(self, organization_id: str) -> List[Dict[str, Any]]:
+        """Replace the organization's rollup rows with a fresh grouped scan"""
+        refreshed_at = datetime.utcnow()
+        grouped = _grouped_deal_query(organization_id).subquery()
+        try:
+            self.db.execute(delete(rollups).where(rollups.c.organization_id == organization_id))
+            rows = self.db.execute(
+                insert(rollups)
+                .from_select(
+                    ["organization_id", "dimension", "key", *ROLLUP_METRICS, "refreshed_at"],
+                    select(
+                        literal(organization_id, rollups.c.organization_id.type), grouped.c.dimension, func.coalesce(grouped.c.key, ""),
+                        *[grouped.c[name] for name in ROLLUP_METRICS], literal(refreshed_at)
+                    )
+                )
+                .returning(*rollups.c)
+            ).mappings().all()
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+        logger.info(f"Rebuilt deal analytics rollup for org {organization_id} ({len(rows)} rows)")
+        return rows
+
+
+# Incremental maintenance on deal writes
+
+def _enum_name(value, enum_cls) -> Optional[str]:
+    """Enum label as stored in the database, from a member, name or value"""
+    if value is None:
+        return None
+    if isinstance(value, enum_cls):
+        return value.name
+    try:
+        return enum_cls[value].name
+    except KeyError:
+        return enum_cls(value).name
+
+
+def deal_contribution(state: Dict[str, Any]) -> Dict[RollupKey, Dict[str, Any]]:
+    """The counters one deal adds to each of its rollup rows (empty if deleted)"""
+    if state["is_deleted"] or state["organization_id"] is None:
+        return {}
+
+    stage = _enum_name(state["stage"], DealStage) or DealStage.SOURCING.name
+    priority = _enum_name(state["priority"], DealPriority) or DealPriority.MEDIUM.name
+    created_at = state["created_at"] or datetime.utcnow()
+    active = state["is_active"] is not False
+    value = state["deal_value"]
+    won = stage == DealStage.CLOSED_WON.name
+    has_close_days = won and state["initial_contact_date"] is not None and state["actual_close_date"] is not None
+
+    counters = {
+        "deal_count": 1,
+        "active_count": int(active),
+        "value_sum": Decimal(value) if value is not None else Decimal("0"),
+        "value_count": int(value is not None),
+        "active_value_sum": Decimal(value) if value is not None and active else Decimal("0"),
+        "closed_count": int(stage in (DealStage.CLOSED_WON.name, DealStage.CLOSED_LOST.name)),
+        "won_count": int(won),
+        "close_days_sum": (state["actual_close_date"] - created_at.date()).days if has_close_days else 0,
+        "close_days_count": int(has_close_days),
+    }
+
+    organization_id = str(state["organization_id"])
+    keys = [("total", ""), ("stage", stage), ("priority", priority), ("month", created_at.strftime("%Y-%m"))]
+    if state["target_industry"] is not None:
+        keys.append(("industry", state["target_industry"]))
+    if state["deal_lead_id"] is not None:
+        keys.append(("lead", str(state["deal_lead_id"])))
+    return {(organization_id, dimension, key): counters for dimension, key in keys}
+
+
+def _deal_states(session: Session, deal: Deal,
+                 deleted: bool) -> Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]:
+    """(state before this flush, state after it) for a deal about to be flushed"""
+    info = inspect(deal)
+    current = {name: getattr(deal, name) for name in TRACKED_ATTRIBUTES}
+    if info.pending:
+        return None, current
+
+    previous = {}
+    unknown = []
+    for name in TRACKED_ATTRIBUTES:
+        history = info.attrs[name].history
+        if history.deleted:
+            previous[name] = history.deleted[0]
+        elif history.added:
+            # Set while expired (e.g. after a commit): the old value was never loaded
+            unknown.append(name)
+        else:
+            previous[name] = current[name]
+
+    if unknown:
+        # Before the flush the row still holds what the rollups last counted
+        stored = session.connection().execute(
+            select(*[deals.c[name] for name in unknown]).where(deals.c.id == info.identity[0])
+        ).one()
+        previous.update(stored._mapping)
+    return previous, None if deleted else current
+
+
+def rollup_deltas(changes) -> Dict[RollupKey, Dict[str, Any]]:
+    """Net counter changes for a set of (before, after) deal states"""
+    deltas: Dict[RollupKey, Dict[str, Any]] = defaultdict(lambda: dict.fromkeys(ROLLUP_METRICS, 0))
+    for before, after in changes:
+        for sign, state in ((-1, before), (1, after)):
+            if state is None:
+                continue
+            for key, counters in deal_contribution(state).items():
+                delta = deltas[key]
+                for name, amount in counters.items():
+                    delta[name] += sign * amount
+    return {key: delta for key, delta in deltas.items() if any(delta.values())}
+
+
+def build_rollup_upsert(deltas: Dict[RollupKey, Dict[str, Any]]):
+    """INSERT .. ON CONFLICT that adds ``deltas`` to the stored counters"""
+    stmt = insert(rollups).values([
+        {"organization_id": organization_id, "dimension": dimension, "key": key, **delta}
+        for (organization_id, dimension, key), delta in deltas.items()
+    ])
+    return stmt.on_conflict_do_update(
+        index_elements=["organization_id", "dimension", "key"],
+        set_={name: rollups.c[name] + stmt.excluded[name] for name in ROLLUP_METRICS}
+    )
+
+
+def _collect_deal_changes(session: Session, flush_context, instances) -> None:
+    changes = []
+    for objects, deleted in ((session.new, False), (session.dirty, False), (session.deleted, True)):
+        for obj in objects:
+            if isinstance(obj, Deal):
+                before, after = _deal_states(session, obj, deleted)
+                if before != after:
+                    changes.append((before, after))
+    if changes:
+        session.info.setdefault("deal_rollup_changes", []).extend(changes)
+
+
+def _apply_deal_changes(session: Session, flush_context) -> None:
+    changes = session.info.pop("deal_rollup_changes", None)
+    if not changes:
+        return
+    deltas = rollup_deltas(changes)
+    if deltas:
+        # Same connection and transaction as the deal write itself
+        session.connection().execute(build_rollup_upsert(deltas))
+
+
+def register_rollup_listeners() -> None:
+    """Keep deal_analytics_rollups current on every ORM flush that touches a Deal"""
+    if not event.contains(Session, "before_flush", _collect_deal_changes):
+        event.listen(Session, "before_flush", _collect_deal_changes)
+        event.listen(Session, "after_flush", _apply_deal_changes)
+
+
+if settings.DEAL_ANALYTICS_ROLLUPS:
+    register_rollup_listeners()
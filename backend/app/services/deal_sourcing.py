@@ -10,18 +10,24 @@ from sqlalchemy.orm import Session
 from sqlalchemy import and_, or_, desc, func
 import anthropic
 import os
+import time
+import asyncio
 import logging
 
 from ..models.opportunities import (
     MarketOpportunity, CompanyProfile, OpportunityScore,
     OpportunityActivity, OpportunitySource, OpportunityStatus,
-    CompanyRegion, IndustryVertical, SourceType, ActivityType
+    CompanyRegion, IndustryVertical, SourceType, ActivityType,
+    DataSourceType
 )
 from ..integrations.companies_house import CompaniesHouseAPI
 from ..integrations.sec_edgar import SECEdgarAPI
 
 logger = logging.getLogger(__name__)
 
+# Recorded on every OpportunityScore row
+SCORING_ALGORITHM_VERSION = "ai_composite_v1"
+
 
 class OpportunityDiscoveryService:
     """Service for discovering M&A opportunities from multiple sources"""
@@ -46,8 +52,6 @@ class OpportunityDiscoveryService:
         Returns:
             List of created MarketOpportunity records
         """
-        opportunities = []
-
         try:
             # Identify distressed companies
             industry_sic = filters.get("industry_sic", "62")  # IT services default
@@ -58,58 +62,16 @@ class OpportunityDiscoveryService:
                 min_age_years=min_age
             )
 
-            for company_data in distressed[:50]:  # Limit batch size
-                # Check if already exists
-                existing = self.db.query(MarketOpportunity).filter(
-                    and_(
-                        MarketOpportunity.organization_id == organization_id,
-                        MarketOpportunity.company_registration_number == company_data.get("company_number")
-                    )
-                ).first()
+            for company_data in distressed:
+                company_data.setdefault("industry_sic", industry_sic)
 
-                if existing:
-                    continue
-
-                # Create opportunity
-                opportunity = MarketOpportunity(
-                    organization_id=organization_id,
-                    company_name=company_data.get("company_name"),
-                    region=CompanyRegion.UK,
-                    industry_vertical=self._map_sic_to_vertical(industry_sic),
-                    company_registration_number=company_data.get("company_number"),
-                    status=OpportunityStatus.NEW,
-                    source_url=f"https://find-and-update.company-information.service.gov.uk/company/{company_data.get('company_number')}",
-                    metadata={
-                        "source": "companies_house_scan",
-                        "scan_date": datetime.utcnow().isoformat(),
-                        "distressed_indicators": company_data.get("indicators", [])
-                    }
-                )
-
-                self.db.add(opportunity)
-
-                # Create source tracking
-                source = OpportunitySource(
-                    opportunity_id=opportunity.id,
-                    source_type=SourceType.API_INTEGRATION,
-                    source_name="Companies House",
-                    source_url=opportunity.source_url,
-                    discovered_at=datetime.utcnow()
-                )
-                self.db.add(source)
-
-                opportunities.append(opportunity)
-
-            self.db.commit()
-            logger.info(f"Discovered {len(opportunities)} new UK opportunities")
+            return self.create_uk_opportunities(organization_id, distressed[:50])  # Limit batch size
 
         except Exception as e:
             self.db.rollback()
             logger.error(f"Error scanning Companies House: {str(e)}")
             raise
 
-        return opportunities
-
     async def scan_sec_edgar(
         self,
         organization_id: str,
@@ -125,81 +87,183 @@ class OpportunityDiscoveryService:
         Returns:
             List of created MarketOpportunity records
         """
-        opportunities = []
-
         try:
             # Search recent 10-K filings
-            cik_list = filters.get("cik_list", [])
+            cik_list = filters.get("cik_list", [])[:20]  # Limit batch size
 
-            for cik in cik_list[:20]:  # Limit batch size
-                try:
-                    # Get company facts
-                    facts = await self.sec_edgar.get_company_facts(cik)
-
-                    # Extract financials
-                    financials = self._extract_sec_financials(facts)
-
-                    if not financials.get("revenue"):
-                        continue
-
-                    # Check if already exists
-                    existing = self.db.query(MarketOpportunity).filter(
-                        and_(
-                            MarketOpportunity.organization_id == organization_id,
-                            MarketOpportunity.company_registration_number == cik
-                        )
-                    ).first()
-
-                    if existing:
-                        continue
-
-                    # Create opportunity
-                    opportunity = MarketOpportunity(
-                        organization_id=organization_id,
-                        company_name=facts.get("entityName", "Unknown"),
-                        region=CompanyRegion.US,
-                        industry_vertical=self._map_sic_to_vertical(facts.get("sic", "")),
-                        company_registration_number=cik,
-                        annual_revenue=Decimal(str(financials.get("revenue", 0))),
-                        ebitda=Decimal(str(financials.get("ebitda", 0))),
-                        employee_count=financials.get("employees"),
-                        status=OpportunityStatus.NEW,
-                        source_url=f"https://www.sec.gov/cgi-bin/browse-edgar?action=getcompany&CIK={cik}",
-                        metadata={
-                            "source": "sec_edgar_scan",
-                            "scan_date": datetime.utcnow().isoformat(),
-                            "fiscal_year": financials.get("fiscal_year")
-                        }
-                    )
-
-                    self.db.add(opportunity)
-
-                    # Create source tracking
-                    source = OpportunitySource(
-                        opportunity_id=opportunity.id,
-                        source_type=SourceType.API_INTEGRATION,
-                        source_name="SEC EDGAR",
-                        source_url=opportunity.source_url,
-                        discovered_at=datetime.utcnow()
-                    )
-                    self.db.add(source)
-
-                    opportunities.append(opportunity)
+            results = await asyncio.gather(
+                *(self.sec_edgar.get_company_facts(cik) for cik in cik_list),
+                return_exceptions=True
+            )
 
-                except Exception as e:
-                    logger.warning(f"Error processing CIK {cik}: {str(e)}")
+            company_facts = {}
+            for cik, facts in zip(cik_list, results):
+                if isinstance(facts, Exception):
+                    logger.warning(f"Error processing CIK {cik}: {str(facts)}")
                     continue
+                company_facts[cik] = facts
 
-            self.db.commit()
-            logger.info(f"Discovered {len(opportunities)} new US opportunities")
+            return self.create_us_opportunities(organization_id, company_facts)
 
         except Exception as e:
             self.db.rollback()
             logger.error(f"Error scanning SEC EDGAR: {str(e)}")
             raise
 
+    def create_uk_opportunities(
+        self,
+        organization_id: str,
+        companies: List[Dict[str, Any]]
+    ) -> List[MarketOpportunity]:
+        """
+        Persist Companies House candidates the organization is not tracking yet
+
+        Args:
+            organization_id: Organization ID
+            companies: Candidate dicts with company_number, company_name,
+                industry_sic and distress indicators
+
+        Returns:
+            List of created MarketOpportunity records
+        """
+        candidates = {
+            company["company_number"]: company
+            for company in companies if company.get("company_number")
+        }
+        untracked = self._untracked_company_numbers(organization_id, candidates.keys())
+
+        opportunities = []
+        source_urls = []
+        for company_number, company_data in candidates.items():
+            if company_number not in untracked:
+                continue
+
+            source_urls.append(
+                f"https://find-and-update.company-information.service.gov.uk/company/{company_number}"
+            )
+            opportunities.append(MarketOpportunity(
+                organization_id=organization_id,
+                company_name=company_data.get("company_name"),
+                company_number=company_number,
+                region=CompanyRegion.UK,
+                industry_vertical=self._map_sic_to_vertical(company_data.get("industry_sic", "")),
+                status=OpportunityStatus.NEW,
+                opportunity_type="distressed",
+                is_distressed=True,
+                discovery_source=DataSourceType.COMPANIES_HOUSE,
+                extra_data={
+                    "source": "companies_house_scan",
+                    "scan_date": datetime.utcnow().isoformat(),
+                    "distressed_indicators": company_data.get("indicators", []),
+                    "distress_indicator": company_data.get("distress_indicator")
+                }
+            ))
+
+        self._save_discoveries(opportunities, source_urls, "Companies House")
+        logger.info(f"Discovered {len(opportunities)} new UK opportunities")
         return opportunities
 
+    def create_us_opportunities(
+        self,
+        organization_id: str,
+        company_facts: Dict[str, Dict[str, Any]]
+    ) -> List[MarketOpportunity]:
+        """
+        Persist SEC EDGAR companies the organization is not tracking yet
+
+        Args:
+            organization_id: Organization ID
+            company_facts: Company facts keyed by CIK
+
+        Returns:
+            List of created MarketOpportunity records
+        """
+        candidates = {}
+        for cik, facts in company_facts.items():
+            financials = self._extract_sec_financials(facts or {})
+            if financials.get("revenue"):
+                candidates[cik] = (facts, financials)
+
+        untracked = self._untracked_company_numbers(organization_id, candidates.keys())
+
+        opportunities = []
+        source_urls = []
+        for cik, (facts, financials) in candidates.items():
+            if cik not in untracked:
+                continue
+
+            source_urls.append(f"https://www.sec.gov/cgi-bin/browse-edgar?action=getcompany&CIK={cik}")
+            opportunities.append(MarketOpportunity(
+                organization_id=organization_id,
+                company_name=facts.get("entityName", "Unknown"),
+                company_number=cik,
+                region=CompanyRegion.US,
+                industry_vertical=self._map_sic_to_vertical(facts.get("sic", "")),
+                annual_revenue=Decimal(str(financials.get("revenue", 0))),
+                revenue_currency="USD",
+                employee_count=financials.get("employees"),
+                status=OpportunityStatus.NEW,
+                discovery_source=DataSourceType.SEC_EDGAR,
+                extra_data={
+                    "source": "sec_edgar_scan",
+                    "scan_date": datetime.utcnow().isoformat(),
+                    "fiscal_year": financials.get("fiscal_year"),
+                    "ebitda_estimate": financials.get("ebitda")
+                }
+            ))
+
+        self._save_discoveries(opportunities, source_urls, "SEC EDGAR")
+        logger.info(f"Discovered {len(opportunities)} new US opportunities")
+        return opportunities
+
+    def _untracked_company_numbers(self, organization_id: str, company_numbers) -> set:
+        """Company numbers without an existing opportunity (one IN query per batch)"""
+        company_numbers = set(company_numbers)
+        if not company_numbers:
+            return set()
+
+        existing = self.db.query(MarketOpportunity.company_number).filter(
+            and_(
+                MarketOpportunity.organization_id == organization_id,
+                MarketOpportunity.company_number.in_(company_numbers)
+            )
+        ).all()
+
+        return company_numbers - {row.company_number for row in existing}
+
+    def _save_discoveries(
+        self,
+        opportunities: List[MarketOpportunity],
+        source_urls: List[str],
+        source_name: str
+    ) -> None:
+        """Insert opportunities with their source tracking rows in one commit"""
+        if not opportunities:
+            return
+
+        try:
+            self.db.add_all(opportunities)
+            self.db.flush()  # Assign opportunity IDs for the source rows
+
+            # Create source tracking
+            self.db.add_all([
+                OpportunitySource(
+                    opportunity_id=opportunity.id,
+                    source_type=SourceType.API_INTEGRATION,
+                    source_name=source_name,
+                    source_url=source_url,
+                    source_reference=opportunity.company_number,
+                    discovered_at=datetime.utcnow()
+                )
+                for opportunity, source_url in zip(opportunities, source_urls)
+            ])
+
+            self.db.commit()
+
+        except Exception:
+            self.db.rollback()
+            raise
+
     async def monitor_news_for_opportunities(
         self,
         organization_id: str,
@@ -357,6 +421,33 @@ class OpportunityScoringService:
         Returns:
             OpportunityScore record
         """
+        fields = self._score_columns(opportunity_id, await self.score_company(company_data))
+        score = OpportunityScore(**fields)
+
+        self.db.add(score)
+
+        # Update opportunity with overall score
+        opportunity = self.db.query(MarketOpportunity).filter(
+            MarketOpportunity.id == opportunity_id
+        ).first()
+
+        if opportunity:
+            opportunity.update(**self._opportunity_scores(fields))
+
+        self.db.commit()
+
+        return score
+
+    async def score_company(self, company_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Compute score components and AI insights without touching the database
+
+        Args:
+            company_data: Company financial and operational data
+
+        Returns:
+            Dict of OpportunityScore column values
+        """
         # Calculate individual components
         financial_score = await self.assess_financial_health(company_data)
         growth_score = await self.evaluate_growth_trajectory(company_data)
@@ -376,16 +467,14 @@ class OpportunityScoringService:
         # Generate AI insights
         ai_insights = await self._generate_ai_insights(company_data, overall_score)
 
-        # Create score record
-        score = OpportunityScore(
-            opportunity_id=opportunity_id,
-            overall_score=round(overall_score, 2),
-            financial_health_score=round(financial_score, 2),
-            growth_trajectory_score=round(growth_score, 2),
-            strategic_fit_score=round(strategic_score, 2),
-            market_position_score=round(market_score, 2),
-            risk_assessment_score=round(risk_score, 2),
-            scoring_criteria={
+        return {
+            "overall_score": round(overall_score, 2),
+            "financial_health_score": round(financial_score, 2),
+            "growth_trajectory_score": round(growth_score, 2),
+            "strategic_fit_score": round(strategic_score, 2),
+            "market_position_score": round(market_score, 2),
+            "risk_assessment_score": round(risk_score, 2),
+            "scoring_criteria": {
                 "methodology": "ai_weighted_composite",
                 "weights": {
                     "financial": 0.30,
@@ -395,26 +484,163 @@ class OpportunityScoringService:
                     "risk": 0.10
                 }
             },
-            ai_insights=ai_insights,
-            confidence_level=self._calculate_confidence(company_data),
-            scored_at=datetime.utcnow()
-        )
+            "ai_insights": ai_insights,
+            "confidence_level": self._calculate_confidence(company_data),
+            "scored_at": datetime.utcnow()
+        }
 
-        self.db.add(score)
+    @staticmethod
+    def _score_columns(opportunity_id: str, fields: Dict[str, Any]) -> Dict[str, Any]:
+        """Map score_company results onto OpportunityScore columns"""
+        return {
+            "opportunity_id": opportunity_id,
+            "overall_score": fields["overall_score"],
+            "financial_health_score": fields["financial_health_score"],
+            "strategic_fit_score": fields["strategic_fit_score"],
+            # Risk factors are what make a deal complex to execute
+            "deal_complexity_score": fields["risk_assessment_score"],
+            "market_conditions_score": fields["market_position_score"],
+            "revenue_growth_score": fields["growth_trajectory_score"],
+            "market_position_score": fields["market_position_score"],
+            "algorithm_version": SCORING_ALGORITHM_VERSION,
+            "scored_at": fields["scored_at"],
+            "score_breakdown": {
+                **fields["scoring_criteria"],
+                "growth_trajectory_score": fields["growth_trajectory_score"],
+                "risk_assessment_score": fields["risk_assessment_score"],
+                "confidence_level": fields["confidence_level"]
+            },
+            "recommendations": fields["ai_insights"]
+        }
 
-        # Update opportunity with overall score
-        opportunity = self.db.query(MarketOpportunity).filter(
-            MarketOpportunity.id == opportunity_id
-        ).first()
+    @staticmethod
+    def _opportunity_scores(columns: Dict[str, Any]) -> Dict[str, Any]:
+        """Scores denormalized onto the MarketOpportunity row"""
+        return {
+            key: columns[key]
+            for key in ("overall_score", "financial_health_score", "strategic_fit_score",
+                        "deal_complexity_score", "market_conditions_score")
+        }
 
-        if opportunity:
-            opportunity.overall_score = overall_score
-            opportunity.financial_health_score = financial_score
-            opportunity.strategic_fit_score = strategic_score
+    async def score_backlog(
+        self,
+        organization_id: Optional[str] = None,
+        page_size: int = 500,
+        concurrency: int = 16,
+        max_items: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Score every unscored opportunity in a single event loop
 
-        self.db.commit()
+        Pages through the backlog by primary key (keyset pagination, so rows
+        that fail to score are not revisited), scores each page concurrently
+        under a semaphore and writes the page back with bulk inserts/updates
+        and one commit.
 
-        return score
+        Args:
+            organization_id: Restrict to one organization
+            page_size: Rows fetched and committed per page
+            concurrency: Maximum opportunities scored at once
+            max_items: Stop after this many rows (None drains the backlog)
+
+        Returns:
+            Throughput metrics for the run
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+        started = time.perf_counter()
+        scoring_seconds = 0.0
+        write_seconds = 0.0
+        processed = scored = failed = pages = 0
+        last_id = None
+
+        async def score_row(row) -> Optional[Dict[str, Any]]:
+            async with semaphore:
+                try:
+                    fields = await self.score_company(self._company_data_from_row(row))
+                except Exception as e:
+                    logger.error(f"Error scoring opportunity {row.id}: {str(e)}")
+                    return None
+            return self._score_columns(row.id, fields)
+
+        while max_items is None or processed < max_items:
+            limit = page_size if max_items is None else min(page_size, max_items - processed)
+
+            query = self.db.query(
+                MarketOpportunity.id,
+                MarketOpportunity.annual_revenue,
+                MarketOpportunity.industry_vertical,
+                MarketOpportunity.region,
+                MarketOpportunity.employee_count
+            ).filter(MarketOpportunity.overall_score.is_(None))
+
+            if organization_id:
+                query = query.filter(MarketOpportunity.organization_id == organization_id)
+            if last_id is not None:
+                query = query.filter(MarketOpportunity.id > last_id)
+
+            rows = query.order_by(MarketOpportunity.id).limit(limit).all()
+            if not rows:
+                break
+
+            pages += 1
+            processed += len(rows)
+            last_id = rows[-1].id
+
+            phase_start = time.perf_counter()
+            results = await asyncio.gather(*(score_row(row) for row in rows))
+            scoring_seconds += time.perf_counter() - phase_start
+
+            score_rows = [fields for fields in results if fields is not None]
+            failed += len(rows) - len(score_rows)
+            if not score_rows:
+                continue
+
+            phase_start = time.perf_counter()
+            try:
+                self.db.bulk_insert_mappings(OpportunityScore, score_rows)
+                self.db.bulk_update_mappings(MarketOpportunity, [
+                    {"id": fields["opportunity_id"], **self._opportunity_scores(fields)}
+                    for fields in score_rows
+                ])
+                self.db.commit()
+                scored += len(score_rows)
+            except Exception as e:
+                self.db.rollback()
+                failed += len(score_rows)
+                logger.error(f"Error writing scores for page {pages}: {str(e)}")
+            write_seconds += time.perf_counter() - phase_start
+
+            logger.info(f"Scoring page {pages}: {scored} scored, {failed} failed so far")
+
+        elapsed = time.perf_counter() - started
+
+        return {
+            "opportunities_processed": processed,
+            "opportunities_scored": scored,
+            "opportunities_failed": failed,
+            "pages": pages,
+            "elapsed_seconds": round(elapsed, 3),
+            "scoring_seconds": round(scoring_seconds, 3),
+            "write_seconds": round(write_seconds, 3),
+            "opportunities_per_second": round(processed / elapsed, 2) if elapsed > 0 else 0.0
+        }
+
+    @staticmethod
+    def _company_data_from_row(opportunity) -> Dict[str, Any]:
+        """Scoring inputs for a MarketOpportunity row"""
+        return {
+            "revenue": float(opportunity.annual_revenue) if opportunity.annual_revenue else 0,
+            "ebitda": 0,  # MarketOpportunity does not carry EBITDA yet
+            "industry": opportunity.industry_vertical.value if opportunity.industry_vertical else "other",
+            "region": opportunity.region.value if opportunity.region else "unknown",
+            "employee_count": opportunity.employee_count,
+            "revenue_growth_rate": 5.0,  # Would calculate from historical data
+            "profit_growth_rate": 3.0,
+            "market_share_trend": "stable",
+            "industry_match": True,
+            "geography_match": True,
+            "synergy_potential": "medium"
+        }
 
     async def assess_financial_health(self, financials: Dict[str, Any]) -> float:
         """
@@ -646,7 +872,9 @@ Provide a JSON response with:
 Be concise and focus on actionable insights."""
 
         try:
-            response = self.client.messages.create(
+            # Run the blocking client off the event loop so batched scoring overlaps requests
+            response = await asyncio.to_thread(
+                self.client.messages.create,
                 model=self.model,
                 max_tokens=2000,
                 temperature=0.3,
@@ -0,0 +1,346 @@
+"""
+Document Pattern Scanner
+Single-pass multi-pattern matching for document analysis.
+
+Patterns that begin with literal text (risk terms, document type
+indicators, most extraction regexes) are compiled into one regular
+expression. They share a prefix trie, so a position is only tried against
+the patterns whose first characters match, and each pattern ends in an
+empty named marker group that identifies it. A scan walks the document once
+for all of them and returns categorized hits with offsets.
+
+Patterns with no literal prefix (``\\d+%``, ``[A-Z][a-z]+ Inc``) would be
+tried at every position of the combined regex; run on their own, re skips
+ahead to the characters that can start them, which is several times faster.
+
+Case-insensitive patterns are matched against the lower-cased document,
+which is several times faster than re.IGNORECASE. Patterns that need the
+original case (e.g. a capitalised company name) get a second combined
+regex over the original text; offsets are the same in both.
+
+Hits follow ``re.findall`` semantics per pattern: each pattern reports its
+leftmost non-overlapping matches. Hits of different patterns may overlap or
+nest, e.g. "cash" inside "cash flow", or a number inside a date.
+"""
+
+import re
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+# Characters that end a literal prefix
+_META = set(".^$*+?{}[]\\|()")
+_QUANTIFIERS = set("*+?{")
+_ESCAPE = re.compile(r"\\.")
+_LETTER = re.compile(r"[A-Za-z]")
+
+
+@dataclass(frozen=True)
+class PatternSpec:
+    """A pattern to scan for and the category/label its hits are filed under"""
+    category: str
+    label: str
+    pattern: str
+    ignore_case: bool = True
+
+
+class PatternHit(NamedTuple):
+    """One match of a pattern in the scanned text"""
+    category: str
+    label: str
+    start: int
+    end: int
+    text: str
+    value: Any  # first capture group when the pattern has one, else the matched text
+
+
+def literal_specs(category: str, terms: Iterable[str], ignore_case: bool = True) -> List[PatternSpec]:
+    """Specs matching each term as a plain substring, labelled with the term"""
+    return [PatternSpec(category, term, re.escape(term), ignore_case) for term in terms]
+
+
+class ScanResult:
+    """Hits from a single scan, in order of their start offset"""
+
+    def __init__(self, hits: List[PatternHit]):
+        self.hits = hits
+        self._by_category: Dict[str, List[PatternHit]] = defaultdict(list)
+        for hit in hits:
+            self._by_category[hit.category].append(hit)
+
+    def for_category(self, category: str, label: Optional[str] = None) -> List[PatternHit]:
+        hits = self._by_category.get(category, [])
+        if label is None:
+            return hits
+        return [hit for hit in hits if hit.label == label]
+
+    def count(self, category: str, label: Optional[str] = None) -> int:
+        return len(self.for_category(category, label))
+
+    def has(self, category: str, label: Optional[str] = None) -> bool:
+        hits = self._by_category.get(category, [])
+        return any(hit.label == label for hit in hits) if label is not None else bool(hits)
+
+    def labels(self, category: str) -> List[str]:
+        """Distinct labels with hits in the category, in order of first appearance"""
+        return list(dict.fromkeys(hit.label for hit in self._by_category.get(category, [])))
+
+    def values(self, category: str, label: Optional[str] = None) -> List[Any]:
+        return [hit.value for hit in self.for_category(category, label)]
+
+    def first(self, category: str, label: Optional[str] = None) -> Optional[PatternHit]:
+        hits = self.for_category(category, label)
+        return hits[0] if hits else None
+
+    def summary(self) -> Dict[str, Dict[str, int]]:
+        """Hit counts per category and label"""
+        counts: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+        for hit in self.hits:
+            counts[hit.category][hit.label] += 1
+        return {category: dict(labels) for category, labels in counts.items()}
+
+
+@dataclass
+class _Pattern:
+    """A distinct (pattern, case) pair; several specs may share one"""
+    pattern: str
+    ignore_case: bool
+    specs: Tuple[PatternSpec, ...]
+    groups: int
+    marker: str = ""
+    prefix: str = ""
+    tail: str = ""
+
+
+def _has_letters(pattern: str) -> bool:
+    """Whether case could matter to the pattern (escapes such as \\d don't count)"""
+    return bool(_LETTER.search(_ESCAPE.sub("", pattern)))
+
+
+def _split_literal_prefix(pattern: str) -> Tuple[str, str]:
+    """Split a regex into its leading literal text and the remainder"""
+    if "|" in pattern:
+        # A top-level alternation has no common prefix; don't try to find one
+        return "", pattern
+
+    literal = []
+    i = 0
+    while i < len(pattern):
+        char = pattern[i]
+        if char == "\\" and i + 1 < len(pattern) and not pattern[i + 1].isalnum():
+            literal.append(pattern[i + 1])
+            step = 2
+        elif char not in _META:
+            literal.append(char)
+            step = 1
+        else:
+            break
+        if i + step < len(pattern) and pattern[i + step] in _QUANTIFIERS:
+            # The quantifier applies to this character, which isn't literal then
+            literal.pop()
+            break
+        i += step
+    else:
+        return "".join(literal), ""
+
+    prefix = "".join(literal)
+    # Cut the pattern after the literal characters that were consumed
+    consumed, position = 0, 0
+    while consumed < len(prefix):
+        position += 2 if pattern[position] == "\\" else 1
+        consumed += 1
+    return prefix, pattern[position:]
+
+
+class _Lane:
+    """
+    Patterns that share case handling: one combined regex over those with a
+    literal prefix, and a regex of its own for each of the rest.
+
+    ``folded`` lanes hold case-insensitive (or caseless) patterns and run
+    over the lower-cased text.
+    """
+
+    def __init__(self, patterns: List[_Pattern], folded: bool):
+        self.folded = folded
+        for entry in patterns:
+            prefix, entry.tail = _split_literal_prefix(entry.pattern)
+            entry.prefix = prefix.lower() if folded else prefix
+
+        # Sorted so the trie is contiguous; a longer prefix sorts before its
+        # own prefix ("cash flow" before "cash")
+        self.order = sorted((entry for entry in patterns if entry.prefix), key=lambda entry: entry.prefix + "\uffff")
+        self.separate = [entry for entry in patterns if not entry.prefix]
+        self.rank = {entry.marker: rank for rank, entry in enumerate(self.order)}
+        self.by_marker = {entry.marker: entry for entry in self.order}
+        # Combined regexes over the patterns from a given rank on, by (rank, flags)
+        self._compiled: Dict[Tuple[int, int], Tuple[re.Pattern, Dict[str, int]]] = {}
+        self._separate_compiled: Dict[int, List[Tuple[_Pattern, re.Pattern]]] = {}
+
+    def compiled(self, rank: int = 0, flags: int = 0):
+        key = (rank, flags)
+        if key not in self._compiled:
+            self._compiled[key] = self._compile(self.order[rank:], flags)
+        return self._compiled[key]
+
+    def separate_compiled(self, flags: int = 0) -> List[Tuple[_Pattern, re.Pattern]]:
+        if flags not in self._separate_compiled:
+            self._separate_compiled[flags] = [
+                (entry, re.compile(self._case_tail(entry, entry.pattern), flags)) for entry in self.separate
+            ]
+        return self._separate_compiled[flags]
+
+    def scan(self, text: str, source: str, flags: int, hits: List[PatternHit]):
+        """
+        Append the lane's hits in ``text`` to ``hits``.
+
+        ``source`` is the original document, which hit text and values are
+        taken from; ``text`` is the same document lower-cased for folded lanes.
+        """
+        if self.order:
+            self._scan_combined(text, source, flags, hits)
+
+        for entry, regex in self.separate_compiled(flags):
+            for match in regex.finditer(text):
+                start, end = match.span()
+                matched = source[start:end]
+                if entry.groups:
+                    group_start, group_end = match.span(1)
+                    value = source[group_start:group_end] if group_start >= 0 else None
+                else:
+                    value = matched
+                for spec in entry.specs:
+                    hits.append(PatternHit(spec.category, spec.label, start, end, matched, value))
+
+    def _scan_combined(self, text: str, source: str, flags: int, hits: List[PatternHit]):
+        regex, value_groups = self.compiled(0, flags)
+        by_marker = self.by_marker
+        rank = self.rank
+        last_rank = len(self.order) - 1
+        last_end: Dict[str, int] = {}
+        position = 0
+
+        while True:
+            match = regex.search(text, position)
+            if match is None:
+                break
+            start = match.start()
+            groups = value_groups
+
+            while True:
+                marker = match.lastgroup
+                # findall semantics: a pattern's matches don't overlap each other
+                if start >= last_end.get(marker, 0):
+                    entry = by_marker[marker]
+                    end = last_end[marker] = match.end()
+                    matched = source[start:end]
+                    if entry.groups:
+                        group_start, group_end = match.span(groups[marker])
+                        value = source[group_start:group_end] if group_start >= 0 else None
+                    else:
+                        value = matched
+                    for spec in entry.specs:
+                        hits.append(PatternHit(spec.category, spec.label, start, end, matched, value))
+
+                # Other patterns may match at the same offset; try those ordered after this one
+                following = rank[marker] + 1
+                if following > last_rank:
+                    break
+                regex_after, groups = self.compiled(following, flags)
+                match = regex_after.match(text, start)
+                if match is None:
+                    break
+
+            position = start + 1
+
+    def _compile(self, order: List[_Pattern], flags: int):
+        """Build the combined regex for ``order``; returns it and each marker's value group"""
+        value_groups: Dict[str, int] = {}
+        group_count = 0
+
+        def finish(entry: _Pattern, tail: str) -> str:
+            nonlocal group_count
+            value_groups[entry.marker] = group_count + 1
+            group_count += entry.groups + 1  # the tail's groups, then the marker
+            tail = self._case_tail(entry, tail)
+            return f"(?:{tail})(?P<{entry.marker}>)" if tail else f"(?P<{entry.marker}>)"
+
+        return re.compile(self._trie(order, 0, finish), flags), value_groups
+
+    def _case_tail(self, entry: _Pattern, tail: str) -> str:
+        """``tail`` made case-insensitive where lower-casing the text doesn't cover it"""
+        if tail and self.folded and entry.ignore_case and _has_letters(tail):
+            # Lower-casing the text covers the prefix; the tail may still name capitals
+            return f"(?i:{tail})"
+        return tail
+
+    def _trie(self, entries: List[_Pattern], depth: int, finish) -> str:
+        """Alternation of ``entries`` (sorted by prefix) factored on shared prefix characters"""
+        branches = []
+        i = 0
+        while i < len(entries):
+            entry = entries[i]
+            if len(entry.prefix) == depth:
+                # The whole prefix has been matched; continue with the tail
+                branches.append(finish(entry, entry.tail))
+                i += 1
+                continue
+            char = entry.prefix[depth]
+            j = i
+            while j < len(entries) and len(entries[j].prefix) > depth and entries[j].prefix[depth] == char:
+                j += 1
+            branches.append(re.escape(char) + self._trie(entries[i:j], depth + 1, finish))
+            i = j
+
+        if len(branches) == 1:
+            return branches[0]
+        return "(?:" + "|".join(branches) + ")"
+
+
+class PatternScanner:
+    """
+    Compile a set of PatternSpecs once and scan documents in a single pass.
+
+    Patterns must not match the empty string and must not define named groups.
+    """
+
+    def __init__(self, specs: Sequence[PatternSpec]):
+        self.specs = list(specs)
+
+        distinct: Dict[Tuple[str, bool], List[PatternSpec]] = {}
+        for spec in self.specs:
+            distinct.setdefault((spec.pattern, spec.ignore_case), []).append(spec)
+
+        folded, exact = [], []
+        for index, ((pattern, ignore_case), pattern_specs) in enumerate(distinct.items()):
+            compiled = re.compile(pattern, re.IGNORECASE if ignore_case else 0)
+            spec = pattern_specs[0]
+            if compiled.groupindex:
+                raise ValueError(f"Pattern for {spec.category}/{spec.label} defines named groups")
+            if compiled.match(""):
+                raise ValueError(f"Pattern for {spec.category}/{spec.label} matches the empty string")
+
+            entry = _Pattern(pattern, ignore_case, tuple(pattern_specs), compiled.groups, marker=f"p{index}")
+            (folded if ignore_case or not _has_letters(pattern) else exact).append(entry)
+
+        self._lanes = [lane for lane in (_Lane(folded, True), _Lane(exact, False)) if lane.order or lane.separate]
+
+    def scan(self, text: str) -> ScanResult:
+        """Find every pattern's hits in ``text``: one combined pass per lane, plus one per prefixless pattern"""
+        hits: List[PatternHit] = []
+        lowered = None
+        for lane in self._lanes:
+            if not lane.folded:
+                lane.scan(text, text, 0, hits)
+                continue
+            if lowered is None:
+                lowered = text.lower()
+            if len(lowered) == len(text):
+                lane.scan(lowered, text, 0, hits)
+            else:
+                # Some characters lower-case to several; keep offsets by matching the original
+                lane.scan(text, text, re.IGNORECASE, hits)
+
+        # Stable, so hits at one offset keep lane and pattern order
+        hits.sort(key=lambda hit: hit.start)
+        return ScanResult(hits)
@@ -0,0 +1,200 @@
+"""Tiered embedding cache: in-process LRU with a byte budget, backed by Redis"""
+
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import redis.asyncio as redis
+import structlog
+
+from app.core.config import settings
+
+
+logger = structlog.get_logger(__name__)
+
+# Little-endian float32 so cached vectors are portable across workers
+EMBEDDING_DTYPE = np.dtype("<f4")
+
+
+def pack_embedding(embedding: Sequence[float]) -> bytes:
+    """Pack an embedding as float32 bytes (4 bytes per dimension)"""
+    return np.asarray(embedding, dtype=EMBEDDING_DTYPE).tobytes()
+
+
+def unpack_embedding(payload: bytes) -> List[float]:
+    """Inverse of pack_embedding"""
+    return np.frombuffer(payload, dtype=EMBEDDING_DTYPE).tolist()
+
+
+class EmbeddingCache:
+    """
+    Two-tier embedding cache.
+
+    Tier 1 is a per-process LRU bounded by total payload bytes; tier 2 is Redis,
+    shared by every worker. Vectors are stored as packed float32 in both tiers,
+    which is roughly a fifth of the size of a JSON list. Redis failures degrade
+    to local-only caching rather than failing embedding generation.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = 64 * 1024 * 1024,
+        redis_client: Optional[redis.Redis] = None,
+        ttl: int = 30 * 24 * 3600,
+        namespace: str = "embedding"
+    ):
+        self.max_bytes = max_bytes
+        self.redis_client = redis_client
+        self.ttl = ttl
+        self.namespace = namespace
+
+        self._entries: "OrderedDict[str, bytes]" = OrderedDict()
+        self._bytes = 0
+
+        self.local_hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.redis_errors = 0
+
+    def _redis_key(self, key: str) -> str:
+        return f"{self.namespace}:{key}"
+
+    # ------------------------------------------------------------------
+    # Local tier
+    # ------------------------------------------------------------------
+
+    def _local_get(self, key: str) -> Optional[bytes]:
+        payload = self._entries.get(key)
+        if payload is not None:
+            self._entries.move_to_end(key)
+        return payload
+
+    def _local_put(self, key: str, payload: bytes) -> None:
+        size = len(payload)
+        if size > self.max_bytes:
+            return
+
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self._bytes -= len(previous)
+
+        self._entries[key] = payload
+        self._bytes += size
+
+        while self._bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= len(evicted)
+            self.evictions += 1
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    async def get(self, key: str) -> Optional[List[float]]:
+        """Get a single embedding, or None on a miss"""
+        return (await self.get_many([key])).get(key)
+
+    async def set(self, key: str, embedding: Sequence[float]) -> None:
+        """Store a single embedding in both tiers"""
+        await self.set_many({key: embedding})
+
+    async def get_many(self, keys: Sequence[str]) -> Dict[str, List[float]]:
+        """
+        Look up many embeddings with at most one Redis round trip.
+
+        Args:
+            keys: Cache keys (duplicates allowed)
+
+        Returns:
+            Dict of key -> embedding for every key that was found
+        """
+        found: Dict[str, List[float]] = {}
+        remote_keys: List[str] = []
+        remote_hits = 0
+
+        # Local tier operations never await, so they are atomic within the event loop
+        for key in dict.fromkeys(keys):
+            payload = self._local_get(key)
+            if payload is not None:
+                found[key] = unpack_embedding(payload)
+                self.local_hits += 1
+            else:
+                remote_keys.append(key)
+
+        if remote_keys and self.redis_client is not None:
+            try:
+                payloads = await self.redis_client.mget(
+                    [self._redis_key(key) for key in remote_keys]
+                )
+            except Exception as e:
+                self.redis_errors += 1
+                logger.warning("Embedding cache Redis read failed", error=str(e))
+                payloads = [None] * len(remote_keys)
+
+            for key, payload in zip(remote_keys, payloads):
+                if payload is None:
+                    continue
+                # Promote into the local tier
+                self._local_put(key, payload)
+                found[key] = unpack_embedding(payload)
+                remote_hits += 1
+
+        self.redis_hits += remote_hits
+        self.misses += len(remote_keys) - remote_hits
+        return found
+
+    async def set_many(self, embeddings: Dict[str, Sequence[float]]) -> None:
+        """Store embeddings in the local tier and pipeline them to Redis"""
+        if not embeddings:
+            return
+
+        packed = {key: pack_embedding(embedding) for key, embedding in embeddings.items()}
+
+        for key, payload in packed.items():
+            self._local_put(key, payload)
+
+        if self.redis_client is not None:
+            try:
+                pipe = self.redis_client.pipeline(transaction=False)
+                for key, payload in packed.items():
+                    pipe.set(self._redis_key(key), payload, ex=self.ttl)
+                await pipe.execute()
+            except Exception as e:
+                self.redis_errors += 1
+                logger.warning("Embedding cache Redis write failed", error=str(e))
+
+    def clear(self) -> None:
+        """Clear the local tier (Redis entries expire on their own)"""
+        self._entries.clear()
+        self._bytes = 0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.local_hits + self.redis_hits + self.misses
+        if lookups == 0:
+            return 0.0
+        return (self.local_hits + self.redis_hits) / lookups
+
+    def get_stats(self) -> dict:
+        """Cache metrics"""
+        return {
+            "local_hits": self.local_hits,
+            "redis_hits": self.redis_hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hit_rate * 100, 2),
+            "evictions": self.evictions,
+            "redis_errors": self.redis_errors,
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes
+        }
+
+
+# Shared by every EmbeddingService in the process; binary-safe Redis client
+# (the general CacheService decodes responses to str)
+embedding_cache = EmbeddingCache(
+    max_bytes=settings.EMBEDDING_CACHE_MAX_BYTES,
+    redis_client=redis.from_url(settings.REDIS_URL) if settings.REDIS_URL else None,
+    ttl=settings.EMBEDDING_CACHE_TTL
+)
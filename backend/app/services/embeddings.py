@@ -11,10 +11,13 @@ from openai import AsyncOpenAI
 import tiktoken
 import numpy as np
 import structlog
+from sqlalchemy import text
 
 from app.core.config import settings
 from app.core.database import AsyncSessionLocal
 from app.models.documents import Document
+from app.services.embedding_cache import EmbeddingCache, embedding_cache
+from app.services.retrieval import ChunkRetriever, ChunkHit, chunk_by_tokens, vector_literal
 
 
 logger = structlog.get_logger(__name__)
@@ -26,13 +29,14 @@ class EmbeddingService:
     Implements batch processing, caching, and semantic search capabilities.
     """
 
-    def __init__(self):
+    def __init__(self, cache: Optional[EmbeddingCache] = None):
         self.client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
         self.model = settings.EMBEDDING_MODEL
         self.dimensions = settings.EMBEDDING_DIMENSIONS
         self.encoding = tiktoken.encoding_for_model("gpt-3.5-turbo")
-        self._cache = {}  # Simple in-memory cache
+        self.cache = cache or embedding_cache  # Process-wide LRU backed by Redis
         self.max_tokens = 8191  # Maximum tokens for embedding model
+        self.retriever = ChunkRetriever()
 
     async def generate_embedding(self, text: str, cache: bool = True) -> List[float]:
         """
@@ -49,9 +53,10 @@ class EmbeddingService:
             # Check cache
             if cache:
                 cache_key = self._get_cache_key(text)
-                if cache_key in self._cache:
+                cached = await self.cache.get(cache_key)
+                if cached is not None:
                     logger.debug("Returning cached embedding", cache_key=cache_key[:8])
-                    return self._cache[cache_key]
+                    return cached
 
             # Truncate text if too long
             text = self._truncate_text(text)
@@ -67,7 +72,7 @@ class EmbeddingService:
 
             # Cache the result
             if cache:
-                self._cache[cache_key] = embedding
+                await self.cache.set(cache_key, embedding)
 
             return embedding
 
@@ -78,25 +83,42 @@ class EmbeddingService:
     async def batch_generate_embeddings(
         self,
         texts: List[str],
-        batch_size: int = 20
+        batch_size: int = 20,
+        cache: bool = True
     ) -> List[List[float]]:
         """
         Generate embeddings for multiple texts in batches.
 
+        Cached embeddings are served from the cache; only distinct misses are
+        sent to the model.
+
         Args:
             texts: List of texts to generate embeddings for
             batch_size: Number of texts to process in each batch
+            cache: Whether to use caching
 
         Returns:
             List of embeddings corresponding to input texts
         """
-        embeddings = []
+        keys = [self._get_cache_key(content) for content in texts]
+        found = await self.cache.get_many(keys) if cache else {}
+
+        # Distinct misses, in first-seen order
+        pending = {}
+        for key, content in zip(keys, texts):
+            if key not in found and key not in pending:
+                pending[key] = content
 
-        for i in range(0, len(texts), batch_size):
-            batch = texts[i:i + batch_size]
+        if found:
+            logger.debug("Batch embedding cache hits", hits=len(found), misses=len(pending))
+
+        pending_items = list(pending.items())
+
+        for i in range(0, len(pending_items), batch_size):
+            batch_items = pending_items[i:i + batch_size]
 
             # Truncate texts in batch
-            batch = [self._truncate_text(text) for text in batch]
+            batch = [self._truncate_text(content) for _, content in batch_items]
 
             try:
                 response = await self.client.embeddings.create(
@@ -105,8 +127,14 @@ class EmbeddingService:
                     encoding_format="float"
                 )
 
-                batch_embeddings = [item.embedding for item in response.data]
-                embeddings.extend(batch_embeddings)
+                generated = {
+                    key: item.embedding
+                    for (key, _), item in zip(batch_items, response.data)
+                }
+                found.update(generated)
+
+                if cache:
+                    await self.cache.set_many(generated)
 
                 logger.info(
                     "Batch embeddings generated",
@@ -120,10 +148,9 @@ class EmbeddingService:
                     batch_num=i // batch_size + 1,
                     error=str(e)
                 )
-                # Add None for failed embeddings
-                embeddings.extend([None] * len(batch))
 
-        return embeddings
+        # None for failed embeddings
+        return [found.get(key) for key in keys]
 
     async def process_document(
         self,
@@ -213,37 +240,43 @@ class EmbeddingService:
 
             # Perform vector search in database
             async with AsyncSessionLocal() as session:
-                # Build the search query
-                sql = """
-                    SELECT
-                        id,
-                        title,
-                        content,
-                        document_type,
-                        1 - (embedding <=> :query_embedding::vector) AS similarity
-                    FROM documents
-                    WHERE
-                        organization_id = :org_id
-                        AND embedding IS NOT NULL
-                        AND is_deleted = FALSE
-                """
-
+                # Walk the vector index in distance order, computing the
+                # distance once per candidate, then apply the threshold
                 params = {
-                    "query_embedding": query_embedding,
-                    "org_id": organization_id
+                    "query_embedding": vector_literal(query_embedding),
+                    "org_id": organization_id,
+                    "candidates": limit * self.retriever.candidate_multiplier,
+                    "max_distance": 1 - threshold,
+                    "limit": limit
                 }
 
+                document_filter = ""
                 if document_type:
-                    sql += " AND document_type = :doc_type"
+                    document_filter = "AND document_type = :doc_type"
                     params["doc_type"] = document_type
 
-                sql += f"""
-                    AND 1 - (embedding <=> :query_embedding::vector) > :threshold
-                    ORDER BY embedding <=> :query_embedding::vector
+                sql = text(f"""
+                    SELECT id, title, content, document_type, 1 - distance AS similarity
+                    FROM (
+                        SELECT
+                            id,
+                            title,
+                            content,
+                            document_type,
+                            embedding <=> CAST(:query_embedding AS vector) AS distance
+                        FROM documents
+                        WHERE
+                            organization_id = :org_id
+                            AND embedding IS NOT NULL
+                            AND is_deleted = FALSE
+                            {document_filter}
+                        ORDER BY embedding <=> CAST(:query_embedding AS vector)
+                        LIMIT :candidates
+                    ) nn
+                    WHERE distance <= :max_distance
+                    ORDER BY distance
                     LIMIT :limit
-                """
-                params["threshold"] = threshold
-                params["limit"] = limit
+                """)
 
                 result = await session.execute(sql, params)
                 rows = result.fetchall()
@@ -272,6 +305,111 @@ class EmbeddingService:
             logger.error("Semantic search failed", error=str(e), query=query)
             raise
 
+    async def index_document_chunks(
+        self,
+        document_id: str,
+        organization_id: str,
+        content: str,
+        title: str = "",
+        chunk_tokens: int = 400,
+        overlap_tokens: int = 50
+    ) -> Dict[str, Any]:
+        """
+        Chunk a document by tokens, embed the chunks and store them for retrieval.
+
+        Args:
+            document_id: Document ID
+            organization_id: Organization ID for multi-tenant isolation
+            content: Document content
+            title: Document title
+            chunk_tokens: Maximum tokens per chunk
+            overlap_tokens: Tokens shared by consecutive chunks
+
+        Returns:
+            Dictionary with indexing results
+        """
+        try:
+            full_text = f"{title}\n\n{content}" if title else content
+            chunks = chunk_by_tokens(full_text, self.encoding, chunk_tokens, overlap_tokens)
+            embeddings = await self.batch_generate_embeddings([chunk.content for chunk in chunks])
+
+            async with AsyncSessionLocal() as session:
+                written = await self.retriever.replace_document_chunks(
+                    session, document_id, organization_id, chunks, embeddings, self.model
+                )
+                await session.commit()
+
+            logger.info(
+                "Document chunks indexed",
+                document_id=document_id,
+                chunks=len(chunks),
+                written=written
+            )
+
+            return {
+                "document_id": document_id,
+                "chunk_count": len(chunks),
+                "chunks_indexed": written,
+                "embedding_model": self.model,
+                "indexed_at": datetime.utcnow().isoformat()
+            }
+
+        except Exception as e:
+            logger.error("Chunk indexing failed", document_id=document_id, error=str(e))
+            raise
+
+    async def search_chunks(
+        self,
+        query: str,
+        organization_id: str,
+        limit: int = 10,
+        threshold: float = 0.0,
+        hybrid: bool = False,
+        document_type: Optional[str] = None
+    ) -> List[ChunkHit]:
+        """
+        Chunk-level retrieval, optionally fused with full-text ranking.
+
+        Args:
+            query: Search query
+            organization_id: Organization ID for multi-tenant isolation
+            limit: Maximum number of chunks
+            threshold: Cosine similarity threshold for vector hits
+            hybrid: Fuse vector and tsvector rankings with reciprocal-rank fusion
+            document_type: Optional filter by document type
+
+        Returns:
+            Ranked ChunkHits
+        """
+        try:
+            query_embedding = await self.generate_embedding(query)
+
+            async with AsyncSessionLocal() as session:
+                hits = await self.retriever.search(
+                    session,
+                    query_embedding,
+                    organization_id,
+                    limit=limit,
+                    threshold=threshold,
+                    query_text=query,
+                    hybrid=hybrid,
+                    document_type=document_type
+                )
+
+            logger.info(
+                "Chunk search completed",
+                query=query[:50],
+                results=len(hits),
+                hybrid=hybrid,
+                organization_id=organization_id
+            )
+
+            return hits
+
+        except Exception as e:
+            logger.error("Chunk search failed", error=str(e), query=query)
+            raise
+
     async def find_similar_documents(
         self,
         document_id: str,
@@ -363,10 +501,14 @@ class EmbeddingService:
         return hashlib.md5(f"{text}_{self.model}".encode()).hexdigest()
 
     def clear_cache(self):
-        """Clear the embedding cache"""
-        self._cache.clear()
+        """Clear the in-process embedding cache"""
+        self.cache.clear()
         logger.info("Embedding cache cleared")
 
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Embedding cache hit/miss metrics"""
+        return self.cache.get_stats()
+
     async def update_document_embedding(
         self,
         document_id: str,
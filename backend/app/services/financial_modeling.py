@@ -8,10 +8,13 @@ from scipy import stats
 from scipy.optimize import minimize
 from datetime import datetime, date
 from decimal import Decimal
-from typing import Dict, List, Optional, Tuple, Any
+from typing import Dict, List, Optional, Tuple, Any, Callable
 from dataclasses import dataclass
 import logging
 
+from ..utils.monte_carlo import MonteCarloEngine, MonteCarloSummary, dcf_enterprise_values
+from ..utils.sensitivity import present_value_grid
+
 logger = logging.getLogger(__name__)
 
 @dataclass
@@ -108,7 +111,8 @@ class FinancialModelingEngine:
             # Sensitivity analysis
             sensitivity = self._dcf_sensitivity_analysis(
                 inputs,
-                enterprise_value
+                enterprise_value,
+                fcff
             )
 
             return {
@@ -366,75 +370,59 @@ class FinancialModelingEngine:
         self,
         base_case: Dict[str, Any],
         variables: Dict[str, Dict[str, float]],
-        iterations: int = 10000
+        iterations: int = 10000,
+        correlation_matrix: Optional[List[List[float]]] = None,
+        seed: Optional[int] = None,
+        on_progress: Optional[Callable[[MonteCarloSummary], None]] = None
     ) -> Dict[str, Any]:
         """
         Monte Carlo simulation for valuation uncertainty
+
+        All paths are sampled and valued as arrays by MonteCarloEngine; the DCF is
+        evaluated over the whole scenario matrix with dcf_enterprise_values.
         """
         try:
-            results = []
-
-            for _ in range(iterations):
-                # Sample from distributions for each variable
-                scenario = {}
-                for var_name, var_params in variables.items():
-                    if var_params["distribution"] == "normal":
-                        value = np.random.normal(
-                            var_params["mean"],
-                            var_params["std"]
-                        )
-                    elif var_params["distribution"] == "uniform":
-                        value = np.random.uniform(
-                            var_params["min"],
-                            var_params["max"]
-                        )
-                    elif var_params["distribution"] == "triangular":
-                        value = np.random.triangular(
-                            var_params["min"],
-                            var_params["mode"],
-                            var_params["max"]
-                        )
-                    else:
-                        value = var_params["mean"]
-
-                    scenario[var_name] = value
-
-                # Calculate valuation for this scenario
-                if "dcf" in base_case:
-                    # Recalculate DCF with sampled parameters
-                    inputs = DCFInputs(
-                        revenue_base=base_case["revenue_base"],
-                        revenue_growth_rates=[scenario.get("revenue_growth", 0.05)] * 5,
-                        ebitda_margins=[scenario.get("ebitda_margin", 0.20)] * 5,
-                        wacc=scenario.get("wacc", 0.10),
-                        terminal_growth=scenario.get("terminal_growth", 0.025),
-                        tax_rate=scenario.get("tax_rate", 0.21),
-                        nwc_pct_revenue=0.10,
-                        capex_pct_revenue=0.03
-                    )
-                    dcf_result = self.dcf_model(inputs)
-                    results.append(dcf_result["enterprise_value"])
-
-            # Calculate statistics
-            results_array = np.array(results)
-            percentiles = np.percentile(results_array, [5, 25, 50, 75, 95])
+            if "dcf" not in base_case:
+                raise ValueError("Monte Carlo simulation requires a 'dcf' base case")
+
+            def dcf_paths(scenario: Dict[str, np.ndarray]) -> np.ndarray:
+                return dcf_enterprise_values(
+                    revenue_base=base_case["revenue_base"],
+                    revenue_growth=scenario.get("revenue_growth", 0.05),
+                    ebitda_margin=scenario.get("ebitda_margin", 0.20),
+                    wacc=scenario.get("wacc", 0.10),
+                    terminal_growth=scenario.get("terminal_growth", 0.025),
+                    tax_rate=scenario.get("tax_rate", 0.21),
+                    nwc_pct_revenue=0.10,
+                    capex_pct_revenue=0.03,
+                    depreciation_pct_revenue=self.assumptions.depreciation_pct_revenue,
+                    years=5
+                )
+
+            engine = MonteCarloEngine(variables, correlation_matrix=correlation_matrix, seed=seed)
+            base_value = base_case.get("base_value", 0)
+            summary = engine.run(
+                dcf_paths, iterations, thresholds=(base_value,), on_progress=on_progress
+            )
+            percentiles = summary.percentiles
 
             return {
                 "iterations": iterations,
-                "mean": np.mean(results_array),
-                "std": np.std(results_array),
-                "min": np.min(results_array),
-                "max": np.max(results_array),
+                "invalid_paths": summary.invalid_paths,
+                "mean": summary.mean,
+                "std": summary.std,
+                "min": summary.min,
+                "max": summary.max,
                 "percentiles": {
-                    "5th": percentiles[0],
-                    "25th": percentiles[1],
-                    "50th": percentiles[2],
-                    "75th": percentiles[3],
-                    "95th": percentiles[4]
+                    "5th": percentiles[5],
+                    "25th": percentiles[25],
+                    "50th": percentiles[50],
+                    "75th": percentiles[75],
+                    "95th": percentiles[95]
                 },
-                "probability_above_base": np.mean(results_array > base_case.get("base_value", 0)),
-                "var_95": percentiles[0],  # Value at Risk (5th percentile)
-                "histogram_data": np.histogram(results_array, bins=50)
+                "probability_above_base": summary.exceedance[base_value],
+                "var_95": percentiles[5],  # Value at Risk (5th percentile)
+                "histogram_data": (summary.histogram_counts, summary.histogram_edges)
             }
 
         except Exception as e:
@@ -551,34 +539,28 @@ class FinancialModelingEngine:
     def _dcf_sensitivity_analysis(
         self,
         inputs: DCFInputs,
-        base_ev: float
+        base_ev: float,
+        fcff: List[float]
     ) -> Dict[str, Any]:
-        """Sensitivity analysis for DCF model"""
+        """
+        Sensitivity analysis for DCF model
+
+        Cash flows do not depend on WACC or terminal growth, so the whole
+        matrix is evaluated as one broadcast over the projected FCFF.
+        """
         wacc_range = np.arange(inputs.wacc - 0.02, inputs.wacc + 0.02, 0.005)
         terminal_growth_range = np.arange(inputs.terminal_growth - 0.01, inputs.terminal_growth + 0.01, 0.0025)
 
-        sensitivity_matrix = []
-        for tg in terminal_growth_range:
-            row = []
-            for wacc in wacc_range:
-                modified_inputs = DCFInputs(
-                    revenue_base=inputs.revenue_base,
-                    revenue_growth_rates=inputs.revenue_growth_rates,
-                    ebitda_margins=inputs.ebitda_margins,
-                    wacc=wacc,
-                    terminal_growth=tg,
-                    tax_rate=inputs.tax_rate,
-                    nwc_pct_revenue=inputs.nwc_pct_revenue,
-                    capex_pct_revenue=inputs.capex_pct_revenue
-                )
-                result = self.dcf_model(modified_inputs)
-                row.append(result["enterprise_value"])
-            sensitivity_matrix.append(row)
+        wacc = wacc_range[np.newaxis, :]
+        tg = terminal_growth_range[:, np.newaxis]
+        with np.errstate(divide="ignore"):
+            terminal_value = fcff[-1] * (1 + tg) / (wacc - tg)
+        sensitivity_matrix = present_value_grid(fcff, terminal_value, wacc * 100)
 
         return {
             "wacc_range": wacc_range.tolist(),
             "terminal_growth_range": terminal_growth_range.tolist(),
-            "valuation_matrix": sensitivity_matrix,
+            "valuation_matrix": sensitivity_matrix.tolist(),
             "base_case": base_ev
         }
 
@@ -592,23 +574,23 @@ class FinancialModelingEngine:
         exit_multiple_range = np.arange(inputs.exit_multiple - 2, inputs.exit_multiple + 2, 0.5)
         ebitda_growth_range = np.arange(-0.05, 0.15, 0.025)
 
-        irr_matrix = []
-        for growth in ebitda_growth_range:
-            row = []
-            for multiple in exit_multiple_range:
-                # Calculate exit EBITDA with growth
-                exit_ebitda = inputs.revenue_base * (1 + growth) ** inputs.holding_period * inputs.ebitda_margins[-1]
-                exit_ev = exit_ebitda * multiple
-                exit_equity = exit_ev - exit_debt
+        # Rows are EBITDA growth, columns exit multiple
+        exit_ebitda = (
+            inputs.revenue_base * (1 + ebitda_growth_range[:, np.newaxis]) ** inputs.holding_period
+            * inputs.ebitda_margins[-1]
+        )
+        exit_equity = exit_ebitda * exit_multiple_range[np.newaxis, :] - exit_debt
 
-                irr = self._calculate_irr(-equity_investment, exit_equity, inputs.holding_period)
-                row.append(irr)
-            irr_matrix.append(row)
+        if equity_investment > 0:
+            with np.errstate(invalid="ignore"):
+                irr_matrix = (exit_equity / equity_investment) ** (1 / inputs.holding_period) - 1
+        else:
+            irr_matrix = np.zeros_like(exit_equity)
 
         return {
             "exit_multiple_range": exit_multiple_range.tolist(),
             "ebitda_growth_range": ebitda_growth_range.tolist(),
-            "irr_matrix": irr_matrix
+            "irr_matrix": irr_matrix.tolist()
         }
 
     def _calculate_weighted_statistics(
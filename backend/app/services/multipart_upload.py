@@ -0,0 +1,462 @@
+"""
+Streaming uploads for the storage backends
+
+Files are read in fixed-size parts and hashed as they stream, so a multi-GB
+data-room upload never sits in memory as a whole. S3-compatible stores (R2,
+AWS S3) get concurrent multipart uploads; Supabase gets TUS resumable uploads.
+Both can resume an interrupted upload without resending finished parts.
+
+These uploaders are synchronous (boto3 and the TUS client block); async callers
+should run them with ``asyncio.to_thread``.
+"""
+
+import base64
+import hashlib
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from dataclasses import dataclass
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Tuple
+
+import httpx
+
+
+DEFAULT_PART_SIZE = 8 * 1024 * 1024
+MIN_PART_SIZE = 5 * 1024 * 1024  # S3/R2 minimum for every part but the last
+MAX_PARTS = 10000
+SUPABASE_CHUNK_SIZE = 6 * 1024 * 1024  # Supabase requires exactly 6MB TUS chunks
+
+
+class MultipartUploadError(Exception):
+    """An upload failed; ``upload_id`` can be passed back in to resume it"""
+
+    def __init__(self, message: str, key: str, upload_id: Optional[str] = None,
+                 failed_parts: Optional[List[int]] = None):
+        super().__init__(message)
+        self.key = key
+        self.upload_id = upload_id
+        self.failed_parts = failed_parts or []
+
+
+@dataclass
+class StreamedUpload:
+    """Outcome of a streaming upload"""
+    key: str
+    sha256: str
+    size: int
+    parts: int
+    etag: str = ""
+    upload_id: Optional[str] = None
+    resumed_parts: int = 0
+    elapsed_seconds: float = 0.0
+
+
+def stream_size(fileobj: BinaryIO) -> Optional[int]:
+    """Bytes left in a seekable stream, or None when it can't be measured"""
+    try:
+        if not fileobj.seekable():
+            return None
+        position = fileobj.tell()
+        end = fileobj.seek(0, os.SEEK_END)
+        fileobj.seek(position)
+        return end - position
+    except (AttributeError, OSError, ValueError):
+        return None
+
+
+def choose_part_size(total_size: Optional[int], part_size: int = DEFAULT_PART_SIZE) -> int:
+    """Grow the part size when needed so the upload stays within MAX_PARTS"""
+    part_size = max(part_size, MIN_PART_SIZE)
+    if total_size and total_size > part_size * MAX_PARTS:
+        part_size = -(-total_size // MAX_PARTS)
+    return part_size
+
+
+def iter_parts(fileobj: BinaryIO, part_size: int) -> Iterator[Tuple[int, bytes]]:
+    """Yield (part_number, data) from a stream, part numbers starting at 1"""
+    part_number = 1
+    while True:
+        data = fileobj.read(part_size)
+        if not data:
+            return
+        yield part_number, data
+        part_number += 1
+
+
+class MultipartUploader:
+    """
+    Concurrent multipart upload to an S3-compatible bucket.
+
+    The calling thread reads and hashes parts in order while a thread pool
+    uploads them; at most ``max_concurrency`` parts are in flight, so memory
+    stays bounded at roughly ``(max_concurrency + 1) * part_size``. Each part is
+    retried on its own, and a failed upload keeps its finished parts so it can
+    be resumed with the same ``upload_id``.
+    """
+
+    def __init__(
+        self,
+        client,
+        bucket: str,
+        part_size: int = DEFAULT_PART_SIZE,
+        max_concurrency: int = 4,
+        max_attempts: int = 3,
+        retry_backoff: float = 0.5
+    ):
+        """
+        Args:
+            client: boto3 S3 client (thread-safe)
+            bucket: Target bucket
+            part_size: Bytes per part (at least 5MB)
+            max_concurrency: Parts uploaded in parallel
+            max_attempts: Tries per part before the upload fails
+            retry_backoff: Base delay between part retries (doubles each try)
+        """
+        self.client = client
+        self.bucket = bucket
+        self.part_size = part_size
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_attempts = max(1, max_attempts)
+        self.retry_backoff = retry_backoff
+
+    def upload(
+        self,
+        fileobj: BinaryIO,
+        key: str,
+        extra_args: Optional[Dict[str, Any]] = None,
+        upload_id: Optional[str] = None,
+        abort_on_failure: bool = False
+    ) -> StreamedUpload:
+        """
+        Stream a file to ``key``.
+
+        Files smaller than one part go up with a single PUT. To resume, pass the
+        ``upload_id`` from a MultipartUploadError along with the same file: parts
+        already stored are hashed but not resent.
+
+        Args:
+            fileobj: Readable binary stream, positioned at the start of the data
+            key: Object key
+            extra_args: put_object / create_multipart_upload arguments
+                (ContentType, Metadata, ServerSideEncryption, ...)
+            upload_id: Existing multipart upload to resume
+            abort_on_failure: Abort the multipart upload instead of keeping it
+                for a later resume
+
+        Raises:
+            MultipartUploadError: A part failed after all attempts
+        """
+        started = time.perf_counter()
+        extra_args = extra_args or {}
+        part_size = choose_part_size(stream_size(fileobj), self.part_size)
+
+        first = fileobj.read(part_size)
+        if upload_id is None and len(first) < part_size:
+            response = self.client.put_object(Bucket=self.bucket, Key=key, Body=first, **extra_args)
+            return StreamedUpload(
+                key=key,
+                sha256=hashlib.sha256(first).hexdigest(),
+                size=len(first),
+                parts=1,
+                etag=response.get('ETag', '').strip('"'),
+                elapsed_seconds=time.perf_counter() - started
+            )
+
+        stored: Dict[int, Dict[str, Any]] = {}
+        if upload_id is None:
+            upload_id = self.client.create_multipart_upload(
+                Bucket=self.bucket, Key=key, **extra_args
+            )['UploadId']
+        else:
+            stored = self.list_uploaded_parts(key, upload_id)
+
+        digest = hashlib.sha256()
+        size = 0
+        resumed = 0
+        completed: Dict[int, str] = {}
+        failed: Dict[int, Exception] = {}
+        in_flight = {}
+
+        def collect(done):
+            for future in done:
+                part_number = in_flight.pop(future)
+                try:
+                    completed[part_number] = future.result()
+                except Exception as e:
+                    failed[part_number] = e
+
+        parts = self._chain_first(first, fileobj, part_size)
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as pool:
+            for part_number, data in parts:
+                digest.update(data)
+                size += len(data)
+
+                previous = stored.get(part_number)
+                if previous and previous['Size'] == len(data):
+                    completed[part_number] = previous['ETag']
+                    resumed += 1
+                    continue
+
+                if len(in_flight) >= self.max_concurrency:
+                    collect(wait(in_flight, return_when=FIRST_COMPLETED).done)
+                if failed:
+                    break
+
+                future = pool.submit(self._upload_part, key, upload_id, part_number, data)
+                in_flight[future] = part_number
+
+            collect(wait(in_flight).done)
+
+        if failed:
+            if abort_on_failure:
+                self.abort(key, upload_id)
+            first_error = failed[min(failed)]
+            raise MultipartUploadError(
+                f"Part upload failed after {self.max_attempts} attempts: {first_error}",
+                key=key,
+                upload_id=None if abort_on_failure else upload_id,
+                failed_parts=sorted(failed)
+            ) from first_error
+
+        response = self.client.complete_multipart_upload(
+            Bucket=self.bucket,
+            Key=key,
+            UploadId=upload_id,
+            MultipartUpload={'Parts': [
+                {'PartNumber': number, 'ETag': completed[number]} for number in sorted(completed)
+            ]}
+        )
+
+        return StreamedUpload(
+            key=key,
+            sha256=digest.hexdigest(),
+            size=size,
+            parts=len(completed),
+            etag=response.get('ETag', '').strip('"'),
+            upload_id=upload_id,
+            resumed_parts=resumed,
+            elapsed_seconds=time.perf_counter() - started
+        )
+
+    def list_uploaded_parts(self, key: str, upload_id: str) -> Dict[int, Dict[str, Any]]:
+        """Parts the store already holds for an upload, by part number"""
+        parts = {}
+        marker = 0
+        while True:
+            response = self.client.list_parts(
+                Bucket=self.bucket, Key=key, UploadId=upload_id, PartNumberMarker=marker
+            )
+            for part in response.get('Parts', []):
+                parts[part['PartNumber']] = part
+            if not response.get('IsTruncated'):
+                return parts
+            marker = response['NextPartNumberMarker']
+
+    def abort(self, key: str, upload_id: str) -> None:
+        """Drop an unfinished multipart upload and its stored parts"""
+        try:
+            self.client.abort_multipart_upload(Bucket=self.bucket, Key=key, UploadId=upload_id)
+        except Exception:
+            # Bucket lifecycle rules clean up anything left behind
+            pass
+
+    def _upload_part(self, key: str, upload_id: str, part_number: int, data: bytes) -> str:
+        for attempt in range(self.max_attempts):
+            try:
+                response = self.client.upload_part(
+                    Bucket=self.bucket,
+                    Key=key,
+                    UploadId=upload_id,
+                    PartNumber=part_number,
+                    Body=data
+                )
+                return response['ETag']
+            except Exception:
+                if attempt == self.max_attempts - 1:
+                    raise
+                time.sleep(self.retry_backoff * (2 ** attempt))
+
+    @staticmethod
+    def _chain_first(first: bytes, fileobj: BinaryIO, part_size: int) -> Iterator[Tuple[int, bytes]]:
+        yield 1, first
+        for part_number, data in iter_parts(fileobj, part_size):
+            yield part_number + 1, data
+
+
+class TusUploader:
+    """
+    Resumable upload to Supabase Storage over the TUS protocol.
+
+    TUS appends at the server's offset, so chunks go up in order rather than
+    concurrently. A failed chunk is retried from whatever offset the server
+    reports, and an interrupted upload resumes from its upload URL.
+    """
+
+    def __init__(
+        self,
+        supabase_url: str,
+        api_key: str,
+        bucket: str,
+        chunk_size: int = SUPABASE_CHUNK_SIZE,
+        max_attempts: int = 3,
+        retry_backoff: float = 0.5,
+        http_client: Optional[httpx.Client] = None,
+        timeout: float = 60.0
+    ):
+        self.endpoint = f"{supabase_url.rstrip('/')}/storage/v1/upload/resumable"
+        self.bucket = bucket
+        self.chunk_size = chunk_size
+        self.max_attempts = max(1, max_attempts)
+        self.retry_backoff = retry_backoff
+        self.headers = {
+            'Authorization': f"Bearer {api_key}",
+            'apikey': api_key,
+            'Tus-Resumable': '1.0.0'
+        }
+        self.http = http_client or httpx.Client(timeout=timeout)
+
+    def upload(
+        self,
+        fileobj: BinaryIO,
+        path: str,
+        content_type: str,
+        cache_control: str = '3600',
+        upload_url: Optional[str] = None,
+        upsert: bool = False
+    ) -> StreamedUpload:
+        """
+        Stream a file to ``path`` in the bucket.
+
+        Args:
+            fileobj: Readable binary stream, positioned at the start of the data
+            path: Object path within the bucket
+            content_type: MIME type stored with the object
+            cache_control: Cache-Control max-age in seconds
+            upload_url: TUS upload URL from a MultipartUploadError, to resume
+            upsert: Overwrite an existing object at ``path``
+
+        Raises:
+            MultipartUploadError: A chunk failed after all attempts
+        """
+        started = time.perf_counter()
+        total = stream_size(fileobj)
+        offset = 0
+        if upload_url is None:
+            upload_url = self._create(path, content_type, cache_control, total, upsert)
+        else:
+            offset = self._server_offset(upload_url)
+
+        digest = hashlib.sha256()
+        position = 0
+        chunks = 0
+        resumed = 0
+        for _, data in iter_parts(fileobj, self.chunk_size):
+            digest.update(data)
+            chunk_start = position
+            position += len(data)
+            chunks += 1
+
+            if position <= offset:
+                resumed += 1
+                continue
+
+            final = total is None and len(data) < self.chunk_size
+            try:
+                offset = self._send(upload_url, data, chunk_start, offset, final)
+            except (httpx.HTTPError, ValueError) as e:
+                raise MultipartUploadError(
+                    f"Chunk upload failed after {self.max_attempts} attempts: {e}",
+                    key=path,
+                    upload_id=upload_url,
+                    failed_parts=[chunks]
+                ) from e
+
+        if total is None and position == offset and position % self.chunk_size == 0:
+            # Deferred length and the stream ended on a chunk boundary
+            self._patch(upload_url, b'', offset, final_length=position)
+
+        return StreamedUpload(
+            key=path,
+            sha256=digest.hexdigest(),
+            size=position,
+            parts=chunks,
+            upload_id=upload_url,
+            resumed_parts=resumed,
+            elapsed_seconds=time.perf_counter() - started
+        )
+
+    def terminate(self, upload_url: Optional[str]) -> None:
+        """Discard an unfinished upload and the bytes stored for it"""
+        if not upload_url:
+            return
+        try:
+            self.http.delete(upload_url, headers=self.headers)
+        except httpx.HTTPError:
+            # Supabase expires abandoned uploads on its own
+            pass
+
+    def close(self) -> None:
+        self.http.close()
+
+    def _create(self, path: str, content_type: str, cache_control: str,
+                total: Optional[int], upsert: bool) -> str:
+        metadata = {
+            'bucketName': self.bucket,
+            'objectName': path,
+            'contentType': content_type,
+            'cacheControl': cache_control
+        }
+        headers = {
+            **self.headers,
+            'x-upsert': 'true' if upsert else 'false',
+            'Upload-Metadata': ','.join(
+                f"{name} {base64.b64encode(value.encode()).decode()}"
+                for name, value in metadata.items()
+            )
+        }
+        if total is None:
+            headers['Upload-Defer-Length'] = '1'
+        else:
+            headers['Upload-Length'] = str(total)
+
+        response = self.http.post(self.endpoint, headers=headers)
+        response.raise_for_status()
+        location = response.headers['Location']
+        return str(response.request.url.join(location))
+
+    def _server_offset(self, upload_url: str) -> int:
+        response = self.http.head(upload_url, headers=self.headers)
+        response.raise_for_status()
+        return int(response.headers['Upload-Offset'])
+
+    def _send(self, upload_url: str, data: bytes, chunk_start: int, offset: int, final: bool) -> int:
+        """PATCH the part of ``data`` the server doesn't have yet; returns the new offset"""
+        for attempt in range(self.max_attempts):
+            try:
+                skip = offset - chunk_start
+                if skip < 0 or skip > len(data):
+                    raise ValueError(f"Server offset {offset} is outside chunk at {chunk_start}")
+                return self._patch(
+                    upload_url,
+                    data[skip:],
+                    offset,
+                    final_length=chunk_start + len(data) if final else None
+                )
+            except (httpx.HTTPError, ValueError):
+                if attempt == self.max_attempts - 1:
+                    raise
+                time.sleep(self.retry_backoff * (2 ** attempt))
+                offset = self._server_offset(upload_url)
+
+    def _patch(self, upload_url: str, data: bytes, offset: int,
+               final_length: Optional[int] = None) -> int:
+        headers = {
+            **self.headers,
+            'Upload-Offset': str(offset),
+            'Content-Type': 'application/offset+octet-stream'
+        }
+        if final_length is not None:
+            headers['Upload-Length'] = str(final_length)
+        response = self.http.patch(upload_url, headers=headers, content=data)
+        response.raise_for_status()
+        return int(response.headers['Upload-Offset'])
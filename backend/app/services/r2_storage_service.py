@@ -6,8 +6,8 @@ Story 3.1: Document Upload API - Cloudflare R2 integration
 
 import os
 import uuid
+import asyncio
 import mimetypes
-import hashlib
 from typing import Optional, Dict, Any, BinaryIO
 from datetime import datetime, timedelta
 import json
@@ -17,6 +17,8 @@ from botocore.exceptions import ClientError, NoCredentialsError
 from botocore.config import Config
 
 from app.core.config import settings
+from app.services.multipart_upload import MultipartUploader, MultipartUploadError
+from app.services.storage_usage import get_usage_tracker, iter_bucket_objects
 
 
 class R2StorageService:
@@ -74,6 +76,17 @@ class R2StorageService:
         # Defer bucket initialization until first use
         self._bucket_initialized = False
 
+        # Streaming multipart uploads (parts go up concurrently on a thread pool)
+        self.uploader = MultipartUploader(
+            self.client,
+            self.bucket_name,
+            part_size=int(os.getenv('STORAGE_UPLOAD_PART_SIZE', 8 * 1024 * 1024)),
+            max_concurrency=int(os.getenv('STORAGE_UPLOAD_CONCURRENCY', 4))
+        )
+
+        # Per-organization/deal usage counters, kept current on every write
+        self.usage = get_usage_tracker(self.bucket_name)
+
     def _ensure_bucket_exists(self):
         """Create R2 bucket if it doesn't exist - only called when bucket is actually needed"""
         if self._bucket_initialized:
@@ -178,11 +191,20 @@ class R2StorageService:
         organization_id: str,
         deal_id: Optional[str] = None,
         content_type: Optional[str] = None,
-        metadata: Optional[Dict[str, str]] = None
+        metadata: Optional[Dict[str, str]] = None,
+        upload_id: Optional[str] = None,
+        r2_key: Optional[str] = None,
+        resumable: bool = True
     ) -> Dict[str, Any]:
         """
         Upload document to Cloudflare R2
 
+        The file is streamed in parts and hashed as it goes, so memory use is
+        bounded by the part size rather than the file size. Files larger than
+        one part use a concurrent multipart upload; if it fails, the result
+        carries ``upload_id`` and ``r2_key``, and passing both back with the
+        same file resumes it without resending finished parts.
+
         Benefits:
         - No egress fees when users download
         - Automatic CDN distribution
@@ -191,27 +213,22 @@ class R2StorageService:
         # Ensure bucket exists before upload
         self._ensure_bucket_exists()
 
-        try:
-            # Generate R2 key
-            r2_key = self._generate_r2_key(organization_id, deal_id, filename)
+        # Generate R2 key (reuse it when resuming)
+        r2_key = r2_key or self._generate_r2_key(organization_id, deal_id, filename)
 
+        try:
             # Detect content type
             if not content_type:
                 content_type, _ = mimetypes.guess_type(filename)
                 if not content_type:
                     content_type = 'application/octet-stream'
 
-            # Read file and calculate hash
-            file_content = file.read()
-            file_hash = hashlib.sha256(file_content).hexdigest()
-            file.seek(0)
-
-            # Prepare metadata (R2 supports S3-style metadata)
+            # Prepare metadata (R2 supports S3-style metadata). The hash is only
+            # known once the last part is read, so it is returned, not stored here.
             r2_metadata = {
                 'organization_id': organization_id,
                 'uploaded_at': datetime.utcnow().isoformat(),
-                'original_filename': filename,
-                'file_hash': file_hash
+                'original_filename': filename
             }
 
             if deal_id:
@@ -221,17 +238,21 @@ class R2StorageService:
                 r2_metadata.update(metadata)
 
             # Upload to R2 with server-side encryption
-            response = self.client.put_object(
-                Bucket=self.bucket_name,
-                Key=r2_key,
-                Body=file_content,
-                ContentType=content_type,
-                Metadata=r2_metadata,
-                # R2 automatically encrypts at rest
-                ServerSideEncryption='AES256',
-                # Cache control for CDN
-                CacheControl='private, max-age=31536000'
+            upload = self.uploader.upload(
+                file,
+                r2_key,
+                extra_args={
+                    'ContentType': content_type,
+                    'Metadata': r2_metadata,
+                    # R2 automatically encrypts at rest
+                    'ServerSideEncryption': 'AES256',
+                    # Cache control for CDN
+                    'CacheControl': 'private, max-age=31536000'
+                },
+                upload_id=upload_id,
+                abort_on_failure=not resumable
             )
+            self.usage.record_upload(r2_key, upload.size)
 
             # Generate URL (use custom domain if configured)
             if self.public_domain:
@@ -245,12 +266,21 @@ class R2StorageService:
                 'r2_bucket': self.bucket_name,
                 'r2_key': r2_key,
                 'r2_url': url,
-                'r2_etag': response.get('ETag', '').strip('"'),
-                'file_hash': file_hash,
-                'file_size': len(file_content),
-                'content_type': content_type
+                'r2_etag': upload.etag,
+                'file_hash': upload.sha256,
+                'file_size': upload.size,
+                'content_type': content_type,
+                'parts': upload.parts,
+                'resumed_parts': upload.resumed_parts
             }
 
+        except MultipartUploadError as e:
+            return {
+                'success': False,
+                'error': f"R2 upload failed: {str(e)}",
+                'r2_key': r2_key,
+                'upload_id': e.upload_id
+            }
         except NoCredentialsError:
             return {
                 'success': False,
@@ -267,6 +297,13 @@ class R2StorageService:
                 'error': f"Unexpected error: {str(e)}"
             }
 
+    async def upload_document_async(self, file: BinaryIO, filename: str, organization_id: str,
+                                    **kwargs) -> Dict[str, Any]:
+        """upload_document on a worker thread, keeping the event loop free"""
+        return await asyncio.to_thread(
+            self.upload_document, file, filename, organization_id, **kwargs
+        )
+
     def generate_presigned_url(
         self,
         r2_key: str,
@@ -357,13 +394,25 @@ class R2StorageService:
                 'error': str(e)
             }
 
+    def _object_size(self, r2_key: str) -> Optional[int]:
+        """Object size for usage accounting (skipped when counters are off)"""
+        if not self.usage.enabled:
+            return None
+        try:
+            return self.client.head_object(Bucket=self.bucket_name, Key=r2_key)['ContentLength']
+        except ClientError:
+            return None
+
     def delete_document(self, r2_key: str) -> bool:
         """Delete document from R2"""
         try:
+            size = self._object_size(r2_key)
             self.client.delete_object(
                 Bucket=self.bucket_name,
                 Key=r2_key
             )
+            if size is not None:
+                self.usage.record_delete(r2_key, size)
             return True
         except ClientError:
             return False
@@ -391,6 +440,9 @@ class R2StorageService:
                 Key=new_key,
                 ServerSideEncryption='AES256'
             )
+            size = self._object_size(new_key)
+            if size is not None:
+                self.usage.record_upload(new_key, size)
 
             if self.public_domain:
                 url = f"https://{self.public_domain}/{new_key}"
@@ -446,42 +498,43 @@ class R2StorageService:
                     return False
             return False
 
-    def get_usage_stats(self) -> Dict[str, Any]:
+    def get_usage_stats(
+        self,
+        organization_id: Optional[str] = None,
+        include_organizations: bool = False
+    ) -> Dict[str, Any]:
         """
         Get R2 usage statistics
 
+        Served from the incremental usage counters (a few Redis hash reads),
+        not a bucket listing. Without Redis it falls back to listing the
+        bucket, which is slow and costs Class A operations.
+
         R2 Free Tier:
         - 10GB storage
         - 10M Class A operations (PUT, POST, LIST)
         - 10M Class B operations (GET)
         - UNLIMITED egress
+
+        Args:
+            organization_id: Report one tenant's usage with its per-deal breakdown
+            include_organizations: Add a per-tenant breakdown to bucket totals
         """
         try:
-            # Get bucket size (note: this lists all objects, use sparingly)
-            paginator = self.client.get_paginator('list_objects_v2')
-            total_size = 0
-            total_count = 0
-
-            for page in paginator.paginate(Bucket=self.bucket_name):
-                if 'Contents' in page:
-                    for obj in page['Contents']:
-                        total_size += obj['Size']
-                        total_count += 1
-
-            # Convert to readable format
-            size_gb = total_size / (1024 ** 3)
+            if not self.usage.enabled:
+                return self._usage_summary(self._scan_usage())
+
+            if organization_id:
+                return {
+                    'provider': 'Cloudflare R2',
+                    'bucket': self.bucket_name,
+                    **self.usage.get_organization_usage(organization_id)
+                }
 
-            return {
-                'provider': 'Cloudflare R2',
-                'bucket': self.bucket_name,
-                'total_files': total_count,
-                'total_size_bytes': total_size,
-                'total_size_gb': round(size_gb, 2),
-                'free_tier_usage': f"{round(size_gb / 10 * 100, 1)}%" if size_gb <= 10 else "Exceeded",
-                'estimated_monthly_cost': 0 if size_gb <= 10 else round((size_gb - 10) * 0.015, 2),
-                'bandwidth_cost': 0,  # Always zero with R2!
-                'note': 'R2 has ZERO egress fees - unlimited free bandwidth!'
-            }
+            stats = self._usage_summary(self.usage.get_totals())
+            if include_organizations:
+                stats['organizations'] = self.usage.get_organization_breakdown()
+            return stats
 
         except Exception as e:
             return {
@@ -489,6 +542,34 @@ class R2StorageService:
                 'provider': 'Cloudflare R2'
             }
 
+    def _scan_usage(self) -> Dict[str, int]:
+        """Sum the bucket listing (slow; reconciliation and no-Redis fallback only)"""
+        total_size = 0
+        total_count = 0
+        for _, size in iter_bucket_objects(self.client, self.bucket_name):
+            total_size += size
+            total_count += 1
+        return {'total_size_bytes': total_size, 'total_files': total_count}
+
+    def _usage_summary(self, usage: Dict[str, Any]) -> Dict[str, Any]:
+        # Convert to readable format
+        size_gb = usage['total_size_bytes'] / (1024 ** 3)
+
+        return {
+            'provider': 'Cloudflare R2',
+            'bucket': self.bucket_name,
+            **usage,
+            'total_size_gb': round(size_gb, 2),
+            'free_tier_usage': f"{round(size_gb / 10 * 100, 1)}%" if size_gb <= 10 else "Exceeded",
+            'estimated_monthly_cost': 0 if size_gb <= 10 else round((size_gb - 10) * 0.015, 2),
+            'bandwidth_cost': 0,  # Always zero with R2!
+            'note': 'R2 has ZERO egress fees - unlimited free bandwidth!'
+        }
+
+    def reconcile_usage(self) -> Dict[str, Any]:
+        """Rebuild the usage counters from a full bucket listing"""
+        return self.usage.reconcile(iter_bucket_objects(self.client, self.bucket_name))
+
 
 # Lazy singleton instance - initialized only when needed
 _r2_storage_service = None
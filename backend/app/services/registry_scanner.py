@@ -0,0 +1,284 @@
+"""
+Registry Scanner
+Concurrent fan-out of Companies House and SEC EDGAR scans across organizations
+"""
+
+from typing import Dict, List, Any, Optional, Tuple
+import asyncio
+import logging
+import time
+
+import httpx
+
+from ..integrations.companies_house import CompaniesHouseAPI
+from ..integrations.sec_edgar import SECEdgarAPI
+from ..integrations.rate_limit import AsyncTokenBucket
+
+logger = logging.getLogger(__name__)
+
+
+class RegistryScanner:
+    """
+    Run registry scans for many organizations in one event loop
+
+    All requests share one pooled HTTP client and a token bucket per registry.
+    Each distinct filter (SIC code, CIK) is fetched once however many
+    organizations ask for it, and companies are deduplicated before they are
+    handed to the discovery service for persistence.
+
+    Usage:
+        async with RegistryScanner(discovery_service) as scanner:
+            result = await scanner.scan_companies_house({org_id: filters})
+    """
+
+    def __init__(
+        self,
+        discovery_service,
+        companies_house_api_key: Optional[str] = None,
+        sec_user_agent: Optional[str] = None,
+        companies_house_url: Optional[str] = None,
+        sec_api_base: Optional[str] = None,
+        companies_house_limiter: Optional[AsyncTokenBucket] = None,
+        sec_limiter: Optional[AsyncTokenBucket] = None,
+        concurrency: int = 8,
+        max_connections: int = 20,
+        timeout: float = 30.0
+    ):
+        """
+        Args:
+            discovery_service: OpportunityDiscoveryService used to persist results
+            companies_house_api_key: Companies House API key (defaults to env)
+            sec_user_agent: SEC EDGAR user agent (defaults to env)
+            companies_house_url: Override the Companies House host
+            sec_api_base: Override the SEC EDGAR data host
+            companies_house_limiter: Token bucket (defaults to 600 per 5 minutes)
+            sec_limiter: Token bucket (defaults to 10 per second)
+            concurrency: Maximum registry scans in flight
+            max_connections: HTTP connection pool size
+            timeout: Request timeout in seconds
+        """
+        self.discovery_service = discovery_service
+        self.companies_house_api_key = companies_house_api_key
+        self.sec_user_agent = sec_user_agent
+        self.companies_house_url = companies_house_url
+        self.sec_api_base = sec_api_base
+        self.companies_house_limiter = companies_house_limiter or CompaniesHouseAPI.default_rate_limiter()
+        self.sec_limiter = sec_limiter or SECEdgarAPI.default_rate_limiter()
+        self.concurrency = concurrency
+        self.max_connections = max_connections
+        self.timeout = timeout
+
+        self.client: Optional[httpx.AsyncClient] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._companies_house: Optional[CompaniesHouseAPI] = None
+        self._sec_edgar: Optional[SECEdgarAPI] = None
+
+    async def __aenter__(self):
+        self.client = httpx.AsyncClient(
+            timeout=self.timeout,
+            limits=httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_connections
+            )
+        )
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    async def close(self):
+        """Close the pooled HTTP client"""
+        if self.client is not None:
+            await self.client.aclose()
+            self.client = None
+
+    @property
+    def companies_house(self) -> CompaniesHouseAPI:
+        """Companies House client bound to the shared pool (created on first use)"""
+        if self._companies_house is None:
+            self._companies_house = CompaniesHouseAPI(
+                api_key=self.companies_house_api_key,
+                session=self._require_client(),
+                rate_limiter=self.companies_house_limiter,
+                base_url=self.companies_house_url
+            )
+        return self._companies_house
+
+    @property
+    def sec_edgar(self) -> SECEdgarAPI:
+        """SEC EDGAR client bound to the shared pool (created on first use)"""
+        if self._sec_edgar is None:
+            self._sec_edgar = SECEdgarAPI(
+                user_agent=self.sec_user_agent,
+                session=self._require_client(),
+                rate_limiter=self.sec_limiter,
+                api_base=self.sec_api_base
+            )
+        return self._sec_edgar
+
+    def _require_client(self) -> httpx.AsyncClient:
+        if self.client is None:
+            raise RuntimeError("RegistryScanner must be used as an async context manager")
+        return self.client
+
+    async def _bounded(self, coro):
+        async with self._semaphore:
+            return await coro
+
+    async def scan_companies_house(
+        self,
+        organization_scans: Dict[str, List[Dict[str, Any]]]
+    ) -> Dict[str, Any]:
+        """
+        Scan Companies House for every organization and SIC filter
+
+        Args:
+            organization_scans: {organization_id: [{"industry_sic", "min_age_years"}, ...]}
+
+        Returns:
+            Scan summary with per-organization counts
+        """
+        started = time.perf_counter()
+
+        filter_keys = {
+            self._sic_filter_key(scan_filter)
+            for scans in organization_scans.values()
+            for scan_filter in scans
+        }
+        filter_keys = sorted(filter_keys)
+
+        results = await asyncio.gather(
+            *(
+                self._bounded(self.companies_house.identify_distressed_companies(
+                    industry_sic=industry_sic,
+                    min_age_years=min_age
+                ))
+                for industry_sic, min_age in filter_keys
+            ),
+            return_exceptions=True
+        )
+
+        companies_by_filter: Dict[Tuple[str, int], List[Dict[str, Any]]] = {}
+        failed_filters = []
+        for key, result in zip(filter_keys, results):
+            if isinstance(result, Exception):
+                logger.error(f"Error scanning SIC {key[0]}: {str(result)}")
+                failed_filters.append(key[0])
+                continue
+            for company in result:
+                company.setdefault("industry_sic", key[0])
+            companies_by_filter[key] = result
+
+        companies_fetched = sum(len(companies) for companies in companies_by_filter.values())
+
+        def candidates_for(scans):
+            unique = {}
+            for scan_filter in scans:
+                for company in companies_by_filter.get(self._sic_filter_key(scan_filter), []):
+                    unique.setdefault(company.get("company_number"), company)
+            unique.pop(None, None)
+            return list(unique.values())
+
+        summary = self._persist(
+            organization_scans,
+            candidates_for,
+            self.discovery_service.create_uk_opportunities
+        )
+
+        summary.update({
+            "source": "companies_house",
+            "filters_scanned": len(filter_keys),
+            "failed_filters": failed_filters,
+            "companies_fetched": companies_fetched,
+            "elapsed_seconds": round(time.perf_counter() - started, 3),
+            "rate_limit_wait_seconds": round(self.companies_house_limiter.total_wait_seconds, 3)
+        })
+        return summary
+
+    async def scan_sec_edgar(
+        self,
+        organization_ciks: Dict[str, List[str]]
+    ) -> Dict[str, Any]:
+        """
+        Fetch SEC EDGAR company facts for every organization's CIK list
+
+        Args:
+            organization_ciks: {organization_id: [cik, ...]}
+
+        Returns:
+            Scan summary with per-organization counts
+        """
+        started = time.perf_counter()
+
+        ciks = sorted({
+            str(cik).zfill(10)
+            for cik_list in organization_ciks.values()
+            for cik in cik_list
+        })
+
+        results = await asyncio.gather(
+            *(self._bounded(self.sec_edgar.get_company_facts(cik)) for cik in ciks),
+            return_exceptions=True
+        )
+
+        facts_by_cik = {}
+        failed_ciks = []
+        for cik, facts in zip(ciks, results):
+            if isinstance(facts, Exception):
+                logger.warning(f"Error processing CIK {cik}: {str(facts)}")
+                failed_ciks.append(cik)
+                continue
+            facts_by_cik[cik] = facts
+
+        def candidates_for(cik_list):
+            return {
+                cik: facts_by_cik[cik]
+                for cik in (str(c).zfill(10) for c in cik_list)
+                if cik in facts_by_cik
+            }
+
+        summary = self._persist(
+            organization_ciks,
+            candidates_for,
+            self.discovery_service.create_us_opportunities
+        )
+
+        summary.update({
+            "source": "sec_edgar",
+            "ciks_scanned": len(ciks),
+            "failed_ciks": failed_ciks,
+            "companies_fetched": len(facts_by_cik),
+            "elapsed_seconds": round(time.perf_counter() - started, 3),
+            "rate_limit_wait_seconds": round(self.sec_limiter.total_wait_seconds, 3)
+        })
+        return summary
+
+    def _persist(self, organization_inputs, candidates_for, create) -> Dict[str, Any]:
+        """Write candidates per organization (the DB session is not shared across tasks)"""
+        per_organization = {}
+        total = 0
+
+        for org_id, inputs in organization_inputs.items():
+            try:
+                created = create(org_id, candidates_for(inputs))
+            except Exception as e:
+                logger.error(f"Error saving opportunities for org {org_id}: {str(e)}")
+                per_organization[org_id] = {"error": str(e)}
+                continue
+
+            per_organization[org_id] = {"opportunities_discovered": len(created)}
+            total += len(created)
+
+        return {
+            "opportunities_discovered": total,
+            "organizations_scanned": len(organization_inputs),
+            "organizations": per_organization
+        }
+
+    @staticmethod
+    def _sic_filter_key(scan_filter: Dict[str, Any]) -> Tuple[str, int]:
+        return (
+            str(scan_filter.get("industry_sic", "62")),
+            int(scan_filter.get("min_age_years", 3))
+        )
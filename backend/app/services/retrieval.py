@@ -0,0 +1,397 @@
+"""Chunk-level vector retrieval with optional lexical hybrid scoring"""
+
+from dataclasses import dataclass, asdict
+from typing import List, Dict, Any, Optional, Sequence, Hashable, Tuple
+
+import numpy as np
+import structlog
+from sqlalchemy import text
+
+
+logger = structlog.get_logger(__name__)
+
+
+@dataclass
+class TextChunk:
+    """A token-bounded slice of a document"""
+    index: int
+    content: str
+    char_start: int
+    char_end: int
+    token_count: int
+
+
+@dataclass
+class ChunkHit:
+    """A retrieved chunk with its rank in each retriever"""
+    chunk_id: str
+    document_id: str
+    chunk_index: int
+    content: str
+    similarity: Optional[float] = None
+    vector_rank: Optional[int] = None
+    lexical_rank: Optional[int] = None
+    score: float = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def chunk_by_tokens(
+    content: str,
+    encoding,
+    chunk_tokens: int = 400,
+    overlap_tokens: int = 50
+) -> List[TextChunk]:
+    """
+    Split text into overlapping chunks of at most ``chunk_tokens`` tokens.
+
+    Chunk boundaries fall on token boundaries and carry character offsets into
+    the original text, so hits can be highlighted in the source document.
+
+    Args:
+        content: Text to split
+        encoding: tiktoken-style encoding (encode / decode_with_offsets)
+        chunk_tokens: Maximum tokens per chunk
+        overlap_tokens: Tokens shared by consecutive chunks
+
+    Returns:
+        List of TextChunk
+    """
+    if overlap_tokens >= chunk_tokens:
+        raise ValueError("overlap_tokens must be smaller than chunk_tokens")
+
+    tokens = encoding.encode(content)
+    if not tokens:
+        return []
+
+    _, offsets = encoding.decode_with_offsets(tokens)
+    offsets = list(offsets) + [len(content)]
+
+    chunks = []
+    step = chunk_tokens - overlap_tokens
+    for start in range(0, len(tokens), step):
+        end = min(start + chunk_tokens, len(tokens))
+        char_start, char_end = offsets[start], offsets[end]
+        chunks.append(TextChunk(
+            index=len(chunks),
+            content=content[char_start:char_end],
+            char_start=char_start,
+            char_end=char_end,
+            token_count=end - start
+        ))
+        if end == len(tokens):
+            break
+
+    return chunks
+
+
+def vector_literal(embedding: Sequence[float]) -> str:
+    """Format an embedding as a pgvector text literal"""
+    return "[" + ",".join(f"{float(x):.7g}" for x in embedding) + "]"
+
+
+def reciprocal_rank_fusion(
+    rankings: Sequence[Sequence[Hashable]],
+    k: int = 60,
+    weights: Optional[Sequence[float]] = None
+) -> List[Tuple[Hashable, float]]:
+    """
+    Fuse ranked lists with reciprocal-rank fusion.
+
+    score(d) = sum_i w_i / (k + rank_i(d)), ranks starting at 1. RRF needs no
+    score calibration between retrievers, which is why it suits combining
+    cosine similarity with ts_rank.
+
+    Args:
+        rankings: Ranked id lists, best first
+        k: Damping constant (60 is the value from the original paper)
+        weights: Optional per-ranking weights
+
+    Returns:
+        (id, score) pairs sorted by descending score
+    """
+    weights = weights or [1.0] * len(rankings)
+    scores: Dict[Hashable, float] = {}
+    for ranking, weight in zip(rankings, weights):
+        for rank, item in enumerate(ranking, start=1):
+            scores[item] = scores.get(item, 0.0) + weight / (k + rank)
+    return sorted(scores.items(), key=lambda pair: pair[1], reverse=True)
+
+
+def recall_at_k(retrieved: Sequence[Hashable], relevant: Sequence[Hashable], k: int) -> float:
+    """Fraction of the true top-k found in the retrieved top-k"""
+    truth = set(list(relevant)[:k])
+    if not truth:
+        return 1.0
+    return len(truth & set(list(retrieved)[:k])) / len(truth)
+
+
+def latency_summary(samples_ms: Sequence[float]) -> Dict[str, float]:
+    """Mean and tail latency of a set of samples (milliseconds)"""
+    samples = np.asarray(samples_ms, dtype=np.float64)
+    if samples.size == 0:
+        return {"count": 0, "mean_ms": 0.0, "p50_ms": 0.0, "p95_ms": 0.0, "p99_ms": 0.0}
+    p50, p95, p99 = np.percentile(samples, [50, 95, 99])
+    return {
+        "count": int(samples.size),
+        "mean_ms": round(float(samples.mean()), 3),
+        "p50_ms": round(float(p50), 3),
+        "p95_ms": round(float(p95), 3),
+        "p99_ms": round(float(p99), 3)
+    }
+
+
+class ChunkRetriever:
+    """
+    Retrieval over the ``document_chunks`` table.
+
+    The vector query orders by ``embedding <=> query`` with a LIMIT so Postgres
+    can walk the HNSW index; the distance is computed once per candidate and
+    the similarity threshold and tenant/deletion filters are applied to that
+    candidate set afterwards.
+    """
+
+    VECTOR_SQL = """
+        SELECT nn.id, nn.document_id, nn.chunk_index, nn.content, 1 - nn.distance AS similarity
+        FROM (
+            SELECT
+                c.id,
+                c.document_id,
+                c.chunk_index,
+                c.content,
+                c.embedding <=> CAST(:query_embedding AS vector) AS distance
+            FROM document_chunks c
+            WHERE c.organization_id = :org_id
+            ORDER BY c.embedding <=> CAST(:query_embedding AS vector)
+            LIMIT :candidates
+        ) nn
+        JOIN documents d ON d.id = nn.document_id
+        WHERE d.is_deleted = FALSE
+            AND nn.distance <= :max_distance
+            {document_filter}
+        ORDER BY nn.distance
+        LIMIT :limit
+    """
+
+    LEXICAL_SQL = """
+        SELECT c.id, c.document_id, c.chunk_index, c.content,
+               ts_rank_cd(c.content_tsv, q.query) AS lexical_score
+        FROM document_chunks c
+        CROSS JOIN websearch_to_tsquery('english', :query_text) AS q(query)
+        JOIN documents d ON d.id = c.document_id
+        WHERE c.organization_id = :org_id
+            AND c.content_tsv @@ q.query
+            AND d.is_deleted = FALSE
+            {document_filter}
+        ORDER BY lexical_score DESC
+        LIMIT :limit
+    """
+
+    def __init__(
+        self,
+        candidate_multiplier: int = 4,
+        ef_search: Optional[int] = None,
+        rrf_k: int = 60
+    ):
+        """
+        Args:
+            candidate_multiplier: ANN candidates fetched per requested result,
+                leaving headroom for threshold and document filters
+            ef_search: HNSW search breadth (recall/latency trade-off)
+            rrf_k: Reciprocal-rank fusion constant
+        """
+        self.candidate_multiplier = candidate_multiplier
+        self.ef_search = ef_search
+        self.rrf_k = rrf_k
+
+    async def replace_document_chunks(
+        self,
+        session,
+        document_id: str,
+        organization_id: str,
+        chunks: Sequence[TextChunk],
+        embeddings: Sequence[Optional[Sequence[float]]],
+        embedding_model: str
+    ) -> int:
+        """
+        Replace a document's chunks (caller commits).
+
+        Chunks whose embedding failed are skipped.
+
+        Returns:
+            Number of chunks written
+        """
+        await session.execute(
+            text("DELETE FROM document_chunks WHERE document_id = :document_id"),
+            {"document_id": document_id}
+        )
+
+        rows = [
+            {
+                "document_id": document_id,
+                "organization_id": organization_id,
+                "chunk_index": chunk.index,
+                "content": chunk.content,
+                "char_start": chunk.char_start,
+                "char_end": chunk.char_end,
+                "token_count": chunk.token_count,
+                "embedding": vector_literal(embedding),
+                "embedding_model": embedding_model
+            }
+            for chunk, embedding in zip(chunks, embeddings)
+            if embedding is not None
+        ]
+
+        if rows:
+            await session.execute(
+                text("""
+                    INSERT INTO document_chunks (
+                        document_id, organization_id, chunk_index, content,
+                        char_start, char_end, token_count, embedding, embedding_model
+                    ) VALUES (
+                        :document_id, :organization_id, :chunk_index, :content,
+                        :char_start, :char_end, :token_count,
+                        CAST(:embedding AS vector), :embedding_model
+                    )
+                """),
+                rows
+            )
+
+        return len(rows)
+
+    async def vector_search(
+        self,
+        session,
+        query_embedding: Sequence[float],
+        organization_id: str,
+        limit: int = 10,
+        threshold: float = 0.0,
+        document_type: Optional[str] = None
+    ) -> List[ChunkHit]:
+        """Nearest chunks by cosine similarity, thresholded after the ANN scan"""
+        if self.ef_search:
+            await session.execute(text(f"SET LOCAL hnsw.ef_search = {int(self.ef_search)}"))
+
+        params = {
+            "query_embedding": vector_literal(query_embedding),
+            "org_id": organization_id,
+            "candidates": max(limit * self.candidate_multiplier, limit),
+            "max_distance": 1 - threshold,
+            "limit": limit
+        }
+        document_filter = ""
+        if document_type:
+            document_filter = "AND d.document_type = :doc_type"
+            params["doc_type"] = document_type
+
+        result = await session.execute(
+            text(self.VECTOR_SQL.format(document_filter=document_filter)), params
+        )
+
+        return [
+            ChunkHit(
+                chunk_id=str(row.id),
+                document_id=str(row.document_id),
+                chunk_index=row.chunk_index,
+                content=row.content,
+                similarity=float(row.similarity),
+                vector_rank=rank,
+                score=float(row.similarity)
+            )
+            for rank, row in enumerate(result.fetchall(), start=1)
+        ]
+
+    async def lexical_search(
+        self,
+        session,
+        query_text: str,
+        organization_id: str,
+        limit: int = 10,
+        document_type: Optional[str] = None
+    ) -> List[ChunkHit]:
+        """Chunks matching the query text, ranked by ts_rank_cd"""
+        params = {"query_text": query_text, "org_id": organization_id, "limit": limit}
+        document_filter = ""
+        if document_type:
+            document_filter = "AND d.document_type = :doc_type"
+            params["doc_type"] = document_type
+
+        result = await session.execute(
+            text(self.LEXICAL_SQL.format(document_filter=document_filter)), params
+        )
+
+        return [
+            ChunkHit(
+                chunk_id=str(row.id),
+                document_id=str(row.document_id),
+                chunk_index=row.chunk_index,
+                content=row.content,
+                lexical_rank=rank,
+                score=float(row.lexical_score)
+            )
+            for rank, row in enumerate(result.fetchall(), start=1)
+        ]
+
+    async def search(
+        self,
+        session,
+        query_embedding: Sequence[float],
+        organization_id: str,
+        limit: int = 10,
+        threshold: float = 0.0,
+        query_text: Optional[str] = None,
+        hybrid: bool = False,
+        document_type: Optional[str] = None
+    ) -> List[ChunkHit]:
+        """
+        Vector search, optionally fused with lexical search.
+
+        In hybrid mode the threshold applies to the vector list only, so strong
+        keyword matches can surface even when their embedding is a weak match.
+
+        Returns:
+            ChunkHits ordered by similarity (vector mode) or RRF score (hybrid)
+        """
+        if not hybrid or not query_text:
+            return await self.vector_search(
+                session, query_embedding, organization_id, limit, threshold, document_type
+            )
+
+        pool = limit * self.candidate_multiplier
+        vector_hits = await self.vector_search(
+            session, query_embedding, organization_id, pool, threshold, document_type
+        )
+        lexical_hits = await self.lexical_search(
+            session, query_text, organization_id, pool, document_type
+        )
+
+        return self.fuse(vector_hits, lexical_hits, limit)
+
+    def fuse(
+        self,
+        vector_hits: Sequence[ChunkHit],
+        lexical_hits: Sequence[ChunkHit],
+        limit: int
+    ) -> List[ChunkHit]:
+        """Merge two ranked hit lists with reciprocal-rank fusion"""
+        hits: Dict[str, ChunkHit] = {}
+        for hit in vector_hits:
+            hits[hit.chunk_id] = ChunkHit(**asdict(hit))
+        for hit in lexical_hits:
+            if hit.chunk_id in hits:
+                hits[hit.chunk_id].lexical_rank = hit.lexical_rank
+            else:
+                hits[hit.chunk_id] = ChunkHit(**asdict(hit))
+
+        fused = reciprocal_rank_fusion(
+            [[hit.chunk_id for hit in vector_hits], [hit.chunk_id for hit in lexical_hits]],
+            k=self.rrf_k
+        )
+
+        results = []
+        for chunk_id, score in fused[:limit]:
+            hit = hits[chunk_id]
+            hit.score = score
+            results.append(hit)
+        return results
@@ -5,16 +5,18 @@ Story 3.1: Document Upload API - S3 integration
 
 import os
 import uuid
+import asyncio
 import mimetypes
 from typing import Optional, Dict, Any, BinaryIO
 from datetime import datetime, timedelta
-import hashlib
 
 import boto3
 from botocore.exceptions import ClientError, NoCredentialsError
 from botocore.config import Config
 
 from app.core.config import settings
+from app.services.multipart_upload import MultipartUploader, MultipartUploadError
+from app.services.storage_usage import get_usage_tracker, iter_bucket_objects
 
 
 class S3Service:
@@ -37,6 +39,17 @@ class S3Service:
         self.bucket_name = os.getenv('S3_BUCKET_NAME', 'ma-platform-documents')
         self.bucket_region = os.getenv('AWS_REGION', 'us-east-1')
 
+        # Streaming multipart uploads (parts go up concurrently on a thread pool)
+        self.uploader = MultipartUploader(
+            self.s3_client,
+            self.bucket_name,
+            part_size=int(os.getenv('STORAGE_UPLOAD_PART_SIZE', 8 * 1024 * 1024)),
+            max_concurrency=int(os.getenv('STORAGE_UPLOAD_CONCURRENCY', 4))
+        )
+
+        # Per-organization/deal usage counters, kept current on every write
+        self.usage = get_usage_tracker(self.bucket_name)
+
     def _generate_s3_key(self, organization_id: str, deal_id: Optional[str], filename: str) -> str:
         """
         Generate a unique S3 key for the document
@@ -57,11 +70,17 @@ class S3Service:
         organization_id: str,
         deal_id: Optional[str] = None,
         content_type: Optional[str] = None,
-        metadata: Optional[Dict[str, str]] = None
+        metadata: Optional[Dict[str, str]] = None,
+        upload_id: Optional[str] = None,
+        s3_key: Optional[str] = None,
+        resumable: bool = True
     ) -> Dict[str, Any]:
         """
         Upload a document to S3 with encryption
 
+        The file is streamed in parts and hashed incrementally; files larger
+        than one part use a concurrent multipart upload.
+
         Args:
             file: File object to upload
             filename: Original filename
@@ -69,14 +88,18 @@ class S3Service:
             deal_id: Optional deal UUID
             content_type: MIME type of the file
             metadata: Additional metadata to store with the file
+            upload_id: Multipart upload to resume (from a failed result)
+            s3_key: Key of the upload being resumed
+            resumable: Keep a failed multipart upload for resuming instead of
+                aborting it
 
         Returns:
             Dictionary containing S3 upload information
         """
-        try:
-            # Generate S3 key
-            s3_key = self._generate_s3_key(organization_id, deal_id, filename)
+        # Generate S3 key (reuse it when resuming)
+        s3_key = s3_key or self._generate_s3_key(organization_id, deal_id, filename)
 
+        try:
             # Detect content type if not provided
             if not content_type:
                 content_type, _ = mimetypes.guess_type(filename)
@@ -94,21 +117,20 @@ class S3Service:
             if metadata:
                 s3_metadata.update(metadata)
 
-            # Calculate file hash
-            file_content = file.read()
-            file_hash = hashlib.sha256(file_content).hexdigest()
-            file.seek(0)  # Reset file pointer
-
             # Upload to S3 with server-side encryption
-            response = self.s3_client.put_object(
-                Bucket=self.bucket_name,
-                Key=s3_key,
-                Body=file_content,
-                ContentType=content_type,
-                ServerSideEncryption='AES256',
-                Metadata=s3_metadata,
-                Tagging=f"organization={organization_id}&environment={os.getenv('ENVIRONMENT', 'production')}"
+            upload = self.uploader.upload(
+                file,
+                s3_key,
+                extra_args={
+                    'ContentType': content_type,
+                    'ServerSideEncryption': 'AES256',
+                    'Metadata': s3_metadata,
+                    'Tagging': f"organization={organization_id}&environment={os.getenv('ENVIRONMENT', 'production')}"
+                },
+                upload_id=upload_id,
+                abort_on_failure=not resumable
             )
+            self.usage.record_upload(s3_key, upload.size)
 
             # Generate URL
             url = f"https://{self.bucket_name}.s3.{self.bucket_region}.amazonaws.com/{s3_key}"
@@ -118,12 +140,21 @@ class S3Service:
                 's3_bucket': self.bucket_name,
                 's3_key': s3_key,
                 's3_url': url,
-                's3_etag': response.get('ETag', '').strip('"'),
-                'file_hash': file_hash,
-                'file_size': len(file_content),
-                'content_type': content_type
+                's3_etag': upload.etag,
+                'file_hash': upload.sha256,
+                'file_size': upload.size,
+                'content_type': content_type,
+                'parts': upload.parts,
+                'resumed_parts': upload.resumed_parts
             }
 
+        except MultipartUploadError as e:
+            return {
+                'success': False,
+                'error': f"S3 upload failed: {str(e)}",
+                's3_key': s3_key,
+                'upload_id': e.upload_id
+            }
         except NoCredentialsError:
             return {
                 'success': False,
@@ -140,6 +171,13 @@ class S3Service:
                 'error': f"Unexpected error: {str(e)}"
             }
 
+    async def upload_document_async(self, file: BinaryIO, filename: str, organization_id: str,
+                                    **kwargs) -> Dict[str, Any]:
+        """upload_document on a worker thread, keeping the event loop free"""
+        return await asyncio.to_thread(
+            self.upload_document, file, filename, organization_id, **kwargs
+        )
+
     def generate_presigned_url(
         self,
         s3_key: str,
@@ -224,6 +262,15 @@ class S3Service:
                 'error': str(e)
             }
 
+    def _object_size(self, s3_key: str) -> Optional[int]:
+        """Object size for usage accounting (skipped when counters are off)"""
+        if not self.usage.enabled:
+            return None
+        try:
+            return self.s3_client.head_object(Bucket=self.bucket_name, Key=s3_key)['ContentLength']
+        except ClientError:
+            return None
+
     def delete_document(self, s3_key: str) -> bool:
         """
         Delete a document from S3
@@ -235,10 +282,13 @@ class S3Service:
             True if successful, False otherwise
         """
         try:
+            size = self._object_size(s3_key)
             self.s3_client.delete_object(
                 Bucket=self.bucket_name,
                 Key=s3_key
             )
+            if size is not None:
+                self.usage.record_delete(s3_key, size)
             return True
         except ClientError:
             return False
@@ -273,6 +323,9 @@ class S3Service:
                 Key=new_key,
                 ServerSideEncryption='AES256'
             )
+            size = self._object_size(new_key)
+            if size is not None:
+                self.usage.record_upload(new_key, size)
 
             url = f"https://{self.bucket_name}.s3.{self.bucket_region}.amazonaws.com/{new_key}"
 
@@ -389,6 +442,44 @@ class S3Service:
             else:
                 return False
 
+    def get_usage_stats(
+        self,
+        organization_id: Optional[str] = None,
+        include_organizations: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Get S3 usage statistics from the incremental usage counters
+
+        Args:
+            organization_id: Report one tenant's usage with its per-deal breakdown
+            include_organizations: Add a per-tenant breakdown to bucket totals
+        """
+        try:
+            if not self.usage.enabled:
+                total_size = total_count = 0
+                for _, size in iter_bucket_objects(self.s3_client, self.bucket_name):
+                    total_size += size
+                    total_count += 1
+                stats = {'total_size_bytes': total_size, 'total_files': total_count}
+            elif organization_id:
+                stats = self.usage.get_organization_usage(organization_id)
+            else:
+                stats = self.usage.get_totals()
+                if include_organizations:
+                    stats['organizations'] = self.usage.get_organization_breakdown()
+
+            return {'provider': 'AWS S3', 'bucket': self.bucket_name, **stats}
+
+        except Exception as e:
+            return {
+                'error': str(e),
+                'provider': 'AWS S3'
+            }
+
+    def reconcile_usage(self) -> Dict[str, Any]:
+        """Rebuild the usage counters from a full bucket listing"""
+        return self.usage.reconcile(iter_bucket_objects(self.s3_client, self.bucket_name))
+
 
 # Singleton instance
 s3_service = S3Service()
\ No newline at end of file
@@ -29,7 +29,17 @@ class StorageServiceProtocol(Protocol):
         content_type: Optional[str] = None,
         metadata: Optional[Dict[str, str]] = None
     ) -> Dict[str, Any]:
-        """Upload a document with security features"""
+        """Upload a document with security features (streamed, not buffered)"""
+        ...
+
+    async def upload_document_async(
+        self,
+        file: BinaryIO,
+        filename: str,
+        organization_id: str,
+        **kwargs
+    ) -> Dict[str, Any]:
+        """upload_document off the event loop"""
         ...
 
     def generate_signed_url(
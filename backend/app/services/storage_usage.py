@@ -0,0 +1,219 @@
+"""
+Incremental storage usage accounting
+
+Byte and object counters per bucket, organization and deal, kept in Redis
+hashes and updated on every upload, copy and delete, so usage stats are a
+couple of hash reads instead of a full bucket listing. A periodic
+reconciliation walks the listing and rewrites the counters to fix drift
+(missed updates, Redis restarts, objects written outside the app).
+
+Counters follow the object key layout used by every storage backend:
+``organizations/{org_id}[/deals/{deal_id}]/documents/{uuid}_{filename}``.
+"""
+
+import time
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple
+
+import redis
+import structlog
+
+from app.core.config import settings
+
+
+logger = structlog.get_logger(__name__)
+
+
+def parse_storage_key(key: str) -> Tuple[Optional[str], Optional[str]]:
+    """(organization_id, deal_id) for an object key; None where absent"""
+    parts = key.split('/')
+    if len(parts) < 3 or parts[0] != 'organizations':
+        return None, None
+    if len(parts) >= 5 and parts[2] == 'deals':
+        return parts[1], parts[3]
+    return parts[1], None
+
+
+def iter_bucket_objects(client, bucket: str, prefix: str = '') -> Iterator[Tuple[str, int]]:
+    """(key, size) for every current object in an S3-compatible bucket"""
+    paginator = client.get_paginator('list_objects_v2')
+    for page in paginator.paginate(Bucket=bucket, Prefix=prefix):
+        for obj in page.get('Contents', []):
+            yield obj['Key'], obj['Size']
+
+
+class StorageUsageTracker:
+    """
+    Usage counters for one bucket.
+
+    Layout (all hashes, values are integers):
+        {ns}:totals          bytes, objects
+        {ns}:orgs            {org}:bytes, {org}:objects
+        {ns}:deals:{org}     {deal}:bytes, {deal}:objects
+        {ns}:meta            reconciled_at, drift_bytes, drift_objects
+
+    Updates are HINCRBY in one pipeline, so concurrent uploads never lose
+    increments. Counter failures are logged and never fail the storage
+    operation; the next reconciliation repairs them.
+    """
+
+    def __init__(self, redis_client: Optional[redis.Redis] = None, namespace: str = 'storage_usage'):
+        self.redis_client = redis_client
+        self.namespace = namespace
+        self.errors = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.redis_client is not None
+
+    def _key(self, *parts: str) -> str:
+        return ':'.join((self.namespace,) + parts)
+
+    def record(self, key: str, size_delta: int, object_delta: int) -> None:
+        """Apply a change in bytes/objects for ``key`` to every level it counts toward"""
+        if not self.enabled:
+            return
+
+        org_id, deal_id = parse_storage_key(key)
+        try:
+            pipe = self.redis_client.pipeline(transaction=False)
+            pipe.hincrby(self._key('totals'), 'bytes', size_delta)
+            pipe.hincrby(self._key('totals'), 'objects', object_delta)
+            if org_id:
+                pipe.hincrby(self._key('orgs'), f"{org_id}:bytes", size_delta)
+                pipe.hincrby(self._key('orgs'), f"{org_id}:objects", object_delta)
+            if org_id and deal_id:
+                pipe.hincrby(self._key('deals', org_id), f"{deal_id}:bytes", size_delta)
+                pipe.hincrby(self._key('deals', org_id), f"{deal_id}:objects", object_delta)
+            pipe.execute()
+        except redis.RedisError as e:
+            self.errors += 1
+            logger.warning("storage_usage_update_failed", key=key, error=str(e))
+
+    def record_upload(self, key: str, size: int) -> None:
+        self.record(key, size, 1)
+
+    def record_delete(self, key: str, size: int) -> None:
+        self.record(key, -size, -1)
+
+    def get_totals(self) -> Dict[str, Any]:
+        """Bucket-wide usage and reconciliation status"""
+        pipe = self.redis_client.pipeline(transaction=False)
+        pipe.hgetall(self._key('totals'))
+        pipe.hgetall(self._key('meta'))
+        totals, meta = pipe.execute()
+        totals, meta = self._decode(totals), self._decode(meta)
+        return {
+            'total_size_bytes': int(totals.get('bytes', 0)),
+            'total_files': int(totals.get('objects', 0)),
+            'reconciled_at': meta.get('reconciled_at'),
+            'last_drift_bytes': int(meta.get('drift_bytes', 0)),
+            'last_drift_objects': int(meta.get('drift_objects', 0))
+        }
+
+    def get_organization_usage(self, organization_id: str) -> Dict[str, Any]:
+        """One organization's usage with its per-deal breakdown"""
+        pipe = self.redis_client.pipeline(transaction=False)
+        pipe.hmget(self._key('orgs'), [f"{organization_id}:bytes", f"{organization_id}:objects"])
+        pipe.hgetall(self._key('deals', organization_id))
+        (size, count), deals = pipe.execute()
+        return {
+            'organization_id': organization_id,
+            'total_size_bytes': int(size or 0),
+            'total_files': int(count or 0),
+            'deals': self._group(self._decode(deals), 'deal_id')
+        }
+
+    def get_organization_breakdown(self) -> list:
+        """Usage for every organization, largest first"""
+        orgs = self._group(self._decode(self.redis_client.hgetall(self._key('orgs'))), 'organization_id')
+        return sorted(orgs, key=lambda org: org['total_size_bytes'], reverse=True)
+
+    def reconcile(self, objects: Iterable[Tuple[str, int]]) -> Dict[str, Any]:
+        """
+        Rebuild every counter from a bucket listing.
+
+        Counters are replaced in one MULTI/EXEC, so readers never see a
+        half-written state. Uploads that land while the listing is walked may
+        be counted either way; the error is bounded by the uploads in flight
+        and the next run corrects it.
+
+        Args:
+            objects: (key, size) pairs, e.g. from iter_bucket_objects
+
+        Returns:
+            Totals, drift against the previous counters and timing
+        """
+        started = time.perf_counter()
+        total_bytes = total_objects = 0
+        orgs: Dict[str, int] = {}
+        deals: Dict[str, Dict[str, int]] = {}
+
+        for key, size in objects:
+            total_bytes += size
+            total_objects += 1
+            org_id, deal_id = parse_storage_key(key)
+            if org_id:
+                orgs[f"{org_id}:bytes"] = orgs.get(f"{org_id}:bytes", 0) + size
+                orgs[f"{org_id}:objects"] = orgs.get(f"{org_id}:objects", 0) + 1
+            if org_id and deal_id:
+                org_deals = deals.setdefault(org_id, {})
+                org_deals[f"{deal_id}:bytes"] = org_deals.get(f"{deal_id}:bytes", 0) + size
+                org_deals[f"{deal_id}:objects"] = org_deals.get(f"{deal_id}:objects", 0) + 1
+
+        previous = self.get_totals()
+        drift_bytes = total_bytes - previous['total_size_bytes']
+        drift_objects = total_objects - previous['total_files']
+        reconciled_at = datetime.utcnow().isoformat()
+
+        stale_deal_keys = list(self.redis_client.scan_iter(match=self._key('deals', '*')))
+        pipe = self.redis_client.pipeline(transaction=True)
+        pipe.delete(self._key('totals'), self._key('orgs'), *stale_deal_keys)
+        pipe.hset(self._key('totals'), mapping={'bytes': total_bytes, 'objects': total_objects})
+        if orgs:
+            pipe.hset(self._key('orgs'), mapping=orgs)
+        for org_id, org_deals in deals.items():
+            pipe.hset(self._key('deals', org_id), mapping=org_deals)
+        pipe.hset(self._key('meta'), mapping={
+            'reconciled_at': reconciled_at,
+            'drift_bytes': drift_bytes,
+            'drift_objects': drift_objects
+        })
+        pipe.execute()
+
+        if drift_bytes or drift_objects:
+            logger.info("storage_usage_drift_corrected", namespace=self.namespace,
+                        drift_bytes=drift_bytes, drift_objects=drift_objects)
+
+        return {
+            'total_size_bytes': total_bytes,
+            'total_files': total_objects,
+            'organizations': len(orgs) // 2,
+            'drift_bytes': drift_bytes,
+            'drift_objects': drift_objects,
+            'reconciled_at': reconciled_at,
+            'elapsed_seconds': round(time.perf_counter() - started, 3)
+        }
+
+    @staticmethod
+    def _decode(mapping: Dict) -> Dict[str, str]:
+        return {
+            (k.decode() if isinstance(k, bytes) else k): (v.decode() if isinstance(v, bytes) else v)
+            for k, v in mapping.items()
+        }
+
+    @staticmethod
+    def _group(fields: Dict[str, str], id_name: str) -> list:
+        """Fold '{id}:bytes' / '{id}:objects' fields into one record per id"""
+        grouped: Dict[str, Dict[str, Any]] = {}
+        for field, value in fields.items():
+            item_id, _, metric = field.rpartition(':')
+            entry = grouped.setdefault(item_id, {id_name: item_id, 'total_size_bytes': 0, 'total_files': 0})
+            entry['total_size_bytes' if metric == 'bytes' else 'total_files'] = int(value)
+        return list(grouped.values())
+
+
+def get_usage_tracker(bucket: str) -> StorageUsageTracker:
+    """Tracker for a bucket; disabled when Redis isn't configured"""
+    client = redis.Redis.from_url(settings.REDIS_URL) if settings.REDIS_URL else None
+    return StorageUsageTracker(client, namespace=f"storage_usage:{bucket}")
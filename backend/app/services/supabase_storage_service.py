@@ -6,6 +6,7 @@ Story 3.1: Document Upload API - Supabase integration
 
 import os
 import uuid
+import asyncio
 import mimetypes
 import hashlib
 from typing import Optional, Dict, Any, BinaryIO
@@ -16,6 +17,7 @@ from supabase import create_client, Client
 from storage3.utils import StorageException
 
 from app.core.config import settings
+from app.services.multipart_upload import TusUploader, MultipartUploadError
 
 
 class SupabaseStorageService:
@@ -50,6 +52,9 @@ class SupabaseStorageService:
 
         self.bucket_name = os.getenv('SUPABASE_BUCKET_NAME', 'ma-documents')
 
+        # Resumable (TUS) uploads stream large files instead of buffering them
+        self.uploader = TusUploader(self.supabase_url, self.supabase_key, self.bucket_name)
+
         # Initialize bucket with security policies
         self._ensure_bucket_exists()
 
@@ -143,31 +148,43 @@ class SupabaseStorageService:
         deal_id: Optional[str] = None,
         content_type: Optional[str] = None,
         metadata: Optional[Dict[str, str]] = None,
-        encrypt: bool = True
+        encrypt: bool = True,
+        upload_url: Optional[str] = None,
+        storage_path: Optional[str] = None,
+        resumable: bool = True
     ) -> Dict[str, Any]:
         """
         Upload document with enterprise security features
 
+        The file streams to Supabase's resumable (TUS) endpoint in 6MB chunks
+        and is hashed as it goes. A failed upload returns ``upload_url`` and
+        ``path``; passing both back with the same file resumes it.
+
         Security measures:
         - File hash for integrity verification
         - Metadata encryption for sensitive info
         - Virus scanning webhook (if configured)
         - Audit logging
         """
-        try:
-            # Generate secure path
-            storage_path = self._generate_storage_path(organization_id, deal_id, filename)
+        # Generate secure path (reuse it when resuming)
+        storage_path = storage_path or self._generate_storage_path(organization_id, deal_id, filename)
 
+        try:
             # Detect content type if not provided
             if not content_type:
                 content_type, _ = mimetypes.guess_type(filename)
                 if not content_type:
                     content_type = 'application/octet-stream'
 
-            # Read and hash file content
-            file_content = file.read()
-            file_hash = self._calculate_file_hash(file_content)
-            file.seek(0)
+            # Stream to Supabase; each chunk is retried from the server's offset
+            upload = self.uploader.upload(
+                file,
+                storage_path,
+                content_type=content_type,
+                cache_control='3600',
+                upload_url=upload_url
+            )
+            file_hash = upload.sha256
 
             # Prepare secure metadata
             secure_metadata = {
@@ -186,30 +203,6 @@ class SupabaseStorageService:
                 # Encrypt sensitive metadata if needed
                 secure_metadata['custom_metadata'] = json.dumps(metadata)
 
-            # Upload to Supabase with retry logic
-            max_retries = 3
-            for attempt in range(max_retries):
-                try:
-                    response = self.client.storage.from_(self.bucket_name).upload(
-                        path=storage_path,
-                        file=file_content,
-                        file_options={
-                            'content-type': content_type,
-                            'cache-control': 'max-age=3600',
-                            'upsert': False  # Prevent overwriting
-                        }
-                    )
-
-                    if response.get('error'):
-                        raise StorageException(response['error']['message'])
-
-                    break
-
-                except Exception as e:
-                    if attempt == max_retries - 1:
-                        raise
-                    continue
-
             # Generate secure signed URL (1 hour expiration)
             signed_url_response = self.client.storage.from_(self.bucket_name).create_signed_url(
                 path=storage_path,
@@ -223,11 +216,22 @@ class SupabaseStorageService:
                 'path': storage_path,
                 'signed_url': signed_url_response.get('signedURL'),
                 'file_hash': file_hash,
-                'file_size': len(file_content),
+                'file_size': upload.size,
                 'content_type': content_type,
-                'metadata': secure_metadata
+                'metadata': secure_metadata,
+                'parts': upload.parts,
+                'resumed_parts': upload.resumed_parts
             }
 
+        except MultipartUploadError as e:
+            if not resumable:
+                self.uploader.terminate(e.upload_id)
+            return {
+                'success': False,
+                'error': f"Storage error: {str(e)}",
+                'path': storage_path,
+                'upload_url': e.upload_id if resumable else None
+            }
         except StorageException as e:
             return {
                 'success': False,
@@ -239,6 +243,13 @@ class SupabaseStorageService:
                 'error': f"Unexpected error: {str(e)}"
             }
 
+    async def upload_document_async(self, file: BinaryIO, filename: str, organization_id: str,
+                                    **kwargs) -> Dict[str, Any]:
+        """upload_document on a worker thread, keeping the event loop free"""
+        return await asyncio.to_thread(
+            self.upload_document, file, filename, organization_id, **kwargs
+        )
+
     def generate_signed_url(
         self,
         storage_path: str,
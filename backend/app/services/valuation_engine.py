@@ -3,10 +3,11 @@ Valuation Engine Service
 Comprehensive financial modeling and valuation for M&A transactions
 Supports DCF, Comparable Company, Precedent Transaction, and LBO analyses
 """
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime
 from decimal import Decimal
 from sqlalchemy.orm import Session
+import numpy as np
 import logging
 
 from ..models.financial_models import (
@@ -21,6 +22,7 @@ from ..utils.financial_calculations import (
     calculate_comparable_multiples_stats, apply_control_premium, apply_marketability_discount,
     sensitivity_analysis, two_way_sensitivity_analysis, monte_carlo_valuation
 )
+from ..utils.sensitivity import evaluate_grid, tornado_analysis, present_value_grid
 
 logger = logging.getLogger(__name__)
 
@@ -28,6 +30,8 @@ logger = logging.getLogger(__name__)
 class DCFValuationService:
     """Discounted Cash Flow valuation service"""
 
+    GRID_PARAMETERS = ("wacc", "terminal_growth_rate", "exit_multiple", "ebitda_margin")
+
     def __init__(self, db: Session):
         self.db = db
 
@@ -216,43 +220,103 @@ class DCFValuationService:
         Returns:
             Sensitivity analysis results
         """
-        # Reconstruct inputs from DCF model
-        base_assumptions = {
+        results = sensitivity_analysis(
+            self._base_assumptions(dcf_model),
+            parameter,
+            value_range,
+            self._grid_valuation(dcf_model),
+            vectorized=True
+        )
+
+        return results
+
+    def run_grid_sensitivity(
+        self,
+        dcf_model: DCFModel,
+        axes: Dict[str, List[float]],
+        tornado_ranges: Optional[Dict[str, Tuple[float, float]]] = None,
+        terminal_value_method: Optional[TerminalValueMethod] = None
+    ) -> Dict[str, Any]:
+        """
+        Run N-dimensional sensitivity analysis on DCF model
+
+        The whole grid (e.g. WACC x terminal growth x exit multiple x margin) is
+        evaluated as one set of broadcast array operations.
+
+        Args:
+            dcf_model: DCF model to analyze
+            axes: Ordered dict of {parameter: values}; parameters are any of
+                wacc, terminal_growth_rate, exit_multiple, ebitda_margin
+            tornado_ranges: Optional {parameter: (low, high)} for tornado deltas
+            terminal_value_method: Override the model's terminal value method
+
+        Returns:
+            Grid valuations with axes, shape and optional tornado bars
+        """
+        unknown = (set(axes) | set(tornado_ranges or {})) - set(self.GRID_PARAMETERS)
+        if unknown:
+            raise ValueError(
+                f"Unsupported sensitivity parameters: {sorted(unknown)}. "
+                f"Supported: {list(self.GRID_PARAMETERS)}"
+            )
+
+        base_assumptions = self._base_assumptions(dcf_model)
+        valuation_func = self._grid_valuation(dcf_model, terminal_value_method)
+
+        results = evaluate_grid(base_assumptions, axes, valuation_func).to_dict()
+
+        if tornado_ranges:
+            results["tornado"] = tornado_analysis(base_assumptions, tornado_ranges, valuation_func)
+
+        return results
+
+    def _base_assumptions(self, dcf_model: DCFModel) -> Dict[str, float]:
+        """Reconstruct sensitivity inputs from DCF model"""
+        return {
             "wacc": float(dcf_model.wacc),
             "terminal_growth_rate": float(dcf_model.terminal_growth_rate) if dcf_model.terminal_growth_rate else 2.5,
+            "exit_multiple": float(dcf_model.exit_multiple) if dcf_model.exit_multiple else 10.0,
             "ebitda_margin": float(dcf_model.ebitda_margin),
         }
 
-        # Valuation function
-        def valuation_func(assumptions):
-            # Recalculate with new assumption
-            free_cash_flows = dcf_model.free_cash_flows
-
-            if parameter == "terminal_growth_rate":
-                terminal_value = calculate_terminal_value_perpetuity(
-                    free_cash_flows[-1],
-                    assumptions["wacc"],
-                    assumptions["terminal_growth_rate"]
-                )
-            else:
-                terminal_value = float(dcf_model.terminal_value)
+    def _grid_valuation(
+        self,
+        dcf_model: DCFModel,
+        terminal_value_method: Optional[TerminalValueMethod] = None
+    ):
+        """
+        Build a vectorized enterprise value function over the stored projections
+
+        Free cash flows are linear in EBITDA margin, so a margin change shifts
+        each year's FCF by revenue * delta margin * (1 - tax). Cells where
+        WACC <= terminal growth are undefined and come back as NaN.
+        """
+        method = terminal_value_method or dcf_model.terminal_value_method
+        free_cash_flows = np.asarray(dcf_model.free_cash_flows, dtype=np.float64)
+        revenues = np.asarray(dcf_model.revenue_projections, dtype=np.float64)
+        tax_rate = float(dcf_model.tax_rate) / 100
+        base_margin = float(dcf_model.ebitda_margin)
 
-            dcf_result = calculate_enterprise_value_from_dcf(
-                free_cash_flows,
-                terminal_value,
-                assumptions.get("wacc", float(dcf_model.wacc))
+        def valuation_func(assumptions):
+            wacc = np.asarray(assumptions["wacc"], dtype=np.float64)
+            margin = np.asarray(assumptions["ebitda_margin"], dtype=np.float64)
+            cash_flows = free_cash_flows + (
+                revenues * (margin[..., np.newaxis] - base_margin) / 100 * (1 - tax_rate)
             )
 
-            return dcf_result["enterprise_value"]
+            if method == TerminalValueMethod.EXIT_MULTIPLE:
+                terminal_value = revenues[-1] * margin / 100 * assumptions["exit_multiple"]
+            else:
+                growth = np.asarray(assumptions["terminal_growth_rate"], dtype=np.float64)
+                terminal_value = np.where(
+                    wacc > growth,
+                    cash_flows[..., -1] * (1 + growth / 100) / ((wacc - growth) / 100),
+                    np.nan
+                )
 
-        results = sensitivity_analysis(
-            base_assumptions,
-            parameter,
-            value_range,
-            valuation_func
-        )
+            return present_value_grid(cash_flows, terminal_value, wacc)
 
-        return results
+        return valuation_func
 
 
 class ComparableCompanyService:
@@ -473,6 +537,8 @@ class PrecedentTransactionService:
 class LBOModelingService:
     """Leveraged Buyout modeling service"""
 
+    GRID_PARAMETERS = ("exit_multiple", "revenue_growth", "ebitda_margin")
+
     def __init__(self, db: Session):
         self.db = db
 
@@ -612,39 +678,96 @@ class LBOModelingService:
         Returns:
             Two-way sensitivity results (IRR matrix)
         """
-        base_assumptions = {
-            "purchase_price": float(lbo_model.purchase_price),
-            "equity_investment": float(lbo_model.equity_investment),
-            "hold_period": lbo_model.hold_period_years,
-            "exit_multiple": float(lbo_model.exit_multiple),
-            "revenue_growth": sum(lbo_model.revenue_projections) / len(lbo_model.revenue_projections) / float(lbo_model.revenue_projections[0]) * 100 if lbo_model.revenue_projections else 5.0
-        }
-
-        def valuation_func(assumptions):
-            exit_ebitda = lbo_model.ebitda_projections[-1]  # Simplified
-            exit_ev = exit_ebitda * assumptions["exit_multiple"]
-            exit_debt = lbo_model.debt_amortization_schedule[-1]
-            exit_equity = exit_ev - exit_debt
-
-            returns = calculate_lbo_returns(
-                assumptions["equity_investment"],
-                exit_equity,
-                assumptions["hold_period"]
-            )
-
-            return returns["irr"]
-
         results = two_way_sensitivity_analysis(
-            base_assumptions,
+            self._base_assumptions(lbo_model),
             "exit_multiple",
             exit_multiple_range,
             "revenue_growth",
             revenue_growth_range,
-            valuation_func
+            self._grid_valuation(lbo_model),
+            vectorized=True
         )
 
         return results
 
+    def run_grid_sensitivity(
+        self,
+        lbo_model: LBOModel,
+        axes: Dict[str, List[float]],
+        tornado_ranges: Optional[Dict[str, Tuple[float, float]]] = None
+    ) -> Dict[str, Any]:
+        """
+        Run N-dimensional sensitivity analysis on LBO IRR
+
+        Args:
+            lbo_model: LBO model to analyze
+            axes: Ordered dict of {parameter: values}; parameters are any of
+                exit_multiple, revenue_growth, ebitda_margin
+            tornado_ranges: Optional {parameter: (low, high)} for tornado deltas
+
+        Returns:
+            IRR grid with axes, shape and optional tornado bars
+        """
+        unknown = (set(axes) | set(tornado_ranges or {})) - set(self.GRID_PARAMETERS)
+        if unknown:
+            raise ValueError(
+                f"Unsupported sensitivity parameters: {sorted(unknown)}. "
+                f"Supported: {list(self.GRID_PARAMETERS)}"
+            )
+
+        base_assumptions = self._base_assumptions(lbo_model)
+        valuation_func = self._grid_valuation(lbo_model)
+
+        results = evaluate_grid(base_assumptions, axes, valuation_func).to_dict()
+
+        if tornado_ranges:
+            results["tornado"] = tornado_analysis(base_assumptions, tornado_ranges, valuation_func)
+
+        return results
+
+    def _base_assumptions(self, lbo_model: LBOModel) -> Dict[str, float]:
+        """Reconstruct sensitivity inputs from LBO model"""
+        revenues = lbo_model.revenue_projections or []
+        ebitdas = lbo_model.ebitda_projections or []
+
+        if len(revenues) > 1 and revenues[0]:
+            revenue_growth = ((revenues[-1] / revenues[0]) ** (1 / (len(revenues) - 1)) - 1) * 100
+        else:
+            revenue_growth = 5.0
+
+        return {
+            "exit_multiple": float(lbo_model.exit_multiple),
+            "revenue_growth": revenue_growth,
+            "ebitda_margin": ebitdas[-1] / revenues[-1] * 100 if revenues and revenues[-1] else 20.0,
+        }
+
+    def _grid_valuation(self, lbo_model: LBOModel):
+        """
+        Build a vectorized IRR function
+
+        Exit EBITDA compounds first-year revenue at the tested growth rate over
+        the rest of the hold period. IRR follows calculate_lbo_returns, whose cash
+        flow layout places the exit one period after the last distribution year.
+        Cells with non-positive exit equity have no IRR and come back as NaN.
+        """
+        first_revenue = float(lbo_model.revenue_projections[0])
+        years_after_first = len(lbo_model.revenue_projections) - 1
+        equity_investment = float(lbo_model.equity_investment)
+        exit_debt = float(lbo_model.debt_amortization_schedule[-1])
+        periods = lbo_model.hold_period_years + 1
+
+        def valuation_func(assumptions):
+            growth = np.asarray(assumptions["revenue_growth"], dtype=np.float64) / 100
+            exit_ebitda = (
+                first_revenue * (1 + growth) ** years_after_first
+                * np.asarray(assumptions["ebitda_margin"], dtype=np.float64) / 100
+            )
+            exit_equity = exit_ebitda * assumptions["exit_multiple"] - exit_debt
+            ratio = np.where(exit_equity > 0, exit_equity / equity_investment, np.nan)
+            return (ratio ** (1 / periods) - 1) * 100
+
+        return valuation_func
+
 
 class MasterValuationService:
     """Master valuation service coordinating all methodologies"""
@@ -30,6 +30,7 @@ from app.services.deal_sourcing import (
     OpportunityScoringService,
     OpportunityManagementService
 )
+from app.services.registry_scanner import RegistryScanner
 import redis
 
 logger = get_task_logger(__name__)
@@ -313,8 +314,6 @@ def scan_companies_house_daily(self, organization_id: str = None):
         else:
             organizations = [organization_id]
 
-        total_opportunities = 0
-
         # Define industry scans
         industry_scans = [
             {"industry_sic": "62", "min_age_years": 3},  # IT/Software
@@ -323,27 +322,22 @@ def scan_companies_house_daily(self, organization_id: str = None):
             {"industry_sic": "70", "min_age_years": 3},  # Professional services
         ]
 
-        for org_id in organizations:
-            for scan_filter in industry_scans:
-                try:
-                    opportunities = asyncio.run(
-                        discovery_service.scan_companies_house(
-                            organization_id=org_id,
-                            filters=scan_filter
-                        )
-                    )
-                    total_opportunities += len(opportunities)
-                    logger.info(f"Found {len(opportunities)} opportunities in SIC {scan_filter['industry_sic']}")
-                except Exception as e:
-                    logger.error(f"Error scanning SIC {scan_filter['industry_sic']}: {str(e)}")
-                    continue
+        # Fan out organizations x SIC filters over one pooled client
+        result = asyncio.run(
+            _run_registry_scan(
+                discovery_service,
+                'scan_companies_house',
+                {org_id: industry_scans for org_id in organizations}
+            )
+        )
 
-        logger.info(f"Daily Companies House scan complete: {total_opportunities} total opportunities")
+        logger.info(
+            f"Daily Companies House scan complete: {result['opportunities_discovered']} total opportunities "
+            f"from {result['companies_fetched']} companies in {result['elapsed_seconds']}s"
+        )
 
         return {
-            'source': 'companies_house',
-            'opportunities_discovered': total_opportunities,
-            'organizations_scanned': len(organizations),
+            **result,
             'timestamp': datetime.utcnow().isoformat()
         }
 
@@ -373,29 +367,21 @@ def scan_sec_edgar_weekly(self, organization_id: str = None, cik_list: List[str]
         else:
             organizations = [organization_id]
 
-        total_opportunities = 0
-
-        for org_id in organizations:
-            try:
-                opportunities = asyncio.run(
-                    discovery_service.scan_sec_edgar(
-                        organization_id=org_id,
-                        filters={"cik_list": cik_list}
-                    )
-                )
-                total_opportunities += len(opportunities)
-                logger.info(f"Found {len(opportunities)} US opportunities for org {org_id}")
-            except Exception as e:
-                logger.error(f"Error scanning SEC EDGAR for org {org_id}: {str(e)}")
-                continue
+        result = asyncio.run(
+            _run_registry_scan(
+                discovery_service,
+                'scan_sec_edgar',
+                {org_id: cik_list for org_id in organizations}
+            )
+        )
 
-        logger.info(f"Weekly SEC EDGAR scan complete: {total_opportunities} total opportunities")
+        logger.info(
+            f"Weekly SEC EDGAR scan complete: {result['opportunities_discovered']} total opportunities "
+            f"from {result['companies_fetched']} companies in {result['elapsed_seconds']}s"
+        )
 
         return {
-            'source': 'sec_edgar',
-            'opportunities_discovered': total_opportunities,
-            'organizations_scanned': len(organizations),
-            'ciks_scanned': len(cik_list),
+            **result,
             'timestamp': datetime.utcnow().isoformat()
         }
 
@@ -403,6 +389,11 @@ def scan_sec_edgar_weekly(self, organization_id: str = None, cik_list: List[str]
         logger.error(f"SEC EDGAR weekly scan error: {str(e)}")
         raise
 
+async def _run_registry_scan(discovery_service, method: str, organization_inputs: Dict[str, Any]) -> Dict:
+    """Run one RegistryScanner method inside a single event loop"""
+    async with RegistryScanner(discovery_service) as scanner:
+        return await getattr(scanner, method)(organization_inputs)
+
 @celery_app.task(base=DataCollectionTask, bind=True, name='app.tasks.data_collection.monitor_market_news')
 def monitor_market_news(self, organization_id: str = None):
     """
@@ -490,67 +481,41 @@ def monitor_market_news(self, organization_id: str = None):
         raise
 
 @celery_app.task(base=DataCollectionTask, bind=True, name='app.tasks.data_collection.score_unscored_opportunities')
-def score_unscored_opportunities(self, organization_id: str = None):
+def score_unscored_opportunities(
+    self,
+    organization_id: str = None,
+    page_size: int = 500,
+    concurrency: int = 16,
+    max_items: int = None
+):
     """
     Score opportunities that haven't been scored yet
 
-    Uses AI-powered scoring service to analyze and score new opportunities
+    Uses AI-powered scoring service to analyze and score new opportunities.
+    The whole backlog is drained in one event loop: rows are keyset-paginated,
+    scored concurrently and written back in bulk per page.
     """
     try:
         db = self.db
         scoring_service = OpportunityScoringService(db)
 
-        # Find opportunities without scores
-        opportunities = db.query(MarketOpportunity).filter(
-            MarketOpportunity.overall_score.is_(None)
-        )
-
-        if organization_id:
-            opportunities = opportunities.filter(
-                MarketOpportunity.organization_id == organization_id
+        metrics = asyncio.run(
+            scoring_service.score_backlog(
+                organization_id=organization_id,
+                page_size=page_size,
+                concurrency=concurrency,
+                max_items=max_items
             )
+        )
 
-        opportunities = opportunities.limit(100).all()  # Batch process 100 at a time
-
-        scored_count = 0
-
-        for opportunity in opportunities:
-            try:
-                # Prepare company data for scoring
-                company_data = {
-                    "revenue": float(opportunity.annual_revenue) if opportunity.annual_revenue else 0,
-                    "ebitda": float(opportunity.ebitda) if opportunity.ebitda else 0,
-                    "industry": opportunity.industry_vertical.value if opportunity.industry_vertical else "other",
-                    "region": opportunity.region.value if opportunity.region else "unknown",
-                    "employee_count": opportunity.employee_count,
-                    "revenue_growth_rate": 5.0,  # Would calculate from historical data
-                    "profit_growth_rate": 3.0,
-                    "market_share_trend": "stable",
-                    "industry_match": True,
-                    "geography_match": True,
-                    "synergy_potential": "medium"
-                }
-
-                # Calculate score
-                score = asyncio.run(
-                    scoring_service.calculate_opportunity_score(
-                        opportunity_id=opportunity.id,
-                        company_data=company_data
-                    )
-                )
-
-                scored_count += 1
-                logger.info(f"Scored opportunity {opportunity.company_name}: {score.overall_score}/100")
-
-            except Exception as e:
-                logger.error(f"Error scoring opportunity {opportunity.id}: {str(e)}")
-                continue
-
-        logger.info(f"Scored {scored_count} out of {len(opportunities)} opportunities")
+        logger.info(
+            f"Scored {metrics['opportunities_scored']} out of {metrics['opportunities_processed']} "
+            f"opportunities in {metrics['elapsed_seconds']}s "
+            f"({metrics['opportunities_per_second']}/s)"
+        )
 
         return {
-            'opportunities_scored': scored_count,
-            'opportunities_processed': len(opportunities),
+            **metrics,
             'timestamp': datetime.utcnow().isoformat()
         }
 
@@ -80,6 +80,10 @@ celery_app.conf.beat_schedule = {
         'task': 'app.tasks.data_processing.cleanup_old_data',
         'schedule': crontab(day_of_week=0, hour=3, minute=0),  # Sunday at 03:00
     },
+    'reconcile-storage-usage': {
+        'task': 'app.tasks.data_processing.reconcile_storage_usage',
+        'schedule': crontab(hour=4, minute=30),  # Daily at 04:30
+    },
 }
 
 class DatabaseTask(Task):
@@ -199,12 +203,13 @@ def aggregate_metrics(self, period: str = 'daily', organization_id: str = None):
                 logger.info(f"Aggregating metrics for org {org.id}, period {period}")
 
                 # Run aggregation
-                celery_app.loop.run_until_complete(
+                rollup = celery_app.loop.run_until_complete(
                     warehouse.run_aggregation_job(str(org.id), agg_period)
                 )
 
                 results.append({
                     'organization_id': str(org.id),
+                    'buckets': rollup.buckets,
                     'status': 'success'
                 })
 
@@ -569,6 +574,32 @@ def calculate_predictive_metrics(self, organization_id: str):
         logger.error(f"Predictive metrics calculation failed: {str(e)}")
         raise
 
+@celery_app.task(bind=True, name='app.tasks.data_processing.reconcile_storage_usage')
+def reconcile_storage_usage(self):
+    """
+    Rebuild storage usage counters from the bucket listing to fix drift
+    """
+    try:
+        from app.services.storage_factory import get_storage_service
+
+        storage = get_storage_service()
+        usage = getattr(storage, 'usage', None)
+        if usage is None or not usage.enabled:
+            logger.info("Storage usage counters disabled; skipping reconciliation")
+            return {'task': 'reconcile_storage_usage', 'skipped': True}
+
+        report = storage.reconcile_usage()
+        logger.info(
+            f"Storage usage reconciled: {report['total_files']} objects, "
+            f"drift {report['drift_bytes']} bytes / {report['drift_objects']} objects"
+        )
+
+        return {'task': 'reconcile_storage_usage', **report}
+
+    except Exception as e:
+        logger.error(f"Storage usage reconciliation failed: {str(e)}")
+        raise
+
 # Export task functions for external use
 __all__ = [
     'collect_metrics',
@@ -578,5 +609,6 @@ __all__ = [
     'generate_report',
     'update_business_goals',
     'cleanup_old_data',
-    'calculate_predictive_metrics'
+    'calculate_predictive_metrics',
+    'reconcile_storage_usage'
 ]
\ No newline at end of file
@@ -6,6 +6,9 @@ import numpy as np
 from typing import List, Dict, Any, Optional, Tuple
 from decimal import Decimal
 
+from .monte_carlo import MonteCarloEngine, evaluate_rowwise, normal_variables
+from .sensitivity import evaluate_grid
+
 
 def calculate_wacc(
     cost_of_equity: float,
@@ -328,45 +331,57 @@ def monte_carlo_valuation(
     base_assumptions: Dict[str, float],
     assumptions_distribution: Dict[str, Tuple[float, float]],
     valuation_function: callable,
-    iterations: int = 10000
+    iterations: int = 10000,
+    vectorized: bool = False,
+    correlation_matrix: Optional[List[List[float]]] = None,
+    seed: Optional[int] = None
 ) -> Dict[str, Any]:
     """
     Run Monte Carlo simulation for valuation sensitivity
 
+    Scenarios are drawn in batches by MonteCarloEngine. When `vectorized` is set,
+    valuation_function receives the assumptions dict with sampled parameters as
+    NumPy arrays and is called once per batch instead of once per path.
+
     Args:
         base_assumptions: Base case assumptions
         assumptions_distribution: Dict of {param: (mean, std_dev)}
         valuation_function: Function that takes assumptions and returns valuation
         iterations: Number of simulation iterations
+        vectorized: Whether valuation_function accepts array-valued assumptions
+        correlation_matrix: Optional correlation matrix ordered like assumptions_distribution
+        seed: Optional random seed
 
     Returns:
         Dict with percentiles and distribution statistics
     """
-    results = []
-
-    for _ in range(iterations):
-        # Sample from distributions
-        sampled_assumptions = base_assumptions.copy()
-        for param, (mean, std_dev) in assumptions_distribution.items():
-            sampled_assumptions[param] = np.random.normal(mean, std_dev)
+    engine = MonteCarloEngine(
+        normal_variables(assumptions_distribution),
+        correlation_matrix=correlation_matrix,
+        seed=seed
+    )
 
-        # Run valuation
-        valuation = valuation_function(sampled_assumptions)
-        results.append(valuation)
+    if vectorized:
+        def batch_valuation(scenarios):
+            assumptions = base_assumptions.copy()
+            assumptions.update(scenarios)
+            return valuation_function(assumptions)
+    else:
+        batch_valuation = evaluate_rowwise(valuation_function, base_assumptions)
 
-    results_array = np.array(results)
+    summary = engine.run(batch_valuation, iterations, percentiles=(10, 25, 50, 75, 90))
 
     return {
-        "mean": round(float(np.mean(results_array)), 2),
-        "median": round(float(np.median(results_array)), 2),
-        "std_dev": round(float(np.std(results_array)), 2),
-        "percentile_10": round(float(np.percentile(results_array, 10)), 2),
-        "percentile_25": round(float(np.percentile(results_array, 25)), 2),
-        "percentile_75": round(float(np.percentile(results_array, 75)), 2),
-        "percentile_90": round(float(np.percentile(results_array, 90)), 2),
-        "min": round(float(np.min(results_array)), 2),
-        "max": round(float(np.max(results_array)), 2),
-        "distribution": results[:100]  # Sample of results for visualization
+        "mean": round(summary.mean, 2),
+        "median": round(summary.percentiles[50], 2),
+        "std_dev": round(summary.std, 2),
+        "percentile_10": round(summary.percentiles[10], 2),
+        "percentile_25": round(summary.percentiles[25], 2),
+        "percentile_75": round(summary.percentiles[75], 2),
+        "percentile_90": round(summary.percentiles[90], 2),
+        "min": round(summary.min, 2),
+        "max": round(summary.max, 2),
+        "distribution": summary.sample.tolist()  # Sample of results for visualization
     }
 
 
@@ -374,7 +389,8 @@ def sensitivity_analysis(
     base_assumptions: Dict[str, float],
     sensitive_param: str,
     param_range: List[float],
-    valuation_function: callable
+    valuation_function: callable,
+    vectorized: bool = False
 ) -> Dict[str, List[float]]:
     """
     Run sensitivity analysis for one parameter
@@ -384,22 +400,22 @@ def sensitivity_analysis(
         sensitive_param: Parameter to vary
         param_range: Range of values to test
         valuation_function: Function that takes assumptions and returns valuation
+        vectorized: Whether valuation_function accepts array-valued assumptions
 
     Returns:
         Dict with parameter values and corresponding valuations
     """
-    valuations = []
-
-    for value in param_range:
-        assumptions = base_assumptions.copy()
-        assumptions[sensitive_param] = value
-        valuation = valuation_function(assumptions)
-        valuations.append(round(valuation, 2))
+    grid = evaluate_grid(
+        base_assumptions,
+        {sensitive_param: param_range},
+        valuation_function,
+        vectorized=vectorized
+    )
 
     return {
         "parameter": sensitive_param,
         "values": param_range,
-        "valuations": valuations
+        "valuations": grid.to_dict()["values"]
     }
 
 
@@ -409,7 +425,8 @@ def two_way_sensitivity_analysis(
     param1_range: List[float],
     param2: str,
     param2_range: List[float],
-    valuation_function: callable
+    valuation_function: callable,
+    vectorized: bool = False
 ) -> Dict[str, Any]:
     """
     Run two-way sensitivity analysis (data table)
@@ -421,28 +438,24 @@ def two_way_sensitivity_analysis(
         param2: Second parameter to vary
         param2_range: Range for second parameter
         valuation_function: Function that takes assumptions and returns valuation
+        vectorized: Whether valuation_function accepts array-valued assumptions
 
     Returns:
         Dict with matrix of valuations
     """
-    results_matrix = []
-
-    for p1_val in param1_range:
-        row = []
-        for p2_val in param2_range:
-            assumptions = base_assumptions.copy()
-            assumptions[param1] = p1_val
-            assumptions[param2] = p2_val
-            valuation = valuation_function(assumptions)
-            row.append(round(valuation, 2))
-        results_matrix.append(row)
+    grid = evaluate_grid(
+        base_assumptions,
+        {param1: param1_range, param2: param2_range},
+        valuation_function,
+        vectorized=vectorized
+    )
 
     return {
         "param1": param1,
         "param1_range": param1_range,
         "param2": param2,
         "param2_range": param2_range,
-        "results_matrix": results_matrix
+        "results_matrix": grid.to_dict()["values"]
     }
 
 
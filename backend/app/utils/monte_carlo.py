@@ -0,0 +1,431 @@
+"""
+Monte Carlo Valuation Engine
+Batched scenario sampling and vectorized DCF evaluation for valuation uncertainty
+"""
+
+import numpy as np
+from scipy.special import ndtr
+from typing import Dict, List, Any, Optional, Callable, Iterator, Sequence, Union
+from dataclasses import dataclass, field
+from enum import Enum
+import logging
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 250_000
+DEFAULT_PERCENTILES = (5, 10, 25, 50, 75, 90, 95)
+
+
+class Distribution(str, Enum):
+    """Supported sampling distributions"""
+    NORMAL = "normal"
+    UNIFORM = "uniform"
+    TRIANGULAR = "triangular"
+    CONSTANT = "constant"
+
+
+@dataclass
+class MonteCarloSummary:
+    """Running (or final) statistics for a Monte Carlo run"""
+    paths_requested: int
+    paths_completed: int
+    invalid_paths: int
+    mean: float
+    std: float
+    min: float
+    max: float
+    percentiles: Dict[float, float]
+    histogram_counts: np.ndarray
+    histogram_edges: np.ndarray
+    is_final: bool = False
+    sample: np.ndarray = field(default_factory=lambda: np.empty(0))
+    exceedance: Dict[float, float] = field(default_factory=dict)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-friendly representation"""
+        return {
+            "paths_requested": self.paths_requested,
+            "paths_completed": self.paths_completed,
+            "invalid_paths": self.invalid_paths,
+            "mean": self.mean,
+            "std": self.std,
+            "min": self.min,
+            "max": self.max,
+            "percentiles": {str(p): v for p, v in self.percentiles.items()},
+            "histogram": {
+                "counts": self.histogram_counts.tolist(),
+                "edges": self.histogram_edges.tolist()
+            },
+            "exceedance": {str(t): v for t, v in self.exceedance.items()},
+            "is_final": self.is_final
+        }
+
+
+def _triangular_ppf(u: np.ndarray, low: float, mode: float, high: float) -> np.ndarray:
+    """Inverse CDF of the triangular distribution"""
+    span = high - low
+    if span <= 0:
+        return np.full_like(u, low, dtype=np.float64)
+    cut = (mode - low) / span
+    left = low + np.sqrt(u * span * (mode - low))
+    right = high - np.sqrt((1 - u) * span * (high - mode))
+    return np.where(u < cut, left, right)
+
+
+class ScenarioSampler:
+    """
+    Draws all scenarios for a set of variables as NumPy arrays in one call
+
+    Variables use the same spec as FinancialModelingEngine.monte_carlo_simulation:
+    {"name": {"distribution": "normal", "mean": ..., "std": ...}}. Correlated draws
+    use a Gaussian copula over the variables in insertion order.
+    """
+
+    def __init__(
+        self,
+        variables: Dict[str, Dict[str, float]],
+        correlation_matrix: Optional[Union[np.ndarray, Sequence[Sequence[float]]]] = None,
+        seed: Optional[Union[int, np.random.Generator]] = None
+    ):
+        """
+        Initialize scenario sampler
+
+        Args:
+            variables: Dict of {name: distribution spec}
+            correlation_matrix: Optional correlation matrix ordered like `variables`
+            seed: Seed or Generator for reproducible runs
+        """
+        self.variables = variables
+        self.names = list(variables.keys())
+        self.rng = seed if isinstance(seed, np.random.Generator) else np.random.default_rng(seed)
+        self._cholesky = None
+
+        if correlation_matrix is not None:
+            corr = np.asarray(correlation_matrix, dtype=np.float64)
+            if corr.shape != (len(self.names), len(self.names)):
+                raise ValueError(
+                    f"Correlation matrix must be {len(self.names)}x{len(self.names)}, got {corr.shape}"
+                )
+            if not np.allclose(corr, corr.T):
+                raise ValueError("Correlation matrix must be symmetric")
+            try:
+                self._cholesky = np.linalg.cholesky(corr)
+            except np.linalg.LinAlgError:
+                raise ValueError("Correlation matrix must be positive definite")
+
+    def sample(self, n: int) -> Dict[str, np.ndarray]:
+        """
+        Draw n scenarios
+
+        Args:
+            n: Number of scenarios
+
+        Returns:
+            Dict of {variable: array of shape (n,)}
+        """
+        if self._cholesky is not None:
+            z = self.rng.standard_normal((n, len(self.names))) @ self._cholesky.T
+            return {
+                name: self._from_standard_normal(self.variables[name], z[:, i])
+                for i, name in enumerate(self.names)
+            }
+
+        return {name: self._draw(self.variables[name], n) for name in self.names}
+
+    def _draw(self, spec: Dict[str, float], n: int) -> np.ndarray:
+        """Independent draw for one variable"""
+        distribution = spec.get("distribution", Distribution.CONSTANT)
+
+        if distribution == Distribution.NORMAL:
+            return self.rng.normal(spec["mean"], spec["std"], n)
+        if distribution == Distribution.UNIFORM:
+            return self.rng.uniform(spec["min"], spec["max"], n)
+        if distribution == Distribution.TRIANGULAR:
+            return self.rng.triangular(spec["min"], spec["mode"], spec["max"], n)
+        return np.full(n, spec["mean"], dtype=np.float64)
+
+    def _from_standard_normal(self, spec: Dict[str, float], z: np.ndarray) -> np.ndarray:
+        """Map correlated standard normals onto the variable's marginal distribution"""
+        distribution = spec.get("distribution", Distribution.CONSTANT)
+
+        if distribution == Distribution.NORMAL:
+            return spec["mean"] + spec["std"] * z
+        if distribution == Distribution.UNIFORM:
+            return spec["min"] + (spec["max"] - spec["min"]) * ndtr(z)
+        if distribution == Distribution.TRIANGULAR:
+            return _triangular_ppf(ndtr(z), spec["min"], spec["mode"], spec["max"])
+        return np.full(z.shape, spec["mean"], dtype=np.float64)
+
+
+def dcf_enterprise_values(
+    revenue_base: Union[float, np.ndarray],
+    revenue_growth: Union[float, np.ndarray],
+    ebitda_margin: Union[float, np.ndarray],
+    wacc: Union[float, np.ndarray],
+    terminal_growth: Union[float, np.ndarray],
+    tax_rate: Union[float, np.ndarray],
+    nwc_pct_revenue: Union[float, np.ndarray] = 0.10,
+    capex_pct_revenue: Union[float, np.ndarray] = 0.03,
+    depreciation_pct_revenue: Union[float, np.ndarray] = 0.02,
+    years: int = 5
+) -> np.ndarray:
+    """
+    Evaluate the FinancialModelingEngine DCF over a whole scenario matrix
+
+    Every argument may be a scalar or an array; arrays are broadcast against each
+    other, so the same kernel serves Monte Carlo paths and sensitivity grids.
+    Growth and margin are held constant across projection years. Paths where
+    wacc <= terminal growth yield non-finite or meaningless values and should be
+    masked by the caller.
+
+    Args:
+        revenue_base: Starting revenue
+        revenue_growth: Annual revenue growth (decimal)
+        ebitda_margin: EBITDA margin (decimal)
+        wacc: Discount rate (decimal)
+        terminal_growth: Perpetual growth rate (decimal)
+        tax_rate: Tax rate (decimal)
+        nwc_pct_revenue: Net working capital as share of revenue
+        capex_pct_revenue: CapEx as share of revenue
+        depreciation_pct_revenue: D&A as share of revenue
+        years: Number of projection years
+
+    Returns:
+        Array of enterprise values with the broadcast shape of the inputs
+    """
+    if years < 1:
+        raise ValueError("DCF requires at least one projection year")
+
+    growth_factor = 1 + np.asarray(revenue_growth, dtype=np.float64)
+    discount_step = 1 / (1 + np.asarray(wacc, dtype=np.float64))
+
+    # Cash generated per unit of revenue: NOPAT + D&A - CapEx
+    cash_conversion = (
+        (ebitda_margin - depreciation_pct_revenue) * (1 - np.asarray(tax_rate, dtype=np.float64))
+        + depreciation_pct_revenue
+        - capex_pct_revenue
+    )
+
+    revenue = np.asarray(revenue_base, dtype=np.float64) * growth_factor
+    discount = discount_step
+    fcff = revenue * cash_conversion
+    pv_total = fcff * discount
+
+    for _ in range(1, years):
+        previous_revenue = revenue
+        revenue = revenue * growth_factor
+        discount = discount * discount_step
+        fcff = revenue * cash_conversion - nwc_pct_revenue * (revenue - previous_revenue)
+        pv_total = pv_total + fcff * discount
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        terminal_value = fcff * (1 + terminal_growth) / (wacc - terminal_growth)
+
+    return pv_total + terminal_value * discount
+
+
+class MonteCarloEngine:
+    """
+    Batched Monte Carlo engine
+
+    Scenarios are drawn and valued chunk by chunk, so sampled variables and
+    valuation intermediates are bounded by `chunk_size` regardless of path
+    count. The valuations themselves are kept (one float64 per path, e.g.
+    80 MB for 10M paths) because exact percentiles need every value.
+    Results stream out as running summaries after each chunk.
+    """
+
+    def __init__(
+        self,
+        variables: Dict[str, Dict[str, float]],
+        correlation_matrix: Optional[Union[np.ndarray, Sequence[Sequence[float]]]] = None,
+        seed: Optional[Union[int, np.random.Generator]] = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE
+    ):
+        """
+        Initialize Monte Carlo engine
+
+        Args:
+            variables: Dict of {name: distribution spec}
+            correlation_matrix: Optional correlation matrix ordered like `variables`
+            seed: Seed or Generator for reproducible runs
+            chunk_size: Paths sampled and evaluated per vectorized batch; bounds
+                the scenario memory, not the per-path results
+        """
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be positive")
+        self.sampler = ScenarioSampler(variables, correlation_matrix, seed)
+        self.chunk_size = chunk_size
+
+    def stream(
+        self,
+        valuation_function: Callable[[Dict[str, np.ndarray]], np.ndarray],
+        iterations: int,
+        percentiles: Sequence[float] = DEFAULT_PERCENTILES,
+        bins: int = 50,
+        sample_size: int = 100,
+        thresholds: Sequence[float] = ()
+    ) -> Iterator[MonteCarloSummary]:
+        """
+        Run the simulation, yielding a summary after every chunk
+
+        Args:
+            valuation_function: Vectorized function mapping {variable: array} to values
+            iterations: Total number of paths
+            percentiles: Percentiles to report
+            bins: Histogram bin count
+            sample_size: Number of raw path values kept for visualization
+            thresholds: Values for which P(valuation > threshold) is reported
+
+        Yields:
+            MonteCarloSummary; the last one has is_final=True
+        """
+        if iterations < 1:
+            raise ValueError("iterations must be positive")
+
+        values = np.empty(iterations, dtype=np.float64)
+        completed = 0
+
+        while completed < iterations:
+            n = min(self.chunk_size, iterations - completed)
+            scenarios = self.sampler.sample(n)
+            chunk_values = np.broadcast_to(
+                np.asarray(valuation_function(scenarios), dtype=np.float64), (n,)
+            )
+            values[completed:completed + n] = chunk_values
+            completed += n
+
+            yield self._summarize(
+                values[:completed], iterations, percentiles, bins, sample_size, thresholds,
+                is_final=completed == iterations
+            )
+
+    def run(
+        self,
+        valuation_function: Callable[[Dict[str, np.ndarray]], np.ndarray],
+        iterations: int,
+        percentiles: Sequence[float] = DEFAULT_PERCENTILES,
+        bins: int = 50,
+        sample_size: int = 100,
+        thresholds: Sequence[float] = (),
+        on_progress: Optional[Callable[[MonteCarloSummary], None]] = None
+    ) -> MonteCarloSummary:
+        """
+        Run the simulation to completion
+
+        Args:
+            valuation_function: Vectorized function mapping {variable: array} to values
+            iterations: Total number of paths
+            percentiles: Percentiles to report
+            bins: Histogram bin count
+            sample_size: Number of raw path values kept for visualization
+            thresholds: Values for which P(valuation > threshold) is reported
+            on_progress: Optional callback receiving each intermediate summary
+
+        Returns:
+            Final MonteCarloSummary
+        """
+        summary = None
+        for summary in self.stream(
+            valuation_function, iterations, percentiles, bins, sample_size, thresholds
+        ):
+            if on_progress is not None and not summary.is_final:
+                on_progress(summary)
+        return summary
+
+    def _summarize(
+        self,
+        values: np.ndarray,
+        requested: int,
+        percentiles: Sequence[float],
+        bins: int,
+        sample_size: int,
+        thresholds: Sequence[float],
+        is_final: bool
+    ) -> MonteCarloSummary:
+        """Build a summary over the paths completed so far"""
+        finite = values[np.isfinite(values)]
+        invalid = int(values.size - finite.size)
+
+        if finite.size == 0:
+            logger.warning("Monte Carlo run produced no finite valuations")
+            return MonteCarloSummary(
+                paths_requested=requested,
+                paths_completed=int(values.size),
+                invalid_paths=invalid,
+                mean=float("nan"),
+                std=float("nan"),
+                min=float("nan"),
+                max=float("nan"),
+                percentiles={p: float("nan") for p in percentiles},
+                histogram_counts=np.zeros(bins, dtype=np.int64),
+                histogram_edges=np.zeros(bins + 1),
+                is_final=is_final,
+                exceedance={t: float("nan") for t in thresholds}
+            )
+
+        counts, edges = np.histogram(finite, bins=bins)
+        pct_values = np.percentile(finite, list(percentiles))
+
+        return MonteCarloSummary(
+            paths_requested=requested,
+            paths_completed=int(values.size),
+            invalid_paths=invalid,
+            mean=float(finite.mean()),
+            std=float(finite.std()),
+            min=float(finite.min()),
+            max=float(finite.max()),
+            percentiles={p: float(v) for p, v in zip(percentiles, pct_values)},
+            histogram_counts=counts,
+            histogram_edges=edges,
+            is_final=is_final,
+            sample=values[:sample_size].copy(),
+            exceedance={t: float(np.mean(finite > t)) for t in thresholds}
+        )
+
+
+def normal_variables(assumptions_distribution: Dict[str, tuple]) -> Dict[str, Dict[str, float]]:
+    """
+    Convert {param: (mean, std_dev)} pairs into normal distribution specs
+
+    Args:
+        assumptions_distribution: Dict of {param: (mean, std_dev)}
+
+    Returns:
+        Variable specs accepted by MonteCarloEngine
+    """
+    return {
+        param: {"distribution": Distribution.NORMAL.value, "mean": mean, "std": std_dev}
+        for param, (mean, std_dev) in assumptions_distribution.items()
+    }
+
+
+def evaluate_rowwise(
+    valuation_function: Callable[[Dict[str, float]], float],
+    base_assumptions: Dict[str, float]
+) -> Callable[[Dict[str, np.ndarray]], np.ndarray]:
+    """
+    Adapt a scalar valuation function to the engine's vectorized interface
+
+    Sampling is still batched; only the valuation itself runs per path.
+
+    Args:
+        valuation_function: Function taking an assumptions dict and returning a value
+        base_assumptions: Assumptions not being sampled
+
+    Returns:
+        Vectorized valuation function
+    """
+    def vectorized(scenarios: Dict[str, np.ndarray]) -> np.ndarray:
+        names = list(scenarios.keys())
+        if not names:
+            return np.asarray(valuation_function(base_assumptions.copy()), dtype=np.float64)
+        columns = [scenarios[name].tolist() for name in names]
+        results: List[float] = []
+        for row in zip(*columns):
+            assumptions = base_assumptions.copy()
+            assumptions.update(zip(names, row))
+            results.append(valuation_function(assumptions))
+        return np.asarray(results, dtype=np.float64)
+
+    return vectorized
@@ -9,8 +9,10 @@ import pandas as pd
 from scipy import optimize
 from scipy.stats import norm
 from typing import Dict, List, Any, Optional, Tuple, Union
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from enum import Enum
+from concurrent.futures import ProcessPoolExecutor
+import time
 import logging
 
 logger = logging.getLogger(__name__)
@@ -48,6 +50,45 @@ class OptimizationResult:
     optimization_info: Dict[str, Any]
 
 
+@dataclass
+class FrontierPoint:
+    """Single efficient frontier solve with convergence diagnostics"""
+    target_return: float
+    expected_return: float
+    risk: float
+    sharpe_ratio: float
+    weights: np.ndarray
+    converged: bool
+    iterations: int
+    function_evaluations: int
+    gradient_evaluations: int
+    message: str
+    warm_started: bool
+
+
+@dataclass
+class FrontierResult:
+    """Efficient frontier with per-point convergence stats"""
+    points: List[FrontierPoint]
+    elapsed_seconds: float
+    segments: int
+    workers: int
+    convergence: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def converged_points(self) -> List[FrontierPoint]:
+        return [p for p in self.points if p.converged]
+
+    def as_arrays(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(expected_returns, risks, sharpe_ratios) of converged points"""
+        points = self.converged_points
+        return (
+            np.array([p.expected_return for p in points]),
+            np.array([p.risk for p in points]),
+            np.array([p.sharpe_ratio for p in points])
+        )
+
+
 @dataclass
 class RiskMetrics:
     """Portfolio risk metrics"""
@@ -623,39 +664,87 @@ class PortfolioOptimizer:
         Returns:
             Tuple of (expected_returns, risks, sharpe_ratios) for efficient frontier
         """
-        min_return = np.min(expected_returns)
-        max_return = np.max(expected_returns)
-
-        target_returns = np.linspace(min_return, max_return, num_points)
-        efficient_risks = []
-        efficient_returns = []
-        efficient_sharpes = []
-
-        for target_return in target_returns:
-            try:
-                # Add return target constraint
-                target_constraints = constraints.copy() if constraints else []
-                target_constraints.append({
-                    "type": "target_return",
-                    "value": target_return
-                })
-
-                result = self._optimize_risk_with_return_target(
-                    expected_returns, covariance_matrix, target_return, constraints
-                )
-
-                efficient_returns.append(result.expected_return)
-                efficient_risks.append(result.risk)
-                efficient_sharpes.append(result.sharpe_ratio)
-
-            except:
-                # Skip if optimization fails for this target return
-                continue
+        result = self.compute_efficient_frontier(
+            expected_returns, covariance_matrix, num_points, constraints, max_workers=1
+        )
+        return result.as_arrays()
 
-        return (
-            np.array(efficient_returns),
-            np.array(efficient_risks),
-            np.array(efficient_sharpes)
+    def compute_efficient_frontier(
+        self,
+        expected_returns: np.ndarray,
+        covariance_matrix: np.ndarray,
+        num_points: int = 100,
+        constraints: Optional[List[Dict[str, Any]]] = None,
+        max_workers: int = 1,
+        segments: Optional[int] = None
+    ) -> FrontierResult:
+        """
+        Generate efficient frontier with warm starts and analytic gradients
+
+        Target returns are split into contiguous segments. Within a segment each
+        solve starts from the previous point's weights; segments are independent
+        and run on a process pool when max_workers > 1. Failed points are kept
+        and reported rather than dropped.
+
+        Args:
+            expected_returns: Expected returns for each asset
+            covariance_matrix: Covariance matrix
+            num_points: Number of points on the frontier
+            constraints: Portfolio constraints
+            max_workers: Worker processes for independent segments
+            segments: Number of segments (defaults to max_workers)
+
+        Returns:
+            FrontierResult with every point and convergence statistics
+        """
+        started = time.perf_counter()
+        expected_returns = np.asarray(expected_returns, dtype=np.float64)
+        covariance_matrix = np.asarray(covariance_matrix, dtype=np.float64)
+        n_assets = len(expected_returns)
+
+        bounds = self._parse_constraints(constraints, n_assets)["bounds"]
+        target_returns = np.linspace(np.min(expected_returns), np.max(expected_returns), num_points)
+
+        n_segments = max(1, min(segments or max_workers, num_points))
+        chunks = [chunk for chunk in np.array_split(target_returns, n_segments) if len(chunk)]
+        tasks = [
+            (expected_returns, covariance_matrix, chunk, bounds, self.risk_free_rate)
+            for chunk in chunks
+        ]
+
+        if max_workers > 1 and len(tasks) > 1:
+            with ProcessPoolExecutor(max_workers=min(max_workers, len(tasks))) as executor:
+                segment_results = list(executor.map(_solve_frontier_segment, tasks))
+        else:
+            segment_results = [_solve_frontier_segment(task) for task in tasks]
+
+        points = [point for segment in segment_results for point in segment]
+        converged = [p for p in points if p.converged]
+        failed = [p for p in points if not p.converged]
+
+        convergence = {
+            "total_points": len(points),
+            "converged": len(converged),
+            "failed": len(failed),
+            "mean_iterations": float(np.mean([p.iterations for p in points])) if points else 0.0,
+            "max_iterations": max((p.iterations for p in points), default=0),
+            "total_function_evaluations": sum(p.function_evaluations for p in points),
+            "failed_targets": [
+                {"target_return": p.target_return, "message": p.message} for p in failed
+            ]
+        }
+
+        if failed:
+            logger.warning(
+                f"Efficient frontier: {len(failed)}/{len(points)} target returns did not converge"
+            )
+
+        return FrontierResult(
+            points=points,
+            elapsed_seconds=time.perf_counter() - started,
+            segments=len(tasks),
+            workers=max_workers,
+            convergence=convergence
         )
 
     def _optimize_risk_with_return_target(
@@ -721,6 +810,77 @@ class PortfolioOptimizer:
             raise ValueError(f"Optimization failed: {result.message}")
 
 
+def _solve_frontier_segment(
+    task: Tuple[np.ndarray, np.ndarray, np.ndarray, List[Tuple[float, float]], float]
+) -> List[FrontierPoint]:
+    """
+    Solve a contiguous run of frontier targets, warm-starting each from the last
+
+    Module-level so it can be shipped to a process pool.
+    """
+    expected_returns, covariance_matrix, target_returns, bounds, risk_free_rate = task
+    n_assets = len(expected_returns)
+    ones = np.ones(n_assets)
+
+    def variance(weights):
+        return weights @ covariance_matrix @ weights
+
+    def variance_gradient(weights):
+        return 2 * covariance_matrix @ weights
+
+    weights = ones / n_assets
+    warm = False
+    points = []
+
+    for target_return in target_returns:
+        scipy_constraints = [
+            {'type': 'eq', 'fun': lambda w: w.sum() - 1.0, 'jac': lambda w: ones},
+            {
+                'type': 'eq',
+                'fun': lambda w, t=target_return: w @ expected_returns - t,
+                'jac': lambda w: expected_returns
+            }
+        ]
+
+        result = optimize.minimize(
+            fun=variance,
+            x0=weights,
+            jac=variance_gradient,
+            method='SLSQP',
+            bounds=bounds,
+            constraints=scipy_constraints,
+            options={'maxiter': 1000}
+        )
+
+        portfolio_return = float(result.x @ expected_returns)
+        portfolio_risk = float(np.sqrt(max(variance(result.x), 0.0)))
+        sharpe_ratio = (portfolio_return - risk_free_rate) / portfolio_risk if portfolio_risk > 0 else 0
+
+        points.append(FrontierPoint(
+            target_return=float(target_return),
+            expected_return=portfolio_return,
+            risk=portfolio_risk,
+            sharpe_ratio=sharpe_ratio,
+            weights=result.x,
+            converged=bool(result.success),
+            iterations=int(getattr(result, "nit", 0)),
+            function_evaluations=int(getattr(result, "nfev", 0)),
+            gradient_evaluations=int(getattr(result, "njev", 0)),
+            message=str(result.message),
+            warm_started=warm
+        ))
+
+        # Only carry converged weights forward; a failed solve restarts from equal weights
+        if result.success:
+            weights = result.x
+            warm = True
+        else:
+            weights = ones / n_assets
+            warm = False
+
+    return points
+
+
 class RiskModel:
     """
     Risk modeling utilities for portfolio optimization
@@ -0,0 +1,207 @@
+"""
+Sensitivity Analysis Utilities
+Grid-evaluated N-dimensional sensitivity tables and tornado charts
+"""
+
+import numpy as np
+from typing import Dict, List, Any, Callable, Sequence, Tuple
+from dataclasses import dataclass
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class SensitivityResult:
+    """Valuations over a parameter grid"""
+    axes: Dict[str, List[float]]
+    values: np.ndarray
+    base_value: float
+
+    @property
+    def shape(self) -> Tuple[int, ...]:
+        return self.values.shape
+
+    def to_dict(self, decimals: int = 2) -> Dict[str, Any]:
+        """JSON-friendly representation; non-finite cells become None"""
+        rounded = np.round(self.values, decimals)
+        cells = rounded.astype(object)
+        cells[~np.isfinite(rounded)] = None
+        return {
+            "parameters": list(self.axes.keys()),
+            "axes": self.axes,
+            "shape": list(self.shape),
+            "base_value": round(self.base_value, decimals) if np.isfinite(self.base_value) else None,
+            "values": cells.tolist()
+        }
+
+
+def grid_assumptions(
+    base_assumptions: Dict[str, Any],
+    axes: Dict[str, Sequence[float]]
+) -> Dict[str, Any]:
+    """
+    Build an assumptions dict whose varied parameters broadcast to the full grid
+
+    Axis i is reshaped to (1, ..., n_i, ..., 1) so any valuation written with
+    NumPy arithmetic evaluates every cell of the grid in one call.
+
+    Args:
+        base_assumptions: Base case assumptions
+        axes: Ordered dict of {parameter: values}
+
+    Returns:
+        Assumptions dict with array-valued parameters
+    """
+    assumptions = base_assumptions.copy()
+    ndim = len(axes)
+    for i, (param, values) in enumerate(axes.items()):
+        shape = [1] * ndim
+        shape[i] = len(values)
+        assumptions[param] = np.asarray(values, dtype=np.float64).reshape(shape)
+    return assumptions
+
+
+def evaluate_grid(
+    base_assumptions: Dict[str, Any],
+    axes: Dict[str, Sequence[float]],
+    valuation_function: Callable[[Dict[str, Any]], Any],
+    vectorized: bool = True
+) -> SensitivityResult:
+    """
+    Evaluate a valuation over the cartesian product of parameter axes
+
+    Args:
+        base_assumptions: Base case assumptions
+        axes: Ordered dict of {parameter: values}
+        valuation_function: Function that takes assumptions and returns valuation
+        vectorized: Whether valuation_function accepts broadcast array assumptions;
+            scalar functions are evaluated cell by cell
+
+    Returns:
+        SensitivityResult with values of shape (len(axis_1), ..., len(axis_n))
+    """
+    if not axes:
+        raise ValueError("At least one sensitivity axis is required")
+
+    shape = tuple(len(values) for values in axes.values())
+    if all(param in base_assumptions for param in axes):
+        base_value = float(valuation_function(base_assumptions.copy()))
+    else:
+        base_value = float("nan")
+
+    if vectorized:
+        with np.errstate(divide="ignore", invalid="ignore"):
+            raw = valuation_function(grid_assumptions(base_assumptions, axes))
+        values = np.array(np.broadcast_to(np.asarray(raw, dtype=np.float64), shape))
+    else:
+        params = list(axes.keys())
+        axis_values = [list(v) for v in axes.values()]
+        values = np.empty(shape, dtype=np.float64)
+        assumptions = base_assumptions.copy()
+        for index in np.ndindex(*shape):
+            for param, values_list, i in zip(params, axis_values, index):
+                assumptions[param] = values_list[i]
+            values[index] = valuation_function(assumptions)
+
+    return SensitivityResult(
+        axes={param: [float(v) for v in values_] for param, values_ in axes.items()},
+        values=values,
+        base_value=base_value
+    )
+
+
+def tornado_analysis(
+    base_assumptions: Dict[str, Any],
+    ranges: Dict[str, Tuple[float, float]],
+    valuation_function: Callable[[Dict[str, Any]], Any],
+    vectorized: bool = True
+) -> Dict[str, Any]:
+    """
+    Compute tornado-chart deltas, flexing one parameter at a time
+
+    With a vectorized valuation all 2k+1 scenarios (base plus low/high per
+    parameter) are evaluated in a single call.
+
+    Args:
+        base_assumptions: Base case assumptions
+        ranges: Dict of {parameter: (low, high)}
+        valuation_function: Function that takes assumptions and returns valuation
+        vectorized: Whether valuation_function accepts array-valued assumptions
+
+    Returns:
+        Dict with base value and bars sorted by swing (largest first)
+    """
+    params = list(ranges.keys())
+    missing = [p for p in params if p not in base_assumptions]
+    if missing:
+        raise ValueError(f"Tornado parameters missing from base assumptions: {missing}")
+
+    n = 2 * len(params) + 1
+
+    if vectorized:
+        assumptions = base_assumptions.copy()
+        for i, param in enumerate(params):
+            column = np.full(n, float(base_assumptions[param]))
+            column[2 * i], column[2 * i + 1] = ranges[param]
+            assumptions[param] = column
+        with np.errstate(divide="ignore", invalid="ignore"):
+            results = np.array(np.broadcast_to(
+                np.asarray(valuation_function(assumptions), dtype=np.float64), (n,)
+            ))
+    else:
+        results = np.empty(n, dtype=np.float64)
+        for i, param in enumerate(params):
+            for j, value in enumerate(ranges[param]):
+                assumptions = base_assumptions.copy()
+                assumptions[param] = value
+                results[2 * i + j] = valuation_function(assumptions)
+        results[-1] = valuation_function(base_assumptions.copy())
+
+    base_value = float(results[-1])
+    bars = []
+    for i, param in enumerate(params):
+        low_valuation, high_valuation = float(results[2 * i]), float(results[2 * i + 1])
+        bars.append({
+            "parameter": param,
+            "low_input": float(ranges[param][0]),
+            "high_input": float(ranges[param][1]),
+            "low_valuation": round(low_valuation, 2),
+            "high_valuation": round(high_valuation, 2),
+            "delta_low": round(low_valuation - base_value, 2),
+            "delta_high": round(high_valuation - base_value, 2),
+            "swing": round(abs(high_valuation - low_valuation), 2)
+        })
+
+    bars.sort(key=lambda bar: bar["swing"] if np.isfinite(bar["swing"]) else -1, reverse=True)
+
+    return {
+        "base_value": round(base_value, 2),
+        "bars": bars
+    }
+
+
+def present_value_grid(
+    cash_flows: Sequence[float],
+    terminal_value: Any,
+    wacc: Any
+) -> np.ndarray:
+    """
+    Vectorized counterpart of calculate_enterprise_value_from_dcf
+
+    Args:
+        cash_flows: Projected cash flows (years 1..N); may carry a leading grid
+            shape with years on the last axis
+        terminal_value: Terminal value (scalar or broadcastable array)
+        wacc: WACC in percent (scalar or broadcastable array)
+
+    Returns:
+        Enterprise values with the broadcast shape of the inputs
+    """
+    flows = np.asarray(cash_flows, dtype=np.float64)
+    years = flows.shape[-1]
+    growth = 1 + np.asarray(wacc, dtype=np.float64) / 100
+    periods = np.arange(1, years + 1, dtype=np.float64)
+    discount = 1 / growth[..., np.newaxis] ** periods
+    pv_flows = np.sum(flows * discount, axis=-1)
+    return pv_flows + terminal_value * discount[..., -1]
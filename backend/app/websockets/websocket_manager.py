@@ -4,6 +4,7 @@ Handles connection management, room management, and event broadcasting
 """
 
 import asyncio
+import inspect
 import json
 from typing import Dict, Set, List, Optional, Any
 from datetime import datetime
@@ -13,6 +14,8 @@ from dataclasses import dataclass, asdict
 import socketio
 from fastapi import HTTPException
 
+from app.core.config import settings
+
 logger = logging.getLogger(__name__)
 
 
@@ -58,12 +61,18 @@ class WebSocketManager:
     """Manages WebSocket connections and real-time communication"""
 
     def __init__(self):
-        # Socket.IO server instance
+        # Socket.IO server instance. With Redis configured, emits to a room go
+        # through Redis pub/sub and reach members connected to any worker.
+        client_manager = None
+        if settings.REDIS_URL and settings.REALTIME_BACKPLANE == "redis":
+            client_manager = socketio.AsyncRedisManager(settings.REDIS_URL)
+
         self.sio = socketio.AsyncServer(
             cors_allowed_origins="*",
             logger=True,
             engineio_logger=True,
-            async_mode='asgi'
+            async_mode='asgi',
+            client_manager=client_manager
         )
 
         # Connection tracking
@@ -123,6 +132,10 @@ class WebSocketManager:
                     self.organization_sessions[organization_id] = set()
                 self.organization_sessions[organization_id].add(sid)
 
+                # Rooms make user/org emits single, cross-worker operations
+                await self._enter_room(sid, self._user_room(user_id))
+                await self._enter_room(sid, self._organization_room(organization_id))
+
                 logger.info(f"User {user_id} connected with session {sid}")
 
                 # Send connection confirmation
@@ -180,6 +193,7 @@ class WebSocketManager:
                 if deal_id not in self.deal_rooms:
                     self.deal_rooms[deal_id] = set()
                 self.deal_rooms[deal_id].add(sid)
+                await self._enter_room(sid, deal_id)
 
                 # Track in session
                 session.joined_deals.add(deal_id)
@@ -216,6 +230,7 @@ class WebSocketManager:
                     self.deal_rooms[deal_id].discard(sid)
                     if not self.deal_rooms[deal_id]:
                         del self.deal_rooms[deal_id]
+                await self._leave_room(sid, deal_id)
 
                 # Remove from session
                 session.joined_deals.discard(deal_id)
@@ -287,6 +302,24 @@ class WebSocketManager:
             except Exception as e:
                 logger.error(f"Error handling typing indicator for {sid}: {e}")
 
+    async def _enter_room(self, sid: str, room: str):
+        result = self.sio.enter_room(sid, room)
+        if inspect.isawaitable(result):
+            await result
+
+    async def _leave_room(self, sid: str, room: str):
+        result = self.sio.leave_room(sid, room)
+        if inspect.isawaitable(result):
+            await result
+
+    @staticmethod
+    def _user_room(user_id: str) -> str:
+        return f"user:{user_id}"
+
+    @staticmethod
+    def _organization_room(organization_id: str) -> str:
+        return f"org:{organization_id}"
+
     def _extract_user_id_from_token(self, token: str) -> Optional[str]:
         """Extract user ID from JWT token"""
         # TODO: Implement proper JWT validation
@@ -312,11 +345,8 @@ class WebSocketManager:
             logger.error(f"Error sending notification {notification.id}: {e}")
 
     async def broadcast_deal_update(self, deal_id: str, updates: Dict[str, Any], user_id: Optional[str] = None):
-        """Broadcast deal update to all users in deal room"""
+        """Broadcast deal update to all users in deal room (on any worker)"""
         try:
-            if deal_id not in self.deal_rooms:
-                return
-
             data = {
                 'deal_id': deal_id,
                 'updates': updates,
@@ -334,16 +364,15 @@ class WebSocketManager:
         """Broadcast pipeline stage change"""
         try:
             # Send to deal room
-            if deal_id in self.deal_rooms:
-                data = {
-                    'deal_id': deal_id,
-                    'old_stage': old_stage,
-                    'new_stage': new_stage,
-                    'changed_by': user_id,
-                    'timestamp': datetime.now().isoformat()
-                }
+            data = {
+                'deal_id': deal_id,
+                'old_stage': old_stage,
+                'new_stage': new_stage,
+                'changed_by': user_id,
+                'timestamp': datetime.now().isoformat()
+            }
 
-                await self.sio.emit('pipeline_changed', data, room=deal_id)
+            await self.sio.emit('pipeline_changed', data, room=deal_id)
 
             # Also send notification to organization
             if user_id:
@@ -371,14 +400,13 @@ class WebSocketManager:
         """Broadcast AI analysis completion"""
         try:
             # Send to deal room
-            if deal_id in self.deal_rooms:
-                data = {
-                    'deal_id': deal_id,
-                    'analysis': analysis,
-                    'timestamp': datetime.now().isoformat()
-                }
+            data = {
+                'deal_id': deal_id,
+                'analysis': analysis,
+                'timestamp': datetime.now().isoformat()
+            }
 
-                await self.sio.emit('ai_analysis_complete', data, room=deal_id)
+            await self.sio.emit('ai_analysis_complete', data, room=deal_id)
 
             # Send notification to organization
             notification = NotificationData(
@@ -401,15 +429,11 @@ class WebSocketManager:
 
     async def _send_to_user(self, user_id: str, event: str, data: Any):
         """Send event to all sessions of a specific user"""
-        if user_id in self.user_sessions:
-            for session_id in self.user_sessions[user_id]:
-                await self.sio.emit(event, data, room=session_id)
+        await self.sio.emit(event, data, room=self._user_room(user_id))
 
     async def _send_to_organization(self, organization_id: str, event: str, data: Any):
         """Send event to all users in an organization"""
-        if organization_id in self.organization_sessions:
-            for session_id in self.organization_sessions[organization_id]:
-                await self.sio.emit(event, data, room=session_id)
+        await self.sio.emit(event, data, room=self._organization_room(organization_id))
 
     def _get_user_session(self, user_id: str) -> Optional[UserSession]:
         """Get a user session by user ID"""
@@ -0,0 +1,154 @@
+#!/usr/bin/env python
+"""
+Cache Codec Benchmark
+Bytes stored and microseconds per set/get for the payload shapes we cache:
+embeddings, Claude analysis responses, DataWarehouse metric records and
+deal lists, comparing the legacy JSON text format with the binary codecs.
+
+Without ``--redis-url`` only encode/decode is timed (the CPU part of a
+get/set); with it each payload is also SET and GET against that Redis.
+
+Usage:
+    python scripts/benchmark_cache_codec.py
+    python scripts/benchmark_cache_codec.py --redis-url redis://localhost:6379/15 --iterations 2000
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+import numpy as np
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.core.codec import (
+    LZ4_AVAILABLE,
+    MSGPACK_AVAILABLE,
+    ORJSON_AVAILABLE,
+    ZSTD_AVAILABLE,
+    CacheCodec,
+    LegacyJSONCodec,
+)
+
+
+def make_payloads(seed: int = 0) -> Dict[str, Any]:
+    rng = random.Random(seed)
+    words = ["revenue", "synergy", "diligence", "covenant", "escrow", "multiple", "ebitda",
+             "integration", "retention", "churn", "pipeline", "valuation", "working", "capital"]
+
+    def sentence(n):
+        return " ".join(rng.choice(words) for _ in range(n)).capitalize() + "."
+
+    start = datetime(2025, 1, 1)
+    return {
+        "embedding_1536": np.random.default_rng(seed).normal(size=1536).astype(np.float32),
+        "claude_analysis": {
+            "summary": " ".join(sentence(20) for _ in range(30)),
+            "risks": [{"title": sentence(4), "severity": rng.choice(["low", "medium", "high"]),
+                       "detail": sentence(40)} for _ in range(12)],
+            "score": 0.82,
+            "model": "claude-analysis",
+            "usage": {"input_tokens": 5210, "output_tokens": 1834}
+        },
+        "metric_records_500": [
+            {
+                "metric_type": rng.choice(["mrr", "arr", "churn_rate", "deal_velocity"]),
+                "period_start": start + timedelta(days=i),
+                "period_end": start + timedelta(days=i + 1),
+                "value": rng.uniform(0, 1e6),
+                "sum": rng.uniform(0, 1e7),
+                "min": rng.uniform(0, 1e3),
+                "max": rng.uniform(1e3, 1e6),
+                "count": rng.randrange(1, 500),
+                "change": rng.uniform(-1e4, 1e4),
+                "change_percent": rng.uniform(-20, 20)
+            }
+            for i in range(500)
+        ],
+        "deal_list_50": [
+            {
+                "id": f"deal_{i}",
+                "title": sentence(5),
+                "stage": rng.choice(["sourcing", "diligence", "negotiation", "closing"]),
+                "deal_value": rng.randrange(1_000_000, 500_000_000),
+                "probability_of_close": rng.randrange(0, 100),
+                "tags": [rng.choice(words) for _ in range(4)]
+            }
+            for i in range(50)
+        ]
+    }
+
+
+def codecs() -> Dict[str, CacheCodec]:
+    variants = {"legacy_json": LegacyJSONCodec(serializer="json", compression="none")}
+    variants["json+zlib"] = CacheCodec(serializer="json", compression="zlib")
+    if ORJSON_AVAILABLE:
+        variants["orjson"] = CacheCodec(serializer="orjson", compression="none")
+    if MSGPACK_AVAILABLE:
+        variants["msgpack"] = CacheCodec(serializer="msgpack", compression="none")
+        if ZSTD_AVAILABLE:
+            variants["msgpack+zstd"] = CacheCodec(serializer="msgpack", compression="zstd")
+        if LZ4_AVAILABLE:
+            variants["msgpack+lz4"] = CacheCodec(serializer="msgpack", compression="lz4")
+    variants["auto"] = CacheCodec()
+    return variants
+
+
+def time_us(fn: Callable[[], Any], iterations: int) -> float:
+    started = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - started) / iterations * 1e6
+
+
+def benchmark(payloads: Dict[str, Any], iterations: int, redis_client=None) -> List[Dict]:
+    results = []
+    for payload_name, payload in payloads.items():
+        for codec_name, codec in codecs().items():
+            encoded = codec.encode(payload)
+            row = {
+                "payload": payload_name,
+                "codec": codec_name,
+                "bytes": len(encoded),
+                "encode_us": round(time_us(lambda: codec.encode(payload), iterations), 1),
+                "decode_us": round(time_us(lambda: codec.decode(encoded), iterations), 1)
+            }
+            if redis_client is not None:
+                key = f"bench:codec:{payload_name}:{codec_name}"
+                row["set_us"] = round(time_us(lambda: redis_client.set(key, codec.encode(payload), ex=60), iterations), 1)
+                row["get_us"] = round(time_us(lambda: codec.decode(redis_client.get(key)), iterations), 1)
+                row["redis_memory_bytes"] = redis_client.memory_usage(key)
+                redis_client.delete(key)
+            results.append(row)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark cache payload codecs")
+    parser.add_argument("--iterations", type=int, default=500)
+    parser.add_argument("--redis-url", help="Also time SET/GET against this Redis")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    redis_client = None
+    if args.redis_url:
+        import redis
+        redis_client = redis.Redis.from_url(args.redis_url, decode_responses=False)
+
+    payloads = make_payloads(args.seed)
+    print(json.dumps({
+        "available": {"msgpack": MSGPACK_AVAILABLE, "orjson": ORJSON_AVAILABLE,
+                      "zstd": ZSTD_AVAILABLE, "lz4": LZ4_AVAILABLE},
+        "iterations": args.iterations,
+        "results": benchmark(payloads, args.iterations, redis_client)
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+#!/usr/bin/env python
+"""
+Collaboration Benchmark
+Replays an edit stream against a large document and compares the legacy
+whole-string apply path with the rope-backed CollaborativeDocumentManager.
+
+Streams are JSON lines, one operation per line:
+
+    {"user": "u1", "type": "insert", "position": 1200, "content": "a"}
+    {"user": "u2", "type": "delete", "position": 88000, "length": 3}
+
+Without ``--stream`` a synthetic stream is generated: several editors typing
+at their own positions in the document, with occasional backspaces. Use
+``--record`` to write the generated stream out for later replays.
+
+Usage:
+    python scripts/benchmark_collaboration.py
+    python scripts/benchmark_collaboration.py --editors 12 --ops 50000 --batch 16
+    python scripts/benchmark_collaboration.py --stream edits.jsonl --doc-size 500000
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.realtime.collaboration import (
+    CollaborativeDocumentManager,
+    DocumentOperation,
+    OperationalTransform,
+    OperationType,
+)
+
+
+def make_document(size: int, seed: int = 0) -> str:
+    rng = random.Random(seed)
+    words = ["revenue", "ebitda", "term", "sheet", "closing", "escrow", "warranty",
+             "indemnity", "valuation", "consideration", "earn-out", "covenant"]
+    parts = []
+    length = 0
+    while length < size:
+        word = rng.choice(words)
+        parts.append(word)
+        length += len(word) + 1
+    return " ".join(parts)[:size]
+
+
+def make_stream(doc_size: int, editors: int, ops: int, seed: int = 0) -> List[Dict]:
+    """Editors typing at their own positions, with occasional backspaces"""
+    rng = random.Random(seed)
+    positions = {f"user_{i}": rng.randrange(doc_size) for i in range(editors)}
+    length = doc_size
+    stream = []
+
+    for _ in range(ops):
+        user = rng.choice(list(positions))
+        position = min(positions[user], length)
+        if rng.random() < 0.15 and position > 0:
+            stream.append({"user": user, "type": "delete", "position": position - 1, "length": 1})
+            positions[user] = position - 1
+            length -= 1
+        else:
+            char = rng.choice("abcdefghijklmnopqrstuvwxyz ")
+            stream.append({"user": user, "type": "insert", "position": position, "content": char})
+            positions[user] = position + 1
+            length += 1
+
+    return stream
+
+
+def to_operation(entry: Dict) -> DocumentOperation:
+    return DocumentOperation(
+        id=None,
+        type=OperationType(entry["type"]),
+        position=entry["position"],
+        content=entry.get("content"),
+        length=entry.get("length"),
+        user_id=entry["user"]
+    )
+
+
+def replay_string(document: str, stream: List[Dict]) -> Dict:
+    """Legacy path: rebuild the document string on every operation"""
+    operations = [to_operation(entry) for entry in stream]
+    started = time.perf_counter()
+    content = document
+    for operation in operations:
+        content = OperationalTransform.apply_operation(content, operation)
+    elapsed = time.perf_counter() - started
+    return {"content": content, "seconds": elapsed}
+
+
+async def replay_manager(document: str, stream: List[Dict], batch: int) -> Dict:
+    """Rope-backed manager, grouping each user's consecutive edits into batches"""
+    manager = CollaborativeDocumentManager()
+    state = await manager.join_document("bench", "owner", {}, "org")
+    state.content = document
+    # Replay is sequential, so there is nothing concurrent to transform against
+    manager.operation_queues["bench"] = []
+
+    async def no_broadcast(*args, **kwargs):
+        return None
+
+    manager._broadcast_operations = no_broadcast
+
+    groups: List[List[Dict]] = []
+    for entry in stream:
+        if groups and groups[-1][0]["user"] == entry["user"] and len(groups[-1]) < batch:
+            groups[-1].append(entry)
+        else:
+            groups.append([entry])
+
+    started = time.perf_counter()
+    for group in groups:
+        await manager.apply_operations("bench", [to_operation(e) for e in group], group[0]["user"])
+        manager.operation_queues["bench"].clear()
+    elapsed = time.perf_counter() - started
+
+    return {"content": state.content, "seconds": elapsed, "batches": len(groups),
+            "chunks": state.buffer.chunk_count, "version": state.version}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark collaborative document edit throughput")
+    parser.add_argument("--doc-size", type=int, default=500_000)
+    parser.add_argument("--editors", type=int, default=8)
+    parser.add_argument("--ops", type=int, default=20_000)
+    parser.add_argument("--batch", type=int, default=1, help="Max operations per apply_operations call")
+    parser.add_argument("--stream", type=Path, help="Replay a recorded JSONL edit stream")
+    parser.add_argument("--record", type=Path, help="Write the generated stream as JSONL")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    document = make_document(args.doc_size, seed=args.seed)
+    if args.stream:
+        with args.stream.open() as f:
+            stream = [json.loads(line) for line in f if line.strip()]
+    else:
+        stream = make_stream(len(document), args.editors, args.ops, seed=args.seed)
+        if args.record:
+            with args.record.open("w") as f:
+                f.writelines(json.dumps(entry) + "\n" for entry in stream)
+
+    legacy = replay_string(document, stream)
+    rope = asyncio.run(replay_manager(document, stream, args.batch))
+
+    print(json.dumps({
+        "document": {"size": len(document), "operations": len(stream)},
+        "results": [
+            {
+                "path": "string",
+                "seconds": round(legacy["seconds"], 3),
+                "ops_per_second": round(len(stream) / legacy["seconds"])
+            },
+            {
+                "path": "rope_manager",
+                "batch": args.batch,
+                "batches": rope["batches"],
+                "chunks": rope["chunks"],
+                "seconds": round(rope["seconds"], 3),
+                "ops_per_second": round(len(stream) / rope["seconds"])
+            }
+        ],
+        "content_matches": legacy["content"] == rope["content"]
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
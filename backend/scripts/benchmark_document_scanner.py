@@ -0,0 +1,126 @@
+#!/usr/bin/env python
+"""
+Document Scanner Benchmark
+Measures the single-pass PatternScanner against running each pattern with
+re.findall, on synthetic contract text.
+
+The documents mix boilerplate prose with the vocabulary the due diligence
+engine and the document intelligence service look for (risk terms, amounts,
+dates, companies, contacts), so both hit-dense and hit-sparse stretches are
+exercised. Each scanner is checked to find the same matches as findall
+before it is timed.
+
+Usage:
+    python scripts/benchmark_document_scanner.py
+    python scripts/benchmark_document_scanner.py --size-kb 2048 --repeat 5
+"""
+
+import argparse
+import json
+import random
+import re
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.ai.document_intelligence import DocumentIntelligenceService
+from app.deal_intelligence.due_diligence_automation import DocumentAnalysisEngine
+from app.services.document_scanner import PatternScanner
+
+FILLER = (
+    "the parties agree that the following terms shall apply to this agreement and any "
+    "schedule attached hereto in accordance with the laws of the jurisdiction"
+).split()
+
+SNIPPETS = [
+    "Revenue: ${amount}M", "EBITDA: ${amount}M", "enterprise value ${amount}B", "growth: {pct}%",
+    "margin: {pct}%", "{pct}% of the shares", "cash flow", "net income", "balance sheet",
+    "pending litigation", "material adverse change", "going concern", "regulatory investigation",
+    "data breach", "trademark", "patent", "environmental contamination", "indemnification",
+    "change of control", "non-compete", "GDPR", "SOX compliance", "{day}/{month}/{year}",
+    "{year}-0{month}-1{month}", "March {day}, {year}", "Acme Holdings Inc", "Globex Corporation",
+    "legal@acme.com", "(555) 010-{phone}", "Action item: circulate the disclosure letter",
+    "Next steps: confirm the escrow amount", "key person dependency", "customer concentration",
+]
+
+
+def make_document(size: int, hit_rate: float, rng: random.Random) -> str:
+    """Synthetic contract text of about ``size`` characters"""
+    words: List[str] = []
+    length = 0
+    while length < size:
+        if rng.random() < hit_rate:
+            word = rng.choice(SNIPPETS).format(
+                amount=rng.randint(1, 900), pct=rng.randint(1, 60), day=rng.randint(1, 28),
+                month=rng.randint(1, 9), year=rng.randint(2015, 2026), phone=rng.randint(1000, 9999)
+            )
+        else:
+            word = rng.choice(FILLER)
+        if rng.random() < 0.05:
+            word += ".\n"
+        words.append(word)
+        length += len(word) + 1
+    return " ".join(words)
+
+
+def findall_each(scanner: PatternScanner, text: str) -> int:
+    """Baseline: one re.findall pass per pattern"""
+    return sum(
+        len(re.findall(spec.pattern, text, re.IGNORECASE if spec.ignore_case else 0))
+        for spec in scanner.specs
+    )
+
+
+def best_of(fn, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def benchmark(name: str, scanner: PatternScanner, text: str, repeat: int) -> Dict:
+    hits = scanner.scan(text).hits
+    expected = findall_each(scanner, text)
+    if len(hits) != expected:
+        raise SystemExit(f"{name}: scanner found {len(hits)} hits, findall found {expected}")
+
+    megabytes = len(text.encode()) / 1e6
+    scan_seconds = best_of(lambda: scanner.scan(text), repeat)
+    findall_seconds = best_of(lambda: findall_each(scanner, text), repeat)
+    return {
+        "patterns": len(scanner.specs),
+        "hits": len(hits),
+        "scan_mb_per_s": round(megabytes / scan_seconds, 2),
+        "findall_mb_per_s": round(megabytes / findall_seconds, 2),
+        "speedup": round(findall_seconds / scan_seconds, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark single-pass document pattern scanning")
+    parser.add_argument("--size-kb", type=int, default=1024)
+    parser.add_argument("--hit-rate", type=float, default=0.05)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    text = make_document(args.size_kb * 1024, args.hit_rate, random.Random(args.seed))
+    scanners = {
+        "due_diligence": DocumentAnalysisEngine().scanner,
+        "document_intelligence": DocumentIntelligenceService().scanner,
+    }
+
+    print(json.dumps({
+        "document": {"characters": len(text), "hit_rate": args.hit_rate},
+        "results": {name: benchmark(name, scanner, text, args.repeat) for name, scanner in scanners.items()}
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+#!/usr/bin/env python
+"""
+Retrieval Benchmark
+Measures recall@k and latency of the chunk ANN query on a synthetic corpus.
+
+The corpus is clustered unit vectors (closer to real embeddings than uniform
+noise). Ground truth is exact cosine top-k from NumPy. The postgres backend
+loads the corpus into a temporary table carrying the same HNSW index as
+``document_chunks`` and runs the same ORDER BY ... LIMIT query shape for each
+ef_search value; the exact backend runs the NumPy search as a baseline.
+
+Usage:
+    python scripts/benchmark_retrieval.py --backend exact
+    DATABASE_URL=postgresql+psycopg://... python scripts/benchmark_retrieval.py \\
+        --chunks 50000 --ef-search 40 100 200
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Sequence
+
+import numpy as np
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.services.retrieval import latency_summary, recall_at_k, vector_literal
+
+
+def make_synthetic_corpus(
+    n_chunks: int,
+    dim: int,
+    n_queries: int,
+    n_clusters: int = 64,
+    spread: float = 0.35,
+    seed: int = 0
+):
+    """Clustered unit vectors plus queries drawn from the same clusters"""
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(n_clusters, dim))
+
+    def sample(n):
+        points = centers[rng.integers(n_clusters, size=n)] + spread * rng.normal(size=(n, dim))
+        return (points / np.linalg.norm(points, axis=1, keepdims=True)).astype(np.float32)
+
+    return sample(n_chunks), sample(n_queries)
+
+
+def exact_top_k(corpus: np.ndarray, queries: np.ndarray, k: int) -> np.ndarray:
+    """Exact cosine top-k ids for unit vectors"""
+    scores = queries @ corpus.T
+    top = np.argpartition(-scores, k, axis=1)[:, :k]
+    order = np.take_along_axis(scores, top, axis=1).argsort(axis=1)[:, ::-1]
+    return np.take_along_axis(top, order, axis=1)
+
+
+def run_queries(
+    search: Callable[[np.ndarray, int], Sequence[int]],
+    queries: np.ndarray,
+    truth: np.ndarray,
+    k: int
+) -> Dict[str, float]:
+    """Time each query and score it against ground truth"""
+    latencies = []
+    recalls = []
+    for query, expected in zip(queries, truth):
+        started = time.perf_counter()
+        retrieved = search(query, k)
+        latencies.append((time.perf_counter() - started) * 1000)
+        recalls.append(recall_at_k(retrieved, expected.tolist(), k))
+
+    return {
+        f"recall@{k}": round(float(np.mean(recalls)), 4),
+        **latency_summary(latencies)
+    }
+
+
+def benchmark_exact(corpus, queries, truth, k) -> List[Dict]:
+    def search(query, k):
+        scores = corpus @ query
+        top = np.argpartition(-scores, k)[:k]
+        return top[np.argsort(-scores[top])].tolist()
+
+    return [{"backend": "exact", **run_queries(search, queries, truth, k)}]
+
+
+def benchmark_postgres(corpus, queries, truth, k, ef_values, database_url) -> List[Dict]:
+    from sqlalchemy import create_engine, text
+
+    engine = create_engine(database_url)
+    results = []
+
+    with engine.connect() as conn:
+        conn.execute(text("CREATE EXTENSION IF NOT EXISTS vector"))
+        conn.execute(text(
+            f"CREATE TEMP TABLE bench_chunks (id integer PRIMARY KEY, embedding vector({corpus.shape[1]}))"
+        ))
+
+        load_started = time.perf_counter()
+        batch = 1000
+        for start in range(0, len(corpus), batch):
+            conn.execute(
+                text("INSERT INTO bench_chunks (id, embedding) VALUES (:id, CAST(:embedding AS vector))"),
+                [
+                    {"id": start + i, "embedding": vector_literal(vector)}
+                    for i, vector in enumerate(corpus[start:start + batch])
+                ]
+            )
+
+        index_started = time.perf_counter()
+        # Same index definition as migration 002
+        conn.execute(text(
+            "CREATE INDEX ON bench_chunks USING hnsw (embedding vector_cosine_ops) "
+            "WITH (m = 16, ef_construction = 64)"
+        ))
+        conn.execute(text("ANALYZE bench_chunks"))
+        build_seconds = time.perf_counter() - index_started
+
+        query_sql = text("""
+            SELECT id FROM bench_chunks
+            ORDER BY embedding <=> CAST(:query_embedding AS vector)
+            LIMIT :limit
+        """)
+
+        for ef_search in ef_values:
+            conn.execute(text(f"SET hnsw.ef_search = {int(ef_search)}"))
+
+            def search(query, k):
+                rows = conn.execute(query_sql, {"query_embedding": vector_literal(query), "limit": k})
+                return [row.id for row in rows]
+
+            results.append({
+                "backend": "postgres_hnsw",
+                "ef_search": ef_search,
+                "load_seconds": round(index_started - load_started, 2),
+                "index_build_seconds": round(build_seconds, 2),
+                **run_queries(search, queries, truth, k)
+            })
+
+    engine.dispose()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark chunk retrieval recall and latency")
+    parser.add_argument("--backend", choices=["postgres", "exact"], default="postgres")
+    parser.add_argument("--chunks", type=int, default=20000)
+    parser.add_argument("--dim", type=int, default=1536)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--ef-search", type=int, nargs="+", default=[40, 100, 200])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--database-url", default=os.getenv("DATABASE_URL"))
+    args = parser.parse_args()
+
+    corpus, queries = make_synthetic_corpus(args.chunks, args.dim, args.queries, seed=args.seed)
+    truth = exact_top_k(corpus, queries, args.k)
+
+    if args.backend == "exact":
+        results = benchmark_exact(corpus, queries, truth, args.k)
+    else:
+        if not args.database_url:
+            parser.error("--database-url or DATABASE_URL is required for the postgres backend")
+        results = benchmark_postgres(corpus, queries, truth, args.k, args.ef_search, args.database_url)
+
+    print(json.dumps({
+        "corpus": {"chunks": args.chunks, "dim": args.dim, "queries": args.queries, "k": args.k},
+        "results": results
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""Tests for the AI gateway against a local mock Messages API"""
+
+import asyncio
+import time
+
+import httpx
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+from app.ai.ai_service import AIModel, AIRequest, AIResponse, AIService, AITask
+from app.services.ai_gateway import AIGateway, AIGatewayError, ModelBudget, TokenBucket, parse_model_budgets
+
+
+class MockMessagesAPI:
+    """Local stand-in for POST /v1/messages with scripted failures"""
+
+    def __init__(self, failures=(), delay=0.02):
+        self.failures = list(failures)
+        self.delay = delay
+        self.calls = 0
+        self.active = 0
+        self.peak = 0
+        self.app = FastAPI()
+        self.app.post("/v1/messages")(self.messages)
+
+    async def messages(self, request: Request):
+        payload = await request.json()
+        self.calls += 1
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            await asyncio.sleep(self.delay)
+            if self.failures:
+                status = self.failures.pop(0)
+                return JSONResponse({"error": {"type": "overloaded"}}, status_code=status,
+                                    headers={"retry-after": "0"})
+            return {
+                "content": [{"type": "text", "text": f"echo: {payload['messages'][0]['content']}"}],
+                "usage": {"input_tokens": 10, "output_tokens": 5},
+                "api_key": request.headers["x-api-key"],
+            }
+        finally:
+            self.active -= 1
+
+
+def make_gateway(api, **kwargs):
+    kwargs.setdefault("backoff_base", 0.001)
+    return AIGateway(api_key="test-key", base_url="http://mock", transport=httpx.ASGITransport(app=api.app), **kwargs)
+
+
+def payload(prompt, model="claude-test"):
+    return {"model": model, "max_tokens": 50, "messages": [{"role": "user", "content": prompt}]}
+
+
+def test_identical_prompts_share_one_call_and_are_cached():
+    api = MockMessagesAPI()
+    gateway = make_gateway(api)
+
+    async def run():
+        same = await asyncio.gather(*(gateway.create_message(payload("hi"), cache=True) for _ in range(5)))
+        again = await gateway.complete(payload("hi"), cache=True)
+        uncached = await gateway.complete(payload("hi"))
+        return same, again, uncached
+
+    same, again, uncached = asyncio.run(run())
+
+    assert all(response == same[0] for response in same)
+    assert same[0]["api_key"] == "test-key"
+    assert again == uncached == "echo: hi"
+    assert api.calls == 2  # the concurrent burst once, then the uncached call
+
+    stats = gateway.get_stats()
+    assert stats["deduplicated"] == 4 and stats["cache_hits"] == 1
+    model = stats["models"]["claude-test"]
+    assert model["request_count"] == 2 and model["input_tokens"] == 20 and model["output_tokens"] == 10
+
+
+def test_retries_429_and_529_then_gives_up_on_other_errors():
+    api = MockMessagesAPI(failures=[429, 529])
+    gateway = make_gateway(api)
+
+    assert asyncio.run(gateway.complete(payload("retry me"))) == "echo: retry me"
+    assert api.calls == 3 and gateway.get_stats()["models"]["claude-test"]["retries"] == 2
+
+    api.failures = [400]
+    with pytest.raises(AIGatewayError) as error:
+        asyncio.run(gateway.complete(payload("bad request")))
+    assert error.value.status_code == 400 and api.calls == 4
+
+    api.failures = [529, 529, 529]
+    with pytest.raises(AIGatewayError):
+        asyncio.run(make_gateway(api, max_retries=2).complete(payload("overloaded")))
+
+
+def test_per_model_concurrency_budget():
+    api = MockMessagesAPI(delay=0.05)
+    gateway = make_gateway(api, budgets={"claude-test": ModelBudget(max_concurrency=2, tokens_per_minute=10**6)})
+
+    async def run():
+        await asyncio.gather(*(gateway.complete(payload(f"p{i}")) for i in range(6)))
+
+    asyncio.run(run())
+    assert api.calls == 6 and api.peak == 2
+
+    budgets = parse_model_budgets("claude-a=3:1000, claude-b=:500", ModelBudget(8, 80000))
+    assert budgets["claude-a"] == ModelBudget(3, 1000) and budgets["claude-b"] == ModelBudget(8, 500)
+
+
+def test_token_bucket_waits_for_refill_and_takes_refunds():
+    async def run():
+        bucket = TokenBucket(tokens_per_minute=6000)  # 100 tokens/s
+        await bucket.acquire(6000)
+        started = time.monotonic()
+        await bucket.acquire(50)
+        waited = time.monotonic() - started
+
+        bucket.refund(3000)
+        started = time.monotonic()
+        await bucket.acquire(2900)
+        return waited, time.monotonic() - started
+
+    waited, refunded_wait = asyncio.run(run())
+    assert waited >= 0.45
+    assert refunded_wait < 0.1
+
+
+def test_batch_process_is_bounded():
+    class SlowProcessor:
+        active = peak = 0
+
+        def supports_task(self, task):
+            return True
+
+        async def process(self, request):
+            SlowProcessor.active += 1
+            SlowProcessor.peak = max(SlowProcessor.peak, SlowProcessor.active)
+            await asyncio.sleep(0.01)
+            SlowProcessor.active -= 1
+            return AIResponse(task=request.task, model=request.model, result={"n": request.input_data["n"]},
+                              confidence=1.0, processing_time_ms=10, metadata={}, timestamp=None)
+
+    service = AIService()
+    service.processors[AIModel.DEAL_SCORER] = SlowProcessor()
+    requests = [AIRequest(task=AITask.SCORE_DEAL, model=AIModel.DEAL_SCORER, input_data={"n": i}) for i in range(20)]
+
+    responses = asyncio.run(service.batch_process(requests, max_concurrency=3))
+
+    assert [r.result["n"] for r in responses] == list(range(20))
+    assert SlowProcessor.peak == 3
@@ -0,0 +1,181 @@
+"""Tests for streamed AI responses: incremental JSON, SSE and WebSocket delivery"""
+
+import asyncio
+import json
+
+import httpx
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+from app.ai import streaming
+from app.ai.streaming import IncrementalJSONParser, StructuredStream, sse_response
+from app.realtime.websocket_manager import MessageType
+from app.services import claude_service as claude_service_module
+from app.services.ai_gateway import AIGateway
+from app.services.claude_service import ClaudeService, MarketResearchRequest
+
+RESEARCH = {
+    "market_overview": "Fragmented, {consolidating}",
+    "key_players": ["Acme \"UK\"", "Globex"],
+    "market_trends": ["Roll-ups", "AI adoption"],
+    "growth_projections": "6% CAGR",
+    "competitive_landscape": "Mid-market",
+}
+
+
+class MockStreamingAPI:
+    """Local stand-in for POST /v1/messages with stream=true"""
+
+    def __init__(self, text, failures=()):
+        self.text = text
+        self.failures = list(failures)
+        self.calls = 0
+        self.app = FastAPI()
+        self.app.post("/v1/messages")(self.messages)
+
+    async def messages(self, request: Request):
+        payload = await request.json()
+        assert payload["stream"] is True
+        self.calls += 1
+        if self.failures:
+            return JSONResponse({"error": {"type": "overloaded_error"}}, status_code=self.failures.pop(0),
+                                headers={"retry-after": "0"})
+
+        async def events():
+            yield {"type": "message_start", "message": {"usage": {"input_tokens": 12, "output_tokens": 1}}}
+            for i in range(0, len(self.text), 7):
+                await asyncio.sleep(0)
+                yield {"type": "content_block_delta", "index": 0,
+                       "delta": {"type": "text_delta", "text": self.text[i:i + 7]}}
+            yield {"type": "message_delta", "usage": {"output_tokens": 40}}
+            yield {"type": "message_stop"}
+
+        async def body():
+            async for event in events():
+                yield f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+
+        return StreamingResponse(body(), media_type="text/event-stream")
+
+
+def make_gateway(api):
+    return AIGateway(api_key="test-key", base_url="http://mock", backoff_base=0.001,
+                     transport=httpx.ASGITransport(app=api.app))
+
+
+def read_sse(body):
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.split("\n"))
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+def test_incremental_parser_reports_fields_and_items_as_they_complete():
+    text = "Here is the analysis:\n```json\n" + json.dumps({"summary": "ok", "risks": ["a, b", {"x": [1]}], "score": 7}) + "\n```"
+    parser = IncrementalJSONParser()
+    seen = []
+    for i, char in enumerate(text):
+        for event in parser.feed(char):
+            seen.append((i, event))
+
+    assert [(e.event, e.data) for _, e in seen] == [
+        ("field", {"name": "summary", "value": "ok"}),
+        ("item", {"field": "risks", "index": 0, "value": "a, b"}),
+        ("item", {"field": "risks", "index": 1, "value": {"x": [1]}}),
+        ("field", {"name": "risks", "value": ["a, b", {"x": [1]}]}),
+        ("field", {"name": "score", "value": 7}),
+    ]
+    # the first risk is reported before the rest of the object has arrived
+    assert seen[1][0] == text.index('"a, b"') + len('"a, b"')
+    assert parser.complete and parser.result()["score"] == 7
+
+    partial = IncrementalJSONParser()
+    partial.feed('{"summary": "ok", "risks": ["a"')
+    assert partial.result() == {"summary": "ok"} and not partial.complete
+
+
+def test_stream_message_retries_before_first_token_and_caches():
+    text = json.dumps(RESEARCH)
+    api = MockStreamingAPI(text, failures=[529])
+    gateway = make_gateway(api)
+    payload = {"model": "claude-test", "max_tokens": 100, "messages": [{"role": "user", "content": "go"}]}
+
+    async def collect():
+        return [chunk async for chunk in gateway.stream_message(payload, cache=True)]
+
+    chunks = asyncio.run(collect())
+    assert len(chunks) > 1 and "".join(chunks) == text
+    assert api.calls == 2
+
+    replay = asyncio.run(collect())
+    assert replay == [text] and api.calls == 2
+    assert asyncio.run(gateway.complete(payload, cache=True)) == text
+
+    model = gateway.get_stats()["models"]["claude-test"]
+    assert model["streams"] == 1 and model["retries"] == 1
+    assert model["input_tokens"] == 12 and model["output_tokens"] == 40
+
+
+def test_market_research_streams_over_sse(monkeypatch):
+    api = MockStreamingAPI("Sure! " + json.dumps(RESEARCH))
+    monkeypatch.setattr(claude_service_module, "get_ai_gateway", lambda: make_gateway(api))
+    service = ClaudeService()
+
+    app = FastAPI()
+
+    @app.post("/stream")
+    async def stream():
+        return sse_response(service.stream_market_research(MarketResearchRequest(industry="Logistics")), "s-1")
+
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            return await client.post("/stream")
+
+    response = asyncio.run(run())
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = read_sse(response.text)
+    kinds = [kind for kind, _ in events]
+
+    assert events[0] == ("start", {"stream_id": "s-1"})
+    assert "".join(data["text"] for kind, data in events if kind == "delta").endswith(json.dumps(RESEARCH))
+    assert [data["value"] for kind, data in events if kind == "item" and data["field"] == "key_players"] == RESEARCH["key_players"]
+    # each field is delivered before the stream finishes
+    assert kinds.index("field") < len(kinds) - 2
+    assert events[-1] == ("done", {"result": RESEARCH})
+
+
+def test_websocket_relay_sends_ai_stream_frames(monkeypatch):
+    sent = []
+
+    async def send_to_user(user_id, message):
+        sent.append((user_id, message))
+        return True
+
+    monkeypatch.setattr(streaming.websocket_manager, "send_to_user", send_to_user)
+
+    async def events():
+        async for event in StructuredStream(chunks()):
+            yield event
+        raise RuntimeError("upstream closed")
+
+    async def chunks():
+        for chunk in ('{"risks": ["a"', ', "b"]}'):
+            yield chunk
+
+    async def run():
+        response = streaming.stream_to_client(events(), "websocket", "user-1", "org-1")
+        await asyncio.gather(*streaming._relays)
+        return response
+
+    response = asyncio.run(run())
+    stream_id = response["stream_id"]
+    assert response["transport"] == "websocket"
+
+    assert {user_id for user_id, _ in sent} == {"user-1"}
+    types = [message.type for _, message in sent]
+    assert types[0] == MessageType.AI_STREAM_START and types[-1] == MessageType.AI_STREAM_ERROR
+    assert types.count(MessageType.AI_STREAM_DELTA) == 2
+    fields = [message.payload for _, message in sent if message.type == MessageType.AI_STREAM_FIELD]
+    assert [(p["event"], p.get("value")) for p in fields] == [("item", "a"), ("item", "b"), ("field", ["a", "b"])]
+    assert all(message.payload["stream_id"] == stream_id and message.organization_id == "org-1" for _, message in sent)
+    assert sent[-1][1].payload["message"] == "upstream closed"
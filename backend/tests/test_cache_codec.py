@@ -0,0 +1,92 @@
+"""Tests for the versioned cache payload codecs"""
+
+import json
+from datetime import datetime
+from decimal import Decimal
+
+import numpy as np
+import pytest
+
+from app.core.codec import (
+    CODEC_VERSION,
+    COMPRESSION_ZSTD,
+    FORMAT_FLOAT32,
+    FORMAT_JSON,
+    FORMAT_MSGPACK,
+    CacheCodec,
+    CodecError,
+    LegacyJSONCodec,
+)
+
+
+def test_round_trip_with_compression_and_fallback_types():
+    codec = CacheCodec(compression="zlib", compress_threshold=64)
+    value = {
+        "summary": "diligence " * 200,
+        "created_at": datetime(2025, 3, 1, 12, 30),
+        "amount": Decimal("12.50"),
+        "count": np.int64(3)
+    }
+
+    encoded = codec.encode(value)
+
+    assert encoded[0] == CODEC_VERSION
+    assert encoded[1] >> 4 != 0  # compressed
+    assert len(encoded) < len(json.dumps(value, default=str))
+    assert codec.decode(encoded) == {
+        "summary": "diligence " * 200,
+        "created_at": "2025-03-01T12:30:00",
+        "amount": "12.50",
+        "count": 3
+    }
+
+
+def test_vectors_are_raw_float32():
+    codec = CacheCodec()
+    vector = np.linspace(-1, 1, 1536, dtype=np.float32)
+
+    encoded = codec.encode(vector)
+
+    assert encoded[1] & 0x0F == FORMAT_FLOAT32
+    assert len(encoded) == 2 + 1536 * 4
+    assert codec.decode(encoded) == vector.tolist()
+
+
+def test_reads_legacy_json_and_rejects_unknown_versions():
+    codec = CacheCodec()
+    legacy = LegacyJSONCodec().encode({"a": [1, 2]})
+
+    assert codec.decode(legacy) == {"a": [1, 2]}
+    assert codec.decode('{"a": 1}') == {"a": 1}
+    with pytest.raises(CodecError):
+        codec.decode(bytes((CODEC_VERSION + 1, 0)) + b"payload")
+
+
+def test_msgpack_round_trip_keeps_int_keys_and_large_ints():
+    pytest.importorskip("msgpack")
+    codec = CacheCodec(serializer="msgpack", compression="none")
+    value = {2024: 5.0, "nested": {1: [2 ** 63 - 1, -2 ** 63, 2 ** 64 - 1]}, "raw": b"\x00\xff"}
+
+    encoded = codec.encode(value)
+
+    assert encoded[1] & 0x0F == FORMAT_MSGPACK
+    assert codec.decode(encoded) == value
+
+    # Beyond 64 bits msgpack can't pack the value; it is written as JSON instead
+    huge = codec.encode({"big": 2 ** 70})
+    assert huge[1] & 0x0F == FORMAT_JSON
+    assert codec.decode(huge) == {"big": 2 ** 70}
+
+
+def test_default_codec_round_trip_with_zstd():
+    pytest.importorskip("msgpack")
+    pytest.importorskip("zstandard")
+    codec = CacheCodec()
+    value = {"rows": [{"year": 2024, "values": {q: q * 1.5 for q in range(1, 5)}}] * 100,
+             "total": 2 ** 64 - 1}
+
+    encoded = codec.encode(value)
+
+    assert encoded[1] == FORMAT_MSGPACK | (COMPRESSION_ZSTD << 4)
+    assert codec.decode(encoded) == value
+    assert CacheCodec(serializer="json", compression="zlib").decode(encoded) == value
@@ -0,0 +1,127 @@
+"""Tests for stampede protection and tagged invalidation in the cache layer"""
+
+import asyncio
+import fnmatch
+import json
+import time
+
+from app.core.cache import ENTRY_MARKER, CacheService, QueryCache
+
+
+class FakeAsyncRedis:
+    """The slice of redis.asyncio used by CacheService (no KEYS command)"""
+
+    def __init__(self):
+        self.data = {}
+        self.sets = {}
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def set(self, key, value, ex=None, px=None, nx=False):
+        if nx and key in self.data:
+            return None
+        self.data[key] = value
+        return True
+
+    async def eval(self, script, numkeys, key, token):
+        if self.data.get(key) == token:
+            del self.data[key]
+            return 1
+        return 0
+
+    async def scan_iter(self, match="*", count=None):
+        for key in list(self.data):
+            if fnmatch.fnmatch(key, match):
+                yield key
+
+    async def sscan_iter(self, key, count=None):
+        for member in list(self.sets.get(key, ())):
+            yield member
+
+    async def unlink(self, *keys):
+        removed = 0
+        for key in keys:
+            removed += (self.data.pop(key, None) is not None) + (self.sets.pop(key, None) is not None)
+        return removed
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.calls = []
+
+    def set(self, key, value, ex=None):
+        self.calls.append(lambda: self.redis.data.__setitem__(key, value))
+
+    def sadd(self, key, member):
+        self.calls.append(lambda: self.redis.sets.setdefault(key, set()).add(member))
+
+    def expire(self, key, ttl):
+        pass
+
+    async def execute(self):
+        for call in self.calls:
+            call()
+
+
+def make_cache(**kwargs):
+    cache = CacheService(**kwargs)
+    cache.redis_client = FakeAsyncRedis()
+    return cache
+
+
+def test_concurrent_misses_share_one_computation():
+    calls = []
+
+    async def expensive(prompt):
+        calls.append(prompt)
+        await asyncio.sleep(0.01)
+        return {"answer": prompt.upper()}
+
+    async def scenario():
+        cache = make_cache()
+        results = await asyncio.gather(*[cache.get_or_set("ai:q", expensive, 60, "hi") for _ in range(20)])
+        assert calls == ["hi"]
+        assert all(r == {"answer": "HI"} for r in results)
+        assert await cache.get("ai:q") == {"answer": "HI"}
+        assert "lock:ai:q" not in cache.redis_client.data
+
+    asyncio.run(scenario())
+
+
+def test_hit_near_expiry_refreshes_in_background():
+    async def scenario():
+        cache = make_cache(early_refresh_beta=1000)
+        stale = {ENTRY_MARKER: [1.0, time.time() + 1], "v": "old"}
+        cache.redis_client.data["k"] = json.dumps(stale)
+
+        async def compute():
+            return "new"
+
+        assert await cache.get_or_set("k", compute, 60) == "old"
+        await asyncio.gather(*cache._inflight.values())
+        assert await cache.get("k") == "new"
+
+    asyncio.run(scenario())
+
+
+def test_model_invalidation_removes_tagged_queries():
+    async def scenario():
+        cache = make_cache()
+        queries = QueryCache(cache)
+        joined = "SELECT * FROM deals d JOIN companies c ON c.id = d.company_id"
+        await queries.set_query_result(joined, {"org": 1}, [1])
+        await queries.set_query_result("SELECT * FROM users", {}, [2])
+
+        assert QueryCache.models_in_query(joined) == ["companies", "deals"]
+        assert await queries.invalidate_for_model("Companies") == 1
+        assert await queries.get_query_result(joined, {"org": 1}) is None
+        assert await queries.get_query_result("SELECT * FROM users", {}) == [2]
+
+        assert await cache.clear_pattern("db:query:*") == 1
+
+    asyncio.run(scenario())
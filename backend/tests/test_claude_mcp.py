@@ -15,7 +15,10 @@ from app.services.claude_mcp import (
 @pytest.fixture
 def claude_service():
     """Create a Claude MCP service instance for testing"""
-    return ClaudeMCPService()
+    service = ClaudeMCPService()
+    # Responses are cached process-wide by the AI gateway
+    service.clear_cache()
+    return service
 
 
 @pytest.fixture
@@ -368,12 +371,12 @@ class TestClaudeMCPService:
     def test_cache_clearing(self, claude_service):
         """Test cache clearing functionality"""
         # Add something to cache
-        claude_service._cache["test_key"] = ("test_value", datetime.now())
-        assert len(claude_service._cache) == 1
+        claude_service.gateway._remember("test_key", {"content": []}, ttl=60)
+        assert len(claude_service.gateway._local) == 1
 
         # Clear cache
         claude_service.clear_cache()
-        assert len(claude_service._cache) == 0
+        assert len(claude_service.gateway._local) == 0
 
 
 if __name__ == "__main__":
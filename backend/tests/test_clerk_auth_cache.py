@@ -0,0 +1,175 @@
+"""Tests for the cached Clerk auth context: JWKS by kid, token and org caches"""
+
+import asyncio
+import time
+
+import httpx
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from fastapi import HTTPException
+from jose import jwk, jwt
+
+from app.auth.clerk_auth import ClerkAuthMiddleware
+
+
+def rsa_key(kid):
+    private = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    pem = private.private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+    )
+    public = jwk.construct(private.public_key().public_bytes(
+        serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo
+    ), "RS256").to_dict()
+    return pem, dict(public, kid=kid, use="sig")
+
+
+def sign(pem, kid, **claims):
+    now = int(time.time())
+    payload = {"sub": "user_1", "iat": now, "exp": now + 60, "org_id": "org_1", **claims}
+    return jwt.encode(payload, pem, algorithm="RS256", headers={"kid": kid})
+
+
+class FakeClerk:
+    """Serves /jwks and /organizations/{id}, counting calls"""
+
+    def __init__(self, keys):
+        self.keys = keys
+        self.calls = {"jwks": 0, "org": 0}
+        self.org_name = "Acme"
+        self.org_status = 200
+
+    async def handle(self, request):
+        await asyncio.sleep(0.01)
+        if request.url.path.endswith("/jwks"):
+            self.calls["jwks"] += 1
+            return httpx.Response(200, json={"keys": self.keys})
+        self.calls["org"] += 1
+        if self.org_status != 200:
+            return httpx.Response(self.org_status)
+        return httpx.Response(200, json={"id": request.url.path.rsplit("/", 1)[-1], "name": self.org_name})
+
+
+def make_auth(clerk, **kwargs):
+    auth = ClerkAuthMiddleware(**kwargs)
+    auth._client = httpx.AsyncClient(transport=httpx.MockTransport(clerk.handle))
+    return auth
+
+
+def test_tokens_verify_by_kid_with_one_shared_jwks_fetch():
+    pem_a, key_a = rsa_key("a")
+    pem_b, key_b = rsa_key("b")
+    clerk = FakeClerk([key_a])
+    auth = make_auth(clerk)
+
+    async def run():
+        tokens = [sign(pem_a, "a", sub=f"user_{i}") for i in range(5)]
+        first = await asyncio.gather(*(auth.verify_token(t) for t in tokens))
+        again = await auth.verify_token(tokens[0])
+
+        # Rotation: an unknown kid forces one refetch, then is throttled
+        clerk.keys = [key_a, key_b]
+        rotated = await auth.verify_token(sign(pem_b, "b"))
+        with pytest.raises(HTTPException):
+            await auth.verify_token(sign(pem_b, "missing"))
+        return first, again, rotated
+
+    first, again, rotated = asyncio.run(run())
+
+    assert [t.sub for t in first] == [f"user_{i}" for i in range(5)]
+    assert again is first[0]
+    assert rotated.sub == "user_1"
+    assert clerk.calls["jwks"] == 2
+
+
+def test_token_cache_respects_exp_and_rejects_bad_signatures():
+    pem, key = rsa_key("a")
+    forger_pem, _ = rsa_key("a")
+    auth = make_auth(FakeClerk([key]), token_cache_size=2)
+
+    async def run():
+        expired = sign(pem, "a", exp=int(time.time()) - 1)
+        with pytest.raises(HTTPException):
+            await auth.verify_token(expired)
+        with pytest.raises(HTTPException):
+            await auth.verify_token(sign(forger_pem, "a"))
+
+        for i in range(3):
+            await auth.verify_token(sign(pem, "a", sub=f"user_{i}"))
+        assert len(auth._token_cache) == 2
+
+        auth.invalidate_user("user_2")
+        assert [t.sub for t in auth._token_cache.values()] == ["user_1"]
+
+        # A cached entry past exp is dropped on lookup
+        token_key = next(iter(auth._token_cache))
+        auth._token_cache[token_key].exp = int(time.time()) - 1
+        assert auth._cached_token(token_key) is None and not auth._token_cache
+
+    asyncio.run(run())
+
+
+def test_org_details_single_flight_stale_refresh_and_invalidation():
+    clerk = FakeClerk([])
+    auth = make_auth(clerk, org_cache_ttl=60)
+
+    async def run():
+        cold = await asyncio.gather(*(auth.get_cached_organization_details("org_1") for _ in range(10)))
+        assert clerk.calls["org"] == 1 and cold[0]["name"] == "Acme"
+
+        # Expired: the stale value is served while one refresh runs behind it
+        clerk.org_name = "Acme Holdings"
+        expires_at, details = auth._org_cache["org_1"]
+        auth._org_cache["org_1"] = (time.monotonic() - 1, details)
+        stale = await auth.get_cached_organization_details("org_1")
+        await auth._org_fetches["org_1"]
+        assert stale["name"] == "Acme" and clerk.calls["org"] == 2
+        assert (await auth.get_cached_organization_details("org_1"))["name"] == "Acme Holdings"
+
+        clerk.org_name = "Acme Group"
+        auth.invalidate_organization("org_1")
+        assert (await auth.get_cached_organization_details("org_1"))["name"] == "Acme Group"
+        assert clerk.calls["org"] == 3
+
+    asyncio.run(run())
+
+
+def test_failed_org_refresh_keeps_stale_details():
+    clerk = FakeClerk([])
+    auth = make_auth(clerk, org_cache_ttl=60)
+
+    async def run():
+        assert (await auth.get_cached_organization_details("org_1"))["name"] == "Acme"
+
+        # Refresh fails: the stale details stay, and the retry waits org_error_ttl
+        clerk.org_status = 503
+        expires_at, details = auth._org_cache["org_1"]
+        auth._org_cache["org_1"] = (time.monotonic() - 1, details)
+        assert (await auth.get_cached_organization_details("org_1"))["name"] == "Acme"
+        await auth._org_fetches["org_1"]
+        expires_at, details = auth._org_cache["org_1"]
+        assert details["name"] == "Acme"
+        assert expires_at <= time.monotonic() + auth.org_error_ttl
+        assert (await auth.get_cached_organization_details("org_1"))["name"] == "Acme"
+        assert clerk.calls["org"] == 2
+
+        # With nothing cached before, the failure is negative-cached
+        assert await auth.get_cached_organization_details("org_2") is None
+        assert await auth.get_cached_organization_details("org_2") is None
+        assert clerk.calls["org"] == 3
+
+    asyncio.run(run())
+
+
+def test_webhook_events_invalidate_cached_context(monkeypatch):
+    webhooks = pytest.importorskip("app.auth.webhooks")
+    dropped = []
+    monkeypatch.setattr(webhooks.clerk_auth, "invalidate_organization", lambda org_id: dropped.append(("org", org_id)))
+    monkeypatch.setattr(webhooks.clerk_auth, "invalidate_user", lambda user_id: dropped.append(("user", user_id)))
+
+    webhooks.invalidate_auth_cache("organization.updated", {"id": "org_1"})
+    webhooks.invalidate_auth_cache("organizationMembership.deleted", {"organization": {"id": "org_2"}})
+    webhooks.invalidate_auth_cache("user.deleted", {"id": "user_1"})
+    webhooks.invalidate_auth_cache("user.updated", {"id": "user_1"})
+
+    assert dropped == [("org", "org_1"), ("org", "org_2"), ("user", "user_1")]
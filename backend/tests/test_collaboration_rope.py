@@ -0,0 +1,123 @@
+"""Tests for the rope-backed collaborative document manager"""
+
+import asyncio
+import random
+
+from app.realtime.collaboration import (
+    CollaborativeDocumentManager,
+    CursorPosition,
+    CursorType,
+    DocumentOperation,
+    OperationType,
+)
+from app.realtime.rope import Rope
+
+
+def insert(position, text):
+    return DocumentOperation(id=None, type=OperationType.INSERT, position=position, content=text)
+
+
+def delete(position, length):
+    return DocumentOperation(id=None, type=OperationType.DELETE, position=position, length=length)
+
+
+def test_rope_matches_string_edits():
+    rng = random.Random(7)
+    text = "".join(rng.choice("abcdef") for _ in range(3000))
+    rope = Rope(text, chunk_size=64)
+
+    for _ in range(2000):
+        position = rng.randrange(len(text) + 1)
+        if rng.random() < 0.4:
+            length = rng.randrange(200)
+            assert rope.delete(position, length) == text[position:position + length]
+            text = text[:position] + text[position + length:]
+        else:
+            chunk = "x" * rng.randrange(1, 150)
+            rope.insert(position, chunk)
+            text = text[:position] + chunk + text[position:]
+        assert len(rope) == len(text)
+
+    assert rope.slice(100, 900) == text[100:900]
+    assert rope.to_string() == text
+    rope.compact()
+    assert rope.chunk_count == -(-len(text) // 64)
+    assert rope.to_string() == text
+
+
+def make_manager(**kwargs):
+    manager = CollaborativeDocumentManager(**kwargs)
+    broadcasts = []
+
+    async def record(document_id, operations, sender_user_id):
+        broadcasts.append(list(operations))
+
+    manager._broadcast_operations = record
+    return manager, broadcasts
+
+
+def test_batch_applies_under_one_broadcast_and_cursors_follow_lazily():
+    async def scenario():
+        manager, broadcasts = make_manager()
+        state = await manager.join_document("d1", "alice", {}, "org")
+        await manager.join_document("d1", "bob", {}, "org")
+        state.content = "hello world"
+        manager._broadcast_cursor_update = lambda *args: asyncio.sleep(0)
+        await manager.update_cursor("d1", CursorPosition("bob", "d1", CursorType.CURSOR, 6))
+
+        applied = await manager.apply_operations("d1", [insert(0, ">> "), delete(3, 5)], "alice")
+
+        assert [op.user_id for op in applied] == ["alice", "alice"]
+        assert state.content == ">>  world"
+        assert state.version == 2
+        assert len(broadcasts) == 1
+
+        collaborators = {c["user_id"]: c for c in await manager.get_document_collaborators("d1")}
+        assert collaborators["bob"]["cursor"]["start_position"] == 4
+        assert state.cursor_versions["bob"] == 2
+
+    asyncio.run(scenario())
+
+
+def test_sender_cursor_follows_remote_edits_made_before_its_own():
+    async def scenario():
+        manager, _ = make_manager()
+        state = await manager.join_document("d1", "alice", {}, "org")
+        await manager.join_document("d1", "bob", {}, "org")
+        state.content = "hello world"
+        manager._broadcast_cursor_update = lambda *args: asyncio.sleep(0)
+        await manager.update_cursor("d1", CursorPosition("bob", "d1", CursorType.CURSOR, 6))
+
+        await manager.apply_operation("d1", insert(0, "12345"), "alice")
+        await manager.apply_operation("d1", insert(16, "!"), "bob")
+
+        assert state.content == "12345hello world!"
+        assert state.cursor_versions["bob"] == 2
+        bob = next(c for c in await manager.get_document_collaborators("d1") if c["user_id"] == "bob")
+        assert bob["cursor"]["start_position"] == 11
+
+    asyncio.run(scenario())
+
+
+def test_snapshots_compact_and_trim_history():
+    async def scenario():
+        manager, _ = make_manager(snapshot_interval=10, history_size=4)
+        state = await manager.join_document("d1", "alice", {}, "org")
+        await manager.join_document("d1", "bob", {}, "org")
+        manager._broadcast_cursor_update = lambda *args: asyncio.sleep(0)
+        await manager.update_cursor("d1", CursorPosition("bob", "d1", CursorType.CURSOR, 0))
+
+        for i in range(12):
+            await manager.apply_operation("d1", insert(0, str(i % 10)), "alice")
+
+        assert state.snapshot.version == 10
+        assert state.snapshot.content == "9876543210"
+        assert len(state.operations) == 6
+        # Bob's cursor was carried forward before the log was trimmed
+        bob = next(c for c in await manager.get_document_collaborators("d1") if c["user_id"] == "bob")
+        assert bob["cursor"]["start_position"] == 12
+
+        assert await manager.save_document("d1")
+        assert state.snapshot.version == 12
+
+    asyncio.run(scenario())
@@ -0,0 +1,176 @@
+"""Tests for the grouped deal analytics query and incremental rollups"""
+
+import json
+import sqlite3
+import uuid
+from datetime import date, datetime
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import create_engine, event, select
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.models.deal import Deal, DealAnalyticsRollup, DealPriority, DealStage
+from app.services.deal_analytics import (
+    ROLLUP_METRICS,
+    TRACKED_ATTRIBUTES,
+    _apply_deal_changes,
+    _collect_deal_changes,
+    _grouped_deal_query,
+    build_rollup_upsert,
+    register_rollup_listeners,
+    rollup_deltas,
+    summarize,
+)
+
+NOW = datetime(2025, 6, 15, 12, 0)
+
+
+def deal(**overrides):
+    state = {
+        "organization_id": "org", "stage": DealStage.SOURCING, "priority": DealPriority.MEDIUM,
+        "target_industry": "software", "deal_lead_id": "lead-1", "created_at": datetime(2025, 6, 1),
+        "is_active": True, "is_deleted": False, "deal_value": Decimal("100"),
+        "initial_contact_date": None, "actual_close_date": None,
+    }
+    state.update(overrides)
+    return state
+
+
+@compiles(ARRAY, "sqlite")
+def _array_as_json(element, compiler, **kw):
+    return "JSON"
+
+
+# Deal's array columns default to [], which sqlite3 cannot bind otherwise
+sqlite3.register_adapter(list, json.dumps)
+
+
+@pytest.fixture
+def session():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Deal.metadata.create_all(engine, tables=[Deal.__table__, DealAnalyticsRollup.__table__])
+    register_rollup_listeners()
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+    event.remove(Session, "before_flush", _collect_deal_changes)
+    event.remove(Session, "after_flush", _apply_deal_changes)
+    engine.dispose()
+
+
+def rows_from(deltas):
+    """Rollup rows as the table would hold them after applying ``deltas`` to nothing"""
+    return [{"dimension": dimension, "key": key, **delta} for (_, dimension, key), delta in deltas.items()]
+
+
+def test_dashboard_is_one_grouped_statement():
+    sql = str(_grouped_deal_query("org").compile(dialect=postgresql.dialect()))
+
+    assert sql.count("FROM deals") == 1
+    assert "GROUP BY GROUPING SETS(" in sql and sql.rstrip().endswith(", ())")
+    assert "count(*) FILTER (WHERE deals.is_active)" in sql
+    assert "to_char(date_trunc('month', deals.created_at), 'YYYY-MM')" in sql
+    assert "deals.is_deleted IS false" in sql
+
+
+def test_summary_from_rollup_rows():
+    deals = [
+        deal(),
+        deal(stage=DealStage.CLOSED_WON, priority=DealPriority.HIGH, is_active=False,
+             created_at=datetime(2025, 1, 10), initial_contact_date=date(2025, 1, 5),
+             actual_close_date=date(2025, 3, 1), deal_value=Decimal("300")),
+        deal(stage=DealStage.CLOSED_LOST, target_industry=None, deal_lead_id="lead-2",
+             created_at=datetime(2024, 3, 1), deal_value=None),
+        deal(deal_lead_id=None, created_at=datetime(2025, 5, 20), deal_value=Decimal("50")),
+    ]
+    summary = summarize(rows_from(rollup_deltas([(None, d) for d in deals])), now=NOW)
+
+    assert summary["total_deals"] == 4 and summary["active_deals"] == 3
+    assert summary["total_pipeline_value"] == Decimal("150")
+    assert summary["average_deal_size"] == Decimal("150")
+    assert summary["win_rate"] == 50
+    assert summary["average_days_to_close"] == (date(2025, 3, 1) - date(2025, 1, 10)).days
+    assert summary["deals_by_stage"]["closed_won"] == 1 and summary["deals_by_stage"]["on_hold"] == 0
+    assert summary["deals_by_priority"] == {"critical": 0, "high": 1, "medium": 3, "low": 0}
+    assert summary["deals_by_industry"] == {"software": 3}
+    assert summary["top_deal_leads"][0] == {"user_id": "lead-1", "deal_count": 2, "total_value": Decimal("400")}
+
+    flow = {entry["month"]: entry["count"] for entry in summary["monthly_deal_flow"]}
+    assert list(flow) == [f"2024-{m:02d}" for m in range(7, 13)] + [f"2025-{m:02d}" for m in range(1, 7)]
+    assert flow["2025-06"] == 1 and flow["2025-05"] == 1 and flow["2025-01"] == 1
+
+
+def test_updates_move_counters_and_soft_delete_removes_them():
+    before = deal(stage=DealStage.NEGOTIATION)
+    won = deal(stage="closed_won", initial_contact_date=date(2025, 6, 2), actual_close_date=date(2025, 6, 11))
+    deleted = dict(deal(deal_lead_id="lead-2"), is_deleted=True)
+
+    deltas = rollup_deltas([(before, won), (deal(deal_lead_id="lead-2"), deleted)])
+
+    assert deltas[("org", "stage", "NEGOTIATION")]["deal_count"] == -1
+    assert deltas[("org", "stage", "CLOSED_WON")]["deal_count"] == 1
+    total = deltas[("org", "total", "")]
+    assert total["deal_count"] == -1 and total["won_count"] == 1 and total["closed_count"] == 1
+    assert total["close_days_sum"] == 10 and total["close_days_count"] == 1
+    assert deltas[("org", "lead", "lead-2")]["value_sum"] == Decimal("-100")
+    # Priority and month are unchanged for the moved deal, so only the deletion shows
+    assert deltas[("org", "priority", "MEDIUM")]["deal_count"] == -1
+
+    sql = str(build_rollup_upsert(deltas).compile(dialect=postgresql.dialect()))
+    assert "ON CONFLICT (organization_id, dimension, key) DO UPDATE" in sql
+    assert "deal_count = (deal_analytics_rollups.deal_count + excluded.deal_count)" in sql
+
+    assert rollup_deltas([(deal(), deal())]) == {}
+
+
+def test_flushes_after_commit_keep_rollups_exact(session):
+    organization_id = str(uuid.uuid4())
+    deals = [
+        Deal(organization_id=organization_id, deal_number=f"D-{i}", title=f"Deal {i}",
+             target_company_name=f"Target {i}", stage=stage, deal_value=Decimal(value),
+             target_industry="software", created_at=created_at)
+        for i, (stage, value, created_at) in enumerate([
+            (DealStage.SOURCING, "100", datetime(2025, 6, 1)),
+            (DealStage.NEGOTIATION, "250", datetime(2025, 3, 10)),
+            (DealStage.VALUATION, "75", datetime(2024, 11, 2)),
+        ])
+    ]
+    session.add_all(deals)
+    session.commit()
+
+    # Each change is made on a deal expired by the previous commit, as the
+    # deal execution agent does, so its old value was never loaded
+    first, second, third = deals
+    first.stage = DealStage.INITIAL_REVIEW
+    session.commit()
+    first.stage = DealStage.DUE_DILIGENCE
+    session.flush()
+    session.commit()
+    second.stage = DealStage.CLOSED_WON
+    second.deal_value = Decimal("300")
+    second.initial_contact_date = date(2025, 3, 12)
+    second.actual_close_date = date(2025, 5, 9)
+    session.commit()
+    third.is_deleted = True
+    session.commit()
+
+    stored = {
+        (row.dimension, row.key): {name: row._mapping[name] for name in ROLLUP_METRICS}
+        for row in session.execute(select(DealAnalyticsRollup.__table__))
+        if row.deal_count or row.value_sum
+    }
+    live = [{name: getattr(d, name) for name in TRACKED_ATTRIBUTES} for d in (first, second)]
+    expected = {
+        (dimension, key): delta
+        for (_, dimension, key), delta in rollup_deltas([(None, state) for state in live]).items()
+    }
+
+    assert stored == expected
+    assert stored[("stage", "DUE_DILIGENCE")]["deal_count"] == 1
+    assert stored[("total", "")]["close_days_sum"] == (date(2025, 5, 9) - date(2025, 3, 10)).days
+    assert ("month", "2024-11") not in stored
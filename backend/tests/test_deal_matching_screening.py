@@ -0,0 +1,125 @@
+"""Tests for batch candidate screening in the deal matching engine"""
+
+import random
+import time
+from datetime import datetime
+
+import numpy as np
+
+from app.global_ops.deal_matching import (
+    CompanyProfile,
+    DealMatchingEngine,
+    DealType,
+    MatchingCriteria,
+)
+
+INDUSTRIES = ["technology", "healthcare", "financial_services", "manufacturing", "media",
+              "insurance", "biotechnology", "retail"]
+REGIONS = ["US", "UK", "DE", "FR", "JP", "SG", "BR", "IN"]
+TECH = ["cloud", "ai", "erp", "crm", "iot", "blockchain", "analytics", "mobile", "security"]
+POSITIONS = ["market_leader", "niche_player", "emerging_player", "growth_company", "established_player"]
+
+
+def make_profile(rng: random.Random, company_id: str) -> CompanyProfile:
+    def maybe(value):
+        return value if rng.random() > 0.15 else None
+
+    return CompanyProfile(
+        company_id=company_id,
+        name=company_id,
+        industry_sector=rng.choice(INDUSTRIES),
+        geographic_regions=rng.sample(REGIONS, rng.randint(0, 3)),
+        revenue=maybe(rng.choice([rng.uniform(1e6, 5e9), 0.0])),
+        employees=rng.randint(10, 50000),
+        valuation=maybe(rng.uniform(1e6, 2e10)),
+        growth_rate=maybe(rng.uniform(-20, 80)),
+        technology_stack=rng.sample(TECH, rng.randint(0, 5)),
+        market_position=rng.choice(POSITIONS),
+        financial_health_score=rng.random(),
+        strategic_priorities=rng.sample(TECH + POSITIONS, rng.randint(0, 4)),
+        available_for=rng.sample(list(DealType), rng.randint(1, 4)),
+        created_at=datetime(2025, 1, 1),
+        updated_at=datetime(2025, 1, 1)
+    )
+
+
+def make_engine(count: int, seed: int = 7) -> DealMatchingEngine:
+    rng = random.Random(seed)
+    engine = DealMatchingEngine()
+    for i in range(count):
+        engine.add_company_profile(make_profile(rng, f"c{i}"))
+    return engine
+
+
+def test_batch_scores_match_scalar_scorers():
+    engine = make_engine(400)
+    weights = {
+        MatchingCriteria.STRATEGIC_FIT: 0.3,
+        MatchingCriteria.FINANCIAL_COMPATIBILITY: 0.25,
+        MatchingCriteria.INDUSTRY_ALIGNMENT: 0.2,
+        MatchingCriteria.GEOGRAPHIC_SYNERGY: 0.15,
+    }
+    rows = np.arange(engine.feature_index.size)
+
+    for buyer_id in ("c0", "c1", "c2", "c3"):
+        buyer = engine.company_profiles[buyer_id]
+        for criteria, scorer in engine.scoring_algorithms.items():
+            batch = scorer.score_batch(buyer, engine.feature_index, rows, criteria)
+            scalar = [scorer.calculate_score(buyer, seller, criteria) for seller in engine.feature_index.profiles]
+            np.testing.assert_allclose(batch, scalar, err_msg=criteria.value)
+
+        overall = engine._screen_candidates(buyer, rows, weights)
+        expected = [engine._calculate_match_score(buyer, seller, weights).overall_score
+                    for seller in engine.feature_index.profiles]
+        np.testing.assert_allclose(overall, expected)
+
+
+def test_find_matches_returns_top_k_of_full_scan():
+    engine = make_engine(600)
+    buyer = engine.company_profiles["c5"]
+    weights = None
+
+    matches = engine.find_matches("c5", DealType.ACQUISITION, weights, min_score_threshold=0.5, max_results=15)
+
+    default_weights = matches[0].match_score.score_breakdown["criteria_weights"]
+    scored = [
+        (engine._calculate_match_score(buyer, seller, default_weights).overall_score, seller.company_id)
+        for seller_id, seller in engine.company_profiles.items()
+        if seller_id != "c5" and DealType.ACQUISITION in seller.available_for
+    ]
+    expected = [company_id for score, company_id in sorted(scored, key=lambda s: -s[0]) if score >= 0.5][:15]
+
+    assert [m.seller_profile.company_id for m in matches] == expected
+    assert all(m.estimated_deal_value is None or m.estimated_deal_value > 0 for m in matches)
+
+
+def test_profile_updates_and_prefilters():
+    engine = make_engine(50)
+    moved = engine.company_profiles["c10"]
+    moved.industry_sector = "aerospace"
+    moved.geographic_regions = ["AQ"]
+    moved.available_for = [DealType.MERGER]
+    engine.add_company_profile(moved)
+
+    index = engine.feature_index
+    assert len(index) == 50 and index.size == 51
+    assert index.candidates(DealType.MERGER, regions=["AQ"]).tolist() == [index.row_of["c10"]]
+    assert index.candidates(DealType.MERGER, industries=["aerospace"], exclude_id="c10").size == 0
+
+    matches = engine.find_matches("c0", DealType.MERGER, min_score_threshold=0, industries=["aerospace"])
+    assert [m.seller_profile.company_id for m in matches] == ["c10"]
+
+    index.rebuild()
+    assert index.size == 50 and index.profiles[index.row_of["c10"]] is moved
+
+
+def test_screening_100k_profiles_is_interactive():
+    engine = make_engine(100_000, seed=11)
+    engine.find_matches("c1", DealType.ACQUISITION, max_results=20)  # warm posting arrays
+
+    started = time.perf_counter()
+    matches = engine.find_matches("c1", DealType.ACQUISITION, min_score_threshold=0.5, max_results=20)
+    elapsed = time.perf_counter() - started
+
+    assert len(matches) == 20
+    assert elapsed < 0.5, f"find_matches took {elapsed * 1000:.0f}ms"
@@ -0,0 +1,107 @@
+"""Tests for the single-pass document pattern scanner and the analyses built on it"""
+
+import random
+import re
+
+import pytest
+
+from app.ai.document_intelligence import EXTRACTION_PATTERNS
+from app.deal_intelligence.due_diligence_automation import DocumentAnalysisEngine, DocumentType
+from app.services.document_scanner import PatternScanner, PatternSpec, literal_specs
+
+CONTRACT = (
+    "Acme Holdings Inc agreed on 03/15/2024 to pay $1,250,000.00 in damages. "
+    "Cash flow turned negative; CASH shortage noted. Pending  litigation and "
+    "key person dependency remain. Contact legal@acme.com."
+)
+
+
+def findall_hits(specs, text):
+    """Expected (category, label, value) hits from one re.findall per spec"""
+    expected = []
+    for spec in specs:
+        for match in re.finditer(spec.pattern, text, re.IGNORECASE if spec.ignore_case else 0):
+            value = match.group(1) if match.re.groups else match.group()
+            expected.append((spec.category, spec.label, match.start(), value))
+    return sorted(expected, key=lambda hit: (hit[2], hit[0], hit[1]))
+
+
+def test_scan_reports_every_pattern_with_offsets_and_values():
+    specs = literal_specs("term", ["cash", "cash flow", "damages"]) + [
+        PatternSpec("date", "date", r"\d{1,2}/\d{1,2}/\d{4}"),
+        PatternSpec("number", "number", r"\$?([\d,]+\.?\d*)"),
+        PatternSpec("company", "company", r"([A-Z][a-z]+ Holdings Inc)", ignore_case=False),
+        PatternSpec("risk", "cash shortage", r"cash\s+shortage"),
+    ]
+    scan = PatternScanner(specs).scan(CONTRACT)
+
+    # overlapping hits of different patterns are all kept, with original-case text
+    assert [hit.text for hit in scan.for_category("term", "cash")] == ["Cash", "CASH"]
+    assert scan.values("term", "cash flow") == ["Cash flow"]
+    assert scan.first("risk").text == "CASH shortage"
+
+    date = scan.first("date")
+    assert CONTRACT[date.start:date.end] == "03/15/2024"
+    # numbers inside the date are found too, as findall would
+    assert scan.values("number")[:4] == ["03", "15", "2024", "1,250,000.00"]
+    assert scan.values("company") == ["Acme Holdings Inc"]
+    assert scan.labels("term") == ["damages", "cash flow", "cash"]
+    assert scan.summary()["term"] == {"damages": 1, "cash flow": 1, "cash": 2}
+    assert [hit.start for hit in scan.hits] == sorted(hit.start for hit in scan.hits)
+
+
+def test_scan_matches_findall_per_pattern_on_random_text():
+    rng = random.Random(7)
+    words = ["cash", "Cash", "flow", "cash flow", "net", "Network", "sec", "SECTION", "12/1/2020",
+             "2020-01-02", "$3,400", "Acme Corp", "a@b.io", "|", "ß", "İ", "breach", "of", "contract"]
+    specs = literal_specs("term", ["cash", "cash flow", "net", "network", "sec", "section"]) + [
+        PatternSpec("term", "pipe", re.escape("|"), ignore_case=False),
+        PatternSpec("date", "slash", r"\d{1,2}[/\-]\d{1,2}[/\-]\d{2,4}"),
+        PatternSpec("date", "iso", r"(\d{4}-\d{2}-\d{2})", ignore_case=False),
+        PatternSpec("number", "number", r"\$?([\d,]+\.?\d*)"),
+        PatternSpec("company", "corp", r"([A-Z][a-zA-Z\s]+(?:Corp|Inc))", ignore_case=False),
+        PatternSpec("email", "email", r"([a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,})", ignore_case=False),
+        PatternSpec("risk", "breach", r"breach\s+of\s+contract"),
+    ]
+    scanner = PatternScanner(specs)
+
+    for _ in range(200):
+        text = " ".join(rng.choice(words) for _ in range(rng.randint(0, 40)))
+        hits = sorted(((hit.category, hit.label, hit.start, hit.value) for hit in scanner.scan(text).hits),
+                      key=lambda hit: (hit[2], hit[0], hit[1]))
+        assert hits == findall_hits(specs, text), text
+
+
+def test_written_date_pattern_matches_unanchored_findall():
+    written = dict((label, pattern) for label, pattern, _ in EXTRACTION_PATTERNS["date"])["written"]
+    rng = random.Random(11)
+    words = ["March", "Mar", "on", "xMarch", "5", "12,", "2024", "1999", "and", "7th", "\n", "9"]
+
+    for _ in range(500):
+        text = " ".join(rng.choice(words) for _ in range(rng.randint(0, 30)))
+        assert re.findall(written, text) == re.findall(r"([A-Za-z]+\s+\d{1,2},?\s+\d{4})", text), text
+
+
+def test_scanner_rejects_patterns_it_cannot_combine():
+    with pytest.raises(ValueError, match="named groups"):
+        PatternScanner([PatternSpec("x", "x", r"(?P<amount>\d+)")])
+    with pytest.raises(ValueError, match="empty string"):
+        PatternScanner([PatternSpec("x", "x", r"\d*")])
+
+
+def test_engine_scans_each_document_once(monkeypatch):
+    engine = DocumentAnalysisEngine()
+    calls = []
+    scan = engine.scanner.scan
+    monkeypatch.setattr(engine.scanner, "scan", lambda text: calls.append(text) or scan(text))
+
+    analysis = engine.analyze_document(
+        "doc-1", CONTRACT, DocumentType.LEGAL_AGREEMENT,
+        ["financial_analysis", "legal_analysis", "risk_assessment", "compliance_check"]
+    )
+
+    assert calls == [CONTRACT]
+    assert "Financial distress indicator: cash shortage" in analysis.risk_flags
+    assert "Legal risk pattern: pending litigation" in analysis.risk_flags
+    assert "Operational risk pattern: key person dependency" in analysis.risk_flags
+    assert "Legal risk indicator: damages" in analysis.risk_flags
@@ -0,0 +1,78 @@
+"""Tests for the warm-started, segmented efficient frontier"""
+
+import numpy as np
+import pytest
+
+from app.utils.portfolio_optimization import ConstraintType, PortfolioOptimizer
+
+
+@pytest.fixture
+def market():
+    """Six assets with a random positive-definite covariance matrix"""
+    rng = np.random.default_rng(3)
+    expected_returns = rng.uniform(0.03, 0.15, size=6)
+    factors = rng.normal(size=(6, 6)) * 0.08
+    covariance = factors @ factors.T + np.diag(rng.uniform(0.005, 0.02, size=6))
+    return expected_returns, covariance
+
+
+def test_warm_started_sweep_matches_cold_starts(market):
+    expected_returns, covariance = market
+    optimizer = PortfolioOptimizer()
+
+    warm = optimizer.compute_efficient_frontier(expected_returns, covariance, num_points=25, segments=1)
+    # One point per segment: every solve starts from equal weights
+    cold = optimizer.compute_efficient_frontier(expected_returns, covariance, num_points=25, segments=25)
+
+    assert warm.convergence["failed"] == cold.convergence["failed"] == 0
+    assert [p.warm_started for p in warm.points] == [False] + [True] * 24
+    assert not any(p.warm_started for p in cold.points)
+    # Equal within SLSQP's default tolerance (ftol=1e-6 on the variance)
+    np.testing.assert_allclose([p.risk for p in warm.points], [p.risk for p in cold.points], rtol=1e-3)
+    np.testing.assert_allclose(
+        [p.expected_return for p in warm.points], [p.target_return for p in warm.points], atol=1e-8
+    )
+
+    # Same frontier as the original per-target solver, with less work
+    for point in warm.points[1:-1:4]:
+        reference = optimizer._optimize_risk_with_return_target(expected_returns, covariance, point.target_return)
+        assert point.risk == pytest.approx(reference.risk, rel=1e-3)
+    assert warm.convergence["total_function_evaluations"] < cold.convergence["total_function_evaluations"]
+
+
+def test_parallel_segments_match_serial(market):
+    expected_returns, covariance = market
+    optimizer = PortfolioOptimizer()
+
+    serial = optimizer.compute_efficient_frontier(expected_returns, covariance, num_points=20, segments=4)
+    parallel = optimizer.compute_efficient_frontier(
+        expected_returns, covariance, num_points=20, max_workers=2, segments=4
+    )
+
+    assert parallel.segments == serial.segments == 4
+    assert [p.target_return for p in parallel.points] == [p.target_return for p in serial.points]
+    for a, b in zip(parallel.points, serial.points):
+        np.testing.assert_allclose(a.weights, b.weights, atol=1e-12)
+        assert (a.converged, a.warm_started) == (b.converged, b.warm_started)
+
+
+def test_failed_points_are_reported_not_dropped(market):
+    expected_returns, covariance = market
+    optimizer = PortfolioOptimizer()
+    # With at most 25% per asset the lowest and highest single-asset returns are unreachable
+    constraints = [{"type": ConstraintType.MAX_WEIGHT, "value": 0.25}]
+
+    result = optimizer.compute_efficient_frontier(expected_returns, covariance, num_points=15,
+                                                  constraints=constraints)
+
+    assert len(result.points) == 15
+    failed = [p for p in result.points if not p.converged]
+    assert failed and result.convergence["failed"] == len(failed)
+    assert result.points[0] in failed and result.points[-1] in failed
+    assert [f["target_return"] for f in result.convergence["failed_targets"]] == [p.target_return for p in failed]
+    assert all(f["message"] for f in result.convergence["failed_targets"])
+
+    # The tuple API only returns converged points
+    returns, risks, _ = optimizer.efficient_frontier(expected_returns, covariance, num_points=15,
+                                                     constraints=constraints)
+    assert len(returns) == len(risks) == len(result.converged_points) == 15 - len(failed)
@@ -0,0 +1,115 @@
+"""Tests for the tiered embedding cache"""
+
+import asyncio
+from types import SimpleNamespace
+
+import numpy as np
+
+from app.services.embedding_cache import EmbeddingCache, pack_embedding
+from app.services.embeddings import EmbeddingService
+
+
+class FakeRedis:
+    """Just enough of redis.asyncio for MGET and pipelined SET"""
+
+    def __init__(self):
+        self.store = {}
+        self.mget_calls = 0
+
+    async def mget(self, keys):
+        self.mget_calls += 1
+        return [self.store.get(key) for key in keys]
+
+    def pipeline(self, transaction=True):
+        redis = self
+
+        class Pipeline:
+            def __init__(self):
+                self.ops = []
+
+            def set(self, key, value, ex=None):
+                self.ops.append((key, value))
+
+            async def execute(self):
+                redis.store.update(self.ops)
+
+        return Pipeline()
+
+
+class FakeEmbeddings:
+    """Stands in for AsyncOpenAI().embeddings"""
+
+    def __init__(self):
+        self.inputs = []
+
+    async def create(self, model, input, encoding_format):
+        self.inputs.append(list(input))
+        return SimpleNamespace(data=[
+            SimpleNamespace(embedding=[float(len(text)), 0.5, -1.0]) for text in input
+        ])
+
+
+def make_service(cache):
+    service = EmbeddingService.__new__(EmbeddingService)
+    service.client = SimpleNamespace(embeddings=FakeEmbeddings())
+    service.model = "test-embedding"
+    service.cache = cache
+    service.max_tokens = 8191
+    service._truncate_text = lambda text: text
+    return service
+
+
+def test_float32_payload_is_compact():
+    vector = np.random.default_rng(0).normal(size=1536).tolist()
+    payload = pack_embedding(vector)
+    assert len(payload) == 1536 * 4
+
+
+def test_lru_respects_byte_budget():
+    cache = EmbeddingCache(max_bytes=3 * 12)  # three 3-dim float32 vectors
+
+    async def run():
+        for i in range(4):
+            await cache.set(f"k{i}", [i, i, i])
+        await cache.get("k1")  # refresh k1 so k2 is the next eviction
+        await cache.set("k4", [4, 4, 4])
+        return await cache.get_many(["k0", "k1", "k2", "k3", "k4"])
+
+    found = asyncio.run(run())
+    assert sorted(found) == ["k1", "k3", "k4"]
+    assert cache.get_stats()["bytes"] <= cache.max_bytes
+    assert cache.evictions == 2
+
+
+def test_redis_tier_is_shared_between_processes():
+    redis = FakeRedis()
+    writer = EmbeddingCache(redis_client=redis)
+    reader = EmbeddingCache(redis_client=redis)
+
+    async def run():
+        await writer.set_many({"a": [0.25, 0.5], "b": [1.0, 2.0]})
+        first = await reader.get_many(["a", "b", "c"])
+        second = await reader.get_many(["a", "b"])
+        return first, second
+
+    first, second = asyncio.run(run())
+    assert first == {"a": [0.25, 0.5], "b": [1.0, 2.0]}
+    assert second == first
+    assert redis.mget_calls == 1  # second lookup served locally
+    assert (reader.redis_hits, reader.local_hits, reader.misses) == (2, 2, 1)
+
+
+def test_batch_only_sends_distinct_misses():
+    service = make_service(EmbeddingCache())
+
+    async def run():
+        await service.batch_generate_embeddings(["alpha", "beta"])
+        return await service.batch_generate_embeddings(["alpha", "gamma", "gamma", "beta", "delta"])
+
+    embeddings = asyncio.run(run())
+
+    assert service.client.embeddings.inputs == [["alpha", "beta"], ["gamma", "delta"]]
+    assert embeddings[1] == embeddings[2] == [5.0, 0.5, -1.0]
+    stats = service.get_cache_stats()
+    assert stats["local_hits"] == 2
+    assert stats["misses"] == 4
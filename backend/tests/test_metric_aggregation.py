@@ -0,0 +1,126 @@
+"""Tests for the set-based metric rollup queries and incremental upserts"""
+
+from datetime import datetime, timezone
+from decimal import Decimal
+
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.sql import Insert
+
+from app.models.analytics import AggregationPeriod, MetricType
+from app.services.metric_aggregation import MetricAggregationEngine
+
+
+def compile_sql(statement):
+    return str(statement.compile(dialect=postgresql.dialect()))
+
+
+class FakeResult:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def all(self):
+        return self.rows
+
+    def one(self):
+        return self.rows[0]
+
+    def mappings(self):
+        return self
+
+
+class FakeSession:
+    """Answers the engine's statements in order and records the upserts"""
+
+    def __init__(self, watermarks, pending, buckets):
+        self.answers = [watermarks, [pending], buckets]
+        self.statements = []
+        self.upserts = []
+        self.commits = 0
+
+    def execute(self, statement):
+        self.statements.append(statement)
+        if isinstance(statement, Insert):
+            self.upserts.append(statement)
+            return FakeResult([])
+        return FakeResult(self.answers.pop(0))
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        pass
+
+
+def bucket_row(period, day, avg, previous=None):
+    start = datetime(2025, 3, day, tzinfo=timezone.utc)
+    return {
+        "period": period, "metric_type": MetricType.MRR,
+        "period_start": start, "period_end": start.replace(day=day + 1),
+        "sum_value": avg * 2, "avg_value": avg, "min_value": avg, "max_value": avg,
+        "count": 2, "std_deviation": Decimal("0"), "percentile_25": float(avg),
+        "percentile_50": float(avg), "percentile_75": float(avg), "percentile_95": float(avg),
+        "previous_period_value": previous,
+    }
+
+
+def test_rollup_is_one_grouped_statement_for_all_periods():
+    engine = MetricAggregationEngine(db=None)
+    periods = [AggregationPeriod.HOURLY, AggregationPeriod.DAILY, AggregationPeriod.MONTHLY]
+    sql = compile_sql(engine.build_rollup_query("org", periods))
+
+    assert sql.count("FROM metric_snapshots") == 1
+    assert "AS grains (period, unit, step)" in sql
+    assert sql.count("WITHIN GROUP (ORDER BY metric_snapshots.metric_value)") == 4
+    assert "stddev_pop(metric_snapshots.metric_value)" in sql
+    assert "lag(buckets.avg_value) OVER (PARTITION BY buckets.period, buckets.metric_type" in sql
+
+    incremental = compile_sql(engine.build_rollup_query("org", periods, since=datetime(2025, 3, 2)))
+    # Reads one bucket back for LAG, then keeps only buckets from `since` on
+    assert "metric_snapshots.timestamp >= date_trunc(grains.unit" in incremental
+    assert "WHERE ranked.period_start >= date_trunc(ranked.unit" in incremental
+
+
+def test_rollup_upserts_in_batches_with_watermark_and_change():
+    created = datetime(2025, 3, 4, 12, 0)
+    db = FakeSession(
+        watermarks=[],
+        pending=(datetime(2025, 3, 1, tzinfo=timezone.utc), created),
+        buckets=[
+            bucket_row("daily", 1, Decimal("100")),
+            bucket_row("daily", 2, Decimal("150"), previous=Decimal("100")),
+            bucket_row("daily", 3, Decimal("120"), previous=Decimal("150")),
+        ],
+    )
+    engine = MetricAggregationEngine(db, batch_size=2)
+    result = engine.rollup("org", [AggregationPeriod.DAILY])
+
+    assert result.buckets == 3 and result.since is None and result.watermark == created
+    assert len(db.upserts) == 2 and db.commits == 1
+    assert "ON CONFLICT ON CONSTRAINT uq_aggregated_metrics DO UPDATE" in compile_sql(db.upserts[0])
+
+    params = db.upserts[0].compile(dialect=postgresql.dialect()).params
+    assert params["period_change_m1"] == Decimal("50")
+    assert params["period_change_percent_m1"] == Decimal("50")
+    assert params["meta_data_m1"] == {"watermark": created.isoformat()}
+    assert params["period_change_m0"] is None
+
+
+def test_incremental_rollup_starts_from_pending_snapshots():
+    earliest = datetime(2025, 3, 3, 8, tzinfo=timezone.utc)
+    db = FakeSession(
+        watermarks=[(AggregationPeriod.DAILY, "2025-03-03T00:00:00")],
+        pending=(earliest, datetime(2025, 3, 3, 9)),
+        buckets=[bucket_row("daily", 3, Decimal("120"), previous=Decimal("150"))],
+    )
+    result = MetricAggregationEngine(db).rollup("org", [AggregationPeriod.DAILY])
+
+    assert result.since == earliest and result.buckets == 1
+    pending_sql = compile_sql(db.statements[1])
+    assert "metric_snapshots.created_at >" in pending_sql
+
+    nothing_new = FakeSession(
+        watermarks=[(AggregationPeriod.DAILY, "2025-03-03T09:00:00")],
+        pending=(None, None), buckets=[],
+    )
+    assert MetricAggregationEngine(nothing_new).rollup("org", [AggregationPeriod.DAILY]).buckets == 0
+    assert nothing_new.upserts == [] and nothing_new.commits == 0
@@ -0,0 +1,77 @@
+"""Tests for columnar metric series, minute buckets and DDSketch quantiles"""
+
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from app.analytics.real_time_analytics import (
+    AggregationType,
+    AnalyticsQuery,
+    MetricProcessor,
+    TimeWindow,
+)
+from app.analytics.time_series import DDSketch, MetricSeries
+
+
+def test_sketch_quantiles_within_relative_accuracy():
+    values = np.random.default_rng(0).lognormal(mean=4, sigma=1, size=20000)
+    sketch = DDSketch(relative_accuracy=0.01)
+    sketch.add_many(values[:10000])
+    for value in values[10000:]:
+        sketch.add(float(value))
+
+    for q in (0.5, 0.95, 0.99):
+        exact = np.quantile(values, q, method="lower")
+        assert sketch.quantile(q) == pytest.approx(exact, rel=0.02)
+
+
+def test_window_summary_matches_exact_on_partial_minutes():
+    rng = np.random.default_rng(1)
+    timestamps = np.sort(rng.uniform(6000, 6600, size=3000))  # ten minutes
+    values = rng.normal(100, 15, size=3000)
+    series = MetricSeries(capacity=4096)
+    for ts, value in zip(timestamps, values):
+        series.append(float(ts), float(value))
+
+    start, end = 6090.5, 6444.2
+    mask = (timestamps >= start) & (timestamps <= end)
+    summary = series.summarize(start, end)
+
+    assert summary.count == mask.sum()
+    assert summary.total == pytest.approx(values[mask].sum())
+    assert summary.maximum == values[mask].max()
+    assert summary.last_value == values[mask][-1]
+    assert len(series.buckets) == 10
+
+
+def test_ring_buffer_is_bounded_and_buckets_expire():
+    series = MetricSeries(capacity=100, retention_minutes=5)
+    for i in range(1000):
+        series.append(60.0 * i / 50, 1.0)  # 50 samples per minute, 20 minutes
+
+    assert series.size == 100
+    assert sorted(series.buckets) == list(range(15, 20))
+    # Edge minutes no longer in the ring are counted whole from their bucket
+    assert series.summarize(15 * 60 + 30, 20 * 60).count == 250
+
+
+def test_processor_aggregations():
+    processor = MetricProcessor()
+    now = datetime.now()
+    for value in range(1, 101):
+        processor.record("api.response_time", value, now)
+
+    results = processor.aggregate_metrics(AnalyticsQuery(
+        metric_names=["api.response_time", "missing"],
+        aggregations=[AggregationType.SUM, AggregationType.AVERAGE, AggregationType.PERCENTILE,
+                      AggregationType.MIN, AggregationType.COUNT],
+        time_window=TimeWindow.FIVE_MINUTES
+    ))
+
+    values = {r.aggregation: r.value for r in results}
+    assert values[AggregationType.SUM] == 5050
+    assert values[AggregationType.AVERAGE] == 50.5
+    assert values[AggregationType.PERCENTILE] == pytest.approx(95, rel=0.02)
+    assert values[AggregationType.MIN] == 1
+    assert values[AggregationType.COUNT] == 100
@@ -0,0 +1,109 @@
+"""Tests for the batched Monte Carlo valuation engine"""
+
+import numpy as np
+import pytest
+
+from app.utils.monte_carlo import (
+    MonteCarloEngine,
+    ScenarioSampler,
+    dcf_enterprise_values,
+)
+from app.utils.financial_calculations import monte_carlo_valuation
+from app.services.financial_modeling import FinancialModelingEngine
+
+
+def reference_dcf(base, growth, margin, wacc, terminal_growth, tax, nwc, capex, dep, years=5):
+    """Straight-line DCF mirroring FinancialModelingEngine.dcf_model"""
+    revenues = [base * (1 + growth) ** t for t in range(1, years + 1)]
+    fcff = []
+    for i, rev in enumerate(revenues):
+        nwc_change = nwc * (rev - revenues[i - 1]) if i else 0
+        fcff.append((rev * margin - rev * dep) * (1 - tax) + rev * dep - rev * capex - nwc_change)
+    terminal_value = fcff[-1] * (1 + terminal_growth) / (wacc - terminal_growth)
+    pv = sum(cf / (1 + wacc) ** (i + 1) for i, cf in enumerate(fcff))
+    return pv + terminal_value / (1 + wacc) ** years
+
+
+@pytest.fixture
+def dcf_variables():
+    """Distribution specs covering every supported distribution"""
+    return {
+        "revenue_growth": {"distribution": "normal", "mean": 0.05, "std": 0.02},
+        "wacc": {"distribution": "triangular", "min": 0.08, "mode": 0.10, "max": 0.13},
+        "ebitda_margin": {"distribution": "uniform", "min": 0.15, "max": 0.25},
+    }
+
+
+class TestDCFKernel:
+    """Vectorized DCF kernel"""
+
+    def test_matches_scalar_reference(self):
+        expected = reference_dcf(1e6, 0.07, 0.22, 0.11, 0.03, 0.25, 0.10, 0.04, 0.02)
+        actual = dcf_enterprise_values(1e6, 0.07, 0.22, 0.11, 0.03, 0.25, 0.10, 0.04, 0.02)
+        assert actual == pytest.approx(expected)
+
+    def test_broadcasts_over_arrays(self):
+        wacc = np.array([0.09, 0.10, 0.11])
+        values = dcf_enterprise_values(1e6, 0.05, 0.2, wacc, 0.025, 0.21)
+        assert values.shape == (3,)
+        assert values[0] > values[1] > values[2]
+
+
+class TestScenarioSampler:
+    """Batched scenario sampling"""
+
+    def test_sample_shapes_and_bounds(self, dcf_variables):
+        scenarios = ScenarioSampler(dcf_variables, seed=7).sample(10_000)
+        assert all(v.shape == (10_000,) for v in scenarios.values())
+        assert scenarios["wacc"].min() >= 0.08 and scenarios["wacc"].max() <= 0.13
+        assert scenarios["ebitda_margin"].min() >= 0.15
+
+    def test_correlated_draws(self, dcf_variables):
+        corr = [[1.0, 0.8, 0.0], [0.8, 1.0, 0.0], [0.0, 0.0, 1.0]]
+        scenarios = ScenarioSampler(dcf_variables, correlation_matrix=corr, seed=7).sample(50_000)
+        observed = np.corrcoef(scenarios["revenue_growth"], scenarios["wacc"])[0, 1]
+        assert observed == pytest.approx(0.8, abs=0.05)
+        assert scenarios["wacc"].min() >= 0.08 and scenarios["wacc"].max() <= 0.13
+
+    def test_rejects_invalid_correlation(self, dcf_variables):
+        with pytest.raises(ValueError):
+            ScenarioSampler(dcf_variables, correlation_matrix=np.eye(2))
+
+
+class TestMonteCarloEngine:
+    """Streaming engine and existing entry points"""
+
+    def test_stream_yields_per_chunk(self, dcf_variables):
+        engine = MonteCarloEngine(dcf_variables, seed=1, chunk_size=1_000)
+        summaries = list(engine.stream(lambda s: s["wacc"], 3_500))
+        assert [s.paths_completed for s in summaries] == [1_000, 2_000, 3_000, 3_500]
+        assert summaries[-1].is_final
+        assert summaries[-1].histogram_counts.sum() == 3_500
+
+    def test_modeling_engine_simulation(self, dcf_variables):
+        result = FinancialModelingEngine().monte_carlo_simulation(
+            {"dcf": True, "revenue_base": 1e6, "base_value": 1e6},
+            dcf_variables,
+            iterations=20_000,
+            seed=3,
+        )
+        pct = result["percentiles"]
+        assert pct["5th"] < pct["50th"] < pct["95th"]
+        assert 0 <= result["probability_above_base"] <= 1
+        assert len(result["histogram_data"][0]) == 50
+
+    def test_valuation_rowwise_and_vectorized_agree(self):
+        def valuation(assumptions):
+            return assumptions["ebitda"] * assumptions["multiple"]
+
+        kwargs = dict(
+            base_assumptions={"ebitda": 100.0},
+            assumptions_distribution={"multiple": (8.0, 1.0)},
+            valuation_function=valuation,
+            iterations=2_000,
+            seed=11,
+        )
+        rowwise = monte_carlo_valuation(**kwargs)
+        vectorized = monte_carlo_valuation(vectorized=True, **kwargs)
+        assert rowwise["median"] == vectorized["median"]
+        assert len(rowwise["distribution"]) == 100
@@ -0,0 +1,155 @@
+"""Tests for streaming multipart and TUS uploads"""
+
+import hashlib
+import io
+import threading
+
+import httpx
+import pytest
+
+from app.services.multipart_upload import (
+    MultipartUploader,
+    MultipartUploadError,
+    TusUploader,
+    choose_part_size,
+    MAX_PARTS,
+)
+
+
+PART = 5 * 1024 * 1024
+
+
+class FakeS3:
+    """Thread-safe stand-in for the boto3 multipart calls"""
+
+    def __init__(self, fail_parts=None):
+        self.lock = threading.Lock()
+        self.parts = {}
+        self.puts = {}
+        self.completed = None
+        self.aborted = False
+        self.attempts = {}
+        self.fail_parts = dict(fail_parts or {})  # part number -> failures left
+
+    def put_object(self, Bucket, Key, Body, **kwargs):
+        self.puts[Key] = Body
+        return {'ETag': '"single"'}
+
+    def create_multipart_upload(self, Bucket, Key, **kwargs):
+        return {'UploadId': 'upload-1'}
+
+    def upload_part(self, Bucket, Key, UploadId, PartNumber, Body):
+        with self.lock:
+            self.attempts[PartNumber] = self.attempts.get(PartNumber, 0) + 1
+            if self.fail_parts.get(PartNumber, 0) > 0:
+                self.fail_parts[PartNumber] -= 1
+                raise ConnectionError(f"part {PartNumber} dropped")
+            self.parts[PartNumber] = Body
+        return {'ETag': f'"etag-{PartNumber}"'}
+
+    def list_parts(self, Bucket, Key, UploadId, PartNumberMarker=0):
+        return {
+            'Parts': [
+                {'PartNumber': n, 'ETag': f'"etag-{n}"', 'Size': len(body)}
+                for n, body in sorted(self.parts.items())
+            ],
+            'IsTruncated': False
+        }
+
+    def complete_multipart_upload(self, Bucket, Key, UploadId, MultipartUpload):
+        self.completed = MultipartUpload['Parts']
+        return {'ETag': '"combined-3"'}
+
+    def abort_multipart_upload(self, Bucket, Key, UploadId):
+        self.aborted = True
+
+
+def payload(size):
+    return (bytes(range(251)) * (size // 251 + 1))[:size]
+
+
+def test_small_file_uses_single_put():
+    client = FakeS3()
+    data = payload(1000)
+    result = MultipartUploader(client, 'docs', part_size=PART).upload(io.BytesIO(data), 'k')
+
+    assert client.puts['k'] == data
+    assert result.sha256 == hashlib.sha256(data).hexdigest()
+    assert (result.size, result.parts, result.etag) == (1000, 1, 'single')
+
+
+def test_parts_upload_concurrently_and_retry():
+    data = payload(PART * 3 + 123)
+    client = FakeS3(fail_parts={2: 1})
+    uploader = MultipartUploader(client, 'docs', part_size=PART, max_concurrency=3, retry_backoff=0)
+
+    result = uploader.upload(io.BytesIO(data), 'k')
+
+    assert result.sha256 == hashlib.sha256(data).hexdigest()
+    assert result.size == len(data) and result.parts == 4
+    assert b''.join(client.parts[n] for n in sorted(client.parts)) == data
+    assert [p['PartNumber'] for p in client.completed] == [1, 2, 3, 4]
+    assert client.attempts[2] == 2
+
+
+def test_failed_upload_resumes_without_resending_parts():
+    data = payload(PART * 3)
+    client = FakeS3(fail_parts={3: 10})
+    uploader = MultipartUploader(client, 'docs', part_size=PART, max_concurrency=1,
+                                 max_attempts=2, retry_backoff=0)
+
+    with pytest.raises(MultipartUploadError) as error:
+        uploader.upload(io.BytesIO(data), 'k')
+    assert error.value.upload_id == 'upload-1'
+    assert error.value.failed_parts == [3]
+    assert client.completed is None and not client.aborted
+
+    client.fail_parts.clear()
+    result = uploader.upload(io.BytesIO(data), 'k', upload_id=error.value.upload_id)
+
+    assert result.resumed_parts == 2
+    assert client.attempts == {1: 1, 2: 1, 3: 3}
+    assert result.sha256 == hashlib.sha256(data).hexdigest()
+
+
+def test_part_size_grows_to_stay_under_part_limit():
+    total = PART * MAX_PARTS * 3
+    assert choose_part_size(total, PART) * MAX_PARTS >= total
+    assert choose_part_size(100, 1024) == PART
+
+
+def test_tus_upload_recovers_from_dropped_chunk():
+    state = {'offset': 0, 'body': b'', 'drop_next': True, 'length': None}
+
+    def handler(request):
+        if request.method == 'POST':
+            state['length'] = int(request.headers['Upload-Length'])
+            return httpx.Response(201, headers={'Location': '/storage/v1/upload/resumable/abc'})
+        if request.method == 'HEAD':
+            return httpx.Response(200, headers={'Upload-Offset': str(state['offset'])})
+        assert int(request.headers['Upload-Offset']) == state['offset']
+        chunk = request.content
+        if state['drop_next'] and state['offset'] > 0:
+            # Half the chunk lands, then the connection drops
+            state['drop_next'] = False
+            state['body'] += chunk[:len(chunk) // 2]
+            state['offset'] += len(chunk) // 2
+            return httpx.Response(502)
+        state['body'] += chunk
+        state['offset'] += len(chunk)
+        return httpx.Response(204, headers={'Upload-Offset': str(state['offset'])})
+
+    data = payload(2500)
+    uploader = TusUploader(
+        'https://project.supabase.co', 'key', 'ma-documents',
+        chunk_size=1000, retry_backoff=0,
+        http_client=httpx.Client(transport=httpx.MockTransport(handler))
+    )
+
+    result = uploader.upload(io.BytesIO(data), 'organizations/o/documents/x.pdf', 'application/pdf')
+
+    assert state['body'] == data
+    assert state['length'] == len(data)
+    assert result.parts == 3
+    assert result.upload_id == 'https://project.supabase.co/storage/v1/upload/resumable/abc'
+    assert result.sha256 == hashlib.sha256(data).hexdigest()
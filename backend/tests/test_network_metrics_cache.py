@@ -0,0 +1,90 @@
+"""Tests for incremental partnership network centrality caching"""
+
+import random
+
+import networkx as nx
+import pytest
+
+from app.intelligence.partnership_network import NetworkMetricsCache
+
+
+def partnership_graph(seed=11, clusters=12, size=8):
+    """Sparse directed graph of small partner clusters, so an added edge affects few nodes"""
+    rng = random.Random(seed)
+    graph = nx.DiGraph()
+    for c in range(clusters):
+        nodes = [f"p{c}_{i}" for i in range(size)]
+        graph.add_nodes_from(nodes)
+        for _ in range(size + 2):
+            u, v = rng.sample(nodes, 2)
+            graph.add_edge(u, v)
+    return graph
+
+
+def assert_matches_full_recompute(snapshot, graph):
+    expected = {
+        "degree": nx.degree_centrality(graph),
+        "betweenness": nx.betweenness_centrality(graph),
+        "closeness": nx.closeness_centrality(graph),
+        "eigenvector": nx.eigenvector_centrality(graph, max_iter=1000),
+    }
+    assert snapshot.node_count == graph.number_of_nodes() and snapshot.edge_count == graph.number_of_edges()
+    for metric, values in expected.items():
+        actual = getattr(snapshot, metric)
+        assert set(actual) == set(values)
+        for node, value in values.items():
+            assert actual[node] == pytest.approx(value, abs=1e-9), (metric, node)
+
+
+def add_edges_within_cluster(graph, rng, count):
+    added = []
+    while len(added) < count:
+        cluster = rng.randrange(12)
+        u, v = rng.sample([f"p{cluster}_{i}" for i in range(8)], 2)
+        if not graph.has_edge(u, v):
+            graph.add_edge(u, v)
+            added.append((u, v))
+    return added
+
+
+def test_incremental_updates_match_full_recompute():
+    rng = random.Random(5)
+    graph = partnership_graph()
+    cache = NetworkMetricsCache()
+
+    first = cache.snapshot(graph)
+    assert not first.incremental
+    assert_matches_full_recompute(first, graph)
+
+    for count in (1, 2, 3):
+        add_edges_within_cluster(graph, rng, count)
+        snapshot = cache.snapshot(graph)
+        assert snapshot.incremental
+        assert snapshot.stats["added_edges"] == count
+        assert_matches_full_recompute(snapshot, graph)
+
+    # Removing edges falls back to a full recompute, still exact
+    for u, v in rng.sample(list(graph.edges()), 3):
+        graph.remove_edge(u, v)
+    removed = cache.snapshot(graph)
+    assert not removed.incremental
+    assert_matches_full_recompute(removed, graph)
+
+    # Adding edges on top of the recomputed graph patches again
+    add_edges_within_cluster(graph, rng, 2)
+    patched = cache.snapshot(graph)
+    assert patched.incremental
+    assert_matches_full_recompute(patched, graph)
+
+
+def test_same_graph_version_is_served_from_cache():
+    graph = partnership_graph()
+    cache = NetworkMetricsCache()
+
+    first = cache.snapshot(graph)
+    graph.add_edge("p0_0", "p0_1")
+    cache.snapshot(graph)
+    graph.remove_edge("p0_0", "p0_1")
+
+    assert cache.snapshot(graph.copy()) is first
+    assert (cache.hits, cache.misses) == (1, 2)
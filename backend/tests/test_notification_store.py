@@ -0,0 +1,100 @@
+"""Tests for the indexed per-user notification store"""
+
+import asyncio
+from datetime import datetime, timedelta
+
+from app.realtime.notifications import NotificationService, NotificationType
+
+
+def make_service(**kwargs):
+    service = NotificationService(**kwargs)
+
+    async def no_send(notification):
+        return None
+
+    service._send_realtime_notification = no_send
+    return service
+
+
+async def notify(service, user_id="u1", **kwargs):
+    return await service.create_notification(
+        NotificationType.DEAL_CREATED, user_id, "org", {"deal_title": "Deal"}, **kwargs
+    )
+
+
+def test_cursor_pages_cover_every_notification_newest_first():
+    async def scenario():
+        service = make_service()
+        created = [await notify(service) for _ in range(25)]
+
+        seen, cursor = [], None
+        while True:
+            page, cursor = await service.get_notification_page("u1", limit=10, cursor=cursor)
+            seen.extend(page)
+            if cursor is None:
+                break
+
+        assert [n.id for n in seen] == [n.id for n in reversed(created)]
+        assert len({n.id for n in created}) == 25
+
+    asyncio.run(scenario())
+
+
+def test_unread_counter_tracks_read_dismiss_and_eviction():
+    async def scenario():
+        service = make_service(max_notifications_per_user=5)
+        created = [await notify(service) for _ in range(7)]
+        assert await service.get_unread_count("u1") == 5
+
+        assert await service.mark_notification_read(created[-1].id, "u1")
+        assert await service.mark_notification_read(created[-1].id, "u1")
+        assert await service.dismiss_notification(created[-2].id, "u1")
+        assert not await service.dismiss_notification(created[0].id, "u1")  # evicted
+
+        assert await service.get_unread_count("u1") == 3
+        unread = await service.get_user_notifications("u1", include_read=False)
+        assert created[-1].id not in {n.id for n in unread}
+        assert len(unread) == 4
+
+    asyncio.run(scenario())
+
+
+def test_expiry_heap_removes_only_expired():
+    async def scenario():
+        service = make_service()
+        expiring = await notify(service, expires_in_hours=1)
+        kept = await notify(service)
+        await notify(service, user_id="u2", expires_in_hours=1)
+
+        assert service._expire(datetime.utcnow()) == 0
+        assert service._expire(datetime.utcnow() + timedelta(hours=2)) == 2
+
+        assert "u2" not in service.notification_cache
+        assert [n.id for n in await service.get_user_notifications("u1")] == [kept.id]
+        assert not await service.mark_notification_read(expiring.id, "u1")
+        assert await service.get_unread_count("u1") == 1
+
+    asyncio.run(scenario())
+
+
+def test_unread_pages_come_from_the_unread_index():
+    async def scenario():
+        service = make_service(max_notifications_per_user=40)
+        created = [await notify(service) for _ in range(60)]
+        for notification in created[20::3]:
+            await service.mark_notification_read(notification.id, "u1")
+        await service.dismiss_notification(created[-1].id, "u1")  # dismissed, still unread
+
+        store = service.notification_cache["u1"]
+        expected = [n.id for n in reversed(created[20:]) if not n.is_read]
+        assert store.unread_order == sorted(store.by_id[i][0] for i in expected)
+
+        seen, cursor = [], None
+        while True:
+            page, cursor = await service.get_notification_page("u1", limit=7, cursor=cursor, include_read=False)
+            seen.extend(n.id for n in page)
+            if cursor is None:
+                break
+        assert seen == expected
+
+    asyncio.run(scenario())
@@ -0,0 +1,247 @@
+"""Tests for the sliding-window rate limiter and its middleware overhead"""
+
+import asyncio
+import math
+import os
+import time
+
+import pytest
+from starlette.requests import Request
+from starlette.responses import Response
+
+from app.middleware import rate_limiter
+from app.middleware.rate_limiter import (
+    SLIDING_WINDOW_SCRIPT,
+    AdvancedRateLimiter,
+    RateLimitMiddleware,
+    SlidingWindowCounter,
+)
+
+
+class ScriptRedis:
+    """Async Redis stand-in that runs SLIDING_WINDOW_SCRIPT's contract in Python"""
+
+    def __init__(self):
+        self.windows = {}
+        self.calls = 0
+        self.fail = False
+
+    def register_script(self, source):
+        return self._run
+
+    async def _run(self, keys, args):
+        if self.fail:
+            raise ConnectionError("redis down")
+        self.calls += 1
+        now, window_start, limit, member, _, fraction, max_lease = args[:7]
+        window = self.windows.setdefault(keys[0], {})
+        for refunded in args[7:]:
+            window.pop(refunded, None)
+        for m in [m for m, score in window.items() if score <= window_start]:
+            del window[m]
+
+        current = len(window)
+        oldest = min(window.values(), default=now)
+        if current >= limit:
+            return [0, current, str(oldest)]
+        lease = max(0, min(math.floor((limit - current - 1) * fraction), max_lease))
+        for i in range(1, lease + 2):
+            window[f"{member}:{i}"] = now
+        return [lease + 1, current + lease + 1, str(oldest)]
+
+
+def test_denied_requests_are_not_recorded():
+    async def scenario():
+        redis = ScriptRedis()
+        limiter = AdvancedRateLimiter(redis_client=redis)
+        results = [await limiter.check_limit("org", 3, 60) for _ in range(5)]
+
+        assert [r["allowed"] for r in results] == [True, True, True, False, False]
+        assert len(redis.windows["ratelimit:org:default"]) == 3
+        assert results[2]["remaining"] == 0
+
+    asyncio.run(scenario())
+
+
+def test_leases_skip_redis_and_refund_unused_slots():
+    async def scenario():
+        redis = ScriptRedis()
+        limiter = AdvancedRateLimiter(redis_client=redis, lease_fraction=0.1, max_lease=20)
+        results = [await limiter.check_limit("org", 100, 60) for _ in range(10)]
+
+        # One round-trip reserved 1 + 9 slots; the other nine were local
+        assert redis.calls == 1
+        assert limiter.local_hits == 9
+        assert [r["current_count"] for r in results] == list(range(1, 11))
+
+        await limiter.check_limit("org", 100, 60)
+        limiter._leases["ratelimit:org:default"].expires_at = 0
+        await limiter.check_limit("org", 100, 60)
+        # The expired lease's unused slots were released in the same call
+        assert len(redis.windows["ratelimit:org:default"]) == 12 + 8
+
+    asyncio.run(scenario())
+
+
+async def lua_redis():
+    """
+    A Redis that runs SLIDING_WINDOW_SCRIPT itself: the server at
+    RATE_LIMIT_TEST_REDIS_URL when set, else fakeredis with its Lua runtime
+    """
+    url = os.getenv("RATE_LIMIT_TEST_REDIS_URL")
+    if url:
+        import redis.asyncio as aioredis
+        client = aioredis.from_url(url, decode_responses=True)
+        await client.flushdb()
+        return client
+    fakeredis = pytest.importorskip("fakeredis")
+    pytest.importorskip("lupa")
+    return fakeredis.FakeAsyncRedis(decode_responses=True)
+
+
+def test_lua_script_records_only_admitted_requests():
+    async def scenario():
+        redis = await lua_redis()
+        script = redis.register_script(SLIDING_WINDOW_SCRIPT)
+        key = "ratelimit:org:default"
+
+        # now, window_start, limit, member, ttl_ms, lease_fraction, max_lease
+        results = [await script(keys=[key], args=[100.0 + i, 40.0, 3, f"m{i}", 60000, 0, 0]) for i in range(5)]
+        assert [int(granted) for granted, _, _ in results] == [1, 1, 1, 0, 0]
+        assert [int(count) for _, count, _ in results] == [1, 2, 3, 3, 3]
+        assert float(results[-1][2]) == 100.0  # oldest entry in the window
+        assert await redis.zcard(key) == 3
+        assert 0 < await redis.pttl(key) <= 60000
+
+        # Entries at or before window_start are pruned before counting
+        granted, count, _ = await script(keys=[key], args=[161.0, 101.0, 3, "late", 60000, 0, 0])
+        assert (int(granted), int(count)) == (1, 2)
+        assert await redis.zrange(key, 0, -1) == ["m2:1", "late:1"]
+
+    asyncio.run(scenario())
+
+
+def test_lua_script_leases_and_refunds_slots():
+    async def scenario():
+        redis = await lua_redis()
+        script = redis.register_script(SLIDING_WINDOW_SCRIPT)
+        key = "ratelimit:org:default"
+
+        granted, count, _ = await script(keys=[key], args=[10.0, 0.0, 100, "a", 60000, 0.1, 20])
+        assert (int(granted), int(count)) == (10, 10)  # 1 + floor(99 * 0.1)
+
+        # Refunded members are removed before the window is counted
+        refund = [f"a:{i}" for i in range(3, 11)]
+        granted, count, _ = await script(keys=[key], args=[11.0, 0.0, 100, "b", 60000, 0.5, 5, *refund])
+        assert (int(granted), int(count)) == (6, 8)  # lease capped at max_lease
+        assert await redis.zcard(key) == 8
+
+        limiter = AdvancedRateLimiter(redis_client=redis, lease_fraction=0.1, max_lease=20)
+        results = [await limiter.check_limit("api", 100, 60) for _ in range(10)]
+        assert [r["current_count"] for r in results] == list(range(1, 11))
+        assert limiter.redis_checks == 1 and limiter.local_hits == 9
+
+    asyncio.run(scenario())
+
+
+def test_redis_failure_falls_back_to_bounded_memory():
+    async def scenario():
+        redis = ScriptRedis()
+        redis.fail = True
+        limiter = AdvancedRateLimiter(redis_client=redis, max_local_keys=50, redis_retry_seconds=60)
+
+        results = [await limiter.check_limit("org", 2, 60) for _ in range(3)]
+        assert [r["allowed"] for r in results] == [True, True, False]
+        assert limiter.redis_errors == 1  # later checks skip Redis until the retry time
+
+        for i in range(200):
+            await limiter.check_limit(f"ip-{i}", 10, 60)
+        assert len(limiter.memory_cache) == 50
+
+    asyncio.run(scenario())
+
+
+def test_unreachable_redis_uses_memory_from_startup(monkeypatch):
+    # Non-routable address: the connect either fails fast or hits the connect timeout
+    monkeypatch.setattr(rate_limiter, "REDIS_URL", "redis://10.255.255.1:6379/0")
+    monkeypatch.setattr(rate_limiter, "REDIS_TIMEOUT_SECONDS", 0.2)
+
+    started = time.perf_counter()
+    limiter = AdvancedRateLimiter()
+    assert time.perf_counter() - started < 2
+    assert not limiter.use_redis
+
+    result = asyncio.run(limiter.check_limit("org", 1, 60))
+    assert result["allowed"] and limiter.redis_checks == 0
+
+
+def test_redis_client_has_short_timeouts(monkeypatch):
+    created = {}
+
+    class Probe:
+        def __init__(self, url, **options):
+            created["probe"] = options
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            return False
+
+        def ping(self):
+            return True
+
+    def async_client(url, **options):
+        created["client"] = options
+        return ScriptRedis()
+
+    monkeypatch.setattr(rate_limiter.redis, "from_url", Probe)
+    monkeypatch.setattr(rate_limiter.aioredis, "from_url", async_client)
+
+    limiter = AdvancedRateLimiter()
+
+    assert limiter.use_redis
+    for options in created.values():
+        assert options["socket_connect_timeout"] == options["socket_timeout"] == rate_limiter.REDIS_TIMEOUT_SECONDS
+
+
+def test_sliding_window_counter_weights_previous_window():
+    counter = SlidingWindowCounter(60)
+    for _ in range(30):
+        counter.add(119.0)
+    assert counter.count(150.0) == 15
+    assert counter.count(500.0) == 0
+
+
+def _request(path="/api/v1/deals"):
+    scope = {
+        "type": "http", "method": "GET", "path": path, "raw_path": path.encode(),
+        "query_string": b"", "headers": [], "client": ("10.0.0.1", 1234),
+        "server": ("test", 80), "scheme": "http", "state": {"organization_id": "org_1"}
+    }
+    return Request(scope)
+
+
+def test_middleware_overhead_p99_under_1ms():
+    async def call_next(request):
+        return Response("ok")
+
+    async def scenario(limiter):
+        middleware = RateLimitMiddleware(app=None, rate_limiter=limiter)
+        latencies = []
+        for _ in range(3000):
+            request = _request()
+            started = time.perf_counter()
+            await middleware.dispatch(request, call_next)
+            latencies.append(time.perf_counter() - started)
+        latencies.sort()
+        return latencies[int(len(latencies) * 0.99)]
+
+    unavailable = ScriptRedis()
+    unavailable.fail = True
+    healthy = AdvancedRateLimiter(redis_client=ScriptRedis())
+    fallback = AdvancedRateLimiter(redis_client=unavailable, redis_retry_seconds=60)
+
+    for limiter in (healthy, fallback):
+        p99 = asyncio.run(scenario(limiter))
+        assert p99 < 0.001, f"p99 overhead {p99 * 1000:.3f}ms"
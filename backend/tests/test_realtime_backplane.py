@@ -0,0 +1,98 @@
+"""Tests for routing realtime broadcasts across workers"""
+
+import asyncio
+import json
+
+from app.realtime.backplane import InMemoryBackplane, InMemoryHub, RedisBackplane, make_envelope
+from app.realtime.websocket_manager import MessageType, RealtimeMessage, WebSocketManager
+
+
+class FakeWebSocket:
+    def __init__(self):
+        self.sent = []
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, text):
+        self.sent.append(json.loads(text))
+
+    async def close(self, code=1000):
+        pass
+
+
+async def settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+async def two_workers():
+    hub = InMemoryHub()
+    workers = [WebSocketManager(), WebSocketManager()]
+    for worker in workers:
+        await worker.attach_backplane(InMemoryBackplane(hub))
+    return hub, workers
+
+
+def message(kind, n, channel=None):
+    return RealtimeMessage(id=f"m{n}", type=kind, sender_id="u1", channel=channel, payload={"n": n})
+
+
+def test_organization_broadcast_reaches_other_worker_once():
+    async def run():
+        _, (a, b) = await two_workers()
+        on_a, on_b = FakeWebSocket(), FakeWebSocket()
+        await a.connect(on_a, "alice", "org1")
+        await b.connect(on_b, "bob", "org1")
+        await settle()
+        on_a.sent.clear()
+        on_b.sent.clear()
+
+        await b.broadcast_to_organization("org1", message(MessageType.DEAL_UPDATE, 1))
+        await settle()
+        return on_a, on_b
+
+    on_a, on_b = asyncio.run(run())
+    assert [m["id"] for m in on_a.sent] == ["m1"]
+    assert [m["id"] for m in on_b.sent] == ["m1"]
+
+
+def test_channel_history_is_shared_between_workers():
+    async def run():
+        _, (a, b) = await two_workers()
+        for n in range(3):
+            await a.broadcast_to_channel("deal_42", message(MessageType.CHAT_MESSAGE, n, "deal_42"))
+
+        late = FakeWebSocket()
+        connection_id = await b.connect(late, "carol", "org1")
+        await b.join_channel(connection_id, "deal_42")
+        await settle()
+        return late
+
+    late = asyncio.run(run())
+    history = [m["id"] for m in late.sent if m["type"] == "chat_message"]
+    assert history == ["m0", "m1", "m2"]
+
+
+def test_redis_backplane_batches_publishes():
+    class FakeRedis:
+        def __init__(self):
+            self.published = []
+
+        async def publish(self, channel, data):
+            self.published.append((channel, json.loads(data)))
+
+    async def run():
+        redis = FakeRedis()
+        backplane = RedisBackplane(redis, batch_interval=0.01)
+        for n in range(5):
+            await backplane.publish(make_envelope("w1", "o", "org1", f"frame{n}"))
+        await asyncio.sleep(0.03)
+        return redis
+
+    redis = asyncio.run(run())
+    assert len(redis.published) == 1
+    channel, batch = redis.published[0]
+    assert channel == "realtime:bus"
+    assert [envelope["f"] for envelope in batch] == [f"frame{n}" for n in range(5)]
+    assert "x" not in batch[0]
@@ -0,0 +1,150 @@
+"""Tests for the concurrent registry scanner against a local stub server"""
+
+import asyncio
+import json
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+import pytest
+
+from app.integrations.rate_limit import AsyncTokenBucket
+from app.services.registry_scanner import RegistryScanner
+
+
+SIC_COMPANIES = {
+    "62": ["00000001", "00000002", "00000003"],
+    "86": ["00000003", "00000004"],
+}
+OVERDUE = {"00000001", "00000003", "00000004"}
+
+
+class StubRegistryHandler(BaseHTTPRequestHandler):
+    """Minimal Companies House / SEC EDGAR responses"""
+
+    requests = Counter()
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        StubRegistryHandler.requests[url.path] += 1
+
+        if url.path == "/advanced-search/companies":
+            sic = parse_qs(url.query)["sic_codes"][0]
+            body = {"items": [
+                {"company_number": number, "title": f"Company {number}", "date_of_creation": "2001-01-01"}
+                for number in SIC_COMPANIES.get(sic, [])
+            ]}
+        elif url.path.endswith("/filing-history"):
+            number = url.path.split("/")[2]
+            body = {"items": [], "overdue_count": 1 if number in OVERDUE else 0}
+        elif url.path.startswith("/api/xbrl/companyfacts/"):
+            cik = url.path.rsplit("CIK", 1)[1].split(".")[0]
+            body = {"entityName": f"Corp {cik}", "facts": {"us-gaap": {"Revenues": {"units": {"USD": [
+                {"end": "2024-12-31", "val": 1_000_000, "fy": 2024}
+            ]}}}}}
+        else:
+            self.send_response(404)
+            self.end_headers()
+            return
+
+        payload = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub_server():
+    StubRegistryHandler.requests.clear()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubRegistryHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+class RecordingDiscoveryService:
+    """Captures what would be persisted"""
+
+    def __init__(self):
+        self.calls = []
+
+    def create_uk_opportunities(self, organization_id, companies):
+        self.calls.append((organization_id, sorted(c["company_number"] for c in companies)))
+        return companies
+
+    def create_us_opportunities(self, organization_id, company_facts):
+        self.calls.append((organization_id, sorted(company_facts)))
+        return list(company_facts)
+
+
+def make_scanner(stub_server, discovery, **kwargs):
+    return RegistryScanner(
+        discovery,
+        companies_house_api_key="test-key",
+        sec_user_agent="Test admin@example.com",
+        companies_house_url=stub_server,
+        sec_api_base=stub_server,
+        companies_house_limiter=kwargs.pop("limiter", AsyncTokenBucket(rate=1000, capacity=100)),
+        sec_limiter=AsyncTokenBucket(rate=1000, capacity=100),
+        **kwargs
+    )
+
+
+def test_companies_house_fan_out_dedupes_across_filters(stub_server):
+    discovery = RecordingDiscoveryService()
+    scans = [{"industry_sic": "62", "min_age_years": 3}, {"industry_sic": "86", "min_age_years": 3}]
+
+    async def run():
+        async with make_scanner(stub_server, discovery) as scanner:
+            return await scanner.scan_companies_house({"org-a": scans, "org-b": scans[:1]})
+
+    result = asyncio.run(run())
+
+    # Each SIC searched once although two organizations asked for "62"
+    assert StubRegistryHandler.requests["/advanced-search/companies"] == 2
+    assert dict(discovery.calls) == {
+        "org-a": ["00000001", "00000003", "00000004"],
+        "org-b": ["00000001", "00000003"],
+    }
+    assert result["opportunities_discovered"] == 5
+    assert result["failed_filters"] == []
+
+
+def test_sec_edgar_fetches_each_cik_once(stub_server):
+    discovery = RecordingDiscoveryService()
+
+    async def run():
+        async with make_scanner(stub_server, discovery) as scanner:
+            return await scanner.scan_sec_edgar({"org-a": ["320193", "789019"], "org-b": ["0000320193"]})
+
+    result = asyncio.run(run())
+
+    assert sum(n for path, n in StubRegistryHandler.requests.items() if "companyfacts" in path) == 2
+    assert dict(discovery.calls)["org-b"] == ["0000320193"]
+    assert result["ciks_scanned"] == 2
+
+
+def test_token_bucket_paces_requests(stub_server):
+    discovery = RecordingDiscoveryService()
+    limiter = AsyncTokenBucket(rate=50, capacity=1)
+
+    async def run():
+        async with make_scanner(stub_server, discovery, limiter=limiter) as scanner:
+            return await scanner.scan_companies_house({"org-a": [{"industry_sic": "62"}]})
+
+    started = time.perf_counter()
+    asyncio.run(run())
+    elapsed = time.perf_counter() - started
+
+    # 1 search + 3 filing histories with a burst of 1 at 50/s
+    assert elapsed >= 3 / 50
+    assert limiter.total_wait_seconds > 0
@@ -0,0 +1,70 @@
+"""Tests for chunking and rank fusion in chunk-level retrieval"""
+
+import re
+
+import pytest
+
+from app.services.retrieval import (
+    ChunkHit,
+    ChunkRetriever,
+    chunk_by_tokens,
+    latency_summary,
+    recall_at_k,
+    reciprocal_rank_fusion,
+    vector_literal,
+)
+
+
+class WordEncoding:
+    """Whitespace tokenizer with the tiktoken encode/decode_with_offsets surface"""
+
+    def __init__(self):
+        self._spans = []
+
+    def encode(self, text):
+        self._spans = [m.start() for m in re.finditer(r"\s*\S+", text)]
+        return list(range(len(self._spans)))
+
+    def decode_with_offsets(self, tokens):
+        return None, [self._spans[t] for t in tokens]
+
+
+def test_token_chunks_overlap_and_cover_text():
+    text = " ".join(f"w{i}" for i in range(25))
+    chunks = chunk_by_tokens(text, WordEncoding(), chunk_tokens=10, overlap_tokens=3)
+
+    assert [c.token_count for c in chunks] == [10, 10, 10, 4]
+    assert chunks[0].content.split()[-3:] == chunks[1].content.split()[:3]
+    assert chunks[-1].char_end == len(text)
+    assert all(text[c.char_start:c.char_end] == c.content for c in chunks)
+
+
+def test_chunker_rejects_overlap_larger_than_chunk():
+    with pytest.raises(ValueError):
+        chunk_by_tokens("a b c", WordEncoding(), chunk_tokens=2, overlap_tokens=2)
+
+
+def test_reciprocal_rank_fusion_rewards_agreement():
+    fused = reciprocal_rank_fusion([["a", "b", "c"], ["c", "a", "d"]], k=60)
+    assert [item for item, _ in fused] == ["a", "c", "b", "d"]
+    assert fused[0][1] == pytest.approx(1 / 61 + 1 / 62)
+
+
+def test_fuse_keeps_both_ranks():
+    vector = [ChunkHit("1", "d1", 0, "x", similarity=0.9, vector_rank=1),
+              ChunkHit("2", "d1", 1, "y", similarity=0.8, vector_rank=2)]
+    lexical = [ChunkHit("3", "d2", 0, "z", lexical_rank=1),
+               ChunkHit("2", "d1", 1, "y", lexical_rank=2)]
+
+    hits = ChunkRetriever().fuse(vector, lexical, limit=2)
+
+    assert hits[0].chunk_id == "2"
+    assert (hits[0].vector_rank, hits[0].lexical_rank) == (2, 2)
+    assert len(hits) == 2
+
+
+def test_benchmark_metrics():
+    assert recall_at_k([1, 2, 3, 9], [1, 2, 3, 4], k=4) == 0.75
+    summary = latency_summary(list(range(1, 101)))
+    assert summary["p95_ms"] == pytest.approx(95.05)
+    assert vector_literal([0.5, -1.0]) == "[0.5,-1]"
@@ -0,0 +1,132 @@
+"""Tests for grid-evaluated sensitivity analysis"""
+
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from app.models.financial_models import TerminalValueMethod
+from app.services.valuation_engine import DCFValuationService, LBOModelingService
+from app.utils.financial_calculations import (
+    calculate_enterprise_value_from_dcf,
+    calculate_lbo_returns,
+    calculate_terminal_value_perpetuity,
+    two_way_sensitivity_analysis,
+)
+from app.utils.sensitivity import evaluate_grid, tornado_analysis
+
+
+REVENUES = [1000.0, 1100.0, 1200.0, 1300.0, 1400.0]
+FREE_CASH_FLOWS = [100.0, 110.0, 120.0, 130.0, 140.0]
+
+
+@pytest.fixture
+def dcf_model():
+    """Stand-in for a persisted DCFModel"""
+    return SimpleNamespace(
+        wacc=9.5,
+        terminal_growth_rate=2.5,
+        exit_multiple=None,
+        ebitda_margin=20,
+        tax_rate=25,
+        free_cash_flows=FREE_CASH_FLOWS,
+        revenue_projections=REVENUES,
+        terminal_value_method=TerminalValueMethod.PERPETUITY_GROWTH,
+        terminal_value=2000,
+    )
+
+
+@pytest.fixture
+def lbo_model():
+    """Stand-in for a persisted LBOModel"""
+    return SimpleNamespace(
+        exit_multiple=8,
+        purchase_price=1000,
+        equity_investment=400,
+        hold_period_years=5,
+        revenue_projections=REVENUES,
+        ebitda_projections=[rev * 0.2 for rev in REVENUES],
+        debt_amortization_schedule=[600, 480, 360, 240, 120, 0],
+    )
+
+
+class TestGridEngine:
+    """Generic grid and tornado evaluation"""
+
+    def test_vectorized_matches_cell_by_cell(self):
+        def valuation(a):
+            return a["ebitda"] * a["multiple"] - a["debt"]
+
+        base = {"ebitda": 100.0, "multiple": 8.0, "debt": 200.0}
+        axes = {"ebitda": [80, 100, 120], "multiple": [6, 8], "debt": [100, 200, 300, 400]}
+
+        vectorized = evaluate_grid(base, axes, valuation)
+        scalar = evaluate_grid(base, axes, valuation, vectorized=False)
+
+        assert vectorized.shape == (3, 2, 4)
+        np.testing.assert_allclose(vectorized.values, scalar.values)
+        assert vectorized.base_value == 600
+
+    def test_two_way_table_layout(self):
+        result = two_way_sensitivity_analysis(
+            {"a": 1.0, "b": 1.0}, "a", [1, 2], "b", [10, 20, 30],
+            lambda x: x["a"] * x["b"], vectorized=True
+        )
+        assert result["results_matrix"] == [[10, 20, 30], [20, 40, 60]]
+
+    def test_tornado_sorted_by_swing(self):
+        tornado = tornado_analysis(
+            {"a": 1.0, "b": 1.0},
+            {"a": (0.5, 1.5), "b": (0.0, 3.0)},
+            lambda x: x["a"] + 2 * x["b"],
+        )
+        assert tornado["base_value"] == 3
+        assert [bar["parameter"] for bar in tornado["bars"]] == ["b", "a"]
+        assert tornado["bars"][0]["delta_low"] == -2
+
+
+class TestValuationServices:
+    """DCF and LBO services on top of the grid engine"""
+
+    def test_dcf_terminal_growth_matches_scalar_path(self, dcf_model):
+        growth = [1.5, 2.5, 3.5]
+        result = DCFValuationService(None).run_sensitivity_analysis(
+            dcf_model, "terminal_growth_rate", growth
+        )
+        expected = [
+            calculate_enterprise_value_from_dcf(
+                FREE_CASH_FLOWS,
+                calculate_terminal_value_perpetuity(FREE_CASH_FLOWS[-1], 9.5, g),
+                9.5,
+            )["enterprise_value"]
+            for g in growth
+        ]
+        assert result["valuations"] == pytest.approx(expected, abs=0.02)
+
+    def test_dcf_four_dimensional_cube(self, dcf_model):
+        axes = {
+            "wacc": list(np.linspace(7, 12, 50)),
+            "terminal_growth_rate": list(np.linspace(1, 8, 50)),
+            "exit_multiple": list(np.linspace(6, 14, 20)),
+            "ebitda_margin": [15, 20, 25],
+        }
+        result = DCFValuationService(None).run_grid_sensitivity(
+            dcf_model, axes, tornado_ranges={"wacc": (8, 11)}
+        )
+        assert result["shape"] == [50, 50, 20, 3]
+        # WACC 7% with 8% terminal growth is undefined
+        assert result["values"][0][-1][0][0] is None
+        assert result["tornado"]["bars"][0]["parameter"] == "wacc"
+
+    def test_dcf_rejects_unknown_parameter(self, dcf_model):
+        with pytest.raises(ValueError):
+            DCFValuationService(None).run_grid_sensitivity(dcf_model, {"beta": [1.0, 1.2]})
+
+    def test_lbo_base_cell_matches_model_returns(self, lbo_model):
+        service = LBOModelingService(None)
+        base_growth = service._base_assumptions(lbo_model)["revenue_growth"]
+        result = service.run_lbo_sensitivity(lbo_model, [6, 8, 10], [2, base_growth, 12])
+
+        expected = calculate_lbo_returns(400, REVENUES[-1] * 0.2 * 8, 5)["irr"]
+        assert result["results_matrix"][1][1] == pytest.approx(expected, abs=0.01)
+        assert result["results_matrix"][1][0] < result["results_matrix"][1][2]
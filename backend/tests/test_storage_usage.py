@@ -0,0 +1,102 @@
+"""Tests for incremental storage usage counters"""
+
+import fnmatch
+
+from app.services.storage_usage import StorageUsageTracker, parse_storage_key
+
+
+class FakeRedis:
+    """In-memory hashes with the pipeline surface the tracker uses"""
+
+    def __init__(self):
+        self.hashes = {}
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    def hincrby(self, name, key, amount):
+        table = self.hashes.setdefault(name, {})
+        table[key] = int(table.get(key, 0)) + amount
+        return table[key]
+
+    def hgetall(self, name):
+        return {k: str(v) for k, v in self.hashes.get(name, {}).items()}
+
+    def hmget(self, name, keys):
+        table = self.hashes.get(name, {})
+        return [None if table.get(k) is None else str(table[k]) for k in keys]
+
+    def hset(self, name, mapping):
+        self.hashes.setdefault(name, {}).update(mapping)
+
+    def delete(self, *names):
+        for name in names:
+            self.hashes.pop(name, None)
+
+    def scan_iter(self, match):
+        return [name for name in list(self.hashes) if fnmatch.fnmatch(name, match)]
+
+
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.ops = []
+
+    def __getattr__(self, name):
+        def queue(*args, **kwargs):
+            self.ops.append((getattr(self.redis, name), args, kwargs))
+        return queue
+
+    def execute(self):
+        return [op(*args, **kwargs) for op, args, kwargs in self.ops]
+
+
+ORG = "org-1"
+DEAL_KEY = f"organizations/{ORG}/deals/deal-9/documents/ab12_cim.pdf"
+ORG_KEY = f"organizations/{ORG}/documents/cd34_nda.pdf"
+
+
+def test_parse_storage_key():
+    assert parse_storage_key(DEAL_KEY) == (ORG, "deal-9")
+    assert parse_storage_key(ORG_KEY) == (ORG, None)
+    assert parse_storage_key("backups/dump.sql") == (None, None)
+
+
+def test_counters_follow_uploads_and_deletes():
+    tracker = StorageUsageTracker(FakeRedis())
+    tracker.record_upload(DEAL_KEY, 1000)
+    tracker.record_upload(ORG_KEY, 200)
+    tracker.record_upload("organizations/org-2/documents/x.pdf", 50)
+    tracker.record_delete(ORG_KEY, 200)
+
+    totals = tracker.get_totals()
+    assert (totals["total_size_bytes"], totals["total_files"]) == (1050, 2)
+
+    usage = tracker.get_organization_usage(ORG)
+    assert (usage["total_size_bytes"], usage["total_files"]) == (1000, 1)
+    assert usage["deals"] == [{"deal_id": "deal-9", "total_size_bytes": 1000, "total_files": 1}]
+
+    breakdown = tracker.get_organization_breakdown()
+    assert [org["organization_id"] for org in breakdown] == [ORG, "org-2"]
+
+
+def test_reconcile_replaces_drifted_counters():
+    redis = FakeRedis()
+    tracker = StorageUsageTracker(redis)
+    tracker.record_upload(DEAL_KEY, 1000)
+    tracker.record_upload("organizations/gone/deals/d/documents/y.pdf", 10)  # deleted out of band
+
+    report = tracker.reconcile([(DEAL_KEY, 1000), (ORG_KEY, 300), ("misc/readme.txt", 5)])
+
+    assert (report["drift_bytes"], report["drift_objects"]) == (295, 1)
+    assert tracker.get_totals()["total_size_bytes"] == 1305
+    assert tracker.get_organization_usage(ORG)["total_size_bytes"] == 1300
+    assert tracker.get_organization_usage("gone")["total_files"] == 0
+    assert "storage_usage:deals:gone" not in redis.hashes
+    assert tracker.get_totals()["reconciled_at"] == report["reconciled_at"]
+
+
+def test_disabled_tracker_is_a_no_op():
+    tracker = StorageUsageTracker(None)
+    tracker.record_upload(DEAL_KEY, 10)
+    assert not tracker.enabled
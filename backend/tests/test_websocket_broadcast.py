@@ -0,0 +1,88 @@
+"""Tests for queued, encode-once WebSocket fan-out"""
+
+import asyncio
+import json
+
+from app.realtime import websocket_manager as ws_module
+from app.realtime.websocket_manager import MessageType, RealtimeMessage, WebSocketManager
+
+
+class FakeWebSocket:
+    def __init__(self, block: bool = False):
+        self.sent = []
+        self.block = block
+        self.closed_with = None
+        self._gate = asyncio.Event()
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, text):
+        if self.block:
+            await self._gate.wait()
+        self.sent.append(json.loads(text))
+
+    async def close(self, code=1000):
+        self.closed_with = code
+
+
+def deal_update(n=0):
+    return RealtimeMessage(id=f"m{n}", type=MessageType.DEAL_UPDATE, sender_id="u1",
+                           payload={"deal_id": "d1", "n": n})
+
+
+async def settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+def test_broadcast_encodes_once_and_reaches_everyone(monkeypatch):
+    async def run():
+        manager = WebSocketManager()
+        sockets = [FakeWebSocket() for _ in range(50)]
+        for i, socket in enumerate(sockets):
+            await manager.connect(socket, f"user{i}", "org1")
+        await settle()
+        for socket in sockets:
+            socket.sent.clear()
+
+        encoded = []
+        original = ws_module.encode_message
+        monkeypatch.setattr(ws_module, "encode_message",
+                            lambda message: encoded.append(message.id) or original(message))
+
+        queued = await manager.broadcast_to_organization("org1", deal_update())
+        await settle()
+        return manager, sockets, queued, encoded
+
+    manager, sockets, queued, encoded = asyncio.run(run())
+
+    assert queued == 50
+    assert encoded == ["m0"]
+    assert all(socket.sent[-1]["payload"] == {"deal_id": "d1", "n": 0} for socket in sockets)
+    assert manager.get_broadcast_metrics()["frames_sent"] >= 50
+
+
+def test_slow_consumer_is_evicted_without_stalling_others():
+    async def run():
+        manager = WebSocketManager(outbound_queue_size=4, slow_consumer_drop_limit=3)
+        fast = FakeWebSocket()
+        slow = FakeWebSocket(block=True)
+        slow_id = await manager.connect(slow, "slow", "org1")
+        await manager.connect(fast, "fast", "org1")
+        await settle()
+
+        for n in range(12):
+            await asyncio.wait_for(manager.broadcast_to_organization("org1", deal_update(n)), 0.1)
+            await settle()
+        await settle()
+        return manager, fast, slow, slow_id
+
+    manager, fast, slow, slow_id = asyncio.run(run())
+
+    assert [m["payload"]["n"] for m in fast.sent if m["type"] == "deal_update"] == list(range(12))
+    assert slow.closed_with == 1013
+    assert slow_id not in manager.connections
+    metrics = manager.get_broadcast_metrics()
+    assert metrics["slow_consumer_evictions"] == 1
+    assert metrics["frames_dropped"] >= 3